@@ -0,0 +1,402 @@
+"""
+Tekrarlanabilir performans ölçümleri; sonuçlar sürümler arası karşılaştırma için JSON'a yazılır.
+
+Örnek:
+    python3 -m fakeusb.bench --output bench.json
+    python3 -m fakeusb.bench --compare bench-1.0.json
+
+Ölçülenler: sysfs disk listeleme, meta veri araması, f3probe çıktı ayrıştırıcısı (büyük
+kayıtlı çıktı ve boru üzerinden), durum alanı (LogSink) yazma hızı (offscreen Qt) ve
+dosya tabanlı sürücülerde uçtan uca prob ve yazma/doğrulama süresi; simüle sahte sürücü
+filosunun zamanlayıcı üzerinden problanması.
+Gerçek aygıt veya root gerekmez; PyQt5 yoksa arayüz ölçümü atlanır.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import devices
+from . import simulator
+from .engine import verify_disk
+from .f3 import F3ProbeParser, drain_lines
+from .index import DeviceIndex, read_disk_metadata
+from .patterns import load_numpy
+from .modes import run_test, MODE_PROBE
+from .probe import probe_capacity
+from .scheduler import ProbeScheduler
+
+DEFAULT_REPEAT = 5
+DEFAULT_FAKE_DISKS = 64  # Sahte sysfs ağacındaki disk sayısı
+DEFAULT_PARSER_LINES = 200000
+DEFAULT_LOG_LINES = 100000
+DEFAULT_DRIVE_MIB = 64
+DEFAULT_SIM_DRIVES = 24
+DEFAULT_TOLERANCE = 0.25  # Karşılaştırmada %25'ten fazla kötüleşme gerileme sayılır
+SIZE_METRICS = ("lines", "disks", "drive_bytes")  # Farklıysa ölçümler karşılaştırılmaz
+
+# Kayıtlı bir f3probe 8.0 çıktısının sonuç bölümü
+F3PROBE_RESULT_LINES = """\
+Bad news: The device `/dev/sdb' is a counterfeit of type limbo
+
+You can "fix" this device using the following command:
+f3fix --last-sec=16477878 /dev/sdb
+
+Device geometry:
+	         *Usable* size: 7.86 GB (16477879 blocks)
+	        Announced size: 15.33 GB (32147456 blocks)
+	                Module: 16.00 GB (2^34 Bytes)
+	Approximate cache size: 0.00 Byte (0 blocks), need-reset=yes
+	   Physical block size: 512.00 Byte (2^9 Bytes)
+
+Probe time: 1'13"
+ Operation: total time / count = avg time
+      Read: 472.1ms / 4198 = 112us
+     Write: 55.48s / 2158 = 25.7ms
+     Reset: 17.88s / 14 = 1.27s
+""".splitlines()
+
+
+def _timings(func, repeat):
+    """func'ı repeat kez çalıştırır; en kısa ve ortanca süreyi saniye olarak döndürür."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return {"min_s": min(durations), "median_s": statistics.median(durations), "repeat": repeat}
+
+
+def build_fake_sysfs(root, disk_count):
+    """root altında disk_count adet USB bellek içeren sahte bir /sys ağacı kurar; block dizinini döndürür."""
+    block_dir = os.path.join(root, "block")
+    os.makedirs(block_dir)
+    for number in range(disk_count):
+        usb_dir = os.path.join(root, "devices", "pci0000:00", f"usb{number % 4 + 1}", f"{number % 4 + 1}-{number}")
+        scsi_dir = os.path.join(usb_dir, f"{number % 4 + 1}-{number}:1.0", f"host{number}", f"target{number}:0:0",
+                                f"{number}:0:0:0")
+        name = f"sd{chr(ord('a') + number // 26)}{chr(ord('a') + number % 26)}"
+        disk_dir = os.path.join(scsi_dir, "block", name)
+        os.makedirs(os.path.join(disk_dir, "queue"))
+        files = {
+            os.path.join(usb_dir, "idVendor"): "0781", os.path.join(usb_dir, "idProduct"): "5567",
+            os.path.join(usb_dir, "manufacturer"): "SanDisk", os.path.join(usb_dir, "product"): "Cruzer Blade",
+            os.path.join(usb_dir, "serial"): f"4C53{number:06d}", os.path.join(usb_dir, "speed"): "480",
+            os.path.join(usb_dir, "busnum"): str(number % 4 + 1), os.path.join(usb_dir, "devnum"): str(number + 2),
+            os.path.join(scsi_dir, "vendor"): "SanDisk ", os.path.join(scsi_dir, "model"): "Cruzer Blade    ",
+            os.path.join(disk_dir, "removable"): "1", os.path.join(disk_dir, "size"): "30031872",
+            os.path.join(disk_dir, "queue", "logical_block_size"): "512",
+            os.path.join(disk_dir, "queue", "physical_block_size"): "512",
+        }
+        for path, content in files.items():
+            with open(path, "w") as f:
+                f.write(content + "\n")
+        os.symlink(os.path.relpath(scsi_dir, disk_dir), os.path.join(disk_dir, "device"))
+        os.symlink(os.path.relpath(disk_dir, block_dir), os.path.join(block_dir, name))
+    return block_dir
+
+
+def bench_enumeration(args, workdir):
+    """Sahte sysfs ağacında tek geçişte disk dizini kurma süresi."""
+    block_dir = build_fake_sysfs(os.path.join(workdir, "sys"), args.fake_disks)
+    index = DeviceIndex(block_dir, mounts_file=os.devnull)
+    result = _timings(index.refresh, args.repeat)
+    result["disks"] = len(index.disks())
+    result["per_disk_s"] = result["median_s"] / max(result["disks"], 1)
+    return result
+
+
+def bench_metadata_lookup(args, workdir):
+    """Seçim sırasında meta veri erişimi: dizin araması ve tek diskin sysfs'ten yeniden okunması."""
+    block_dir = os.path.join(workdir, "sys", "block")
+    if not os.path.isdir(block_dir):
+        block_dir = build_fake_sysfs(os.path.join(workdir, "sys"), args.fake_disks)
+    index = DeviceIndex(block_dir, mounts_file=os.devnull)
+    paths = [disk["path"] for disk in index.refresh()]
+    lookups = 100000
+
+    def lookup_all():
+        for number in range(lookups):
+            index.get(paths[number % len(paths)])
+
+    lookup = _timings(lookup_all, args.repeat)
+    read = _timings(lambda: read_disk_metadata(os.path.basename(paths[0]), block_dir), args.repeat)
+    return {"index_lookup_s": lookup["median_s"] / lookups, "sysfs_read_s": read["median_s"],
+            "repeat": args.repeat}
+
+
+def _recorded_output(line_count):
+    """line_count satırlık bir f3probe çıktısı: ilerleme satırları ve sonunda sonuç bölümü."""
+    filler = max(line_count - len(F3PROBE_RESULT_LINES), 0)
+    return [f"Probing block {number} of 32147456..." for number in range(filler)] + F3PROBE_RESULT_LINES
+
+
+def bench_parser(args, workdir):
+    """Büyük kayıtlı f3probe çıktısının F3ProbeParser ile ayrıştırılması."""
+    lines = _recorded_output(args.parser_lines)
+
+    def parse():
+        parser = F3ProbeParser("/dev/sdb")
+        for line in lines:
+            parser.feed(line)
+        result = parser.finish()
+        assert result.real_bytes == 16477879 * 512
+
+    result = _timings(parse, args.repeat)
+    result["lines"] = len(lines)
+    result["lines_per_sec"] = len(lines) / result["median_s"]
+    return result
+
+
+def bench_pipe_parser(args, workdir):
+    """Aynı çıktının bir alt süreçten stdout+stderr borusu üzerinden okunup ayrıştırılması."""
+    path = os.path.join(workdir, "f3probe-output.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(_recorded_output(args.parser_lines)) + "\n")
+    # f3'ün --time-ops çıktısına benzer şekilde stdout ve stderr'e aynı anda yazılır
+    script = ("import sys\n"
+              f"for line in open({path!r}):\n"
+              "    sys.stdout.write(line)\n"
+              "    sys.stderr.write(line)\n")
+
+    def run():
+        parser = F3ProbeParser("/dev/sdb")
+        process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        drain_lines(process, parser.feed, lambda line: None)
+        process.wait()
+        parser.finish()
+
+    result = _timings(run, args.repeat)
+    result["lines"] = args.parser_lines * 2
+    result["lines_per_sec"] = result["lines"] / result["median_s"]
+    return result
+
+
+def bench_log_widget(args, workdir):
+    """LogSink'in offscreen Qt altında QPlainTextEdit'e satır yazma hızı."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtWidgets import QApplication, QPlainTextEdit
+    except ImportError as e:
+        return {"skipped": f"PyQt5 yok: {e}"}
+    gui_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if gui_dir not in sys.path:
+        sys.path.insert(0, gui_dir)
+    import fake_usb_tester as gui
+
+    app = QApplication.instance() or QApplication([])
+    view = QPlainTextEdit()
+    sink = gui.LogSink(view)
+    flush_every = 1000  # ~LOG_FLUSH_INTERVAL_MS içinde gelen satır sayısı
+
+    def write():
+        sink.clear()
+        for number in range(args.log_lines):
+            if number % 50 == 0:
+                sink.error(f"[/dev/sdb] Hata satırı {number}")
+            else:
+                sink.info(f"[/dev/sdb] Probing block {number}...")
+            if number % flush_every == 0:
+                sink.flush()
+                app.processEvents()
+        sink.flush()
+        app.processEvents()
+
+    result = _timings(write, args.repeat)
+    result["lines"] = args.log_lines
+    result["lines_per_sec"] = args.log_lines / result["median_s"]
+    result["visible_lines"] = view.blockCount()
+    return result
+
+
+def _file_drive(workdir, size_mib):
+    path = os.path.join(workdir, "drive.img")
+    with open(path, "wb") as f:
+        f.truncate(size_mib * 1024 * 1024)
+    return path
+
+
+def bench_probe_file(args, workdir):
+    """Dosya tabanlı (gerçek kapasiteli) sürücüde yerleşik kapasite probu."""
+    path = _file_drive(workdir, args.drive_mib)
+    results = []
+    timing = _timings(lambda: results.append(probe_capacity(path)), args.repeat)
+    timing["drive_bytes"] = args.drive_mib * 1024 * 1024
+    timing["verdict"] = results[-1].verdict
+    timing["io_ops"] = results[-1].details.get("reads", 0) + results[-1].details.get("writes", 0)
+    return timing
+
+
+def bench_verify_file(args, workdir):
+    """Dosya tabanlı sürücüde tam yüzey yazma/doğrulama."""
+    path = _file_drive(workdir, args.drive_mib)
+    results = []
+    timing = _timings(lambda: results.append(verify_disk(path)), max(1, args.repeat // 2))
+    details = results[-1].details
+    timing["drive_bytes"] = details["total_bytes"]
+    timing["verdict"] = results[-1].verdict
+    timing["write_bytes_per_sec"] = details["write_bytes_per_sec"]
+    timing["read_bytes_per_sec"] = details["read_bytes_per_sec"]
+    timing["direct_io"] = details["direct_io"]
+    return timing
+
+
+def bench_simulated_fleet(args, workdir):
+    """Simüle sahte sürücü filosunun (genuine/limbo/wraparound) zamanlayıcı üzerinden problanması."""
+    directory = os.path.join(workdir, "sim")
+    drive_bytes = args.drive_mib * 1024 * 1024
+    paths = simulator.create_fleet(directory, args.sim_drives, announced_bytes=drive_bytes,
+                                   real_bytes=drive_bytes // 4)
+    expected = {path: simulator.load_manifest(path)["kind"] for path in paths}
+    wrong = []
+
+    def probe_fleet():
+        scheduler = ProbeScheduler()
+        results = {}
+
+        def make_job(path):
+            def job():
+                results[path] = run_test(path, MODE_PROBE)
+            return job
+
+        jobs = [scheduler.submit(path, make_job(path)) for path in paths]
+        for job in jobs:
+            job.wait()
+        scheduler.shutdown()
+        for path, result in results.items():
+            found = result.fake_type if result.is_fake else simulator.KIND_GENUINE
+            if found != expected[path]:
+                wrong.append(path)
+
+    timing = _timings(probe_fleet, args.repeat)
+    timing["disks"] = len(paths)
+    timing["drive_bytes"] = drive_bytes
+    timing["per_disk_s"] = timing["median_s"] / len(paths)
+    timing["misdetected"] = len(set(wrong))
+    return timing
+
+
+BENCHMARKS = (
+    ("enumeration", bench_enumeration),
+    ("metadata_lookup", bench_metadata_lookup),
+    ("parser", bench_parser),
+    ("pipe_parser", bench_pipe_parser),
+    ("log_widget", bench_log_widget),
+    ("probe_file", bench_probe_file),
+    ("verify_file", bench_verify_file),
+    ("simulated_fleet", bench_simulated_fleet),
+)
+
+
+def run_benchmarks(args):
+    """Seçilen ölçümleri çalıştırır ve JSON'a yazılacak sözlüğü döndürür."""
+    selected = set(args.only or [name for name, _ in BENCHMARKS])
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "numpy": load_numpy() is not None,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="fake-usb-bench-")
+    try:
+        for name, func in BENCHMARKS:
+            if name not in selected:
+                continue
+            sys.stderr.write(f"{name}...\n")
+            try:
+                report["results"][name] = func(args, workdir)
+            except Exception as e:
+                report["results"][name] = {"error": str(e)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    İki raporu karşılaştırır; gerilemeleri (ad, metrik, eski, yeni) listesi olarak döndürür.
+    "_s" ile biten metrikler küçüldükçe, "_per_sec" ile bitenler büyüdükçe iyidir.
+    Farklı boyutlarla (satır, disk, sürücü boyutu) alınmış ölçümler karşılaştırılmaz.
+    """
+    regressions = []
+    for name, metrics in current.get("results", {}).items():
+        old_metrics = baseline.get("results", {}).get(name, {})
+        if any(metrics.get(key) != old_metrics.get(key) for key in SIZE_METRICS):
+            continue
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            if metric.endswith("_s") and value > old * (1 + tolerance):
+                regressions.append((name, metric, old, value))
+            elif metric.endswith("_per_sec") and value < old * (1 - tolerance):
+                regressions.append((name, metric, old, value))
+    return regressions
+
+
+def _print_summary(report):
+    for name, metrics in report["results"].items():
+        if "skipped" in metrics or "error" in metrics:
+            print(f"{name}\t{metrics.get('skipped') or metrics.get('error')}")
+            continue
+        line = f"{name}\t"
+        if "median_s" in metrics:
+            line += f"{metrics['median_s'] * 1000:.2f} ms"
+        elif "index_lookup_s" in metrics:
+            line += f"dizin {metrics['index_lookup_s'] * 1e9:.0f} ns, sysfs {metrics['sysfs_read_s'] * 1e6:.0f} us"
+        for key in ("lines_per_sec", "write_bytes_per_sec", "read_bytes_per_sec"):
+            if key in metrics:
+                value = metrics[key]
+                line += f"\t{key}={devices.bytes_to_human_readable(value) + '/s' if 'bytes' in key else f'{value:,.0f}'}"
+        print(line)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.bench",
+                                     description="Fake USB Tester performans ölçümleri.")
+    parser.add_argument("--output", default="bench-results.json", help="Sonuçların yazılacağı JSON dosyası.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Önceki bir sonuç dosyasıyla karşılaştırır.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Gerileme sayılacak en küçük oransal kötüleşme (0.25 = %%25).")
+    parser.add_argument("--only", nargs="+", choices=[name for name, _ in BENCHMARKS], help="Yalnızca bu ölçümler.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Her ölçümün tekrar sayısı.")
+    parser.add_argument("--fake-disks", type=int, default=DEFAULT_FAKE_DISKS, help="Sahte sysfs disk sayısı.")
+    parser.add_argument("--parser-lines", type=int, default=DEFAULT_PARSER_LINES,
+                        help="Ayrıştırıcıya verilecek çıktı satırı sayısı.")
+    parser.add_argument("--log-lines", type=int, default=DEFAULT_LOG_LINES, help="Durum alanına yazılacak satır.")
+    parser.add_argument("--drive-mib", type=int, default=DEFAULT_DRIVE_MIB, help="Dosya tabanlı sürücü boyutu (MiB).")
+    parser.add_argument("--sim-drives", type=int, default=DEFAULT_SIM_DRIVES, help="Simüle sürücü filosu boyutu.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run_benchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    _print_summary(report)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"GERİLEME {name}.{metric}: {old:.6g} -> {new:.6g}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Aygıt kimliğine göre saklanan kalıcı test sonucu önbelleği (SQLite).
+
+Kimlik; seri numarası, VID:PID ve duyurulan boyuttan oluşur. Geçerlilik süresi içinde
+yeniden görülen bir disk için son sonuç hemen gösterilebilir veya test atlanabilir.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .result import ProbeResult, VERDICT_ERROR
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 30 gün
+DEFAULT_MAX_ENTRIES = 5000
+CACHE_FILE_NAME = "results.sqlite"
+
+
+def default_cache_dir():
+    """$XDG_CACHE_HOME/fake-usb-tester (varsayılan ~/.cache/fake-usb-tester)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "fake-usb-tester")
+
+
+def make_identity(serial, vendor_id, product_id, size_bytes):
+    """
+    Seri numarası, VID:PID ve boyuttan aygıt kimliği üretir.
+    Seri numarası yoksa aygıt güvenilir biçimde tanınamaz; None döndürülür.
+    """
+    if not serial:
+        return None
+    return f"{serial}|{vendor_id or ''}:{product_id or ''}|{size_bytes}"
+
+
+class ResultCache:
+    """Test sonuçlarını (kimlik, test türü) anahtarıyla saklar; süresi dolanları ve fazlalıkları siler."""
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        if path is None:
+            path = os.path.join(default_cache_dir(), CACHE_FILE_NAME)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    identity TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    tested_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    verdict TEXT,
+                    result_json TEXT NOT NULL,
+                    PRIMARY KEY (identity, mode)
+                )""")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_seen ON results (last_seen)")
+
+    def get(self, identity, mode=None, max_age=None):
+        """
+        Kimliğin geçerlilik süresindeki en yeni sonucunu (ProbeResult, tested_at) olarak döndürür.
+        mode verilmezse herhangi bir test türünün sonucu kabul edilir.
+        """
+        if identity is None:
+            return None
+        max_age = self.ttl_seconds if max_age is None else max_age
+        now = time.time()
+        query = "SELECT mode, tested_at, result_json FROM results WHERE identity = ? AND tested_at >= ?"
+        parameters = [identity, now - max_age]
+        if mode is not None:
+            query += " AND mode = ?"
+            parameters.append(mode)
+        query += " ORDER BY tested_at DESC LIMIT 1"
+        with self._lock, self._connection:
+            row = self._connection.execute(query, parameters).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE results SET last_seen = ? WHERE identity = ? AND mode = ?",
+                                     (now, identity, row[0]))
+        return ProbeResult.from_dict(json.loads(row[2])), row[1]
+
+    def put(self, identity, result, mode):
+        """Sonucu saklar ve önbelleği temizler; hatalı testler saklanmaz."""
+        if identity is None or result.verdict == VERDICT_ERROR:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (identity, mode, tested_at, last_seen, verdict, result_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (identity, mode, now, now, result.verdict, json.dumps(result.to_dict())))
+        self.evict()
+
+    def entries(self):
+        """Geçerli tüm kayıtları (kimlik, test türü, ProbeResult, tested_at) olarak döndürür."""
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT identity, mode, tested_at, result_json FROM results WHERE tested_at >= ? ORDER BY tested_at",
+                (time.time() - self.ttl_seconds,)).fetchall()
+        return [(identity, mode, ProbeResult.from_dict(json.loads(result_json)), tested_at)
+                for identity, mode, tested_at, result_json in rows]
+
+    def evict(self):
+        """Süresi dolan kayıtları ve max_entries'i aşan en eski görülmüş kayıtları siler."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results WHERE tested_at < ?", (time.time() - self.ttl_seconds,))
+            self._connection.execute(
+                "DELETE FROM results WHERE rowid NOT IN "
+                "(SELECT rowid FROM results ORDER BY last_seen DESC LIMIT ?)", (self.max_entries,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
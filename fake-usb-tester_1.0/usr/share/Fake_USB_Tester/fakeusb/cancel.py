@@ -0,0 +1,57 @@
+"""
+Süren testlerin iptali.
+
+Arayüz veya komut satırı bir CancelToken oluşturup testle birlikte verir; cancel() çağrıldığında
+motorlar bir sonraki parçada TestCancelled yükseltir (prob özgün verileri geri yazar, tam yüzey
+testi kaldığı yeri kaydeder). Başlamış f3probe sonlandırılmaz (yedeklediği bloklar yalnızca
+bellektedir); on_cancel ile kaydedilen geri çağırma iptalin reddedildiğini bildirir. Tek bir belirteç birden fazla teste verilebilir (ör. toplu testin tamamı).
+"""
+
+import threading
+
+
+class TestCancelled(Exception):
+    """Test kullanıcı isteğiyle yarıda kesildi."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """İptal ister; kayıtlı geri çağırmalar bu thread'de çağrılır."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+    def check(self):
+        """İptal istendiyse TestCancelled yükseltir; uzun döngülerde parça başına çağrılır."""
+        if self._event.is_set():
+            raise TestCancelled()
+
+    def on_cancel(self, callback):
+        """
+        İptalde çağrılacak geri çağırmayı kaydeder ve kaydı silen fonksiyonu döndürür.
+        Belirteç zaten iptal edilmişse callback hemen çağrılır.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
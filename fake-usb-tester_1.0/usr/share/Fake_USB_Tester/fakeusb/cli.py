@@ -0,0 +1,512 @@
+"""
+Başsız (PyQt5'siz) toplu test kipi.
+
+Örnek:
+    fake-usb-tester --batch /dev/sdb /dev/sdc --json
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+from . import devices, trace
+from .cache import ResultCache
+from .cancel import CancelToken
+from .events import EventBus, ProgressStreamServer
+from .helper import PrivilegedHelper, HelperError, helper_needed
+from .hotplug import HotplugMonitor
+from .fingerprint import FingerprintDB, plan_test, risk_summary, RISK_KNOWN_BAD, RISK_SUSPECT, RISK_UNKNOWN
+from .index import scan_removable_disks, disk_identity, disk_metadata
+from .metrics import MetricsCollector, MetricsServer
+from .modes import (
+    run_test, MODES, MODE_F3PROBE, MODE_VERIFY, MODE_SPEED, MODE_SUSTAINED, MODE_QUICK, DESTRUCTIVE_MODES,
+    CACHEABLE_MODES, ESCALATION_MODES,
+)
+from .quick import DEFAULT_SAMPLES, MIN_FAKE_FRACTION, detection_confidence, quick_summary
+from .regions import regions_summary
+from .result import (ProbeResult, VERDICT_GENUINE, VERDICT_UNKNOWN, VERDICT_ERROR, PERFORMANCE_OK, ERROR_CANCELLED,
+                     ERROR_DEVICE_BUSY, ERROR_UNEXPECTED)
+from .scheduler import ProbeScheduler, DEFAULT_MAX_WORKERS, DEFAULT_PER_BUS_LIMIT, PRIORITY_NORMAL
+from .simulator import parse_size
+from .speed import DEFAULT_QUEUE_DEPTHS, DEFAULT_RANDOM_SECONDS, DEFAULT_SEQUENTIAL_BYTES, speed_summary
+from .sustained import save_profile, sustained_summary
+
+EXIT_ALL_GENUINE = 0
+EXIT_FAKE_FOUND = 1
+EXIT_USAGE = 2  # argparse kullanım hataları için de 2 döndürür
+EXIT_TEST_ERROR = 3
+EXIT_INCONCLUSIVE = 4
+EXIT_TOO_SLOW = 5
+UNMOUNT_ATTEMPTS = 3  # Otomatik bağlayıcı diski ayırma ile test arasında yeniden bağlarsa
+UNMOUNT_RETRY_SECONDS = 1.0
+EXIT_CANCELLED = 130  # Ctrl+C ile durduruldu (kabukların 128 + SIGINT kuralı)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="fake-usb-tester",
+        description="USB bellekleri f3probe ile grafik arayüz olmadan test eder.",
+        epilog="Çıkış kodları: 0 hepsi gerçek, 1 sahte bulundu, 2 kullanım hatası, "
+               "3 test hatası, 4 karar verilemedi, 5 hız alt sınırın altında veya önbellek uçurumu var.",
+    )
+    parser.add_argument("--batch", nargs="*", metavar="DISK",
+                        help="Verilen diskleri test eder; disk verilmezse tüm çıkarılabilir diskler test edilir.")
+    parser.add_argument("--list", action="store_true", help="Çıkarılabilir diskleri listeler ve çıkar.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Takılan diskleri bekler; her birinin bölümlerini ayırıp otomatik test eder (Ctrl+C ile çıkılır).")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdırır.")
+    parser.add_argument("--mode", choices=MODES, default=MODE_F3PROBE,
+                        help="Test türü: quick (rastgele örneklemle hızlı ön eleme, şüpheliler tam proba aktarılır), "
+                             "f3probe veya probe (veriler korunur), "
+                             "verify (tam yazma/doğrulama, veriler silinir), "
+                             "speed (hız ölçümü, diskin başındaki veriler silinir), "
+                             "sustained (tam yazma/doğrulama + yazma hızı profili, veriler silinir).")
+    parser.add_argument("--yes", action="store_true", help="Yıkıcı test türlerinde onay sormadan devam eder.")
+    parser.add_argument("--restart", action="store_true",
+                        help="verify testinde yarıda kalmış testin kaydını yok sayar ve baştan başlar.")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Aynı anda çalışacak en fazla test sayısı.")
+    parser.add_argument("--per-bus-limit", type=int, default=DEFAULT_PER_BUS_LIMIT,
+                        help="Aynı kök hub üzerinde aynı anda çalışacak en fazla test sayısı.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Önbellekteki sonuçları kullanmaz; her disk yeniden test edilir.")
+    parser.add_argument("--cache-ttl", type=float, default=None, metavar="DAYS",
+                        help="Önbellekteki sonuçların geçerli sayılacağı en fazla gün (varsayılan 30).")
+    parser.add_argument("--no-fingerprints", action="store_true",
+                        help="Parmak izi veritabanını kullanmaz: bilinen sahte diskler öne alınmaz, bilinen temiz "
+                             "diskler hızlı ön elemeye yönlendirilmez ve sonuçlar veritabanına eklenmez.")
+    parser.add_argument("--no-helper", action="store_true",
+                        help="Root yardımcısını kullanmaz; her f3probe ayrı pkexec ile yetki ister.")
+    parser.add_argument("--progress-socket", nargs="?", const="", default=None, metavar="PATH",
+                        help="İlerleme olaylarını bu Unix soketinde NDJSON olarak yayınlar "
+                             "(yol verilmezse $XDG_RUNTIME_DIR/fake-usb-tester/progress.sock).")
+    parser.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                        help="Prometheus metriklerini http://127.0.0.1:PORT/metrics adresinde sunar "
+                             "(en çok --watch ile kullanışlıdır).")
+    parser.add_argument("--trace", default=None, metavar="FILE",
+                        help="Testlerin zaman çizelgesini Chrome trace biçiminde (Perfetto, chrome://tracing) "
+                             "bu dosyaya yazar.")
+    quick = parser.add_argument_group("hızlı ön eleme (--mode quick)")
+    quick.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, metavar="N",
+                       help=f"Örneklenecek blok sayısı (varsayılan %(default)s; kapasitenin "
+                            f"%%{MIN_FAKE_FRACTION * 100:g}'i sahte olan disk %(default)s örnekle "
+                            f"%%{detection_confidence(DEFAULT_SAMPLES) * 100:.1f} olasılıkla yakalanır).")
+    quick.add_argument("--escalate", choices=ESCALATION_MODES + ("none",), default=MODE_F3PROBE,
+                       help="Gerçek bulunmayan (sahte veya belirsiz) disklerin aktarılacağı tam test; "
+                            "none ile yalnızca ön eleme sonucu bildirilir (varsayılan %(default)s).")
+    speed = parser.add_argument_group("hız testleri (--mode speed / sustained)")
+    speed.add_argument("--speed-size", default=None, metavar="SIZE",
+                       help=f"Sıralı okuma/yazma boyutu, ör. 512M (varsayılan {DEFAULT_SEQUENTIAL_BYTES // 2**20}M).")
+    speed.add_argument("--queue-depths", default=",".join(map(str, DEFAULT_QUEUE_DEPTHS)), metavar="N,N,...",
+                       help="4K rastgele ölçümlerin kuyruk derinlikleri (varsayılan %(default)s).")
+    speed.add_argument("--speed-duration", type=float, default=DEFAULT_RANDOM_SECONDS, metavar="SECONDS",
+                       help="Her rastgele ölçümün süresi (varsayılan %(default)s).")
+    speed.add_argument("--min-write-speed", type=float, default=None, metavar="MB/S",
+                       help="Sıralı (sustained kipinde sürekli) yazma bunun altındaysa disk yavaş sayılır (çıkış kodu 5).")
+    speed.add_argument("--min-read-speed", type=float, default=None, metavar="MB/S",
+                       help="Sıralı okuma bunun altındaysa disk yavaş sayılır (çıkış kodu 5).")
+    speed.add_argument("--profile-dir", default=None, metavar="DIR",
+                       help="sustained kipinin yazma profillerinin kaydedileceği dizin "
+                            "(varsayılan ~/.cache/fake-usb-tester/profiles).")
+    parser.add_argument("-v", "--verbose", action="store_true", help="f3probe çıktısını stderr'e yazdırır.")
+    return parser
+
+
+def _list_disks(as_json):
+    disks = scan_removable_disks()
+    if as_json:
+        print(json.dumps({"disks": disks}, indent=2))
+    else:
+        for disk in disks:
+            print(f"{disk['path']}\t{disk['size']}\t{disk['brand_model'] or ''}".rstrip())
+    return EXIT_ALL_GENUINE
+
+
+def run_batch(disk_paths, max_workers=DEFAULT_MAX_WORKERS, per_bus_limit=DEFAULT_PER_BUS_LIMIT, verbose=False,
+              mode=MODE_F3PROBE, cache=None, max_age=None, helper=None, options=None, profile_dir=None,
+              event_bus=None, cancel=None, fingerprints=None):
+    """
+    Diskleri zamanlayıcı üzerinden test eder ve sonuçları disk sırasıyla döndürür.
+    fingerprints (fingerprint.FingerprintDB) verilirse her disk testten önce değerlendirilir: bilinen
+    sahte ve şüpheli diskler hemen bildirilip kuyruğun önüne alınır, bilinen temizler hızlı ön elemeye
+    gider (plan_test); risk details["risk"] içinde döner, yeni sonuçlar veritabanına eklenir.
+    cache verilirse geçerli önbellek sonucu olan diskler yeniden test edilmez;
+    bu sonuçların details sözlüğünde "cached_at" bulunur. Önbellek yalnızca CACHEABLE_MODES içindir.
+    Yazma profili olan sonuçlar profile_dir'e kaydedilir, yolu details["profile_path"] olur.
+    event_bus (events.EventBus) verilirse başlangıç, ilerleme ve sonuç olayları ona yayınlanır.
+    Ctrl+C tüm testleri iptal eder (cancel); aygıtlar geri yüklendikten sonra sonuçlar yine döndürülür.
+    """
+    cancel = cancel or CancelToken()
+    scheduler = ProbeScheduler(max_workers, per_bus_limit)
+    results = {}
+    output_lock = threading.Lock()
+
+    def make_job(disk_path, metadata, risk, mode):
+        job_cache = cache if mode in CACHEABLE_MODES else None
+
+        def echo(line):
+            if verbose:
+                with output_lock:
+                    sys.stderr.write(f"[{disk_path}] {line.rstrip()}\n")
+
+        def progress(phase, done_bytes, total_bytes, bytes_per_sec):
+            line = f"{phase}: {100.0 * done_bytes / max(total_bytes, 1):.1f}%"
+            if bytes_per_sec:
+                line += f" ({devices.bytes_to_human_readable(bytes_per_sec)}/s)"
+            echo(line)
+
+        def job():
+            with trace.span("cache_lookup", disk_path):
+                identity = disk_identity(disk_path) if job_cache is not None else None
+                cached = job_cache.get(identity, mode, max_age) if identity else None
+            if cached is not None:
+                result, tested_at = cached
+                result.disk = disk_path  # Aynı aygıt bu kez başka bir yolda olabilir
+                result.details["cached_at"] = tested_at
+                _attach_risk(result, risk)
+                echo(f"önbellekten: {time.strftime('%Y-%m-%d %H:%M', time.localtime(tested_at))}")
+                results[disk_path] = result
+                if event_bus is not None:
+                    event_bus.result(result)
+                return
+            on_progress = progress
+            if event_bus is not None:
+                event_bus.started(disk_path, mode)
+                on_progress = event_bus.progress_callback(disk_path, progress)
+            result = run_test(disk_path, mode, on_stdout=echo, on_stderr=echo, on_progress=on_progress,
+                              helper=helper, options=options, cancel=cancel)
+            _save_profile(result, profile_dir)
+            _attach_risk(result, risk)
+            results[disk_path] = result  # Önbelleğe/veritabanına yazılamasa da biten test kaybolmaz
+            if event_bus is not None:
+                event_bus.result(result)
+            if identity:
+                job_cache.put(identity, result, mode)
+            if fingerprints is not None and metadata is not None:
+                _record_fingerprint(fingerprints, metadata, result, output_lock)
+        return job
+
+    jobs = []
+    for disk_path in disk_paths:
+        metadata, risk, disk_mode, priority = _assess_disk(disk_path, mode, fingerprints, output_lock)
+        jobs.append(scheduler.submit(disk_path, make_job(disk_path, metadata, risk, disk_mode), priority))
+    try:
+        for job in jobs:
+            job.wait()
+    except KeyboardInterrupt:
+        sys.stderr.write("Testler durduruluyor; aygıtlar geri yükleniyor...\n")
+        cancel.cancel()
+        for job in jobs:
+            job.wait()
+    scheduler.shutdown()
+    for job in jobs:
+        if job.disk_path not in results:
+            # İş sonuç üretmeden hata verdi (ör. önbellek okunamadı); disk yine de raporlanır
+            results[job.disk_path] = ProbeResult(disk=job.disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED,
+                                                 error_detail=str(job.error or "Test sonuç üretmedi."))
+    return [results[disk_path] for disk_path in disk_paths]
+
+
+def watch(mode=MODE_F3PROBE, max_workers=DEFAULT_MAX_WORKERS, per_bus_limit=DEFAULT_PER_BUS_LIMIT,
+          verbose=False, as_json=False, helper=None, options=None, profile_dir=None, event_bus=None,
+          fingerprints=None):
+    """
+    Takılan her çıkarılabilir diski otomatik test eder; sonuçları geldikçe yazdırır.
+    fingerprints verilirse diskler run_batch'teki gibi önceliklendirilip yönlendirilir.
+    """
+    scheduler = ProbeScheduler(max_workers, per_bus_limit)
+    cancel = CancelToken()
+    output_lock = threading.Lock()
+
+    def on_add(disk):
+        disk_path = disk["path"]
+        if scheduler.is_busy(disk_path):
+            return
+        # Takma olayı yalnızca yol ve boyut taşır; parmak izi için tam meta veri sysfs'ten okunur
+        metadata, risk, disk_mode, priority = _assess_disk(disk_path, mode, fingerprints, output_lock)
+
+        def job():
+            on_progress = None
+            if event_bus is not None:
+                event_bus.started(disk_path, disk_mode)
+                on_progress = event_bus.progress_callback(disk_path)
+            result = unmount_and_test(disk_path, disk_mode, helper, on_progress=on_progress, options=options,
+                                      cancel=cancel)
+            if result.error == ERROR_DEVICE_BUSY:
+                with output_lock:
+                    sys.stderr.write(f"[{disk_path}] Bağlı bölümler ayrılamadı: {result.error_detail}\n")
+            _save_profile(result, profile_dir)
+            _attach_risk(result, risk)
+            if fingerprints is not None and metadata is not None:
+                _record_fingerprint(fingerprints, metadata, result, output_lock)
+            if event_bus is not None:
+                event_bus.result(result)
+            with output_lock:
+                _print_results([result], as_json, compact=True)
+                sys.stdout.flush()
+
+        if verbose:
+            with output_lock:
+                sys.stderr.write(f"[{disk_path}] takıldı ({disk['size']}), test kuyruğa alındı.\n")
+        scheduler.submit(disk_path, job, priority)
+
+    def on_remove(disk_path):
+        if event_bus is not None:
+            event_bus.forget(disk_path)
+        if verbose:
+            with output_lock:
+                sys.stderr.write(f"[{disk_path}] çıkarıldı.\n")
+
+    monitor = HotplugMonitor(on_add, on_remove)
+    monitor.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+        # Süren testler durdurulur ve aygıtlar geri yüklenene kadar beklenir
+        cancel.cancel()
+        scheduler.shutdown(wait=True)
+    return EXIT_ALL_GENUINE
+
+
+def unmount_and_test(disk_path, mode, helper=None, attempts=UNMOUNT_ATTEMPTS, **run_test_options):
+    """
+    Diskin bölümlerini ayırıp run_test'i çalıştırır. Masaüstünün otomatik bağlayıcısı yeni takılan
+    diski ayırma ile test arasında yeniden bağlayabilir; yerleşik testler aygıtı özel (O_EXCL) açtığı
+    için bu durumda ERROR_DEVICE_BUSY döner ve ayırma attempts kez denenir. Test başladıktan sonra
+    disk bağlanamaz.
+    """
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(UNMOUNT_RETRY_SECONDS)
+        try:
+            with trace.span("unmount", disk_path):
+                still_mounted = (helper.unmount(disk_path) if helper is not None
+                                 else devices.unmount_disk(disk_path))
+        except HelperError as e:
+            still_mounted = [str(e)]
+        if still_mounted:
+            result = ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_DEVICE_BUSY,
+                                 error_detail=", ".join(still_mounted))
+            continue
+        result = run_test(disk_path, mode, helper=helper, **run_test_options)
+        if result.error != ERROR_DEVICE_BUSY:
+            break
+    return result
+
+
+def _assess_disk(disk_path, mode, fingerprints, output_lock):
+    """
+    Diski parmak izi veritabanına göre değerlendirir: (meta veri, risk, test türü, öncelik).
+    Bilinen sahte ve şüpheli diskler test beklenmeden stderr'e bildirilir.
+    """
+    if fingerprints is None:
+        return None, None, mode, PRIORITY_NORMAL
+    metadata = disk_metadata(disk_path)
+    if metadata is None:
+        return None, None, mode, PRIORITY_NORMAL
+    risk = fingerprints.assess(metadata)
+    disk_mode, priority = plan_test(risk, mode)
+    if risk.level in (RISK_KNOWN_BAD, RISK_SUSPECT):
+        with output_lock:
+            sys.stderr.write(f"[{disk_path}] UYARI: parmak izi {risk_summary(risk)}; test kuyruğun önüne alındı "
+                             f"({disk_mode}).\n")
+    return metadata, risk, disk_mode, priority
+
+
+def _record_fingerprint(fingerprints, metadata, result, output_lock):
+    """Sonucu parmak izi veritabanına ekler; veritabanı hatası testi boşa çıkarmaz, yalnızca uyarı yazılır."""
+    try:
+        fingerprints.record(metadata, result)
+    except sqlite3.Error as e:
+        with output_lock:
+            sys.stderr.write(f"[{result.disk}] Parmak izi kaydedilemedi: {e}\n")
+
+
+def _attach_risk(result, risk):
+    if risk is not None and risk.level != RISK_UNKNOWN:
+        result.details["risk"] = risk.to_dict()
+
+
+def _save_profile(result, directory):
+    """Sonuçta yazma profili varsa kaydeder; kaydedilemezse yalnızca uyarı yazar."""
+    if "write_profile" not in result.details:
+        return
+    try:
+        result.details["profile_path"] = save_profile(result, directory)
+    except OSError as e:
+        sys.stderr.write(f"[{result.disk}] Yazma profili kaydedilemedi: {e}\n")
+
+
+def exit_code_for(results):
+    """Sonuç listesine göre çıkış kodunu belirler."""
+    if any(result.is_fake for result in results):
+        return EXIT_FAKE_FOUND
+    if any(result.error == ERROR_CANCELLED for result in results):
+        return EXIT_CANCELLED
+    if any(result.verdict == VERDICT_ERROR for result in results):
+        return EXIT_TEST_ERROR
+    if any(result.is_slow for result in results):
+        return EXIT_TOO_SLOW
+    # Yalnızca hız ölçen testler kapasite kararı vermez; hızları yeterliyse başarılı sayılır
+    if all(result.verdict == VERDICT_GENUINE
+           or (result.verdict == VERDICT_UNKNOWN and result.performance_verdict == PERFORMANCE_OK)
+           for result in results):
+        return EXIT_ALL_GENUINE
+    return EXIT_INCONCLUSIVE
+
+
+def _print_results(results, as_json, compact=False):
+    if as_json and compact:
+        # İzleme kipinde her sonuç tek satırlık bir JSON nesnesidir
+        for result in results:
+            print(json.dumps(result.to_dict()))
+        return
+    if as_json:
+        print(json.dumps({"results": [result.to_dict() for result in results]}, indent=2))
+        return
+    for result in results:
+        line = f"{result.disk}\t{result.verdict}"
+        if result.real_capacity or result.promised_capacity:
+            line += f"\t{result.real_capacity or '?'} / {result.promised_capacity or '?'}"
+        if "speed" in result.details:
+            line += f"\t{result.performance_verdict}: {speed_summary(result.details['speed'])}"
+        if "write_profile" in result.details:
+            line += f"\t{result.performance_verdict}: {sustained_summary(result.details)}"
+        if "profile_path" in result.details:
+            line += f"\t{result.details['profile_path']}"
+        if result.error:
+            line += f"\t{result.error}" + (f": {result.error_detail}" if result.error_detail else "")
+        if "quick" in result.details:
+            line += f"\t({quick_summary(result.details['quick'])})"
+        if "regions" in result.details and result.verdict != VERDICT_GENUINE:
+            line += f"\t{regions_summary(result.details['regions'])}"
+        if result.details.get("resumed_from"):
+            resumed = result.details["resumed_from"]
+            line += f"\t(devam: {resumed['phase']} @ {devices.bytes_to_human_readable(resumed['offset'])})"
+        if "risk" in result.details:
+            line += f"\t(parmak izi: {result.details['risk']['level']})"
+        if "cached_at" in result.details:
+            line += "\t(önbellek)"
+        print(line)
+
+
+def _mode_options(args, parser):
+    """Teste özgü seçenekleri modes.run_test'in options sözlüğüne çevirir."""
+    if args.mode == MODE_VERIFY:
+        return {"resume": not args.restart}
+    if args.mode == MODE_QUICK:
+        if args.samples < 1:
+            parser.error("--samples en az 1 olmalı")
+        return {"samples": args.samples, "escalate": None if args.escalate == "none" else args.escalate}
+    if args.mode == MODE_SUSTAINED:
+        return {"min_write_mbps": args.min_write_speed}
+    if args.mode != MODE_SPEED:
+        return None
+    try:
+        queue_depths = [int(depth) for depth in args.queue_depths.split(",") if depth.strip()]
+        sequential_bytes = parse_size(args.speed_size) if args.speed_size else DEFAULT_SEQUENTIAL_BYTES
+    except ValueError:
+        parser.error("--queue-depths ve --speed-size sayısal olmalı")
+    return {"sequential_bytes": sequential_bytes, "queue_depths": queue_depths,
+            "random_seconds": args.speed_duration, "min_write_mbps": args.min_write_speed,
+            "min_read_mbps": args.min_read_speed}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    options = _mode_options(args, parser)
+
+    if args.list:
+        return _list_disks(args.json)
+
+    if args.mode in DESTRUCTIVE_MODES and not args.yes:
+        sys.stderr.write(f"'{args.mode}' test türü disklerdeki tüm verileri siler; devam etmek için --yes verin.\n")
+        return EXIT_USAGE
+
+    # Yardımcı ilk testte bir kez yetki ister; sonraki testler ve çağrılar aynı süreci kullanır
+    helper = PrivilegedHelper() if helper_needed() and not args.no_helper else None
+
+    if not args.watch and args.batch is None:
+        parser.print_usage(sys.stderr)
+        return EXIT_USAGE
+
+    event_bus = stream = metrics_server = None
+    if args.progress_socket is not None or args.metrics_port is not None:
+        event_bus = EventBus()
+    try:
+        if args.progress_socket is not None:
+            stream = ProgressStreamServer(event_bus, args.progress_socket or None)
+            stream.start()
+        if args.metrics_port is not None:
+            MetricsCollector(event_bus)
+            metrics_server = MetricsServer(args.metrics_port)
+            metrics_server.start()
+    except OSError as e:
+        sys.stderr.write(f"İlerleme soketi veya metrik ucu açılamadı: {e}\n")
+        if stream is not None:
+            stream.stop()
+        return EXIT_USAGE
+    if args.trace:
+        trace.enable(args.trace)
+    try:
+        return _run(args, helper, options, event_bus)
+    finally:
+        if stream is not None:
+            stream.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if args.trace:
+            _write_trace(trace.disable())
+
+
+def _write_trace(tracer):
+    try:
+        sys.stderr.write(f"Zaman çizelgesi yazıldı: {tracer.write()}\n")
+    except OSError as e:
+        sys.stderr.write(f"Zaman çizelgesi yazılamadı: {e}\n")
+
+
+def _run(args, helper, options, event_bus):
+    fingerprints = None
+    if not args.no_fingerprints:
+        try:
+            fingerprints = FingerprintDB()
+        except Exception as e:  # Veritabanı açılamazsa diskler değerlendirilmeden test edilir
+            sys.stderr.write(f"Parmak izi veritabanı açılamadı: {e}\n")
+    if args.watch:
+        return watch(args.mode, args.max_workers, args.per_bus_limit, args.verbose, args.json, helper, options,
+                     args.profile_dir, event_bus, fingerprints)
+
+    disk_paths = args.batch or [disk["path"] for disk in scan_removable_disks()]
+    if not disk_paths:
+        sys.stderr.write("Test edilecek çıkarılabilir disk bulunamadı.\n")
+        return EXIT_USAGE
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResultCache()
+        except Exception as e:  # Önbellek açılamazsa önbelleksiz devam edilir
+            sys.stderr.write(f"Sonuç önbelleği açılamadı: {e}\n")
+    max_age = args.cache_ttl * 24 * 3600 if args.cache_ttl is not None else None
+
+    results = run_batch(disk_paths, args.max_workers, args.per_bus_limit, args.verbose, args.mode,
+                        cache, max_age, helper, options, args.profile_dir, event_bus, fingerprints=fingerprints)
+    if cache is not None:
+        cache.close()
+    if fingerprints is not None:
+        fingerprints.close()
+    _print_results(results, args.json)
+    return exit_code_for(results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
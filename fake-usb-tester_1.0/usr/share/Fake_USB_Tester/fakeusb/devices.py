@@ -0,0 +1,80 @@
+"""Disk yardımcıları: boyut biçimlendirme, sysfs okuma ve bölüm ayırma (GUI'den bağımsız)."""
+
+import os
+import subprocess
+
+EXCLUDED_DEVICE_PREFIXES = ("/dev/loop", "/dev/ram", "/dev/md")
+PROC_MOUNTS = "/proc/mounts"
+SYS_BLOCK_DIR = "/sys/block"
+
+
+def bytes_to_human_readable(num_bytes):
+    """Bayt cinsinden boyutu okunabilir KB, MB, GB, TB formatına çevirir."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if num_bytes < 1024.0:
+            return f"{num_bytes:.2f} {unit}"
+        num_bytes /= 1024.0
+    return f"{num_bytes:.2f} PB"
+
+
+def mounted_partitions(disk_path, mounts_file=PROC_MOUNTS, sys_block_dir=SYS_BLOCK_DIR):
+    """Diskin kendisinin veya bölümlerinin bağlı olduğu /dev yollarını döndürür."""
+    disk_name = os.path.basename(disk_path)
+    disk_dir = os.path.join(sys_block_dir, disk_name)
+    mounted = []
+    try:
+        with open(mounts_file) as f:
+            for line in f:
+                source = line.split(" ", 1)[0]
+                if not source.startswith("/dev/"):
+                    continue
+                name = os.path.basename(os.path.realpath(source))
+                # Bölümler çekirdekte /sys/block/<disk>/<bölüm>/partition olarak görünür; ad önekine bakmak
+                # nvme0n10'u nvme0n1'in bölümü sanırdı
+                if name == disk_name or os.path.exists(os.path.join(disk_dir, name, "partition")):
+                    mounted.append(source)
+    except OSError:
+        pass
+    return mounted
+
+
+def _read_sysfs(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def is_removable_disk(name, sys_block_dir=SYS_BLOCK_DIR):
+    """/sys/block/<name> çıkarılabilir ve test edilebilir bir disk ise True döndürür."""
+    if ("/dev/" + name).startswith(EXCLUDED_DEVICE_PREFIXES):
+        return False
+    return _read_sysfs(os.path.join(sys_block_dir, name, "removable")) == "1"
+
+
+def disk_from_sysfs(name, sys_block_dir=SYS_BLOCK_DIR):
+    """/sys/block/<name> için {"path", "size_bytes", "size"} sözlüğü döndürür (takma olayları için hızlı yol)."""
+    sectors = _read_sysfs(os.path.join(sys_block_dir, name, "size"))
+    if sectors is None or not sectors.isdigit():
+        return None
+    size_bytes = int(sectors) * 512  # sysfs boyutu her zaman 512 baytlık birimlerle verir
+    return {"path": "/dev/" + name, "size_bytes": size_bytes, "size": bytes_to_human_readable(size_bytes)}
+
+
+def unmount_disk(disk_path):
+    """
+    Diskin bağlı bölümlerini ayırır (önce udisksctl, olmazsa umount).
+    Ayrılamayan bölümlerin listesini döndürür.
+    """
+    failed = []
+    for partition in mounted_partitions(disk_path):
+        for command in (["udisksctl", "unmount", "--no-user-interaction", "-b", partition], ["umount", partition]):
+            try:
+                if subprocess.run(command, capture_output=True).returncode == 0:
+                    break
+            except FileNotFoundError:
+                continue
+        else:
+            failed.append(partition)
+    return failed
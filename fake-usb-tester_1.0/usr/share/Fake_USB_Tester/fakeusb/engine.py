@@ -0,0 +1,370 @@
+"""
+Yerleşik tam yüzey yazma/doğrulama motoru (f3write/f3read benzeri, doğrudan blok aygıtı üzerinde).
+
+Yazma aşamasında desen üretimi ile aygıta yazma, okuma aşamasında aygıttan okuma ile
+doğrulama iki iş parçacığında örtüşür; aradaki tamponlar iki kuyrukla döndürülür.
+Test parça başına iptal edilebilir; checkpoint verilirse kaldığı yer düzenli olarak kaydedilir
+ve aynı aygıtın sonraki testi oradan devam eder.
+"""
+
+import queue
+import threading
+import time
+
+from .blockdev import open_device, aligned_buffer, DeviceBusyError
+from .cancel import TestCancelled
+from .devices import bytes_to_human_readable, mounted_partitions
+from .patterns import PatternTable, DEFAULT_SEED
+from .regions import RegionMap, REGION_GOOD, REGION_WRAPAROUND, REGION_DISCARDED
+from .result import ProbeResult, VERDICT_GENUINE, VERDICT_FAKE
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+BUFFER_COUNT = 2  # Çift tamponlama
+PROGRESS_INTERVAL = 0.5  # Saniye
+RESUME_SAMPLE_SECTORS = 16  # Her kayıtta bu kadar örnek sektör seçilir; devamdan önce kayıtta sağlam olanlar denetlenir
+
+PHASE_WRITE = "write"
+PHASE_VERIFY = "verify"
+
+
+class _Pipeline:
+    """
+    Üretici iş parçacığı ile çağıran iş parçacığı arasında sabit sayıda tamponu döndürür.
+    Üreticide oluşan hata, tüketici tarafında yeniden yükseltilir.
+    """
+
+    def __init__(self, chunk_size, buffer_count=BUFFER_COUNT):
+        self.free = queue.Queue()
+        self.full = queue.Queue()
+        for _ in range(buffer_count):
+            self.free.put(aligned_buffer(chunk_size))
+        self.error = None
+        self.stopped = False  # Tüketici hata verdiyse (ör. iptal) üretici bir sonraki tamponda durur
+
+    def run_producer(self, chunks, produce):
+        """chunks içindeki her (offset, length) için produce(buffer, offset, length) çağırır."""
+        def target():
+            try:
+                for offset, length in chunks:
+                    buffer = self.free.get()
+                    if self.stopped:
+                        break
+                    view = memoryview(buffer)[:length]
+                    produce(view, offset, length)
+                    self.full.put((buffer, view, offset, length))
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.full.put(None)
+        thread = threading.Thread(target=target, name="engine-producer", daemon=True)
+        thread.start()
+        return thread
+
+    def consume(self, consume):
+        """Üreticiden gelen tamponları sırayla consume(view, offset, length) ile işler."""
+        while True:
+            item = self.full.get()
+            if item is None:
+                break
+            buffer, view, offset, length = item
+            try:
+                consume(view, offset, length)
+            except BaseException:
+                self.stopped = True
+                raise
+            finally:
+                view.release()
+                self.free.put(buffer)
+        if self.error is not None:
+            raise self.error
+
+
+class _Progress:
+    """İlerleme geri çağırmasını belirli aralıklarla çağırır."""
+
+    def __init__(self, phase, total_bytes, callback, done_bytes=0):
+        self.phase = phase
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.done_bytes = done_bytes  # Devam eden testte önceki çalıştırmada tamamlanan kısım
+        self._start_bytes = done_bytes
+        self.start_time = time.monotonic()
+        self._last_report = 0.0
+
+    def advance(self, length):
+        self.done_bytes += length
+        now = time.monotonic()
+        if self.callback and (now - self._last_report >= PROGRESS_INTERVAL or self.done_bytes >= self.total_bytes):
+            self._last_report = now
+            self.callback(self.phase, self.done_bytes, self.total_bytes, self.rate(now))
+
+    def rate(self, now=None):
+        elapsed = (now or time.monotonic()) - self.start_time
+        return (self.done_bytes - self._start_bytes) / elapsed if elapsed > 0 else 0.0
+
+
+def _chunks(total_bytes, chunk_size, start=0):
+    for offset in range(start, total_bytes, chunk_size):
+        yield offset, min(chunk_size, total_bytes - offset)
+
+
+def _intact_sectors(device, table, sectors):
+    """Verilen sektörlerden kendi desenini taşıyanları döndürür."""
+    sector_size = table.sector_size
+    buffer = aligned_buffer(sector_size)
+    view = memoryview(buffer)[:sector_size]
+    try:
+        return [sector for sector in sectors
+                if device.read_into(view, sector * sector_size) == sector_size and bytes(view) == table.sector(sector)]
+    finally:
+        view.release()
+
+
+def _resume_samples(device, table, written_bytes):
+    """
+    Kayıt anında yazılan bölgeye yayılmış örnek sektörlerden desenini taşıyanları döndürür.
+    Sahte diskte kaybolan (limbo) veya sonraki yazmaların üzerine yazdığı (sarma) sektörler
+    zaten bozuktur; devam denetimi yalnızca kayıt anında sağlam olan örneklere bakar.
+    """
+    sectors = written_bytes // table.sector_size
+    if sectors <= 0:
+        return []
+    samples = {index * sectors // RESUME_SAMPLE_SECTORS for index in range(RESUME_SAMPLE_SECTORS)}
+    samples.add(sectors - 1)
+    return _intact_sectors(device, table, sorted(samples))
+
+
+def _resume_state(device, table, state, saved):
+    """
+    Kayıt bu aygıt ve ayarlarla yapılmış ve yazılan desen yerinde duruyorsa devam durumunu döndürür.
+    Arada disk biçimlendirildiyse veya başka veri yazıldıysa None (test baştan başlar).
+    """
+    if not saved or any(saved.get(key) != state[key] for key in ("total_bytes", "sector_size", "chunk_size", "seed")):
+        return None
+    samples = saved.get("resume_samples")  # Eski kayıtlarda yok; test baştan başlar
+    if not samples or len(_intact_sectors(device, table, samples)) != len(samples):
+        return None
+    resumed = {key: saved[key] for key in ("phase", "offset", "bad_sectors", "first_bad_offset", "write_bytes_per_sec",
+                                           "resume_samples")}
+    resumed["regions"] = saved.get("regions")  # Eski kayıtlarda yok; doğrulanmış kısım test edilmemiş görünür
+    resumed["aliases"] = saved.get("aliases")
+    return resumed
+
+
+class _Aliases:
+    """
+    Doğrulamada görülen adres sarmaları. Okunan A adresi başka bir S adresinin desenini
+    taşıyorsa ikisi aynı fiziksel hücreye düşer ve |S - A| gerçek kapasitenin katıdır; büyük
+    olan adres kesinlikle hayalettir (gerçek kapasitenin ötesi). Küçük olan ise ancak gerçek
+    kapasitenin ötesindeyse hayalettir; gerçek kapasite en küçük |S - A| ile kestirilir.
+    Böylece sarmalı diskte okunan baştaki gerçek bölge değil, ötesindeki hayalet bölge işaretlenir.
+    """
+
+    def __init__(self, sectors, sector_size):
+        self.phantom = RegionMap(sectors, sector_size)  # Kesin hayalet adresler
+        self.lower = RegionMap(sectors, sector_size)  # Eşinden küçük olan okunan adresler
+        self.period = None  # Sektör; gözlenen en küçük |S - A|
+
+    def add(self, start, end, distance):
+        """[start, end) okunan adresleri start + distance'tan başlayan adreslerin desenini taşıyor."""
+        if distance > 0:
+            self.lower.mark(start, end, REGION_WRAPAROUND)
+            self.phantom.mark(start + distance, end + distance, REGION_WRAPAROUND)
+        else:
+            self.phantom.mark(start, end, REGION_WRAPAROUND)
+        self.period = min(self.period or abs(distance), abs(distance))
+
+    def apply(self, regions):
+        """Hayalet bölgeleri haritaya işler; kayıp (discarded) bölgeler olduğu gibi kalır."""
+        if self.period is None:
+            return
+        for start, end, kind in self.lower.runs():
+            if kind == REGION_WRAPAROUND and end > self.period:
+                regions.escalate(max(start, self.period), end, REGION_WRAPAROUND)
+        for start, end, kind in self.phantom.runs():
+            if kind == REGION_WRAPAROUND:
+                regions.escalate(start, end, REGION_WRAPAROUND)
+
+    def to_dict(self):
+        return {"phantom": self.phantom.to_dict(), "lower": self.lower.to_dict(), "period": self.period}
+
+    @classmethod
+    def from_dict(cls, data):
+        aliases = cls(0, 512)
+        aliases.phantom = RegionMap.from_dict(data["phantom"])
+        aliases.lower = RegionMap.from_dict(data["lower"])
+        aliases.period = data["period"]
+        return aliases
+
+
+def _mark_bad_regions(regions, aliases, table, view, first_sector, bad):
+    """
+    Bozuk sektörleri ardışık ve aynı türden gruplar halinde işler. Başka bir adresin desenini
+    taşıyan sektörler sarma gözlemi olarak aliases'e (haritaya test sonunda işlenir), diğerleri
+    kayıp (discarded) olarak doğrudan haritaya yazılır.
+    """
+    sector_size = table.sector_size
+    run_start = run_end = run_distance = None  # run_distance None: kayıp bölge
+    for index in bad:
+        sector = first_sector + index
+        source = table.source_address(view[index * sector_size:(index + 1) * sector_size])
+        distance = source - sector if source is not None and source != sector else None
+        if run_start is not None and sector == run_end and distance == run_distance:
+            run_end += 1
+            continue
+        _flush_bad_run(regions, aliases, run_start, run_end, run_distance)
+        run_start, run_end, run_distance = sector, sector + 1, distance
+    _flush_bad_run(regions, aliases, run_start, run_end, run_distance)
+
+
+def _flush_bad_run(regions, aliases, start, end, distance):
+    if start is None:
+        return
+    if distance is None:
+        regions.mark(start, end, REGION_DISCARDED)
+    else:
+        aliases.add(start, end, distance)
+
+
+def write_verify(device, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED, on_progress=None, on_write=None,
+                 cancel=None, checkpoint=None, resume=True):
+    """
+    Aygıtın tamamına adres etiketli desen yazar, ardından okuyup doğrular.
+    on_write(offset, length, seconds) verilirse her parça yazıldıktan sonra yazma süresiyle çağrılır.
+    cancel (cancel.CancelToken) iptal edilirse parça sınırında TestCancelled yükseltilir.
+    checkpoint (checkpoint.Checkpoint) verilirse ilerleme düzenli aralıklarla ve iptalde kaydedilir;
+    resume True ise geçerli bir kayıttan devam edilir. İstatistikleri içeren bir sözlük döndürür.
+    """
+    sector_size = device.logical_block_size
+    chunk_size -= chunk_size % sector_size
+    total_bytes = device.size
+    table = PatternTable(seed, sector_size)
+
+    state = {"total_bytes": total_bytes, "sector_size": sector_size, "chunk_size": chunk_size, "seed": seed,
+             "phase": PHASE_WRITE, "offset": 0, "bad_sectors": 0, "first_bad_offset": None,
+             "write_bytes_per_sec": None, "resume_samples": []}
+    regions = RegionMap(total_bytes // sector_size, sector_size)
+    aliases = _Aliases(total_bytes // sector_size, sector_size)
+    resumed_from = None
+    if checkpoint is not None and resume:
+        saved = _resume_state(device, table, state, checkpoint.load())
+        if saved is not None:
+            saved_regions, saved_aliases = saved.pop("regions"), saved.pop("aliases")
+            if saved_regions:
+                regions = RegionMap.from_dict(saved_regions)
+            if saved_aliases:
+                aliases = _Aliases.from_dict(saved_aliases)
+            state.update(saved)
+            resumed_from = {"phase": state["phase"], "offset": state["offset"]}
+
+    def save_checkpoint():
+        if state["phase"] == PHASE_WRITE:
+            # Kayıttaki konuma kadar yazılanlar aygıta ulaşmış olmalı; örnekler önbellekten değil aygıttan okunur.
+            # Doğrulama aşaması yazmadığından aşama geçişinde seçilen örnekler geçerli kalır.
+            device.drop_caches()
+            state["resume_samples"] = _resume_samples(device, table, state["offset"])
+        checkpoint.save(dict(state, regions=regions.to_dict(), aliases=aliases.to_dict()))
+
+    try:
+        if state["phase"] == PHASE_WRITE:
+            # Yazma: desen üretimi (üretici) ile aygıta yazma (tüketici) örtüşür
+            pipeline = _Pipeline(chunk_size)
+            progress = _Progress(PHASE_WRITE, total_bytes, on_progress, state["offset"])
+            pipeline.run_producer(_chunks(total_bytes, chunk_size, state["offset"]),
+                                  lambda view, offset, length: table.fill(view, offset // sector_size))
+
+            def write_chunk(view, offset, length):
+                if cancel is not None:
+                    cancel.check()
+                start = time.perf_counter()
+                written = device.write(view, offset)
+                if written != length:
+                    raise OSError(f"Kısa yazma: {offset} konumunda {written}/{length} bayt")
+                if on_write:
+                    on_write(offset, length, time.perf_counter() - start)
+                state["offset"] = offset + length
+                if checkpoint is not None and checkpoint.due():
+                    save_checkpoint()
+                progress.advance(length)
+            pipeline.consume(write_chunk)
+            device.drop_caches()
+            state.update(phase=PHASE_VERIFY, offset=0, write_bytes_per_sec=progress.rate())
+            if checkpoint is not None:
+                # Doğrulama aşamasının devamı, yüzeyin tamamına yayılmış örneklerle denetlenir
+                state["resume_samples"] = _resume_samples(device, table, total_bytes)
+                save_checkpoint()
+
+        # Okuma: aygıttan okuma (üretici) ile desen doğrulama (tüketici) örtüşür
+        pipeline = _Pipeline(chunk_size)
+        progress = _Progress(PHASE_VERIFY, total_bytes, on_progress, state["offset"])
+
+        def read_chunk(view, offset, length):
+            read = device.read_into(view, offset)
+            if read < length:
+                view[read:length] = bytes(length - read)  # Eksik okunan kısım bozuk sayılır
+
+        def verify_chunk(view, offset, length):
+            if cancel is not None:
+                cancel.check()
+            first_sector = offset // sector_size
+            bad = table.find_bad_sectors(view, first_sector)
+            regions.mark(first_sector, first_sector + length // sector_size, REGION_GOOD)
+            if bad:
+                state["bad_sectors"] += len(bad)
+                if state["first_bad_offset"] is None:
+                    state["first_bad_offset"] = offset + bad[0] * sector_size
+                _mark_bad_regions(regions, aliases, table, view, first_sector, bad)
+            state["offset"] = offset + length
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint()
+            progress.advance(length)
+
+        pipeline.run_producer(_chunks(total_bytes, chunk_size, state["offset"]), read_chunk)
+        pipeline.consume(verify_chunk)
+    except TestCancelled:
+        if checkpoint is not None:
+            try:
+                save_checkpoint()
+            except OSError:
+                pass  # Aygıt çıkarıldıysa son düzenli kayıt geçerli kalır
+        raise
+    if checkpoint is not None:
+        checkpoint.clear()
+    aliases.apply(regions)
+
+    bad_bytes = state["bad_sectors"] * sector_size
+    return {
+        "total_bytes": total_bytes,
+        "sector_size": sector_size,
+        "bad_bytes": bad_bytes,
+        "good_bytes": total_bytes - bad_bytes,
+        "first_bad_offset": state["first_bad_offset"],
+        "write_bytes_per_sec": state["write_bytes_per_sec"],
+        "read_bytes_per_sec": progress.rate(),
+        "direct_io": device.direct,
+        "resumed_from": resumed_from,
+        "regions": regions.to_dict(),
+    }
+
+
+def verify_disk(disk_path, chunk_size=DEFAULT_CHUNK_SIZE, seed=DEFAULT_SEED, on_progress=None, on_write=None,
+                cancel=None, checkpoint=None, resume=True):
+    """
+    Diski yıkıcı biçimde tam yüzey test eder ve ProbeResult döndürür.
+    Bağlı bölümü olan disklerde DeviceBusyError, yetki yoksa PermissionError, iptalde TestCancelled yükseltir.
+    """
+    mounts = mounted_partitions(disk_path)
+    if mounts:
+        raise DeviceBusyError(", ".join(mounts))
+
+    start_time = time.monotonic()
+    with open_device(disk_path, writable=True) as device:
+        stats = write_verify(device, chunk_size, seed, on_progress, on_write, cancel, checkpoint, resume)
+
+    result = ProbeResult(disk=disk_path, announced_bytes=stats["total_bytes"], real_bytes=stats["good_bytes"])
+    result.real_capacity = bytes_to_human_readable(result.real_bytes)
+    result.promised_capacity = bytes_to_human_readable(result.announced_bytes)
+    result.verdict = VERDICT_FAKE if stats["bad_bytes"] else VERDICT_GENUINE
+    result.details = stats
+    result.elapsed = time.monotonic() - start_time
+    return result
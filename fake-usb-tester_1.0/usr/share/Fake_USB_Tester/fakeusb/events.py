@@ -0,0 +1,261 @@
+"""
+Yerel, makine tarafından okunabilir ilerleme akışı.
+
+Testler başlangıç, ilerleme ve sonuç olaylarını bir EventBus'a yayınlar. ProgressStreamServer
+bu olayları yerel bir Unix soketine (satır başına bir JSON nesnesi, NDJSON) bağlanan tüm
+abonelere iletir. Her abonenin sınırlı bir kuyruğu ve kendi yazıcı thread'i vardır; yavaş
+bir abone olay kaçırır ama testi yavaşlatmaz. Soketi yalnızca aynı kullanıcı ve root açabilir.
+
+Olaylar:
+    {"type": "hello", "version": 1, "drives": {"/dev/sdb": <son olay>, ...}}  (bağlanınca bir kez)
+    {"type": "started", "disk": "/dev/sdb", "mode": "verify", "time": ...}
+    {"type": "progress", "disk": ..., "phase": "write", "percent": 41.5, "done": ..., "total": ...,
+     "rate": ..., "time": ...}
+    {"type": "result", "disk": ..., "verdict": "genuine", "performance_verdict": null, "real_bytes": ...,
+     "announced_bytes": ..., "error": null, "elapsed": ..., "time": ...}
+    (f3probe sonuçlarında ayrıca "time_ops" ve "parse_seconds" bulunur)
+    {"type": "dropped", "count": 12}  (abone yetişemediği için atlanan olay sayısı)
+f3probe yüzde bildirmez; bu türde yalnızca started ve result olayları yayınlanır.
+
+Örnek:
+    python3 -m fakeusb.events   # Akışı stdout'a yazar
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+from .helper import default_socket_path, _peer_uid
+
+STREAM_SOCKET_NAME = "progress.sock"
+STREAM_VERSION = 1
+SUBSCRIBER_QUEUE_LIMIT = 1024  # Abone başına bekleyen en fazla satır
+STOP_FLUSH_SECONDS = 1.0  # Kapanırken abonelere kalan olayların yazılması için beklenen süre
+
+
+class EventBus:
+    """
+    Thread güvenli yayın/abone noktası. Abone geri çağırmaları yayınlayan thread'de çağrılır
+    ve bloklamamalıdır. Her diskin son olayı, sonradan bağlanan abonelere özet için tutulur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._latest = {}
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def snapshot(self):
+        """Disk yolu -> son olay sözlüğü."""
+        with self._lock:
+            return dict(self._latest)
+
+    def forget(self, disk_path):
+        """Çıkarılan diski özetten siler."""
+        with self._lock:
+            self._latest.pop(disk_path, None)
+
+    def publish(self, event):
+        event.setdefault("time", time.time())
+        with self._lock:
+            if "disk" in event:
+                self._latest[event["disk"]] = event
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+
+    def started(self, disk_path, mode):
+        self.publish({"type": "started", "disk": disk_path, "mode": mode})
+
+    def progress(self, disk_path, phase, done, total, rate):
+        self.publish({"type": "progress", "disk": disk_path, "phase": phase,
+                      "percent": 100.0 * done / total if total else 100.0, "done": done, "total": total,
+                      "rate": rate})
+
+    def result(self, result):
+        event = {"type": "result", "disk": result.disk, "verdict": result.verdict,
+                 "performance_verdict": result.performance_verdict, "real_bytes": result.real_bytes,
+                 "announced_bytes": result.announced_bytes, "error": result.error, "elapsed": result.elapsed}
+        for key in ("time_ops", "parse_seconds"):  # f3probe'un kendi süreleri (metrikler için)
+            if key in result.details:
+                event[key] = result.details[key]
+        self.publish(event)
+
+    def progress_callback(self, disk_path, on_progress=None):
+        """modes.run_test için on_progress: olayı yayınlar, varsa on_progress'i de çağırır."""
+        def callback(phase, done, total, rate):
+            self.progress(disk_path, phase, done, total, rate)
+            if on_progress:
+                on_progress(phase, done, total, rate)
+        return callback
+
+
+def _encode(event):
+    return json.dumps(event).encode() + b"\n"
+
+
+class _Subscriber:
+    """Tek bir soket abonesi: sınırlı kuyruk ve kuyruğu boşaltan yazıcı thread'i."""
+
+    def __init__(self, connection, on_close):
+        self.connection = connection
+        self.on_close = on_close
+        self.queue = queue.Queue(SUBSCRIBER_QUEUE_LIMIT)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self._write_loop, name="progress-subscriber", daemon=True)
+        self.thread.start()
+
+    def offer(self, line):
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self):
+        """Kuyruktaki olaylar yazıldıktan sonra bağlantıyı kapatır; kuyruk doluysa hemen kapatır."""
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _write_loop(self):
+        try:
+            while True:
+                line = self.queue.get()
+                if line is None:
+                    break
+                with self._lock:
+                    dropped, self.dropped = self.dropped, 0
+                if dropped:
+                    self.connection.sendall(_encode({"type": "dropped", "count": dropped}))
+                self.connection.sendall(line)
+        except OSError:
+            pass  # Abone bağlantıyı kapattı
+        finally:
+            self.connection.close()
+            self.on_close(self)
+
+
+class ProgressStreamServer:
+    """EventBus olaylarını Unix soketindeki abonelere NDJSON olarak dağıtır."""
+
+    def __init__(self, bus, socket_path=None):
+        self.bus = bus
+        self.socket_path = socket_path or default_socket_path(STREAM_SOCKET_NAME)
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._listener = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        directory = os.path.dirname(self.socket_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.lexists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(16)
+        listener.settimeout(1.0)
+        self._listener = listener
+        self.bus.subscribe(self._broadcast)
+        threading.Thread(target=self._accept_loop, name="progress-stream", daemon=True).start()
+
+    def stop(self):
+        self._stopping.set()
+        self.bus.unsubscribe(self._broadcast)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.close()
+        deadline = time.monotonic() + STOP_FLUSH_SECONDS
+        for subscriber in subscribers:
+            subscriber.thread.join(max(deadline - time.monotonic(), 0))
+        if self._listener is not None:
+            self._listener.close()
+            if os.path.lexists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def _broadcast(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return  # Abone yoksa olay kodlanmaz bile
+        line = _encode(event)
+        for subscriber in subscribers:
+            subscriber.offer(line)
+
+    def _remove(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            try:
+                connection, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Dinleyici kapatıldı
+            if _peer_uid(connection) not in (os.getuid(), 0):
+                connection.close()
+                continue
+            connection.shutdown(socket.SHUT_RD)  # Aboneler yalnızca okur
+            subscriber = _Subscriber(connection, self._remove)
+            # Özet, abone listeye eklenmeden kuyruğa konur; sonraki olaylar ondan sonra gelir
+            subscriber.offer(_encode({"type": "hello", "version": STREAM_VERSION,
+                                      "drives": self.bus.snapshot()}))
+            with self._lock:
+                self._subscribers.append(subscriber)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.events",
+                                     description="İlerleme akışına abone olur ve olayları stdout'a yazar.")
+    parser.add_argument("--socket", default=None, help="Akış soketi (varsayılan $XDG_RUNTIME_DIR/fake-usb-tester/"
+                                                       f"{STREAM_SOCKET_NAME}).")
+    args = parser.parse_args(argv)
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(args.socket or default_socket_path(STREAM_SOCKET_NAME))
+    except OSError as e:
+        sys.stderr.write(f"Akış soketine bağlanılamadı: {e}\n")
+        return 1
+    try:
+        with connection.makefile("rb") as stream:
+            for line in stream:
+                sys.stdout.write(line.decode())
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
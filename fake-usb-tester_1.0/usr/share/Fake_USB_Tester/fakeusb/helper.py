@@ -0,0 +1,554 @@
+"""
+Oturum başına bir kez yetkilendirilen ayrıcalıklı yardımcı süreç.
+
+Her test için ayrı `pkexec f3probe` çalıştırmak her diskte yeni bir polkit sorusu ve
+yetkilendirme gecikmesi demektir. Bunun yerine yardımcı bir kez pkexec ile root olarak
+başlatılır ve yerel bir Unix soketi üzerinden istek kabul eder. Soketi yalnızca onu
+başlatan kullanıcı (pkexec'in PKEXEC_UID değişkeni; bağlantıda SO_PEERCRED ile denetlenir)
+ve root kullanabilir.
+
+Root olarak çalışan kod kullanıcının yazabildiği bir dizinden içe aktarılmaz: yardımcı ve
+fakeusb paketinin bir kopyası root'a ait /usr/lib/fake-usb-tester altına bir kez kurulur ve
+pkexec yalnızca oradaki başlatıcıyı çalıştırır:
+
+    sudo python3 -m fakeusb.helper install
+
+Protokol satır başına bir JSON nesnesidir (NDJSON). İstekler:
+    {"op": "ping"}
+    {"op": "test", "disk": "/dev/sdb", "mode": "f3probe", "options": {}}
+    {"op": "unmount", "disk": "/dev/sdb"}
+    {"op": "cancel", "disk": "/dev/sdb"}  (o diskte süren testi durdurur)
+    {"op": "shutdown"}
+Test isteğine "stdout", "stderr", "progress" ve "event" mesajları akar; son mesaj
+{"type": "result", "result": {...}} olur. İstekte "trace": true varsa sonuçtan önce yardımcının
+kaydettiği aralıklar {"type": "trace", "events": [...]} ile gönderilir. Hatalar {"type": "error", "error": "..."} ile bildirilir.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import devices, trace
+from .f3 import ProgressEvent, CapacityEvent, BlockSizeEvent, VerdictEvent, TimingEvent, PKEXEC_AUTH_FAILED_CODES
+from .metrics import AUTH_SECONDS
+from .cancel import CancelToken
+from .modes import run_test, MODES
+from .result import (ProbeResult, VERDICT_ERROR, ERROR_AUTH, ERROR_PKEXEC_MISSING, ERROR_HELPER_MISSING,
+                     ERROR_UNEXPECTED)
+
+SOCKET_NAME = "helper.sock"
+IDLE_TIMEOUT_SECONDS = 600  # Bu süre boyunca istek gelmezse yardımcı kapanır
+START_TIMEOUT_SECONDS = 120  # Kullanıcının parola girmesi için beklenen en uzun süre
+START_RETRY_SECONDS = 10  # Reddedilen yetkilendirme bu süre içinde yeniden sorulmaz
+
+HELPER_INSTALL_DIR = "/usr/lib/fake-usb-tester"  # Root'a ait; fakeusb paketinin kopyası ve başlatıcı
+HELPER_PROGRAM_NAME = "fake-usb-tester-helper"
+HELPER_PYTHON = "/usr/bin/python3"
+# -I: PYTHON* ortam değişkenleri, kullanıcı site-packages'ı ve çalışma dizini sys.path'e girmez
+HELPER_LAUNCHER = """#!{python} -I
+import sys
+sys.path.insert(0, {install_dir!r})
+from fakeusb.helper import main
+sys.exit(main(sys.argv[1:]))
+"""
+
+EVENT_TYPES = {cls.__name__: cls for cls in (ProgressEvent, CapacityEvent, BlockSizeEvent, VerdictEvent,
+                                              TimingEvent)}
+
+
+class HelperError(Exception):
+    """Yardımcı başlatılamadı veya isteği reddetti; error bir result.ERROR_* sabitidir."""
+
+    def __init__(self, error, detail=""):
+        super().__init__(detail or error)
+        self.error = error
+        self.detail = detail
+
+
+def helper_needed():
+    """Root değilsek cihaz erişimi için yardımcı gerekir."""
+    return os.geteuid() != 0
+
+
+def default_socket_path(name=SOCKET_NAME):
+    """$XDG_RUNTIME_DIR/fake-usb-tester/<name> (yoksa /tmp altında kullanıcıya özel dizin)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "fake-usb-tester", name)
+    return os.path.join(tempfile.gettempdir(), f"fake-usb-tester-{os.getuid()}", name)
+
+
+def _root_owned(path):
+    """Yol root'a ait, sembolik bağ değil ve grup/başkaları tarafından yazılamıyor mu?"""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return info.st_uid == 0 and not stat.S_ISLNK(info.st_mode) and not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _trusted_tree(path):
+    """path, üst dizinleri ve altındaki her şey yalnızca root tarafından değiştirilebiliyorsa True."""
+    parent = path
+    while True:
+        if not _root_owned(parent):
+            return False
+        if parent == os.sep:
+            break
+        parent = os.path.dirname(parent)
+    for directory, subdirectories, files in os.walk(path):
+        if not all(_root_owned(os.path.join(directory, name)) for name in subdirectories + files):
+            return False
+    return True
+
+
+def helper_program(install_dir=HELPER_INSTALL_DIR):
+    """Kurulu ve yalnızca root tarafından değiştirilebilen başlatıcının yolu; yoksa None."""
+    if not _trusted_tree(install_dir):
+        return None
+    program = os.path.join(install_dir, HELPER_PROGRAM_NAME)
+    return program if os.path.isfile(program) else None
+
+
+def helper_command(socket_path, install_dir=HELPER_INSTALL_DIR):
+    """Yardımcıyı pkexec ile başlatan komut listesini döndürür; yardımcı kurulu değilse HelperError."""
+    program = helper_program(install_dir)
+    if program is None:
+        raise HelperError(ERROR_HELPER_MISSING,
+                          f"{install_dir} altında root'a ait yardımcı yok: sudo python3 -m fakeusb.helper install")
+    return ["pkexec", program, "--socket", socket_path]
+
+
+def install_helper(install_dir=HELPER_INSTALL_DIR, python=HELPER_PYTHON):
+    """
+    Bu fakeusb paketinin .py dosyalarını install_dir/fakeusb altına kopyalar ve başlatıcıyı yazar.
+    Root olarak çalıştırılmalıdır; başlatıcının yolunu döndürür.
+    """
+    if os.geteuid() != 0:
+        raise PermissionError("Yardımcı yalnızca root olarak kurulabilir.")
+    source = os.path.dirname(os.path.abspath(__file__))
+    target = os.path.join(install_dir, "fakeusb")
+    os.makedirs(install_dir, mode=0o755, exist_ok=True)
+    os.chown(install_dir, 0, 0)
+    os.chmod(install_dir, 0o755)
+    staging = target + ".new"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.mkdir(staging, 0o755)
+    for name in sorted(os.listdir(source)):
+        if name.endswith(".py"):
+            shutil.copyfile(os.path.join(source, name), os.path.join(staging, name))
+            os.chmod(os.path.join(staging, name), 0o644)
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(staging, target)
+    program = os.path.join(install_dir, HELPER_PROGRAM_NAME)
+    with open(program + ".new", "w") as f:
+        f.write(HELPER_LAUNCHER.format(python=python, install_dir=install_dir))
+    os.chmod(program + ".new", 0o755)
+    os.rename(program + ".new", program)
+    return program
+
+
+def _send(connection, message):
+    connection.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _read_messages(connection):
+    """Bağlantıdan JSON satırlarını okur; karşı taraf kapatınca biter."""
+    with connection.makefile("rb") as stream:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _peer_uid(connection):
+    _, uid, _ = struct.unpack("3i", connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                            struct.calcsize("3i")))
+    return uid
+
+
+def _validate_disk(disk_path):
+    """Root olarak yalnızca çıkarılabilir disklere dokunulur."""
+    if not isinstance(disk_path, str) or not disk_path.startswith("/dev/"):
+        raise ValueError(f"Geçersiz disk yolu: {disk_path!r}")
+    name = os.path.basename(disk_path)
+    if os.path.dirname(disk_path) != "/dev" or not devices.is_removable_disk(name):
+        raise ValueError(f"Çıkarılabilir bir disk değil: {disk_path}")
+
+
+class HelperServer:
+    """Root olarak çalışan istek sunucusu; her bağlantı kendi thread'inde işlenir."""
+
+    def __init__(self, socket_path, allowed_uid, idle_timeout=IDLE_TIMEOUT_SECONDS):
+        self.socket_path = socket_path
+        self.allowed_uid = allowed_uid
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_activity = time.monotonic()
+        self._stopping = threading.Event()
+        self._listener = None
+        self._cancel_tokens = {}  # Disk yolu -> süren testin CancelToken'ı
+        self._traced_requests = 0  # İzleme yalnızca izlenen istekler sürerken açıktır
+
+    def _bind(self):
+        directory = os.path.dirname(self.socket_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.lstat(directory)
+        # Dizin kullanıcıya ait gerçek bir dizin olmalı; aksi halde root başka bir yere soket açabilir
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid not in (self.allowed_uid, 0):
+            raise PermissionError(f"Güvensiz soket dizini: {directory}")
+        if os.path.lexists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        os.chown(self.socket_path, self.allowed_uid, -1)
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(16)
+        listener.settimeout(1.0)
+        self._listener = listener
+
+    def serve_forever(self):
+        self._bind()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection, _ = self._listener.accept()
+                except socket.timeout:
+                    with self._lock:
+                        idle = self._active == 0 and time.monotonic() - self._last_activity > self.idle_timeout
+                    if idle:
+                        break
+                    continue
+                if _peer_uid(connection) not in (self.allowed_uid, 0):
+                    connection.close()
+                    continue
+                with self._lock:
+                    self._active += 1
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if os.path.lexists(self.socket_path):
+                os.unlink(self.socket_path)
+            # Süren testler yarıda kesilirse aygıtın orijinal verisi geri yazılmaz; bitmeleri beklenir
+            while True:
+                with self._lock:
+                    if self._active == 0:
+                        break
+                time.sleep(0.1)
+
+    def _serve_connection(self, connection):
+        send_lock = threading.Lock()
+        peer_gone = []
+
+        def send(message):
+            # İstemci giderse test yine de tamamlanır; aygıt durumu geri yüklenmeden bırakılmaz
+            if peer_gone:
+                return
+            try:
+                with send_lock:
+                    _send(connection, message)
+            except OSError:
+                peer_gone.append(True)
+
+        try:
+            for request in _read_messages(connection):
+                try:
+                    self._dispatch(request, send)
+                except Exception as e:
+                    send({"type": "error", "error": str(e)})
+        except (OSError, ValueError):
+            pass
+        finally:
+            connection.close()
+            with self._lock:
+                self._active -= 1
+                self._last_activity = time.monotonic()
+
+    def _dispatch(self, request, send):
+        op = request.get("op")
+        if op == "ping":
+            send({"type": "pong", "pid": os.getpid()})
+        elif op == "test":
+            disk_path, mode = request.get("disk"), request.get("mode")
+            _validate_disk(disk_path)
+            if mode not in MODES:
+                raise ValueError(f"Bilinmeyen test türü: {mode}")
+            traced = bool(request.get("trace"))
+            if traced:
+                self._begin_trace()  # İstemci izliyor; bu diskin aralıkları sonuçla birlikte geri gönderilir
+            cancel = CancelToken()
+            with self._lock:
+                self._cancel_tokens[disk_path] = cancel
+            try:
+                result = self._run_test(request, disk_path, mode, send, cancel)
+            finally:
+                with self._lock:
+                    if self._cancel_tokens.get(disk_path) is cancel:
+                        del self._cancel_tokens[disk_path]
+                events = self._end_trace(disk_path) if traced else None
+            if traced:
+                send({"type": "trace", "events": events})
+            send({"type": "result", "result": result.to_dict()})
+        elif op == "cancel":
+            with self._lock:
+                cancel = self._cancel_tokens.get(request.get("disk"))
+            if cancel is not None:
+                cancel.cancel()
+            send({"type": "cancelled", "running": cancel is not None})
+        elif op == "unmount":
+            _validate_disk(request.get("disk"))
+            send({"type": "unmounted", "failed": devices.unmount_disk(request["disk"])})
+        elif op == "shutdown":
+            self._stopping.set()
+            send({"type": "bye"})
+        else:
+            raise ValueError(f"Bilinmeyen istek: {op}")
+
+    def _begin_trace(self):
+        with self._lock:
+            if self._traced_requests == 0:
+                trace.enable()
+            self._traced_requests += 1
+
+    def _end_trace(self, disk_path):
+        """
+        Diskin aralıklarını çıkarıp döndürür; izlenen son istek bittiyse izlemeyi kapatır
+        (izlenmeyen isteklerin o arada kaydedilen aralıkları da atılır).
+        """
+        with self._lock:
+            events = trace.current().drain(disk_path)
+            self._traced_requests -= 1
+            if self._traced_requests == 0:
+                trace.disable()
+        return events
+
+    def _run_test(self, request, disk_path, mode, send, cancel):
+        return run_test(
+            disk_path, mode, options=request.get("options") or {}, cancel=cancel,
+            on_stdout=lambda line: send({"type": "stdout", "line": line}),
+            on_stderr=lambda line: send({"type": "stderr", "line": line}),
+            on_progress=lambda phase, done, total, rate: send(
+                {"type": "progress", "phase": phase, "done": done, "total": total, "rate": rate}),
+            on_event=lambda event: send(
+                {"type": "event", "name": type(event).__name__, "fields": event._asdict()}))
+
+
+class PrivilegedHelper:
+    """
+    Yardımcının istemci tarafı. İlk istekte yardımcı pkexec ile başlatılır (tek polkit sorusu);
+    sonraki istekler aynı süreci kullanır. Her istek ayrı bir bağlantı açar, bu yüzden
+    farklı thread'lerden aynı anda birçok disk test edilebilir.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or default_socket_path()
+        self._lock = threading.Lock()
+        self._process = None
+        self._start_error = None
+        self._start_error_time = 0.0
+
+    def _connect(self):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+        except OSError:
+            connection.close()
+            raise
+        return connection
+
+    def _ping(self):
+        try:
+            connection = self._connect()
+        except OSError:
+            return False
+        with connection:
+            try:
+                _send(connection, {"op": "ping"})
+                connection.shutdown(socket.SHUT_WR)
+                return any(message.get("type") == "pong" for message in _read_messages(connection))
+            except (OSError, ValueError):
+                return False
+
+    def is_running(self):
+        return self._ping()
+
+    def start(self):
+        """Yardımcı çalışmıyorsa pkexec ile başlatır; başarısızsa HelperError yükseltir."""
+        with self._lock:
+            if self._ping():
+                return
+            if self._start_error and time.monotonic() - self._start_error_time < START_RETRY_SECONDS:
+                raise self._start_error
+            start_time = time.monotonic()
+            try:
+                with trace.span("auth"):
+                    self._launch()
+                self._start_error = None
+            except HelperError as e:
+                AUTH_SECONDS.observe(time.monotonic() - start_time, e.error)
+                self._start_error, self._start_error_time = e, time.monotonic()
+                raise
+            AUTH_SECONDS.observe(time.monotonic() - start_time, "ok")
+
+    def _launch(self):
+        directory = os.path.dirname(self.socket_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        command = helper_command(self.socket_path)
+        sys.stderr.write(f"Yardımcı başlatılıyor: {' '.join(command[:2])}\n")
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.DEVNULL)
+        except FileNotFoundError as e:
+            raise HelperError(ERROR_PKEXEC_MISSING, str(e))
+
+        deadline = time.monotonic() + START_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            returncode = self._process.poll()
+            if returncode is not None:
+                if returncode in PKEXEC_AUTH_FAILED_CODES:
+                    raise HelperError(ERROR_AUTH, f"pkexec çıkış kodu {returncode}")
+                raise HelperError(ERROR_UNEXPECTED, f"Yardımcı beklenmedik biçimde kapandı (kod {returncode})")
+            if os.path.exists(self.socket_path) and self._ping():
+                return
+            time.sleep(0.1)
+        raise HelperError(ERROR_AUTH, "Yetkilendirme zaman aşımına uğradı")
+
+    def request(self, message, on_message=None):
+        """İsteği gönderir, akan mesajları on_message'a verir ve son mesajı döndürür."""
+        self.start()
+        last = None
+        with self._connect() as connection:
+            _send(connection, message)
+            connection.shutdown(socket.SHUT_WR)
+            for last in _read_messages(connection):
+                if last.get("type") == "error":
+                    raise HelperError(ERROR_UNEXPECTED, last.get("error", ""))
+                if on_message:
+                    on_message(last)
+        if last is None:
+            raise HelperError(ERROR_UNEXPECTED, "Yardımcı yanıt vermeden bağlantıyı kapattı")
+        return last
+
+    def run_test(self, disk_path, mode, on_stdout=None, on_stderr=None, on_progress=None, on_event=None,
+                 options=None, cancel=None):
+        """modes.run_test ile aynı sözleşme: her durumda ProbeResult döndürür."""
+        cancel_sent = []
+
+        def dispatch(message):
+            if cancel is not None and cancel.cancelled and not cancel_sent:
+                # İptal, test yardımcıda başlamadan önce istendiyse orada hiçbir test bulunamamıştır
+                cancel_sent.append(True)
+                self.cancel(disk_path)
+            kind = message.get("type")
+            if kind == "stdout" and on_stdout:
+                on_stdout(message["line"])
+            elif kind == "stderr" and on_stderr:
+                on_stderr(message["line"])
+            elif kind == "progress" and on_progress:
+                on_progress(message["phase"], message["done"], message["total"], message["rate"])
+            elif kind == "event" and on_event and message.get("name") in EVENT_TYPES:
+                on_event(EVENT_TYPES[message["name"]](**message["fields"]))
+            elif kind == "trace" and trace.enabled():
+                trace.current().merge(message["events"])
+
+        request = {"op": "test", "disk": disk_path, "mode": mode, "options": options or {}}
+        if trace.enabled():
+            request["trace"] = True
+        # İptal, yardımcıya ayrı bir bağlantıdan iletilir; test orada durdurulup sonucu bu bağlantıdan döner
+        remove_cancel = cancel.on_cancel(lambda: self.cancel(disk_path)) if cancel is not None else None
+        try:
+            with trace.span("helper_request", disk_path):
+                last = self.request(request, dispatch)
+        except HelperError as e:
+            return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=e.error, error_detail=e.detail)
+        except OSError as e:
+            return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED, error_detail=str(e))
+        finally:
+            if remove_cancel is not None:
+                remove_cancel()
+        if last.get("type") != "result":
+            return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED,
+                               error_detail=f"Beklenmeyen yanıt: {last}")
+        return ProbeResult.from_dict(last["result"])
+
+    def cancel(self, disk_path):
+        """Diskte yardımcıda süren testi durdurur; yardımcıya ulaşılamazsa sessizce vazgeçer."""
+        try:
+            self.request({"op": "cancel", "disk": disk_path})
+        except (HelperError, OSError):
+            pass
+
+    def unmount(self, disk_path):
+        """Diskin bölümlerini root olarak ayırır; ayrılamayanların listesini döndürür."""
+        return self.request({"op": "unmount", "disk": disk_path})["failed"]
+
+    def shutdown(self):
+        """Çalışıyorsa yardımcıyı kapatır (parola sormadan)."""
+        if not self._ping():
+            return
+        try:
+            with self._connect() as connection:
+                _send(connection, {"op": "shutdown"})
+                connection.shutdown(socket.SHUT_WR)
+                for _ in _read_messages(connection):
+                    pass
+        except OSError:
+            pass
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+
+
+def allowed_uid():
+    """
+    Soketi kullanabilecek kullanıcı: yardımcıyı pkexec ile başlatan kullanıcı (PKEXEC_UID).
+    pkexec dışında root olarak başlatıldıysa yalnızca root.
+    """
+    value = os.environ.get("PKEXEC_UID")
+    if value is None:
+        return 0 if os.geteuid() == 0 else None
+    return int(value) if value.isdigit() else None
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["install"]:
+        installer = argparse.ArgumentParser(prog="python3 -m fakeusb.helper install",
+                                            description="Yardımcıyı root'a ait dizine kurar (root olarak çalıştırın).")
+        installer.add_argument("--prefix", default=HELPER_INSTALL_DIR, help="Kurulum dizini (varsayılan %(default)s).")
+        installer.add_argument("--python", default=HELPER_PYTHON, help="Başlatıcının yorumlayıcısı.")
+        args = installer.parse_args(argv[1:])
+        try:
+            print(install_helper(args.prefix, args.python))
+        except OSError as e:
+            sys.stderr.write(f"Yardımcı kurulamadı: {e}\n")
+            return 1
+        return 0
+    parser = argparse.ArgumentParser(prog="fake-usb-tester-helper",
+                                     description="Fake USB Tester ayrıcalıklı yardımcı süreci (pkexec ile başlatılır).")
+    parser.add_argument("--socket", required=True, help="Dinlenecek Unix soketi.")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT_SECONDS,
+                        help="Bu kadar saniye istek gelmezse çıkar.")
+    args = parser.parse_args(argv)
+    uid = allowed_uid()
+    if uid is None:
+        sys.stderr.write("Yardımcı pkexec ile (PKEXEC_UID) veya root olarak başlatılmalı.\n")
+        return 2
+    HelperServer(args.socket, uid, args.idle_timeout).serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
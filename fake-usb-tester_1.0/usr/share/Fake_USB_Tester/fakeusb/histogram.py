@@ -0,0 +1,96 @@
+"""
+Sabit boyutlu, log-doğrusal gecikme histogramı.
+
+Değerler (ör. mikrosaniye) ikinin her kuvveti aralığında SUB_BUCKETS eşit dilime bölünerek
+sayılır; bağıl hata en fazla 1/SUB_BUCKETS olur. Sayaçlar tek bir array('Q') içinde
+tutulur, bellek kullanımı ölçüm sayısından bağımsızdır.
+"""
+
+import array
+
+SUB_BUCKET_BITS = 2
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS  # İkinin her kuvveti aralığındaki dilim sayısı
+MAX_VALUE_BITS = 40  # 2^40 us ~ 12 gün; daha büyük değerler son kovaya yazılır
+BUCKET_COUNT = (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+
+def bucket_index(value):
+    """Negatif olmayan tamsayı değerin kova numarası."""
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    index = (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+    return min(index, BUCKET_COUNT - 1)
+
+
+def bucket_lower_bound(index):
+    """Kovaya düşen en küçük değer."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+
+
+class LatencyHistogram:
+    """Thread güvenli değildir; her iş parçacığı kendi histogramını tutar, sonra merge ile birleştirilir."""
+
+    def __init__(self, unit="us"):
+        self.unit = unit
+        self.counts = array.array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        value = max(int(value), 0)
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """fraction (0-1) yüzdeliğindeki değerin yaklaşığı (kovanın orta noktası); boşsa 0."""
+        if not self.count:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                lower = bucket_lower_bound(index)
+                return min((lower + bucket_lower_bound(index + 1)) // 2, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        return {"count": self.count, "mean": self.mean, "p50": self.percentile(0.5),
+                "p90": self.percentile(0.9), "p99": self.percentile(0.99), "max": self.max}
+
+    def to_dict(self):
+        """Sondaki boş kovalar atılmış, JSON'a yazılabilir gösterim."""
+        counts = list(self.counts)
+        while counts and not counts[-1]:
+            counts.pop()
+        return dict(self.summary(), unit=self.unit, sub_buckets=SUB_BUCKETS, counts=counts)
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data.get("unit", "us"))
+        for index, count in enumerate(data.get("counts", [])):
+            histogram.counts[index] = count
+        histogram.count = data.get("count", sum(histogram.counts))
+        histogram.total = int(data.get("mean", 0) * histogram.count)
+        histogram.max = data.get("max", 0)
+        return histogram
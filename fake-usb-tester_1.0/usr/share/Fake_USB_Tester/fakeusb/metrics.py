@@ -0,0 +1,247 @@
+"""
+Sayaç ve histogramlardan oluşan işletim metrikleri; Prometheus metin biçiminde yerel HTTP ucu.
+
+Disk listeleme, meta veri okuma (sysfs), polkit yetkilendirmesi, test aşamaları,
+f3probe çıktısının ayrıştırılması ve f3'ün --time-ops süreleri ölçülür; istasyonun hangi
+aşamada darboğaz olduğu buradan görülür. Test metrikleri events.EventBus olaylarından
+toplanır (MetricsCollector), diğerleri ölçüldükleri yerde doğrudan güncellenir.
+
+Örnek:
+    fake-usb-tester --batch --metrics-port 9464 &
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600, 14400)
+METRICS_HOST = "127.0.0.1"  # Yalnızca yerel makineden erişilir
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Yalnızca artan sayaç; etiket değerleri sırasıyla labels(...) veya inc(...) ile verilir."""
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            yield self.name + _label_text(self.label_names, label_values), value
+
+
+class Histogram:
+    """Sabit kovalı histogram; bellek kullanımı gözlem sayısından bağımsızdır."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        self._series = {}  # etiket değerleri -> [kova sayaçları, toplam, adet]
+
+    def observe(self, value, *label_values, count=1):
+        """value değerini count kez gözlemler (ör. f3'ün bildirdiği ortalama süre ve işlem sayısı)."""
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += count
+                    break
+            series[1] += value * count
+            series[2] += count
+
+    def time(self, *label_values):
+        """with bloğunun süresini gözlemleyen bağlam yöneticisi."""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[2] if series else 0
+
+    def samples(self):
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        for label_values, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield (self.name + "_bucket"
+                       + _label_text(self.label_names, label_values, [("le", _number(bound))]), cumulative)
+            yield self.name + "_sum" + _label_text(self.label_names, label_values), total
+            yield self.name + "_count" + _label_text(self.label_names, label_values), count
+
+
+class _Timer:
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik zaten tanımlı: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self):
+        """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {_number(value)}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+ENUMERATION_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_enumeration_seconds", "Çıkarılabilir disklerin tek geçişte listelenme süresi.")
+METADATA_LOOKUP_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_metadata_lookup_seconds", "Tek bir diskin meta verisinin okunma süresi.", ("source",))
+AUTH_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_auth_seconds", "Yardımcının pkexec/polkit ile yetkilendirilip başlatılma süresi.", ("result",))
+TEST_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_test_seconds", "Bir disk testinin başından sonucuna kadar geçen süre.", ("mode",))
+PHASE_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_phase_seconds", "Test aşamalarının (yazma, doğrulama, prob...) süresi.", ("mode", "phase"))
+PARSE_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_parse_seconds", "f3probe çıktısının ayrıştırılmasında harcanan toplam süre.")
+F3_OPERATION_SECONDS = REGISTRY.histogram(
+    "fake_usb_tester_f3_operation_seconds", "f3probe --time-ops ile bildirilen tek işlem süreleri.", ("operation",))
+RESULTS_TOTAL = REGISTRY.counter(
+    "fake_usb_tester_results_total", "Karara göre biten test sayısı.", ("mode", "verdict"))
+
+
+class MetricsCollector:
+    """EventBus olaylarından test, aşama ve sonuç metriklerini günceller."""
+
+    def __init__(self, bus):
+        self._lock = threading.Lock()
+        self._running = {}  # disk -> [mod, başlangıç, aşama, aşama başlangıcı]
+        bus.subscribe(self.on_event)
+
+    def on_event(self, event):
+        kind = event.get("type")
+        disk = event.get("disk")
+        now = time.monotonic()
+        with self._lock:
+            if kind == "started":
+                self._running[disk] = [event["mode"], now, None, now]
+                return
+            state = self._running.get(disk)
+            if state is None:
+                return  # Önbellekten gelen sonuçlar ölçülmez
+            mode, started, phase, phase_started = state
+            if kind == "progress" and event["phase"] != phase:
+                if phase is not None:
+                    PHASE_SECONDS.observe(now - phase_started, mode, phase)
+                state[2], state[3] = event["phase"], now
+                return
+            if kind != "result":
+                return
+            del self._running[disk]
+        if phase is not None:
+            PHASE_SECONDS.observe(now - phase_started, mode, phase)
+        TEST_SECONDS.observe(now - started, mode)
+        RESULTS_TOTAL.inc(mode, event["verdict"])
+        for operation, timing in (event.get("time_ops") or {}).items():
+            F3_OPERATION_SECONDS.observe(timing["average_seconds"], operation, count=timing["count"])
+        if event.get("parse_seconds") is not None:
+            PARSE_SECONDS.observe(event["parse_seconds"])
+
+
+class _MetricsHandler:
+    """/metrics isteklerini yanıtlar; http.server.BaseHTTPRequestHandler ile birlikte kullanılır."""
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Her kazıma isteği terminale yazılmaz
+
+
+class MetricsServer:
+    """Registry'yi http://127.0.0.1:<port>/metrics adresinde sunar (arka plan thread'i)."""
+
+    def __init__(self, port, registry=REGISTRY, host=METRICS_HOST):
+        import http.server  # Yalnızca sunucu açılırken yüklenir; komut satırının açılışını yavaşlatmaz
+        handler = type("MetricsHandler", (_MetricsHandler, http.server.BaseHTTPRequestHandler), {"registry": registry})
+        self.server = http.server.ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
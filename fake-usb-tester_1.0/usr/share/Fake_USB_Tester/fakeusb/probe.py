@@ -0,0 +1,221 @@
+"""
+Yerleşik sahte kapasite probu (f3probe benzeri, pkexec/harici süreç olmadan).
+
+Gerçek kapasite sınırı, örneklenen sektör adreslerinde ikili arama ile bulunur.
+Her denemede aday sektörün yanı sıra onun 2'nin kuvveti modüllerdeki olası eşleri
+(adres & (2^k - 1)) de etiketlenir; böylece hem yazılanı kaybeden (limbo) hem de
+adres sarması yapan (wraparound) aygıtlar yakalanır. Yazılan her sektörün özgün
+içeriği önceden saklanır ve test sonunda (iptal edilse de) ters sırayla geri yazılır.
+
+Sahte disklerin çoğu son yazılanları denetleyici önbelleğinde tutar; etiket yazılır yazılmaz
+geri okunursa önbellekten gelir ve sınırın ötesi sağlam görünür. Bu yüzden her denemede okumadan
+önce önbellek boşaltılır: verilen reset geri çağırması (root olarak USB sıfırlaması) kullanılır,
+yoksa ya da başarısız olursa diskin başındaki CACHE_FLUSH_BYTES'lık alan (etiketli sektörler
+atlanarak) yeniden yazılır. Bu alanın özgün içeriği de saklanıp geri yazılır.
+"""
+
+import random
+import time
+
+from .blockdev import open_device, aligned_buffer
+from .devices import bytes_to_human_readable, mounted_partitions
+from .engine import DeviceBusyError
+from .patterns import PatternTable
+from .regions import cutoff_map
+from .result import ProbeResult, VERDICT_GENUINE, VERDICT_FAKE
+
+FAKE_TYPE_LIMBO = "limbo"  # Sınırın ötesine yazılanlar kayboluyor
+FAKE_TYPE_WRAPAROUND = "wraparound"  # Sınırın ötesi baştaki sektörlerin üzerine yazıyor
+CACHE_FLUSH_BYTES = 4 * 1024 * 1024  # Sıfırlama yapılamazsa önbelleği boşaltmak için yazılan alan
+# Doldurma alanı duyurulan kapasitenin bu kesrini aşmaz: gerçek kapasitesi alandan küçük sarmalı
+# bir diskte doldurma yazmaları etiketlerin üzerine sarardı
+MAX_FLUSH_FRACTION = 64
+
+
+class CapacityProbe:
+    """Açık bir BlockDevice üzerinde gerçek sektör sayısını bulur."""
+
+    def __init__(self, device, seed=None, reset=None, on_progress=None, cancel=None, flush_bytes=CACHE_FLUSH_BYTES):
+        self.device = device
+        self.sector_size = device.logical_block_size
+        self.sector_count = device.sector_count
+        # Her çalıştırmada farklı tohum: önceki testlerden kalan etiketler yanıltmasın
+        self.table = PatternTable(seed if seed is not None else random.getrandbits(63), self.sector_size)
+        self.reset = reset  # Aygıt önbelleğini boşaltmak için isteğe bağlı geri çağırma (ör. USB sıfırlama)
+        self.on_progress = on_progress
+        self.cancel = cancel  # cancel.CancelToken; her denemeden önce denetlenir
+        self._buffer = aligned_buffer(max(self.sector_size, 4096))
+        self._flush_sectors = min(flush_bytes, device.size // MAX_FLUSH_FRACTION) // self.sector_size
+        self._flush_buffer = None  # Doldurma deseni; ilk doldurmada hazırlanır
+        self._saved = set()  # Özgün içeriği saklanmış sektörler
+        self._save_order = []  # (ilk sektör, ilk yazmadan önce okunan içerik)
+        self.failure_type = None
+        self.stats = {"reads": 0, "writes": 0, "read_time": 0.0, "write_time": 0.0, "probes": 0, "resets": 0,
+                      "flush_bytes": 0}
+
+    def _read(self, sector, count=1):
+        buffer = self._buffer if count == 1 else aligned_buffer(count * self.sector_size)
+        view = memoryview(buffer)[:count * self.sector_size]
+        start = time.monotonic()
+        try:
+            read = self.device.read_into(view, sector * self.sector_size)
+            data = bytes(view[:read])
+        finally:
+            view.release()
+        self.stats["reads"] += 1
+        self.stats["read_time"] += time.monotonic() - start
+        return data
+
+    def _write(self, sector, data):
+        """data'yı sector'den başlayarak yazar; data bayt dizisi ya da hizalı bir tamponun memoryview'ıdır."""
+        if not isinstance(data, memoryview):
+            buffer = self._buffer if len(data) <= len(self._buffer) else aligned_buffer(len(data))
+            buffer[:len(data)] = data
+            data = memoryview(buffer)[:len(data)]
+        start = time.monotonic()
+        try:
+            self.device.write(data, sector * self.sector_size)
+        finally:
+            data.release()
+        self.stats["writes"] += 1
+        self.stats["write_time"] += time.monotonic() - start
+
+    def _save(self, sector, count=1):
+        """[sector, sector+count) aralığının şimdiki içeriğini geri yüklenmek üzere saklar."""
+        self._save_order.append((sector, self._read(sector, count)))
+        self._saved.update(range(sector, sector + count))
+
+    def _write_tag(self, sector):
+        if sector not in self._saved:
+            self._save(sector)
+        self._write(sector, self.table.sector(sector))
+
+    def _alias_candidates(self, sector):
+        """2'nin kuvveti büyüklüğündeki modüllerde sector'ün düşebileceği alt adresler."""
+        candidates = set()
+        for bits in range(1, self.sector_count.bit_length() + 1):
+            alias = sector & ((1 << bits) - 1)
+            if alias != sector:
+                candidates.add(alias)
+        return sorted(candidates)
+
+    def _sector_is_good(self, sector):
+        """sector'e yazılan etiket geri okunabiliyor ve hiçbir eşini bozmuyorsa True."""
+        if self.cancel is not None:
+            self.cancel.check()
+        self.stats["probes"] += 1
+        anchors = self._alias_candidates(sector)
+        for anchor in anchors:
+            self._write_tag(anchor)
+        self._write_tag(sector)
+        self.device.drop_caches()
+        self._evict_cache(set(anchors) | {sector})
+
+        if self._read(sector) != self.table.sector(sector):
+            self.failure_type = FAKE_TYPE_LIMBO
+            return False
+        for anchor in anchors:
+            if self._read(anchor) != self.table.sector(anchor):
+                self.failure_type = FAKE_TYPE_WRAPAROUND
+                return False
+        return True
+
+    def _evict_cache(self, tagged):
+        """Denetleyici önbelleğini boşaltır: önce reset denenir, olmazsa önbellekten büyük bir alan yazılır."""
+        if self.reset is not None:
+            try:
+                self.reset()
+                self.stats["resets"] += 1
+                return
+            except OSError:
+                self.reset = None  # Sıfırlama desteklenmiyor; bundan sonra doldurma kullanılır
+        if not self._flush_sectors:
+            return
+        sector_size, count = self.sector_size, self._flush_sectors
+        if self._flush_buffer is None:
+            self._save(0, count)
+            self._flush_buffer = aligned_buffer(count * sector_size)
+            self.table.fill(self._flush_buffer, 0)
+        # Doldurma [0, count) aralığındaki etiketli sektörlerin arasına yazılır, etiketlerin üzerine yazılmaz
+        start = 0
+        for end in sorted(sector for sector in tagged if sector < count) + [count]:
+            if start < end:
+                self._write(start, memoryview(self._flush_buffer)[start * sector_size:end * sector_size])
+                self.stats["flush_bytes"] += (end - start) * sector_size
+            start = end + 1
+        self.device.drop_caches()
+
+    def run(self):
+        """Gerçek (kullanılabilir) sektör sayısını döndürür; özgün veriler her durumda geri yazılır."""
+        try:
+            return self._find_last_good()
+        finally:
+            self.restore()
+
+    def _find_last_good(self):
+        last = self.sector_count - 1
+        if last < 0:
+            return 0
+        if self._sector_is_good(last):
+            self.failure_type = None
+            return self.sector_count
+        if not self._sector_is_good(0):
+            return 0
+
+        low, high = 0, last  # low iyi, high kötü
+        total_steps = max(1, (high - low).bit_length())
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._sector_is_good(middle):
+                low = middle
+            else:
+                high = middle
+            if self.on_progress:
+                done_steps = total_steps - (high - low).bit_length()
+                self.on_progress("probe", done_steps, total_steps, 0.0)
+        return low + 1
+
+    def restore(self):
+        """Saklanan özgün içerikleri ters sırayla geri yazar (eş adresler doğru sırayla geri gelir)."""
+        for sector, data in reversed(self._save_order):
+            self._write(sector, data)
+        self._saved.clear()
+        self._save_order.clear()
+        self.device.flush()
+
+
+def probe_capacity(disk_path, seed=None, reset=None, on_progress=None, cancel=None):
+    """
+    Diskin gerçek kapasitesini yerleşik prob ile bulur ve ProbeResult döndürür.
+    reset her denemede denetleyici önbelleğini boşaltan geri çağırmadır (ör. USB sıfırlaması);
+    None ise ya da OSError yükseltirse önbellek doldurma yazmalarıyla boşaltılır.
+    Bağlı bölümü olan disklerde DeviceBusyError, yetki yoksa PermissionError, iptalde
+    (özgün veriler geri yazıldıktan sonra) TestCancelled yükseltir.
+    """
+    mounts = mounted_partitions(disk_path)
+    if mounts:
+        raise DeviceBusyError(", ".join(mounts))
+
+    start_time = time.monotonic()
+    with open_device(disk_path, writable=True) as device:
+        probe = CapacityProbe(device, seed, reset, on_progress, cancel)
+        real_sectors = probe.run()
+        sector_size = probe.sector_size
+        announced_sectors = probe.sector_count
+
+    result = ProbeResult(disk=disk_path, real_bytes=real_sectors * sector_size,
+                         announced_bytes=announced_sectors * sector_size)
+    result.real_capacity = bytes_to_human_readable(result.real_bytes)
+    result.promised_capacity = bytes_to_human_readable(result.announced_bytes)
+    if real_sectors == announced_sectors:
+        result.verdict = VERDICT_GENUINE
+    else:
+        result.verdict = VERDICT_FAKE
+        result.fake_type = probe.failure_type
+    result.details = dict(probe.stats, sector_size=sector_size, real_sectors=real_sectors,
+                          announced_sectors=announced_sectors, direct_io=device.direct)
+    regions = cutoff_map(result.announced_bytes, result.real_bytes, result.fake_type, sector_size)
+    if regions is not None:
+        result.details["regions"] = regions.to_dict()
+    result.elapsed = time.monotonic() - start_time
+    return result
@@ -0,0 +1,315 @@
+"""
+Dosya tabanlı sahte USB bellek simülatörü.
+
+Her simüle sürücü bir bildirim dosyasından (<ad>.sim, JSON) ve yalnızca gerçek kapasite
+kadar yer kaplayan seyrek bir yedek dosyadan (<ad>.img) oluşur. Sürücünün yolu .sim
+dosyasıdır; blockdev.open_device bu yolu gören motorlara BlockDevice ile aynı arayüze
+sahip bir SimulatedDevice verir. Root, loop aygıtı veya gerçek bellek gerekmez.
+
+Davranışlar:
+    genuine     duyurulan boyut = gerçek boyut
+    limbo       gerçek kapasitenin ötesine yazılanlar kaybolur, okumalar sıfır döner
+    wraparound  gerçek kapasitenin ötesindeki adresler baştaki sektörlere sarar
+
+cache_bytes verilirse sürücü SLC önbelleği olan bir bellek gibi davranır: açıldıktan sonra
+ilk cache_bytes bayt hızlı yazılır, sonrası cliff_bandwidth bayt/s'ye düşer.
+
+cached_sectors verilirse denetleyici son yazılan o kadar sektörü bellekte tutar: sınırın ötesine
+yazılan veri bile önbellekten çıkana ya da aygıt sıfırlanana (SimulatedDevice.reset) kadar
+doğru okunur (önbellekli sahte diskler; probun önbellek boşaltmasını sınamak için).
+
+FAKE_USB_TESTER_SIMULATOR ortam değişkeni bir dizini gösteriyorsa oradaki sürücüler
+disk listesine (GUI ve --list/--batch) çıkarılabilir disk olarak eklenir.
+
+Örnek:
+    python3 -m fakeusb.simulator create --dir /tmp/sim --count 24 --announced 16G --real 1G
+    FAKE_USB_TESTER_SIMULATOR=/tmp/sim python3 -m fakeusb --batch --mode probe
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+import zlib
+
+from .cache import make_identity
+from .devices import bytes_to_human_readable
+
+SIMULATOR_DIR_ENV = "FAKE_USB_TESTER_SIMULATOR"
+MANIFEST_SUFFIX = ".sim"
+BACKING_SUFFIX = ".img"
+
+KIND_GENUINE = "genuine"
+KIND_LIMBO = "limbo"  # probe.FAKE_TYPE_LIMBO ile aynı
+KIND_WRAPAROUND = "wraparound"  # probe.FAKE_TYPE_WRAPAROUND ile aynı
+KINDS = (KIND_GENUINE, KIND_LIMBO, KIND_WRAPAROUND)
+
+DEFAULT_SECTOR_SIZE = 512
+DEFAULT_BUS_COUNT = 4  # Filodaki sürücüler bu kadar sanal kök hub'a dağıtılır
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(text):
+    """"16G", "512M", "4096" gibi boyutları bayta çevirir (ikili katlar)."""
+    text = text.strip().upper().rstrip("B").rstrip("I")
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def simulator_dir():
+    """Ortam değişkeniyle etkinleştirilmiş simülatör dizinini döndürür; yoksa None."""
+    return os.environ.get(SIMULATOR_DIR_ENV) or None
+
+
+def is_simulated(path):
+    return path.endswith(MANIFEST_SUFFIX) and os.path.isfile(path)
+
+
+def load_manifest(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest["path"] = path
+    return manifest
+
+
+def create_drive(directory, name, kind=KIND_LIMBO, announced_bytes=16 * 1024**3, real_bytes=1024**3,
+                 sector_size=DEFAULT_SECTOR_SIZE, bus="sim1", bandwidth=0, cache_bytes=0, cliff_bandwidth=0,
+                 cached_sectors=0):
+    """
+    Simüle bir sürücü oluşturur ve yolunu döndürür.
+    bandwidth > 0 ise G/Ç saniyede bu kadar bayta yavaşlatılır (zamanlayıcı yük testleri için).
+    cache_bytes > 0 ise o kadar yazmadan sonra yazmalar cliff_bandwidth bayt/s'ye düşer.
+    cached_sectors > 0 ise son yazılan o kadar sektör denetleyici önbelleğinden okunur.
+    """
+    if cache_bytes and not cliff_bandwidth:
+        raise ValueError("cache_bytes için cliff_bandwidth de verilmeli")
+    if kind not in KINDS:
+        raise ValueError(f"Bilinmeyen simülasyon türü: {kind}")
+    if kind == KIND_GENUINE:
+        real_bytes = announced_bytes
+    if not 0 < real_bytes <= announced_bytes or real_bytes % sector_size or announced_bytes % sector_size:
+        raise ValueError("Boyutlar sektör boyutunun katı olmalı ve gerçek boyut duyurulanı aşmamalı")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + MANIFEST_SUFFIX)
+    backing = os.path.join(directory, name + BACKING_SUFFIX)
+    with open(backing, "wb") as f:
+        f.truncate(real_bytes)  # Seyrek dosya: yazılmayan bölümler yer kaplamaz
+    manifest = {
+        "name": name, "kind": kind, "announced_bytes": announced_bytes, "real_bytes": real_bytes,
+        "sector_size": sector_size, "bus": bus, "serial": f"SIM{zlib.crc32(os.path.abspath(path).encode()):010d}",
+        "bandwidth": bandwidth, "cache_bytes": cache_bytes, "cliff_bandwidth": cliff_bandwidth,
+        "cached_sectors": cached_sectors, "backing": os.path.basename(backing),
+    }
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def create_fleet(directory, count, kinds=KINDS, announced_bytes=16 * 1024**3, real_bytes=1024**3,
+                 bus_count=DEFAULT_BUS_COUNT, bandwidth=0, cache_bytes=0, cliff_bandwidth=0, cached_sectors=0):
+    """count adet sürücü oluşturur; türler ve sanal kök hub'lar sırayla dağıtılır."""
+    return [create_drive(directory, f"sim{number:03d}", kinds[number % len(kinds)], announced_bytes, real_bytes,
+                         bus=f"sim{number % bus_count + 1}", bandwidth=bandwidth, cache_bytes=cache_bytes,
+                         cliff_bandwidth=cliff_bandwidth, cached_sectors=cached_sectors)
+            for number in range(count)]
+
+
+def remove_drive(path):
+    manifest = load_manifest(path)
+    for file_path in (os.path.join(os.path.dirname(path), manifest["backing"]), path):
+        if os.path.exists(file_path):
+            os.unlink(file_path)
+
+
+def list_drives(directory):
+    """Dizindeki simüle sürücülerin yollarını ada göre sıralı döndürür."""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in names if name.endswith(MANIFEST_SUFFIX)]
+
+
+def drive_metadata(path):
+    """Simüle sürücüyü index.read_disk_metadata ile aynı biçimde tanımlar."""
+    manifest = load_manifest(path)
+    size_bytes = manifest["announced_bytes"]
+    return {
+        "path": path,
+        "name": manifest["name"],
+        "size_bytes": size_bytes,
+        "size": bytes_to_human_readable(size_bytes),
+        "removable": True,
+        "vendor": "Simulator",
+        "model": manifest["kind"],
+        "serial": manifest["serial"],
+        "brand_model": f"Simulator {manifest['kind']}",
+        "logical_block_size": manifest["sector_size"],
+        "physical_block_size": manifest["sector_size"],
+        "usb": {"bus": manifest["bus"], "busnum": None, "devnum": None, "vendor_id": "sim",
+                "product_id": manifest["kind"], "manufacturer": "Simulator", "product": manifest["kind"],
+                "serial": manifest["serial"], "speed_mbps": None, "version": None},
+        "identity": make_identity(manifest["serial"], "sim", manifest["kind"], size_bytes),
+        "simulated": True,
+    }
+
+
+class SimulatedDevice:
+    """
+    BlockDevice arayüzüyle simüle sürücü: duyurulan boyutu gösterir, gerçek kapasitenin
+    ötesindeki erişimleri türüne göre kaybeder (limbo) veya başa sarar (wraparound).
+    """
+
+    def __init__(self, path, writable=True):
+        self.path = path
+        self.manifest = load_manifest(path)
+        self.kind = self.manifest["kind"]
+        self.real_bytes = self.manifest["real_bytes"]
+        self.bandwidth = self.manifest.get("bandwidth", 0)
+        self.cache_bytes = self.manifest.get("cache_bytes", 0)
+        self.cliff_bandwidth = self.manifest.get("cliff_bandwidth", 0)
+        self._written = 0  # Bu açılışta yazılan bayt (SLC önbelleği tükenmesi için)
+        self.cached_sectors = self.manifest.get("cached_sectors", 0)
+        self._cache = collections.OrderedDict()  # Sektör -> denetleyici önbelleğindeki veri (eskiden yeniye)
+        backing = os.path.join(os.path.dirname(path), self.manifest["backing"])
+        self.fd = os.open(backing, (os.O_RDWR if writable else os.O_RDONLY) | getattr(os, "O_CLOEXEC", 0))
+        self.direct = False
+        self.is_block_device = False
+        self.logical_block_size = self.manifest["sector_size"]
+        self.physical_block_size = self.logical_block_size
+        self.size = self.manifest["announced_bytes"]
+
+    @property
+    def sector_count(self):
+        return self.size // self.logical_block_size
+
+    def _runs(self, offset, length):
+        """[offset, offset+length) aralığını (göreli başlangıç, uzunluk, yedek dosyadaki konum|None) parçalarına böler."""
+        position = 0
+        while position < length:
+            address = offset + position
+            if address < self.real_bytes:
+                run = min(length - position, self.real_bytes - address)
+                yield position, run, address
+            elif self.kind == KIND_WRAPAROUND:
+                physical = address % self.real_bytes
+                run = min(length - position, self.real_bytes - physical)
+                yield position, run, physical
+            else:
+                yield position, length - position, None
+                return
+            position += run
+
+    def _throttle(self, length):
+        if self.bandwidth:
+            time.sleep(length / self.bandwidth)
+
+    def read_into(self, buffer, offset):
+        view = memoryview(buffer).cast("B")
+        length = min(len(view), max(self.size - offset, 0))
+        for start, run, physical in self._runs(offset, length):
+            if physical is None:
+                view[start:start + run] = bytes(run)  # Limbo bölgesi sıfır okunur
+            else:
+                os.preadv(self.fd, [view[start:start + run]], physical)
+        if self._cache:
+            sector_size = self.logical_block_size
+            for sector, data in self._cache.items():
+                position = sector * sector_size - offset
+                if 0 <= position and position + sector_size <= length:
+                    view[position:position + sector_size] = data
+        self._throttle(length)
+        return length
+
+    def write(self, buffer, offset):
+        view = memoryview(buffer).cast("B")
+        length = min(len(view), max(self.size - offset, 0))
+        for start, run, physical in self._runs(offset, length):
+            if physical is not None:  # Limbo bölgesine yazılanlar kaybolur
+                os.pwritev(self.fd, [view[start:start + run]], physical)
+        if self.cached_sectors:
+            self._remember(view, offset, length)
+        self._throttle(length)
+        self._written += length
+        if self.cache_bytes and self._written > self.cache_bytes:
+            time.sleep(min(length, self._written - self.cache_bytes) / self.cliff_bandwidth)
+        return length
+
+    def _remember(self, view, offset, length):
+        """Yazılan sektörlerin sonuncularını denetleyici önbelleğine alır; en eskiler önbellekten çıkar."""
+        sector_size = self.logical_block_size
+        first, end = offset // sector_size, (offset + length) // sector_size
+        for sector in range(max(first, end - self.cached_sectors), end):
+            position = sector * sector_size - offset
+            self._cache.pop(sector, None)
+            self._cache[sector] = bytes(view[position:position + sector_size])
+        while len(self._cache) > self.cached_sectors:
+            self._cache.popitem(last=False)
+
+    def reset(self):
+        """USB sıfırlamasının karşılığı: denetleyici önbelleği boşalır."""
+        self._cache.clear()
+
+    def flush(self):
+        os.fsync(self.fd)
+
+    def drop_caches(self):
+        self.flush()
+        os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.simulator",
+                                     description="Dosya tabanlı sahte USB bellek simülatörü.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Simüle sürücüler oluşturur.")
+    create.add_argument("--dir", required=True, help="Sürücülerin oluşturulacağı dizin.")
+    create.add_argument("--count", type=int, default=1)
+    create.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS),
+                        help="Sırayla dağıtılacak türler.")
+    create.add_argument("--announced", default="16G", help="Duyurulan boyut (ör. 16G).")
+    create.add_argument("--real", default="1G", help="Gerçek boyut (ör. 1G).")
+    create.add_argument("--buses", type=int, default=DEFAULT_BUS_COUNT, help="Sanal kök hub sayısı.")
+    create.add_argument("--bandwidth", default="0", help="Saniyedeki G/Ç sınırı (ör. 20M); 0 sınırsız.")
+    create.add_argument("--cache", default="0", help="SLC önbellek boyutu (ör. 2G); 0 önbelleksiz.")
+    create.add_argument("--cliff-bandwidth", default="0", help="Önbellek dolduktan sonraki yazma hızı (ör. 4M).")
+    create.add_argument("--cached-sectors", type=int, default=0,
+                        help="Denetleyicinin önbellekte tuttuğu son yazılan sektör sayısı; 0 önbelleksiz.")
+    remove = commands.add_parser("remove", help="Dizindeki tüm simüle sürücüleri siler.")
+    remove.add_argument("--dir", required=True)
+    commands.add_parser("list", help="FAKE_USB_TESTER_SIMULATOR dizinindeki sürücüleri listeler.")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        paths = create_fleet(args.dir, args.count, tuple(args.kinds), parse_size(args.announced),
+                             parse_size(args.real), args.buses, parse_size(args.bandwidth),
+                             parse_size(args.cache), parse_size(args.cliff_bandwidth), args.cached_sectors)
+        for path in paths:
+            print(path)
+        print(f"export {SIMULATOR_DIR_ENV}={os.path.abspath(args.dir)}", file=sys.stderr)
+    elif args.command == "remove":
+        for path in list_drives(args.dir):
+            remove_drive(path)
+    else:
+        for path in list_drives(simulator_dir() or "."):
+            metadata = drive_metadata(path)
+            print(f"{path}\t{metadata['size']}\t{metadata['model']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Sürücü hız ölçümü: sıralı okuma/yazma hızı ve 4K rastgele okuma/yazma IOPS'u.
+
+Rastgele testlerde kuyruk derinliği, aynı dosya tanıtıcısı üzerinde eşzamanlı pread/pwrite
+yapan iş parçacığı sayısıyla sağlanır (fio'nun psync + numjobs yaklaşımı). Her işlemin
+gecikmesi mikrosaniye olarak sabit boyutlu histogramlara yazılır.
+Yazma testleri diskin başındaki bölgenin içeriğini siler (yıkıcı).
+"""
+
+import os
+import random
+import threading
+import time
+
+from .blockdev import open_device, aligned_buffer
+from .devices import bytes_to_human_readable, mounted_partitions
+from .engine import DeviceBusyError, PROGRESS_INTERVAL
+from .histogram import LatencyHistogram
+from .result import ProbeResult, VERDICT_UNKNOWN, PERFORMANCE_OK, PERFORMANCE_SLOW
+
+DEFAULT_SEQUENTIAL_BYTES = 256 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+RANDOM_BLOCK_SIZE = 4096
+DEFAULT_RANDOM_SPAN = 1024 * 1024 * 1024  # Rastgele erişimlerin dağıldığı baştaki bölge
+DEFAULT_QUEUE_DEPTHS = (1, 4, 32)
+MAX_QUEUE_DEPTH = 256
+DEFAULT_RANDOM_SECONDS = 2.0  # Her (işlem, kuyruk derinliği) ölçümünün süresi
+
+PHASE_SEQ_WRITE = "seq_write"
+PHASE_SEQ_READ = "seq_read"
+PHASE_RAND_READ = "rand_read"
+PHASE_RAND_WRITE = "rand_write"
+
+MB = 1000 * 1000  # Etiketlerdeki MB/s ondalık megabayttır
+
+
+def _sequential(device, operation, total_bytes, chunk_size, on_progress, cancel=None):
+    """Baştan total_bytes kadar sıralı G/Ç yapar; hız (bayt/s) ve parça gecikme histogramını döndürür."""
+    buffer = aligned_buffer(chunk_size)
+    if operation == PHASE_SEQ_WRITE:
+        buffer[:] = os.urandom(chunk_size)  # Sıkıştırılamayan veri
+    histogram = LatencyHistogram()
+    io = device.write if operation == PHASE_SEQ_WRITE else device.read_into
+    start = time.perf_counter()
+    last_report = start
+    done = 0
+    while done < total_bytes:
+        if cancel is not None:
+            cancel.check()
+        length = min(chunk_size, total_bytes - done)
+        view = memoryview(buffer)[:length]
+        op_start = time.perf_counter_ns()
+        try:
+            io(view, done)
+        finally:
+            view.release()
+        histogram.record((time.perf_counter_ns() - op_start) // 1000)
+        done += length
+        now = time.perf_counter()
+        if on_progress and (now - last_report >= PROGRESS_INTERVAL or done >= total_bytes):
+            last_report = now
+            on_progress(operation, done, total_bytes, done / (now - start))
+    if operation == PHASE_SEQ_WRITE:
+        device.flush()  # Önbellekte bekleyen veri de süreye dahil
+    elapsed = time.perf_counter() - start
+    return total_bytes / elapsed if elapsed > 0 else 0.0, histogram
+
+
+def _random(device, operation, queue_depth, span, seconds, on_progress, cancel=None):
+    """queue_depth iş parçacığıyla seconds boyunca 4K rastgele G/Ç yapar; (IOPS, histogram) döndürür."""
+    blocks = max(span // RANDOM_BLOCK_SIZE, 1)
+    histograms = [LatencyHistogram() for _ in range(queue_depth)]
+    deadline = time.perf_counter() + seconds
+    errors = []
+
+    def stopped():
+        return errors or (cancel is not None and cancel.cancelled)
+
+    def worker(histogram, seed):
+        generator = random.Random(seed)
+        buffer = aligned_buffer(RANDOM_BLOCK_SIZE)
+        if operation == PHASE_RAND_WRITE:
+            buffer[:] = os.urandom(RANDOM_BLOCK_SIZE)
+        io = device.write if operation == PHASE_RAND_WRITE else device.read_into
+        try:
+            while time.perf_counter() < deadline and not stopped():
+                offset = generator.randrange(blocks) * RANDOM_BLOCK_SIZE
+                op_start = time.perf_counter_ns()
+                io(buffer, offset)
+                histogram.record((time.perf_counter_ns() - op_start) // 1000)
+        except OSError as e:
+            errors.append(e)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(histogram, index), name=f"speed-{operation}-{index}",
+                                daemon=True)
+               for index, histogram in enumerate(histograms)]
+    for thread in threads:
+        thread.start()
+    while time.perf_counter() < deadline and not stopped():
+        threads[0].join(min(PROGRESS_INTERVAL, max(deadline - time.perf_counter(), 0)))
+        if on_progress:
+            # Rastgele aşamalar bayt değil süre bildirir (hız 0 = yüzde olarak gösterilir)
+            elapsed_ms = int(min(time.perf_counter() - start, seconds) * 1000)
+            on_progress(operation, elapsed_ms, int(seconds * 1000), 0.0)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    if cancel is not None:
+        cancel.check()
+    if operation == PHASE_RAND_WRITE:
+        device.flush()
+    elapsed = time.perf_counter() - start
+
+    merged = LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return merged.count / elapsed if elapsed > 0 else 0.0, merged
+
+
+def measure_speed(device, sequential_bytes=DEFAULT_SEQUENTIAL_BYTES, chunk_size=DEFAULT_CHUNK_SIZE,
+                  queue_depths=DEFAULT_QUEUE_DEPTHS, random_seconds=DEFAULT_RANDOM_SECONDS,
+                  random_span=DEFAULT_RANDOM_SPAN, on_progress=None, cancel=None):
+    """Açık bir aygıtta hız ölçümlerini yapar ve sonuç sözlüğünü döndürür."""
+    queue_depths = [int(depth) for depth in queue_depths]
+    if not all(1 <= depth <= MAX_QUEUE_DEPTH for depth in queue_depths):
+        raise ValueError(f"Kuyruk derinliği 1-{MAX_QUEUE_DEPTH} aralığında olmalı")
+    sector_size = device.logical_block_size
+    chunk_size -= chunk_size % sector_size
+    sequential_bytes = min(sequential_bytes, device.size)
+    sequential_bytes -= sequential_bytes % sector_size
+    random_span = min(random_span, device.size)
+
+    write_rate, write_histogram = _sequential(device, PHASE_SEQ_WRITE, sequential_bytes, chunk_size, on_progress,
+                                              cancel)
+    device.drop_caches()
+    read_rate, read_histogram = _sequential(device, PHASE_SEQ_READ, sequential_bytes, chunk_size, on_progress,
+                                            cancel)
+
+    random_results = []
+    for queue_depth in queue_depths:
+        for operation in (PHASE_RAND_READ, PHASE_RAND_WRITE):
+            device.drop_caches()
+            iops, histogram = _random(device, operation, queue_depth, random_span, random_seconds, on_progress,
+                                      cancel)
+            random_results.append({"operation": operation, "queue_depth": queue_depth, "iops": iops,
+                                   "bytes_per_sec": iops * RANDOM_BLOCK_SIZE, "latency": histogram.to_dict()})
+
+    return {
+        "sequential_bytes": sequential_bytes,
+        "chunk_size": chunk_size,
+        "seq_write_bytes_per_sec": write_rate,
+        "seq_read_bytes_per_sec": read_rate,
+        "seq_write_latency": write_histogram.to_dict(),
+        "seq_read_latency": read_histogram.to_dict(),
+        "random_block_size": RANDOM_BLOCK_SIZE,
+        "random": random_results,
+        "direct_io": device.direct,
+    }
+
+
+def speed_verdict(speed, min_write_mbps=None, min_read_mbps=None):
+    """Verilen alt sınırlardan biri tutmuyorsa PERFORMANCE_SLOW, aksi halde PERFORMANCE_OK."""
+    if min_write_mbps and speed["seq_write_bytes_per_sec"] < min_write_mbps * MB:
+        return PERFORMANCE_SLOW
+    if min_read_mbps and speed["seq_read_bytes_per_sec"] < min_read_mbps * MB:
+        return PERFORMANCE_SLOW
+    return PERFORMANCE_OK
+
+
+def random_iops(speed, operation, queue_depth):
+    """Sonuçtan belirli bir rastgele ölçümün IOPS'unu döndürür; yoksa None."""
+    for entry in speed.get("random", []):
+        if entry["operation"] == operation and entry["queue_depth"] == queue_depth:
+            return entry["iops"]
+    return None
+
+
+def speed_summary(speed):
+    """Tek satırlık özet: "W 12.3 MB/s, R 30.1 MB/s, 4K QD1 R 1200 / W 300 IOPS"."""
+    text = (f"W {speed['seq_write_bytes_per_sec'] / MB:.1f} MB/s, "
+            f"R {speed['seq_read_bytes_per_sec'] / MB:.1f} MB/s")
+    depths = sorted({entry["queue_depth"] for entry in speed.get("random", [])})
+    for queue_depth in depths:
+        read_iops = random_iops(speed, PHASE_RAND_READ, queue_depth)
+        write_iops = random_iops(speed, PHASE_RAND_WRITE, queue_depth)
+        text += f", 4K QD{queue_depth} R {read_iops:.0f} / W {write_iops:.0f} IOPS"
+    return text
+
+
+def speed_test(disk_path, sequential_bytes=DEFAULT_SEQUENTIAL_BYTES, queue_depths=DEFAULT_QUEUE_DEPTHS,
+               random_seconds=DEFAULT_RANDOM_SECONDS, min_write_mbps=None, min_read_mbps=None, on_progress=None,
+               cancel=None):
+    """
+    Diskin hızını ölçer ve ProbeResult döndürür; kapasite kararı verilmez (unknown),
+    hız kararı performance_verdict alanındadır, ölçümler details["speed"] içindedir.
+    Bağlı bölümü olan disklerde DeviceBusyError, yetki yoksa PermissionError, iptalde TestCancelled yükseltir.
+    """
+    mounts = mounted_partitions(disk_path)
+    if mounts:
+        raise DeviceBusyError(", ".join(mounts))
+
+    start_time = time.monotonic()
+    with open_device(disk_path, writable=True) as device:
+        speed = measure_speed(device, sequential_bytes, queue_depths=queue_depths, random_seconds=random_seconds,
+                              on_progress=on_progress, cancel=cancel)
+        announced_bytes = device.size
+
+    result = ProbeResult(disk=disk_path, verdict=VERDICT_UNKNOWN, announced_bytes=announced_bytes,
+                         promised_capacity=bytes_to_human_readable(announced_bytes))
+    result.performance_verdict = speed_verdict(speed, min_write_mbps, min_read_mbps)
+    result.details["speed"] = speed
+    result.elapsed = time.monotonic() - start_time
+    return result
@@ -0,0 +1,762 @@
+"""
+Test istasyonu: kalıcı iş kuyruğu ve yerel HTTP iş API'si.
+
+İstasyon, arayüzdeki "Testi Başlat" düğmesi yerine HTTP üzerinden sürülür. İşler SQLite'ta
+saklanır; istasyon yeniden başlatıldığında bekleyen ve yarıda kalan işler yeniden kuyruğa
+alınır. Yarıda kalan yıkıcı işler ise kendiliğinden yeniden çalıştırılmaz, "interrupted" olarak
+kapanır; aynı disk için yeniden gönderilen tam yüzey testi kaldığı yerden devam eder.
+
+Yalnızca test edilebilir çıkarılabilir diskler (index.scan_removable_disks) iş olarak kabul
+edilir; yıkıcı test türleri isteğin "confirm_destructive": true içermesini gerektirir. İş
+kaydedilirken diskin kimliği (seri no, VID:PID, marka/model, boyut) da saklanır ve test
+başlamadan hemen önce yeniden karşılaştırılır: aynı /dev yoluna başka bir disk takıldıysa,
+disk çıkarıldıysa veya artık test edilebilir değilse iş ERROR_DEVICE_CHANGED ile biter.
+
+Uçlar (JSON; akış NDJSON):
+    GET  /drives                 Diskler ve üzerlerindeki bekleyen/çalışan iş
+    GET  /jobs[?state=queued]    İşler, en yeni önce
+    POST /jobs                   {"disk": ..., "mode": "quick", "options": {...}, "confirm_destructive": false}
+    GET  /jobs/<id>              İş (bittiyse "result" ile)
+    POST /jobs/<id>/cancel       Bekleyen iş hemen, çalışan iş aygıt geri yüklendikten sonra iptal olur
+    GET  /jobs/<id>/stream       İşin durumu ve ilerleme olayları, iş bitene kadar (events.py biçimi)
+    GET  /jobs/<id>/result       Sonuç (ProbeResult.to_dict); iş bitmediyse 409
+
+Varsayılan olarak yalnızca 127.0.0.1 dinlenir. Her istek belirteç taşımalıdır (Authorization:
+Bearer <belirteç>); --token verilmezse belirteç ~/.cache/fake-usb-tester/station.token dosyasında
+(yalnızca sahibi okuyabilir) üretilir ve aynı kullanıcının collect komutu onu oradan okur.
+POST gövdeleri Content-Type: application/json olmalıdır; yerel adreste dinlenirken Host başlığı
+da yerel olmalıdır (tarayıcıdaki bir sayfanın DNS yeniden bağlama ile istek göndermesine karşı).
+
+Örnek:
+    python3 -m fakeusb.station serve --port 9465
+    python3 -m fakeusb.station collect http://127.0.0.1:9465 --mode quick
+"""
+
+import argparse
+import hmac
+import http.server
+import ipaddress
+import json
+import os
+import queue
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from .cache import default_cache_dir
+from .cancel import CancelToken
+from .cli import unmount_and_test
+from .events import EventBus
+from .fingerprint import FingerprintDB, plan_test, RISK_UNKNOWN
+from .helper import PrivilegedHelper, helper_needed
+from .index import scan_removable_disks, disk_metadata
+from .modes import MODES, MODE_QUICK, DESTRUCTIVE_MODES
+from .result import (ProbeResult, VERDICT_ERROR, ERROR_CANCELLED, ERROR_DEVICE_CHANGED,
+                     ERROR_UNEXPECTED)
+from .scheduler import ProbeScheduler, DEFAULT_MAX_WORKERS, DEFAULT_PER_BUS_LIMIT, PRIORITY_NORMAL
+from .sustained import save_profile
+
+JOBS_FILE_NAME = "jobs.sqlite"
+TOKEN_FILE_NAME = "station.token"
+DEFAULT_API_PORT = 9465  # Metrik ucunun (9464) yanında
+DEFAULT_API_HOST = "127.0.0.1"
+TOKEN_ENVIRONMENT = "FAKE_USB_TESTER_API_TOKEN"
+STREAM_POLL_SECONDS = 1.0  # Akışta iş durumunun yeniden okunma aralığı (olay gelmese de)
+COLLECT_POLL_SECONDS = 2.0
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_CANCELLED = "cancelled"
+JOB_INTERRUPTED = "interrupted"  # Yıkıcı test istasyon dururken yarıda kaldı; yeniden çalıştırılmaz
+FINISHED_STATES = (JOB_DONE, JOB_CANCELLED, JOB_INTERRUPTED)
+
+# İşin hedeflediği diski tanımlayan meta veri alanları (index.read_disk_metadata)
+DRIVE_IDENTITY_KEYS = ("identity", "serial", "vendor", "model", "size_bytes")
+
+
+class JobError(Exception):
+    """İş kabul edilemedi ya da bulunamadı; status HTTP durum kodudur."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def drive_identity(metadata):
+    """Meta veriden işle birlikte saklanan disk kimliği sözlüğü (VID:PID dahil)."""
+    identity = {key: metadata.get(key) for key in DRIVE_IDENTITY_KEYS}
+    usb = metadata.get("usb") or {}
+    identity["vendor_id"], identity["product_id"] = usb.get("vendor_id"), usb.get("product_id")
+    return identity
+
+
+def interrupted_result(disk_path):
+    return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_CANCELLED,
+                       error_detail="İstasyon test sürerken durdu; yıkıcı iş yeniden çalıştırılmadı.")
+
+
+class JobQueue:
+    """
+    İşleri SQLite'ta saklar. Açılışta çalışır durumda kalmış işlerden yıkıcı olanlar
+    JOB_INTERRUPTED olarak kapatılır, diğerleri yeniden kuyruğa alınır.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(default_cache_dir(), JOBS_FILE_NAME)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    disk TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    options_json TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    planned_mode TEXT,
+                    drive_json TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result_json TEXT
+                )""")
+            columns = {row["name"] for row in self._connection.execute("PRAGMA table_info(jobs)")}
+            if "drive_json" not in columns:
+                # Disk kimliği olmayan eski işler çalıştırılmadan önce ERROR_DEVICE_CHANGED ile biter
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN drive_json TEXT")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, created_at)")
+            # Süreç test sürerken durdu: yıkıcı işler kapatılır, diğerleri yeniden çalıştırılır
+            interrupted = self._connection.execute(
+                f"SELECT id, disk FROM jobs WHERE state = ? AND mode IN ({', '.join('?' for _ in DESTRUCTIVE_MODES)})",
+                (JOB_RUNNING, *DESTRUCTIVE_MODES)).fetchall()
+            for row in interrupted:
+                self._connection.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ?, result_json = ? WHERE id = ?",
+                    (JOB_INTERRUPTED, time.time(), json.dumps(interrupted_result(row["disk"]).to_dict()), row["id"]))
+            self._connection.execute("UPDATE jobs SET state = ?, started_at = NULL WHERE state = ?",
+                                     (JOB_QUEUED, JOB_RUNNING))
+
+    def add(self, disk, mode, options, drive):
+        """drive: drive_identity() sözlüğü; test başlamadan önce diskle yeniden karşılaştırılır."""
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO jobs (id, disk, mode, options_json, state, drive_json, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, disk, mode, json.dumps(options or {}), JOB_QUEUED, json.dumps(drive), time.time()))
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """İşi sözlük olarak döndürür; yoksa None."""
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def list(self, state=None, limit=None):
+        query, parameters = "SELECT * FROM jobs", []
+        if state:
+            query += " WHERE state = ?"
+            parameters.append(state)
+        query += " ORDER BY created_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            parameters.append(int(limit))
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def pending(self):
+        """Bekleyen işler, geliş sırasıyla."""
+        return list(reversed(self.list(JOB_QUEUED)))
+
+    def active(self):
+        """Disk yolu -> bekleyen veya çalışan işin kimliği."""
+        with self._lock:
+            rows = self._connection.execute("SELECT disk, id FROM jobs WHERE state IN (?, ?)",
+                                            (JOB_QUEUED, JOB_RUNNING)).fetchall()
+        return {row["disk"]: row["id"] for row in rows}
+
+    def _update(self, job_id, only_from, **fields):
+        """İşi yalnızca durumu only_from içindeyse günceller; güncellendiyse True."""
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        placeholders = ", ".join("?" for _ in only_from)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND state IN ({placeholders})",
+                (*fields.values(), job_id, *only_from))
+        return cursor.rowcount > 0
+
+    def mark_running(self, job_id, planned_mode):
+        return self._update(job_id, (JOB_QUEUED,), state=JOB_RUNNING, planned_mode=planned_mode,
+                            started_at=time.time())
+
+    def finish(self, job_id, result, only_from=(JOB_RUNNING,), state=None):
+        if state is None:
+            state = JOB_CANCELLED if result.error == ERROR_CANCELLED else JOB_DONE
+        return self._update(job_id, only_from, state=state, finished_at=time.time(),
+                            result_json=json.dumps(result.to_dict()))
+
+    def requeue(self, job_id):
+        return self._update(job_id, (JOB_RUNNING,), state=JOB_QUEUED, started_at=None)
+
+    def interrupt(self, job_id, disk_path):
+        """Yarıda kalan yıkıcı işi yeniden kuyruğa almadan kapatır."""
+        return self.finish(job_id, interrupted_result(disk_path), state=JOB_INTERRUPTED)
+
+    def cancel_queued(self, job_id):
+        return self._update(job_id, (JOB_QUEUED,), state=JOB_CANCELLED, finished_at=time.time())
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _job_dict(row):
+    job = {key: row[key] for key in ("id", "disk", "mode", "planned_mode", "state", "created_at", "started_at",
+                                     "finished_at")}
+    job["options"] = json.loads(row["options_json"])
+    job["drive"] = json.loads(row["drive_json"]) if row["drive_json"] else None
+    job["result"] = json.loads(row["result_json"]) if row["result_json"] else None
+    return job
+
+
+class Station:
+    """
+    İş kuyruğundaki işleri zamanlayıcı üzerinden çalıştırır. Testler --watch kipindeki gibi
+    diskin bölümleri ayrıldıktan sonra başlar; parmak izi veritabanı verilirse iş önceliği ve
+    test türü cli'daki gibi plan_test ile belirlenir ve sonuç veritabanına eklenir.
+    """
+
+    def __init__(self, jobs, max_workers=DEFAULT_MAX_WORKERS, per_bus_limit=DEFAULT_PER_BUS_LIMIT, helper=None,
+                 fingerprints=None, event_bus=None, profile_dir=None):
+        self.jobs = jobs
+        self.scheduler = ProbeScheduler(max_workers, per_bus_limit)
+        self.helper = helper
+        self.fingerprints = fingerprints
+        self.event_bus = event_bus or EventBus()
+        self.profile_dir = profile_dir
+        self._lock = threading.Lock()
+        self._cancel_tokens = {}  # İş kimliği -> çalışan testin CancelToken'ı
+        self._stopping = False
+
+    def start(self):
+        """Önceki çalıştırmadan kalan işleri, diskleri hâlâ aynıysa kuyruğa alır."""
+        for job in self.jobs.pending():
+            self._schedule(job)
+
+    def drives(self):
+        active = self.jobs.active()
+        return [dict(disk, job=active.get(disk["path"])) for disk in scan_removable_disks()]
+
+    @staticmethod
+    def _testable_metadata(disk_path):
+        return next((disk for disk in scan_removable_disks() if disk["path"] == disk_path), None)
+
+    def _check_drive(self, job):
+        """
+        İşin diskinin güncel meta verisini döndürür. Disk yoksa, test edilebilir değilse veya
+        kimliği iş kaydedildiğindekinden farklıysa ERROR_DEVICE_CHANGED sonucu (ProbeResult) döndürür.
+        """
+        disk_path = job["disk"]
+        metadata = self._testable_metadata(disk_path)
+        if metadata is None:
+            detail = ("Disk çıkarılmış." if disk_metadata(disk_path) is None
+                      else "Disk artık test edilebilir değil.")
+        elif job["drive"] is None:
+            detail = "İşle birlikte disk kimliği kaydedilmemiş."
+        elif drive_identity(metadata) != job["drive"]:
+            detail = f"{disk_path} yolunda artık başka bir disk var."
+        else:
+            return metadata
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_DEVICE_CHANGED, error_detail=detail)
+
+    def submit(self, disk_path, mode, options=None, confirm_destructive=False):
+        """İşi doğrulayıp kaydeder ve kuyruğa alır; kabul edilmezse JobError yükseltir."""
+        if mode not in MODES:
+            raise JobError(f"Bilinmeyen test türü: {mode}")
+        if mode in DESTRUCTIVE_MODES and not confirm_destructive:
+            raise JobError(f"'{mode}' test türü diskteki verileri siler; confirm_destructive gerekli.")
+        if options is not None and not isinstance(options, dict):
+            raise JobError("options bir JSON nesnesi olmalı.")
+        metadata = self._testable_metadata(disk_path)
+        if metadata is None:
+            raise JobError(f"Test edilebilir çıkarılabilir disk değil: {disk_path}", 404)
+        with self._lock:
+            if disk_path in self.jobs.active():
+                raise JobError(f"Disk için bekleyen veya çalışan bir iş var: {disk_path}", 409)
+            job = self.jobs.add(disk_path, mode, options, drive_identity(metadata))
+        self._schedule(job, metadata)
+        return job
+
+    def cancel(self, job_id):
+        """İşi iptal eder ve güncel halini döndürür."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise JobError(f"İş bulunamadı: {job_id}", 404)
+        if not self.jobs.cancel_queued(job_id):
+            with self._lock:
+                token = self._cancel_tokens.get(job_id)
+            if token is not None:
+                token.cancel()  # Sonuç (ERROR_CANCELLED) test aygıtı geri yükleyince yazılır
+        return self.jobs.get(job_id)
+
+    def stop(self):
+        """
+        Çalışan testleri durdurur. Yıkıcı olmayanlar sonraki açılışta yeniden çalıştırılmak üzere
+        kuyrukta kalır, yıkıcı olanlar JOB_INTERRUPTED ile kapanır.
+        """
+        with self._lock:
+            self._stopping = True
+            tokens = list(self._cancel_tokens.values())
+        for token in tokens:
+            token.cancel()
+        self.scheduler.shutdown(wait=True)
+
+    def _schedule(self, job, metadata=None):
+        if metadata is None:
+            metadata = self._check_drive(job)
+            if isinstance(metadata, ProbeResult):
+                self._finish_unstarted(job, metadata)
+                return
+        mode, priority = job["mode"], PRIORITY_NORMAL
+        risk = None
+        if self.fingerprints is not None:
+            risk = self.fingerprints.assess(metadata)
+            mode, priority = plan_test(risk, mode)
+        self.scheduler.submit(job["disk"], lambda: self._run(job, mode, risk), priority)
+
+    def _finish_unstarted(self, job, result):
+        if self.jobs.finish(job["id"], result, only_from=(JOB_QUEUED,)):
+            self.event_bus.result(result)
+
+    def _run(self, job, mode, risk):
+        job_id, disk_path = job["id"], job["disk"]
+        # Kuyrukta beklerken disk değişmiş olabilir; yıkıcı testten hemen önce yeniden denetlenir
+        metadata = self._check_drive(job)
+        if isinstance(metadata, ProbeResult):
+            self._finish_unstarted(job, metadata)
+            return
+        token = CancelToken()
+        with self._lock:
+            if self._stopping or not self.jobs.mark_running(job_id, mode):
+                return  # Kuyrukta beklerken iptal edildi
+            self._cancel_tokens[job_id] = token
+        try:
+            result = self._test(disk_path, mode, job["options"], token)
+            if risk is not None and risk.level != RISK_UNKNOWN:
+                result.details["risk"] = risk.to_dict()
+            if self.fingerprints is not None:
+                self.fingerprints.record(metadata, result)
+        except Exception as e:  # İş çalışır durumda takılı kalmasın
+            result = ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED, error_detail=str(e))
+        finally:
+            with self._lock:
+                self._cancel_tokens.pop(job_id, None)
+                stopping = self._stopping
+        if stopping and result.error == ERROR_CANCELLED:
+            if job["mode"] in DESTRUCTIVE_MODES:
+                self.jobs.interrupt(job_id, disk_path)
+            else:
+                self.jobs.requeue(job_id)
+        else:
+            self.jobs.finish(job_id, result)
+        self.event_bus.result(result)
+
+    def _test(self, disk_path, mode, options, cancel):
+        self.event_bus.started(disk_path, mode)
+        result = unmount_and_test(disk_path, mode, self.helper,
+                                  on_progress=self.event_bus.progress_callback(disk_path), options=options,
+                                  cancel=cancel)
+        if "write_profile" in result.details:
+            try:
+                result.details["profile_path"] = save_profile(result, self.profile_dir)
+            except OSError as e:
+                sys.stderr.write(f"[{disk_path}] Yazma profili kaydedilemedi: {e}\n")
+        return result
+
+
+def default_token_path():
+    return os.path.join(default_cache_dir(), TOKEN_FILE_NAME)
+
+
+def read_token(path=None):
+    """Kayıtlı istasyon belirtecini döndürür; yoksa None."""
+    try:
+        with open(path or default_token_path()) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def load_or_create_token(path=None):
+    """Kayıtlı belirteci döndürür; yoksa üretip yalnızca sahibinin okuyabileceği dosyaya yazar."""
+    path = path or default_token_path()
+    token = read_token(path)
+    if token:
+        return token
+    token = secrets.token_urlsafe(32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+class _StationHandler(http.server.BaseHTTPRequestHandler):
+    station = None
+    token = None
+    loopback_only = False  # Sunucu yerel adreste dinliyorsa Host başlığı da yerel olmalı
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        if self.loopback_only and not _is_loopback(_host_name(self.headers.get("Host", ""))):
+            self._send_json(403, {"error": "Host başlığı yerel bir adres değil."})
+            return
+        if not self._authorized():
+            self._send_json(401, {"error": "Yetkisiz istek."})
+            return
+        # Tarayıcı formları bu türü ön uçuş (preflight) isteği olmadan gönderemez
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if method == "POST" and content_type != "application/json":
+            self._send_json(415, {"error": "POST istekleri Content-Type: application/json olmalı."})
+            return
+        url = urllib.parse.urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            if method == "GET" and parts == ["drives"]:
+                self._send_json(200, {"drives": self.station.drives()})
+            elif method == "GET" and parts == ["jobs"]:
+                state = query.get("state", [None])[0]
+                self._send_json(200, {"jobs": self.station.jobs.list(state, query.get("limit", [None])[0])})
+            elif method == "POST" and parts == ["jobs"]:
+                body = self._read_json()
+                job = self.station.submit(body.get("disk"), body.get("mode", MODE_QUICK), body.get("options"),
+                                          bool(body.get("confirm_destructive")))
+                self._send_json(201, {"job": job})
+            elif len(parts) >= 2 and parts[0] == "jobs":
+                self._job_request(method, parts[1], parts[2:])
+            else:
+                self._send_json(404, {"error": "Bilinmeyen uç."})
+        except JobError as e:
+            self._send_json(e.status, {"error": str(e)})
+
+    def _job_request(self, method, job_id, rest):
+        if method == "POST" and rest == ["cancel"]:
+            self._send_json(200, {"job": self.station.cancel(job_id)})
+            return
+        if method != "GET" or rest not in ([], ["result"], ["stream"]):
+            self._send_json(404, {"error": "Bilinmeyen uç."})
+            return
+        job = self.station.jobs.get(job_id)
+        if job is None:
+            raise JobError(f"İş bulunamadı: {job_id}", 404)
+        if rest == ["stream"]:
+            self._stream(job)
+        elif rest == ["result"]:
+            if job["state"] not in FINISHED_STATES:
+                raise JobError(f"İş henüz bitmedi ({job['state']}).", 409)
+            self._send_json(200, job["result"])
+        else:
+            self._send_json(200, {"job": job})
+
+    def _stream(self, job):
+        """İş bitene kadar iş durumunu ve diskin olaylarını satır satır yazar."""
+        events = queue.Queue()
+
+        def on_event(event):
+            if event.get("disk") == job["disk"]:
+                events.put(event)
+
+        self.station.event_bus.subscribe(on_event)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self._write_line({"type": "job", "job": job})
+            state = job["state"]
+            while state not in FINISHED_STATES:
+                try:
+                    self._write_line(events.get(timeout=STREAM_POLL_SECONDS))
+                except queue.Empty:
+                    pass
+                job = self.station.jobs.get(job["id"])
+                if job["state"] != state:
+                    state = job["state"]
+                    self._write_line({"type": "job", "job": job})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Abone bağlantıyı kapattı
+        finally:
+            self.station.event_bus.unsubscribe(on_event)
+        self.close_connection = True
+
+    def _authorized(self):
+        header = self.headers.get("Authorization", "")
+        return hmac.compare_digest(header.encode(), f"Bearer {self.token}".encode())
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise JobError("İstek gövdesi geçerli JSON değil.")
+        if not isinstance(body, dict):
+            raise JobError("İstek gövdesi bir JSON nesnesi olmalı.")
+        return body
+
+    def _write_line(self, event):
+        self.wfile.write(json.dumps(event).encode() + b"\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Her istek terminale yazılmaz
+
+
+def _is_loopback(host):
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+def _host_name(header):
+    """Host başlığından port ve IPv6 köşeli parantezleri olmadan adı döndürür."""
+    if header.startswith("["):
+        return header[1:].split("]", 1)[0]
+    return header.rsplit(":", 1)[0] if header.count(":") == 1 else header
+
+
+class StationServer:
+    """
+    Station'ı http://host:port adresinde sunar (arka plan thread'i). token verilmezse
+    load_or_create_token ile kayıtlı belirteç kullanılır; her istek belirteç taşımalıdır.
+    """
+
+    def __init__(self, station, port=DEFAULT_API_PORT, host=DEFAULT_API_HOST, token=None):
+        self.token = token or load_or_create_token()
+        handler = type("StationHandler", (_StationHandler,),
+                       {"station": station, "token": self.token, "loopback_only": _is_loopback(host)})
+        self.server = http.server.ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="station-http", daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StationError(Exception):
+    """İstasyon isteği başarısız oldu; status HTTP durum kodudur (bağlantı hatalarında None)."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class StationClient:
+    """Bir istasyonun iş API'si için küçük istemci (merkezi denetleyici ve betikler için)."""
+
+    def __init__(self, base_url, token=None, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _open(self, method, path, payload=None, timeout=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        if data is not None:
+            request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            return urllib.request.urlopen(request, timeout=timeout or self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise StationError(f"{self.base_url}: {message}", e.code)
+        except OSError as e:
+            raise StationError(f"{self.base_url}: {e}")
+
+    def _request(self, method, path, payload=None):
+        with self._open(method, path, payload) as response:
+            return json.loads(response.read())
+
+    def drives(self):
+        return self._request("GET", "/drives")["drives"]
+
+    def jobs(self, state=None):
+        return self._request("GET", "/jobs" + (f"?state={state}" if state else ""))["jobs"]
+
+    def submit(self, disk, mode=MODE_QUICK, options=None, confirm_destructive=False):
+        return self._request("POST", "/jobs", {"disk": disk, "mode": mode, "options": options or {},
+                                               "confirm_destructive": confirm_destructive})["job"]
+
+    def job(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")["job"]
+
+    def cancel(self, job_id):
+        return self._request("POST", f"/jobs/{job_id}/cancel", {})["job"]
+
+    def result(self, job_id):
+        """İşin sonucunu ProbeResult olarak döndürür; iş bitmediyse StationError (409)."""
+        return ProbeResult.from_dict(self._request("GET", f"/jobs/{job_id}/result"))
+
+    def stream(self, job_id):
+        """İşin olaylarını iş bitene kadar sözlük olarak üretir."""
+        with self._open("GET", f"/jobs/{job_id}/stream", timeout=None) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def collect(clients, mode=MODE_QUICK, options=None, confirm_destructive=False, poll_seconds=COLLECT_POLL_SECONDS,
+            on_job=None):
+    """
+    Merkezi denetleyici: her istasyonun boştaki tüm disklerine iş gönderir, hepsi bitene kadar
+    bekler ve (istasyon adresi, iş) listesi döndürür. Ulaşılamayan istasyonlar atlanıp stderr'e
+    yazılır. on_job(istasyon adresi, iş) her iş bittiğinde çağrılır.
+    """
+    submitted = []
+    for client in clients:
+        try:
+            for drive in client.drives():
+                if drive["job"] is None:
+                    submitted.append((client, client.submit(drive["path"], mode, options, confirm_destructive)))
+        except StationError as e:
+            sys.stderr.write(f"İstasyon atlandı: {e}\n")
+
+    finished = {}
+    while len(finished) < len(submitted):
+        for client, job in submitted:
+            if job["id"] in finished:
+                continue
+            try:
+                current = client.job(job["id"])
+            except StationError as e:
+                sys.stderr.write(f"İş durumu okunamadı: {e}\n")
+                continue
+            if current["state"] in FINISHED_STATES:
+                finished[job["id"]] = (client.base_url, current)
+                if on_job:
+                    on_job(client.base_url, current)
+        if len(finished) < len(submitted):
+            time.sleep(poll_seconds)
+    return [finished[job["id"]] for _, job in submitted]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.station",
+                                     description="Test istasyonunu HTTP iş API'si ile çalıştırır veya istasyonlardan "
+                                                 "sonuç toplar.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="İş API'sini sunar (Ctrl+C ile çıkılır; bekleyen işler saklanır).")
+    serve.add_argument("--host", default=DEFAULT_API_HOST, help="Dinlenecek adres (varsayılan %(default)s).")
+    serve.add_argument("--port", type=int, default=DEFAULT_API_PORT, help="Port (varsayılan %(default)s).")
+    serve.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT),
+                       help=f"İsteklerde beklenen Bearer belirteci (varsayılan ${TOKEN_ENVIRONMENT}; o da yoksa "
+                            f"~/.cache/fake-usb-tester/{TOKEN_FILE_NAME} dosyasındaki ya da yeni üretilen belirteç).")
+    serve.add_argument("--jobs-db", default=None, help="İş kuyruğu dosyası (varsayılan ~/.cache/fake-usb-tester).")
+    serve.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                       help="Aynı anda çalışacak en fazla test sayısı.")
+    serve.add_argument("--per-bus-limit", type=int, default=DEFAULT_PER_BUS_LIMIT,
+                       help="Aynı kök hub üzerinde aynı anda çalışacak en fazla test sayısı.")
+    serve.add_argument("--no-helper", action="store_true", help="Root yardımcısını kullanmaz.")
+    serve.add_argument("--no-fingerprints", action="store_true", help="Parmak izi veritabanını kullanmaz.")
+    gather = commands.add_parser("collect", help="İstasyonların boştaki disklerini test ettirip sonuçları toplar.")
+    gather.add_argument("stations", nargs="+", metavar="URL")
+    gather.add_argument("--mode", choices=MODES, default=MODE_QUICK)
+    gather.add_argument("--yes", action="store_true", help="Yıkıcı test türlerinde onay sormadan devam eder.")
+    gather.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT),
+                        help=f"İstasyonlara gönderilecek Bearer belirteci (varsayılan ${TOKEN_ENVIRONMENT}; o da yoksa "
+                             f"~/.cache/fake-usb-tester/{TOKEN_FILE_NAME}).")
+    gather.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdırır.")
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        return _collect(args)
+
+    helper = PrivilegedHelper() if helper_needed() and not args.no_helper else None
+    fingerprints = None if args.no_fingerprints else FingerprintDB()
+    station = Station(JobQueue(args.jobs_db), args.max_workers, args.per_bus_limit, helper, fingerprints)
+    try:
+        server = StationServer(station, args.port, args.host, args.token)
+    except OSError as e:
+        sys.stderr.write(f"İş API'si açılamadı: {e}\n")
+        return 2
+    station.start()
+    server.start()
+    sys.stderr.write(f"İş API'si: http://{args.host}:{server.port}/jobs\n")
+    if not args.token:
+        sys.stderr.write(f"Belirteç: {default_token_path()}\n")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sys.stderr.write("Çalışan testler durduruluyor; aygıtlar geri yükleniyor...\n")
+    finally:
+        server.stop()
+        station.stop()
+    return 0
+
+
+def _collect(args):
+    from .cli import exit_code_for, EXIT_USAGE  # cli bu modülü içe aktarmaz; döngü oluşmaz
+
+    if args.mode in DESTRUCTIVE_MODES and not args.yes:
+        sys.stderr.write(f"'{args.mode}' test türü disklerdeki tüm verileri siler; devam etmek için --yes verin.\n")
+        return EXIT_USAGE
+
+    def on_job(station_url, job):
+        if not args.json:
+            result = job["result"] or {}
+            print(f"{station_url}\t{job['disk']}\t{job['state']}\t{result.get('verdict', '')}\t"
+                  f"{result.get('real_capacity') or '?'} / {result.get('promised_capacity') or '?'}")
+            sys.stdout.flush()
+
+    token = args.token or read_token()
+    clients = [StationClient(url, token) for url in args.stations]
+    finished = collect(clients, args.mode, confirm_destructive=args.yes, on_job=on_job)
+    if args.json:
+        print(json.dumps({"jobs": [dict(job, station=url) for url, job in finished]}, indent=2))
+    if not finished:
+        sys.stderr.write("Test edilecek disk bulunamadı.\n")
+        return EXIT_USAGE
+    results = [ProbeResult.from_dict(job["result"]) if job["result"]
+               else ProbeResult(disk=job["disk"], verdict=VERDICT_ERROR, error=ERROR_CANCELLED)
+               for _, job in finished]
+    return exit_code_for(results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
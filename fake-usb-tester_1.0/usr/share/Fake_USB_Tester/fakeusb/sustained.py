@@ -0,0 +1,186 @@
+"""
+Sürekli yazma profili ve SLC önbellek uçurumu tespiti.
+
+Bazı sahte bellekler gerçek kapasiteye sahiptir ama ilk birkaç GB'tan sonra birkaç MB/s'ye
+düşer; kısa bir prob bunu görmez. Bu test tam yüzey yazma/doğrulama motorunu çalıştırırken
+her parçanın yazma süresini diskteki konuma göre sabit sayıda kovaya toplar (bellek
+kullanımı disk boyutundan bağımsızdır). Kapasite kararı motorun doğrulamasından, hız kararı
+(performance_verdict) profildeki uçurumdan gelir. Profil JSON olarak kaydedilip çizilebilir:
+
+    python3 -m fakeusb.sustained csv ~/.cache/fake-usb-tester/profiles/sdb-20260101-120000.json
+"""
+
+import argparse
+import array
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+from .blockdev import open_device
+from .cache import default_cache_dir
+from .devices import bytes_to_human_readable
+from .engine import verify_disk
+from .result import PERFORMANCE_OK, PERFORMANCE_SLOW, PERFORMANCE_CACHE_CLIFF
+
+DEFAULT_BUCKETS = 512
+CLIFF_RATIO = 0.5  # Uçurum sonrası hız öncesinin bu oranının altındaysa uçurum sayılır
+MIN_BUCKETS = 8  # Bundan az dolu kovayla karar verilmez
+PROFILE_DIR_NAME = "profiles"
+
+MB = 1000 * 1000
+
+
+class ThroughputProfile:
+    """
+    Disk boyunca yazma süresini bucket_count eşit bölgeye toplar.
+    Her kova yazılan bayt, harcanan süre ve kova bittiğinde testin başından geçen süreyi tutar.
+    """
+
+    def __init__(self, total_bytes, bucket_count=DEFAULT_BUCKETS):
+        self.total_bytes = total_bytes
+        self.bucket_size = max(-(-total_bytes // bucket_count), 1)  # Yukarı yuvarlanmış bölme
+        self.bucket_count = -(-total_bytes // self.bucket_size) if total_bytes else 0
+        self.bytes = array.array("Q", bytes(8 * self.bucket_count))
+        self.seconds = array.array("d", bytes(8 * self.bucket_count))
+        self.elapsed = array.array("d", bytes(8 * self.bucket_count))
+        self.start_time = time.monotonic()
+
+    def record(self, offset, length, seconds):
+        """engine.write_verify'ın on_write geri çağırması; kovalara taşan parçalar orantılı bölünür."""
+        end = offset + length
+        now = time.monotonic() - self.start_time
+        while offset < end:
+            index = min(offset // self.bucket_size, self.bucket_count - 1)
+            run = min(end, (index + 1) * self.bucket_size) - offset
+            self.bytes[index] += run
+            self.seconds[index] += seconds * run / length
+            self.elapsed[index] = now
+            offset += run
+
+    def to_dict(self):
+        return {
+            "total_bytes": self.total_bytes,
+            "bucket_size": self.bucket_size,
+            "buckets": [{"offset": index * self.bucket_size, "bytes": self.bytes[index],
+                         "seconds": self.seconds[index], "elapsed": self.elapsed[index],
+                         "bytes_per_sec": self.bytes[index] / self.seconds[index] if self.seconds[index] > 0 else 0.0}
+                        for index in range(self.bucket_count) if self.bytes[index]],
+        }
+
+
+def detect_cliff(buckets, ratio=CLIFF_RATIO):
+    """
+    Profil kovalarında (to_dict()["buckets"]) önbellek uçurumunu arar.
+    Logaritmik hızları iki düz bölüme en iyi ayıran kova (en küçük kareler) bulunur; ikinci
+    bölümün medyan hızı birincininkinin ratio katının altındaysa orası uçurumdur. Yoksa None.
+    """
+    rates = [bucket["bytes_per_sec"] for bucket in buckets]
+    if len(rates) < MIN_BUCKETS or min(rates) <= 0:
+        return None
+    logs = [math.log(rate) for rate in rates]
+    count = len(logs)
+    prefix, prefix_squares = [0.0], [0.0]
+    for value in logs:
+        prefix.append(prefix[-1] + value)
+        prefix_squares.append(prefix_squares[-1] + value * value)
+
+    def sse(start, stop):
+        size = stop - start
+        total = prefix[stop] - prefix[start]
+        return prefix_squares[stop] - prefix_squares[start] - total * total / size
+
+    margin = max(1, count // 64)  # Tek tük yavaş kovalar uçurum sayılmasın
+    split = min(range(margin, count - margin + 1), key=lambda index: sse(0, index) + sse(index, count))
+    before = statistics.median(rates[:split])
+    after = statistics.median(rates[split:])
+    if after >= before * ratio:
+        return None
+    return {"offset": buckets[split]["offset"], "before_bytes_per_sec": before, "after_bytes_per_sec": after}
+
+
+def sustained_verdict(profile, cliff, min_write_mbps=None):
+    """Uçurum varsa PERFORMANCE_CACHE_CLIFF, sürekli hız alt sınırın altındaysa PERFORMANCE_SLOW."""
+    if cliff is not None:
+        return PERFORMANCE_CACHE_CLIFF
+    rates = [bucket["bytes_per_sec"] for bucket in profile["buckets"]]
+    if min_write_mbps and rates and statistics.median(rates) < min_write_mbps * MB:
+        return PERFORMANCE_SLOW
+    return PERFORMANCE_OK
+
+
+def sustained_summary(details):
+    """Tek satırlık özet: "cliff @ 3.00 GB: 45.0 -> 4.1 MB/s" veya "sustained 12.0 MB/s"."""
+    cliff = details.get("cache_cliff")
+    if cliff:
+        return (f"cliff @ {bytes_to_human_readable(cliff['offset'])}: "
+                f"{cliff['before_bytes_per_sec'] / MB:.1f} -> {cliff['after_bytes_per_sec'] / MB:.1f} MB/s")
+    rates = [bucket["bytes_per_sec"] for bucket in details["write_profile"]["buckets"]]
+    return f"sustained {statistics.median(rates) / MB if rates else 0.0:.1f} MB/s"
+
+
+def sustained_test(disk_path, bucket_count=DEFAULT_BUCKETS, cliff_ratio=CLIFF_RATIO, min_write_mbps=None,
+                   on_progress=None, cancel=None):
+    """
+    Diskin tamamına yazıp doğrular (yıkıcı) ve ProbeResult döndürür. Kapasite kararı verify_disk
+    ile aynıdır; details["write_profile"] profili, details["cache_cliff"] bulunan uçurumu içerir.
+    """
+    with open_device(disk_path, writable=False, direct=False) as device:
+        profile = ThroughputProfile(device.size, bucket_count)
+
+    # Profil testin tamamını kapsamalı; bu yüzden kaldığı yerden devam edilmez
+    result = verify_disk(disk_path, on_progress=on_progress, on_write=profile.record, cancel=cancel)
+    profile = profile.to_dict()
+    cliff = detect_cliff(profile["buckets"], cliff_ratio)
+    result.details["write_profile"] = profile
+    result.details["cache_cliff"] = cliff
+    result.performance_verdict = sustained_verdict(profile, cliff, min_write_mbps)
+    return result
+
+
+def default_profile_dir():
+    return os.path.join(default_cache_dir(), PROFILE_DIR_NAME)
+
+
+def save_profile(result, directory=None):
+    """Sonucun yazma profilini <dizin>/<disk>-<tarih>.json olarak kaydeder ve yolunu döndürür."""
+    directory = directory or default_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.basename(result.disk).rsplit(".", 1)[0]
+    stem = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+    path, number = stem + ".json", 1
+    while os.path.exists(path):  # Aynı saniyede aynı adlı başka bir disk
+        path, number = f"{stem}-{number}.json", number + 1
+    with open(path, "w") as f:
+        json.dump({"disk": result.disk, "verdict": result.verdict,
+                   "performance_verdict": result.performance_verdict,
+                   "cache_cliff": result.details.get("cache_cliff"),
+                   "profile": result.details["write_profile"]}, f, indent=2)
+    return path
+
+
+def profile_to_csv(saved, out):
+    """Kaydedilmiş profili çizim araçları için CSV olarak yazar."""
+    out.write("offset_bytes,elapsed_seconds,mb_per_sec\n")
+    for bucket in saved["profile"]["buckets"]:
+        out.write(f"{bucket['offset']},{bucket['elapsed']:.3f},{bucket['bytes_per_sec'] / MB:.3f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.sustained",
+                                     description="Kaydedilmiş sürekli yazma profillerini dönüştürür.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    csv = commands.add_parser("csv", help="Profili CSV olarak yazdırır (konum, süre, MB/s).")
+    csv.add_argument("profile")
+    args = parser.parse_args(argv)
+
+    with open(args.profile) as f:
+        saved = json.load(f)
+    profile_to_csv(saved, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,161 +4,672 @@ import sys
 import subprocess
 import json
 import os
+import time
+import html
+import collections
+
+STARTUP_TIME = time.monotonic()  # İlk kareye kadar geçen süreyi ölçmek için
+
+# Çekirdek paket (fakeusb) program dizininde veya /usr/share altında aranır
+SHARE_DIR = os.path.join("/usr", "share", "Fake_USB_Tester")
+if os.path.isdir(os.path.join(SHARE_DIR, "fakeusb")) and SHARE_DIR not in sys.path:
+    sys.path.append(SHARE_DIR)
+
+# Başsız kip (--batch/--list) PyQt5 yüklenmeden çalışır
+if __name__ == '__main__' and any(arg in ("--batch", "--list", "--watch", "-h", "--help") for arg in sys.argv[1:]):
+    from fakeusb.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QComboBox, QPushButton, QTextEdit, QMessageBox, QFrame
+    QLabel, QComboBox, QPushButton, QPlainTextEdit, QMessageBox, QFrame, QCheckBox,
+    QTableView, QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QObject, QThread, QTimer, pyqtSignal as Signal, QSize, QRect, QAbstractTableModel, QModelIndex
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal as Signal, QSize, QRect
-from PyQt5.QtGui import QFont, QGuiApplication, QPixmap, QMovie, QIcon
+from PyQt5.QtGui import QFont, QGuiApplication, QPixmap, QMovie, QIcon, QTextCharFormat, QPainter, QColor
 from PyQt5 import QtCore
 
+from fakeusb import devices, trace
+from fakeusb.cache import ResultCache
+from fakeusb.cancel import CancelToken
+from fakeusb.cli import unmount_and_test
+from fakeusb.events import EventBus, ProgressStreamServer
+from fakeusb.fingerprint import FingerprintDB, plan_test, RISK_KNOWN_BAD, RISK_SUSPECT
+from fakeusb.f3 import f3probe_command
+from fakeusb.helper import PrivilegedHelper, helper_needed
+from fakeusb.hotplug import HotplugMonitor
+from fakeusb.index import DeviceIndex
+from fakeusb.metrics import MetricsCollector, MetricsServer
+from fakeusb.regions import RegionMap, REGION_GOOD, REGION_UNTESTED, REGION_WRAPAROUND, REGION_DISCARDED
+from fakeusb.modes import run_test, MODES, MODE_F3PROBE, DESTRUCTIVE_MODES, CACHEABLE_MODES
+from fakeusb.result import (
+    VERDICT_GENUINE, VERDICT_FAKE, VERDICT_MISMATCH, VERDICT_ERROR, PERFORMANCE_SLOW, PERFORMANCE_CACHE_CLIFF,
+    ERROR_AUTH, ERROR_PKEXEC_MISSING, ERROR_HELPER_MISSING, ERROR_F3_MISSING, ERROR_UNEXPECTED, ERROR_PERMISSION,
+    ERROR_DEVICE_BUSY, ERROR_CANCELLED,
+)
+from fakeusb.scheduler import ProbeScheduler, PRIORITY_NORMAL
+from fakeusb.speed import speed_summary
+from fakeusb.sustained import save_profile, sustained_summary
+
 # Genel ikon boyutu sabitlerini tanımla (yeni dikdörtgen boyutlar)
 ICON_TARGET_WIDTH = 47  # Piksel cinsinden
 ICON_TARGET_HEIGHT = 100 # Piksel cinsinden
 
-class F3Worker(QThread):
+# Pano (disk tablosu) ayarları
+DASHBOARD_ROW_HEIGHT = 26  # Piksel; sabit satır yüksekliği satırların tek tek ölçülmesini önler
+DASHBOARD_ICON_HEIGHT = 22  # Piksel; tablo ikonları bu yüksekliğe bir kez ölçeklenir
+DASHBOARD_FLUSH_INTERVAL_MS = 100  # Değişen satırların yeniden çizilme aralığı
+SCANNING_ICON = "flashicon_scanning.gif"
+
+# Bölge haritası çubuğu (sağlam / sarmalı / kayıp / test edilmemiş bölgeler)
+REGION_BAR_HEIGHT = 10  # Piksel
+REGION_COLORS = {
+    REGION_GOOD: "#4caf50",
+    REGION_UNTESTED: "#d0d0d0",
+    REGION_WRAPAROUND: "#ff9800",
+    REGION_DISCARDED: "#e53935",
+}
+
+# Çoklu disk testi sınırları
+SCHEDULER_MAX_WORKERS = 8  # Aynı anda çalışabilecek toplam test
+SCHEDULER_PER_BUS_LIMIT = 2  # Aynı kök hub üzerinde aynı anda çalışabilecek test
+
+# Durum alanı (log) ayarları
+LOG_DEBUG = 10
+LOG_INFO = 20
+LOG_SUCCESS = 25
+LOG_WARNING = 30
+LOG_ERROR = 40
+LOG_LEVEL_NAMES = {"debug": LOG_DEBUG, "info": LOG_INFO, "warning": LOG_WARNING, "error": LOG_ERROR}
+LOG_LEVEL = LOG_LEVEL_NAMES.get(os.environ.get("FAKE_USB_TESTER_LOG_LEVEL", "info").lower(), LOG_INFO)
+LOG_MAX_LINES = 2000  # Durum alanında tutulan en fazla satır
+LOG_FLUSH_INTERVAL_MS = 100  # Biriken satırların görünüme yazılma aralığı
+
+RESULT_CACHE_TTL_DAYS = 30  # Önbellekteki sonuçların geçerlilik süresi
+
+# Verilirse Prometheus metrikleri http://127.0.0.1:<port>/metrics adresinde sunulur
+METRICS_PORT = os.environ.get("FAKE_USB_TESTER_METRICS_PORT")
+# Verilirse testlerin zaman çizelgesi kapanışta bu dosyaya (Chrome trace biçiminde) yazılır
+TRACE_PATH = os.environ.get("FAKE_USB_TESTER_TRACE")
+
+# Hız kararı -> durum mesajı çeviri anahtarı (diğerleri speed_ok_message)
+PERFORMANCE_MESSAGE_KEYS = {
+    PERFORMANCE_SLOW: "speed_slow_warning",
+    PERFORMANCE_CACHE_CLIFF: "cache_cliff_warning",
+}
+
+# Karar -> durum mesajı çeviri anahtarı
+VERDICT_MESSAGE_KEYS = {
+    VERDICT_FAKE: "fake_warning",
+    VERDICT_MISMATCH: "capacity_mismatch_warning",
+    VERDICT_GENUINE: "probably_genuine",
+}
+
+# Pano satırı durumu -> (çeviri anahtarı, ikon); test edilen satırlar paylaşılan tarama animasyonunu gösterir
+DRIVE_STATE_IDLE = "idle"
+DRIVE_STATE_QUEUED = "queued"
+DRIVE_STATE_RUNNING = "running"
+DRIVE_STATE_GENUINE = "genuine"
+DRIVE_STATE_FAKE = "fake"
+DRIVE_STATE_DONE = "done"  # Kapasite kararı vermeyen testler (hız testi) bitti
+DRIVE_STATE_SLOW = "slow"
+DRIVE_STATE_ERROR = "error"
+DRIVE_STATE_CANCELLED = "cancelled"
+DRIVE_STATES = {
+    DRIVE_STATE_IDLE: ("state_idle", "flashicon.png"),
+    DRIVE_STATE_QUEUED: ("state_queued", "flashicon.png"),
+    DRIVE_STATE_RUNNING: ("state_running", SCANNING_ICON),
+    DRIVE_STATE_GENUINE: ("state_genuine", "flashicon_testOK.png"),
+    DRIVE_STATE_FAKE: ("state_fake", "flashicon_testFAIL.png"),
+    DRIVE_STATE_DONE: ("state_done", "flashicon_testOK.png"),
+    DRIVE_STATE_SLOW: ("state_slow", "flashicon_testFAIL.png"),
+    DRIVE_STATE_ERROR: ("state_error", "flashicon_testFAIL.png"),
+    DRIVE_STATE_CANCELLED: ("state_cancelled", "flashicon.png"),
+}
+
+class F3Worker(QObject):
     """
-    f3 komutlarını ayrı bir thread'de çalıştırmak için Worker sınıfı.
-    GUI'nin donmasını engeller.
-    Bu sürüm sadece f3probe komutunu çalıştırır.
+    f3 komutlarını zamanlayıcının iş parçacığı havuzunda çalıştırmak için Worker sınıfı.
+    GUI'nin donmasını engeller; her test için yeni bir thread açılmaz.
+    Test türü f3probe veya yerleşik tam yazma/doğrulama motoru olabilir;
+    her iki türün sonucu da f3probe_result sinyaliyle yayılır. Hız testinin sonucu
+    kapasite etiketlerine dokunmadan speed_result sinyaliyle yayılır; sürekli yazma testi
+    ikisini de yayar ve yazma profilini kaydeder.
     """
     finished = Signal(str)
     progress = Signal(str)
     error = Signal(str)
     f3probe_result = Signal(str, str, str, str)
-
-    def __init__(self, disk_path, translations, current_language_index):
+    speed_result = Signal(str, str)  # Hız özeti, hız kararı (PERFORMANCE_*)
+    regions_result = Signal(object)  # Sonucun bölge haritası (regions.RegionMap.to_dict)
+    test_started = Signal(str)  # Zamanlayıcı testi başlattığında disk yolu ile yayılır
+    phase_progress = Signal(str)  # Yerleşik motorun son ilerleme satırı (pano için)
+    done = Signal(str)  # Test bittiğinde (başarılı ya da hatalı) disk yolu ile yayılır
+
+    def __init__(self, disk_path, translations, current_language_index, mode=MODE_F3PROBE, unmount_first=False,
+                 identity=None, result_cache=None, helper=None, event_bus=None, metadata=None, fingerprints=None,
+                 log_sink=None):
         super().__init__()
         self.disk_path = disk_path
-        self.command = "f3probe"
+        self.command = mode
+        self.unmount_first = unmount_first
+        self.identity = identity  # Sonucun önbelleğe yazılacağı aygıt kimliği
+        self.result_cache = result_cache
+        self.helper = helper  # Root yardımcısı; None ise test bu süreçte (pkexec f3probe ile) çalışır
+        self.event_bus = event_bus  # İlerleme akışı (events.EventBus); None ise olay yayınlanmaz
+        self.metadata = metadata  # Disk dizinindeki meta veri; sonuç parmak izi veritabanına bununla eklenir
+        self.fingerprints = fingerprints  # fingerprint.FingerprintDB; None ise sonuç eklenmez
+        self.log_sink = log_sink  # Hata ayıklama satırları ve uyarılar; None ise atılır
+        self.cancel_token = CancelToken()
         self._translations = translations
         self._current_language_index = current_language_index
 
+    def cancel(self):
+        """Testi durdurur (GUI thread'inden çağrılır); sonuç error sinyaliyle bildirilir."""
+        self.cancel_token.cancel()
+
     def tr(self, key):
         """Worker içinde kullanılacak çeviri fonksiyonu."""
         lang_key = "tr" if self._current_language_index == 0 else "en"
         return self._translations.get(lang_key, {}).get(key, key)
 
+    def _log(self, text, level=LOG_DEBUG):
+        """Satırı GUI'nin LogSink'ine iletir (LogSink.log worker thread'inden çağrılabilir)."""
+        if self.log_sink is not None:
+            self.log_sink.log(text, level)
+
     def run(self):
         try:
-            f3_executable = "pkexec f3"
-
-            full_command_str = f"{f3_executable}probe {self.disk_path}"
-            self.progress.emit(self.tr("test_start_message") + f" {self.disk_path}\n")
-            print(f"DEBUG (TERMINAL): Test başlatılıyor komut: {full_command_str}") # YENİ DEBUG
-
-            import shlex
-            command_list = shlex.split(full_command_str)
-
-            process = subprocess.Popen(
-                command_list,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-
-            stdout_lines = []
-            stderr_lines = []
-
-            for line in process.stdout:
-                stdout_lines.append(line.strip())
-                self.progress.emit(line)
-                print(f"DEBUG (TERMINAL - f3probe stdout): {line.strip()}") # YENİ DEBUG
-
-            for line in process.stderr:
-                stderr_lines.append(line.strip())
-                self.error.emit(line)
-                print(f"DEBUG (TERMINAL - f3probe stderr): {line.strip()}") # YENİ DEBUG
-
-            process.wait()
-
-            if process.returncode == 0 or process.returncode == 102:
-                self.finished.emit(self.tr("command_success"))
-                self._parse_f3probe_output(stdout_lines)
-                if process.returncode == 102:
-                    self.finished.emit(self.tr("fake_device_detected_code_102"))
-            else:
-                error_output = "\n".join(stderr_lines) if stderr_lines else self.tr("no_output_found")
-                if "polkit" in error_output.lower() or "authentication" in error_output.lower():
-                    self.error.emit(self.tr("authentication_error").format(detail=error_output))
-                elif "not found" in error_output.lower() and "pkexec" in error_output.lower():
-                     self.error.emit(self.tr("pkexec_not_found"))
-                else:
-                    self.error.emit(self.tr("command_error_code") + f": {process.returncode}\nDetay: {error_output}")
-
-        except FileNotFoundError:
-            self.error.emit(self.tr("f3_not_found_error"))
-            print(f"DEBUG (TERMINAL): FileNotFoundError: {self.tr('f3_not_found_error')}") # YENİ DEBUG
-        except Exception as e:
-            self.error.emit(self.tr("unexpected_error") + f": {e}")
-            print(f"DEBUG (TERMINAL): Unexpected error in F3Worker: {e}") # YENİ DEBUG
+            with trace.span("worker", self.disk_path, mode=self.command):
+                self._run_test()
+        finally:
+            self._emit("done", self.disk_path)
+
+    def _emit(self, name, *args):
+        """Sinyali yayar; izleme açıksa GUI thread'ine teslimine kadar geçen süre de kaydedilir."""
+        trace.async_begin(name, id(self), disk=self.disk_path)
+        getattr(self, name).emit(*args)
+
+    def _run_test(self):
+        self.test_started.emit(self.disk_path)
+        self.progress.emit(self.tr("test_start_message") + f" {self.disk_path}\n")
+        if self.unmount_first and devices.mounted_partitions(self.disk_path):
+            self.progress.emit(self.tr("unmounting_message"))
+        if self.helper is not None:
+            self._log(lambda: f"Test yardımcıya gönderiliyor: {self.command} {self.disk_path}")
+        elif self.command == MODE_F3PROBE:
+            self._log(lambda: f"Test başlatılıyor komut: {' '.join(f3probe_command(self.disk_path))}")
+        else:
+            self._log(lambda: f"Yerleşik test başlatılıyor: {self.command} {self.disk_path}")
+
+        on_progress = self._on_engine_progress
+        if self.event_bus is not None:
+            self.event_bus.started(self.disk_path, self.command)
+            on_progress = self.event_bus.progress_callback(self.disk_path, on_progress)
+        # Yeni takılan disk otomatik bağlayıcıyla yeniden bağlanabilir; ayırma CLI ve istasyondaki gibi yinelenir.
+        # Ayrılamayan bölümler ERROR_DEVICE_BUSY sonucu olarak bildirilir.
+        test = unmount_and_test if self.unmount_first else run_test
+        result = test(self.disk_path, self.command, on_stdout=self._on_stdout, on_stderr=self._on_stderr,
+                      on_progress=on_progress, helper=self.helper, cancel=self.cancel_token)
+        if self.event_bus is not None:
+            self.event_bus.result(result)
+
+        if result.verdict == VERDICT_ERROR:
+            self._emit_error(result)
+            return
 
-    def _parse_f3probe_output(self, lines):
-        """f3probe çıktısını ayrıştırır ve ilgili bilgileri yayar."""
-        real_capacity = self.tr("not_detected")
-        promised_capacity = self.tr("not_detected")
+        if self.result_cache is not None and self.identity and self.command in CACHEABLE_MODES:
+            self.result_cache.put(self.identity, result, self.command)
+        if self.fingerprints is not None and self.metadata is not None:
+            try:
+                self.fingerprints.record(self.metadata, result)
+            except Exception as e:
+                self._log(self.tr("fingerprint_record_error").format(detail=e), LOG_WARNING)
+
+        self.finished.emit(self.tr("command_success"))
+        self._emit_result(result)
+        if result.returncode == 102:
+            self.finished.emit(self.tr("fake_device_detected_code_102"))
+
+    def _on_stdout(self, line):
+        self.progress.emit(line)  # Satır durum alanına zaten düşer; ayrıca terminale yazılmaz
+
+    def _on_stderr(self, line):
+        self.error.emit(line)  # Satır durum alanına zaten düşer; ayrıca terminale yazılmaz
+
+    def _on_engine_progress(self, phase, done_bytes, total_bytes, bytes_per_sec):
+        """Yerleşik motorun ilerlemesini okunabilir bir satır olarak yayar."""
+        percent = 100.0 * done_bytes / total_bytes if total_bytes else 100.0
+        if not bytes_per_sec:
+            # Prob aşaması bayt değil adım sayısı bildirir
+            line = self.tr("probe_progress").format(phase=self.tr(f"phase_{phase}"), percent=percent)
+        else:
+            line = self.tr("engine_progress").format(
+                phase=self.tr(f"phase_{phase}"), percent=percent,
+                done=devices.bytes_to_human_readable(done_bytes), total=devices.bytes_to_human_readable(total_bytes),
+                rate=devices.bytes_to_human_readable(bytes_per_sec))
+        self.progress.emit(line)
+        self.phase_progress.emit(line)
+
+    def _emit_error(self, result):
+        """Çalıştırma hatasını çevrilmiş mesaj olarak yayar."""
+        error_output = result.error_detail or self.tr("no_output_found")
+        if result.error == ERROR_AUTH:
+            self.error.emit(self.tr("authentication_error").format(detail=error_output))
+        elif result.error == ERROR_PKEXEC_MISSING:
+            self.error.emit(self.tr("pkexec_not_found"))
+        elif result.error == ERROR_HELPER_MISSING:
+            self.error.emit(self.tr("helper_not_installed").format(detail=result.error_detail))
+        elif result.error == ERROR_F3_MISSING:
+            self.error.emit(self.tr("f3_not_found_error"))
+        elif result.error == ERROR_PERMISSION:
+            self.error.emit(self.tr("device_permission_error").format(detail=result.error_detail))
+        elif result.error == ERROR_DEVICE_BUSY:
+            self.error.emit(self.tr("device_busy_error").format(detail=result.error_detail))
+        elif result.error == ERROR_CANCELLED:
+            self.error.emit(self.tr("test_cancelled_message")
+                            + (f" ({result.error_detail})" if result.error_detail else ""))
+        elif result.error == ERROR_UNEXPECTED:
+            self.error.emit(self.tr("unexpected_error") + f": {result.error_detail}")
+        else:
+            self.error.emit(self.tr("command_error_code") + f": {result.returncode}\nDetay: {error_output}")
+
+    def _emit_result(self, result):
+        """Çekirdekten gelen ProbeResult'u çevrilmiş metinlerle f3probe_result sinyaline dönüştürür."""
+        if result.parse_errors:
+            self.error.emit(self.tr("f3probe_capacity_parse_error"))
+        if "speed" in result.details:
+            self._emit("speed_result", speed_summary(result.details["speed"]), result.performance_verdict)
+            return
+        if result.details.get("resumed_from"):
+            resumed = result.details["resumed_from"]
+            self.progress.emit(self.tr("test_resumed_message").format(
+                phase=self.tr(f"phase_{resumed['phase']}"), offset=devices.bytes_to_human_readable(resumed["offset"])))
+        if "bad_bytes" in result.details:
+            self.progress.emit(self.tr("verify_summary").format(
+                write=devices.bytes_to_human_readable(result.details["write_bytes_per_sec"]),
+                read=devices.bytes_to_human_readable(result.details["read_bytes_per_sec"]),
+                bad=devices.bytes_to_human_readable(result.details["bad_bytes"])))
+        if "quick" in result.details:
+            quick = result.details["quick"]
+            if quick["escalated_to"]:
+                self.progress.emit(self.tr("quick_escalated_message").format(
+                    samples=quick["samples"], bad=quick["bad_samples"], mode=self.tr(f"mode_{quick['escalated_to']}")))
+            elif quick["verdict"] == VERDICT_GENUINE:
+                self.progress.emit(self.tr("quick_genuine_message").format(
+                    samples=quick["samples"], fraction=quick["min_fake_fraction"] * 100,
+                    confidence=quick["confidence"] * 100))
+
+        real_capacity = result.real_capacity or self.tr("not_detected")
+        promised_capacity = result.promised_capacity or self.tr("not_detected")
         brand_model = self.tr("not_detected") # Bu, f3probe çıktısından gelmez, yalnızca bir yer tutucu
-        status_message = self.tr("test_completed")
-
-        is_fake = False
-
-        for line in lines:
-            if "Good news: The device" in line and "is the real thing" in line:
-                status_message = self.tr("probably_genuine")
-            elif "Bad news: The device" in line and "is a counterfeit" in line:
-                is_fake = True
-                status_message = self.tr("fake_warning")
-            elif "WARNING: Only" in line and "sectors were found" in line:
-                is_fake = True
-                try:
-                    parts = line.split("Only ")[1].split(" of ")
-                    real_sectors = int(parts[0].replace(",", "").strip()) if len(parts) > 0 else 0
-                    declared_sectors = int(parts[1].split(" sectors")[0].replace(",", "").strip()) if len(parts) > 1 else 0
-
-                    sector_size_bytes = 512
-
-                    real_capacity_gb = round(real_sectors * sector_size_bytes / (1024**3), 2)
-                    declared_capacity_gb = round(declared_sectors * sector_size_bytes / (1024**3), 2)
-
-                    real_capacity = f"{real_capacity_gb} GB"
-                    promised_capacity = f"{declared_capacity_gb} GB"
-                except (ValueError, IndexError):
-                    self.error.emit(self.tr("f3probe_capacity_parse_error"))
-
-            elif "*Usable* size:" in line:
-                try:
-                    size_part = line.split(":")[-1].strip().split("(")[0].strip()
-                    real_capacity = size_part
-                except IndexError:
-                    pass
-            elif "Announced size:" in line:
-                try:
-                    size_part = line.split(":")[-1].strip().split("(")[0].strip()
-                    promised_capacity = size_part
-                except IndexError:
-                    pass
-
-        # is_fake bayrağına göre nihai durumu ayarla
-        if is_fake:
-            status_message = self.tr("fake_warning")
-        elif real_capacity != self.tr("not_detected") and promised_capacity != self.tr("not_detected"):
-            # Düzeltme: Burada kesilen satırı tamamladık
+
+        status_message = self.tr(VERDICT_MESSAGE_KEYS.get(result.verdict, "test_completed"))
+
+        if "regions" in result.details:
+            self.regions_result.emit(result.details["regions"])
+        self._emit("f3probe_result", real_capacity, promised_capacity, brand_model, status_message)
+
+        if "write_profile" in result.details:
             try:
-                real_val, real_unit = real_capacity.split(" ")
-                promised_val, promised_unit = promised_capacity.split(" ")
+                self.progress.emit(self.tr("profile_saved_message").format(path=save_profile(result)))
+            except OSError as e:
+                self.error.emit(self.tr("profile_save_error").format(detail=e))
+            self._emit("speed_result", sustained_summary(result.details), result.performance_verdict)
+
+
+class LogSink(QObject):
+    """
+    Durum alanına yazılacak satırları halka tamponda biriktirir ve zamanlayıcıyla
+    toplu halde, satır sınırı olan düz metin görünüme yazar.
+    Seviyesi altındaki satırlar (ör. DEBUG) hiç biçimlendirilmeden atılır.
+    log() yalnızca tampona eklediği için worker thread'lerinden de çağrılabilir;
+    görünüme yalnızca GUI thread'indeki zamanlayıcı yazar.
+    """
+    LEVEL_COLORS = {LOG_SUCCESS: "green", LOG_WARNING: "darkorange", LOG_ERROR: "red"}
+
+    def __init__(self, view, level=LOG_LEVEL, max_lines=LOG_MAX_LINES, flush_interval_ms=LOG_FLUSH_INTERVAL_MS):
+        super().__init__(view)
+        self.view = view
+        self.level = level
+        self.view.setMaximumBlockCount(max_lines)
+        self._pending = collections.deque(maxlen=max_lines)
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def log(self, text, level=LOG_INFO):
+        """Satırı tampona ekler; text, yalnızca gerektiğinde çağrılan bir fonksiyon da olabilir."""
+        if level < self.level:
+            return
+        if callable(text):
+            text = text()
+        self._pending.append((level, text))
+
+    def debug(self, text):
+        self.log(text, LOG_DEBUG)
+
+    def info(self, text):
+        self.log(text, LOG_INFO)
+
+    def success(self, text):
+        self.log(text, LOG_SUCCESS)
+
+    def warning(self, text):
+        self.log(text, LOG_WARNING)
+
+    def error(self, text):
+        self.log(text, LOG_ERROR)
+
+    def flush(self):
+        """Biriken satırları görünüme yazar; renksiz ardışık satırlar tek seferde eklenir."""
+        if not self._pending:
+            return
+        plain_lines = []
+        while self._pending:
+            level, text = self._pending.popleft()
+            color = self.LEVEL_COLORS.get(level)
+            if color is None:
+                plain_lines.append(text)
+                continue
+            if plain_lines:
+                self.view.appendPlainText("\n".join(plain_lines))
+                plain_lines = []
+            self.view.appendHtml(f"<font color='{color}'>{html.escape(text).replace(chr(10), '<br>')}</font>")
+            # Renk sonraki düz satırlara taşınmasın
+            self.view.setCurrentCharFormat(QTextCharFormat())
+        if plain_lines:
+            self.view.appendPlainText("\n".join(plain_lines))
+
+    def clear(self):
+        self._pending.clear()
+        self.view.clear()
+
+    def set_text(self, text):
+        """Görünümün içeriğini hemen text ile değiştirir; henüz yazılmamış uyarı ve hatalar korunur."""
+        kept = [entry for entry in self._pending if entry[0] >= LOG_WARNING]
+        self._pending.clear()
+        self._pending.extend(kept)
+        self.view.setPlainText(text)
+
+
+class IconCache(QObject):
+    """
+    Durum ikonlarını bir kez çözüp istenen her boyut için bir kez ölçekleyerek saklar.
+    Tarama animasyonu tek bir QMovie'dir; büyük ikon etiketi ve panodaki tüm test edilen
+    satırlar aynı kareleri gösterir, küçültülmüş kareler de kare numarasına göre saklanır.
+    """
+
+    def __init__(self, icon_path, parent=None):
+        super().__init__(parent)
+        self.icon_path = icon_path  # İkon adı -> dosya yolu (bulunamazsa None)
+        self._pixmaps = {}  # (ad, genişlik, yükseklik) -> QPixmap
+        self._frames = {}  # (kare numarası, genişlik, yükseklik) -> QPixmap
+        self._movie = None
+
+    def pixmap(self, icon_name, size):
+        key = (icon_name, size.width(), size.height())
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            path = self.icon_path(icon_name)
+            pixmap = QPixmap(path) if path else QPixmap()
+            if not pixmap.isNull():
+                pixmap = pixmap.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def scanning_movie(self):
+        """Paylaşılan tarama animasyonu; çözülen kareler bellekte tutulur (CacheAll)."""
+        if self._movie is None:
+            self._movie = QMovie(self.icon_path(SCANNING_ICON) or "")
+            self._movie.setParent(self)
+            self._movie.setCacheMode(QMovie.CacheMode.CacheAll)
+            self._movie.setScaledSize(QSize(ICON_TARGET_WIDTH, ICON_TARGET_HEIGHT))
+        return self._movie
+
+    def scanning_frame(self, size):
+        """Animasyonun o anki karesi size boyutunda; her kare her boyut için bir kez ölçeklenir."""
+        movie = self.scanning_movie()
+        key = (movie.currentFrameNumber(), size.width(), size.height())
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = movie.currentPixmap()
+            if not frame.isNull():
+                frame = frame.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+            self._frames[key] = frame
+        return frame
+
+    def state_pixmap(self, state, size):
+        if state == DRIVE_STATE_RUNNING:
+            return self.scanning_frame(size)
+        return self.pixmap(DRIVE_STATES[state][1], size)
+
+
+class RegionBar(QWidget):
+    """
+    Bölge haritasını ince bir çubuk olarak çizer: her piksel sütunu kapsadığı en kötü bölge
+    türünün rengini alır. Harita yoksa çubuk gizlenir.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(REGION_BAR_HEIGHT)
+        self._regions = None
+        self._cells = None  # Son çizim genişliği için hesaplanan hücreler
+        self.hide()
+
+    def set_regions(self, regions, tooltip=None):
+        """regions bir RegionMap ya da None'dır."""
+        self._regions = regions
+        self._cells = None
+        self.setToolTip(tooltip or "")
+        self.setVisible(regions is not None)
+        self.update()
+
+    def resizeEvent(self, event):
+        self._cells = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._regions is None:
+            return
+        width = self.width()
+        if self._cells is None or len(self._cells) != width:
+            self._cells = self._regions.cells(width)
+        painter = QPainter(self)
+        start = 0
+        # Aynı türden ardışık sütunlar tek dikdörtgen olarak çizilir
+        for x in range(1, width + 1):
+            if x == width or self._cells[x] != self._cells[start]:
+                painter.fillRect(start, 0, x - start, self.height(), QColor(REGION_COLORS[self._cells[start]]))
+                start = x
+        painter.end()
+
+
+class DriveTableModel(QAbstractTableModel):
+    """
+    Pano tablosunun modeli: her disk bir satır. Değişiklikler disk yolu bazında biriktirilir
+    ve zamanlayıcıyla yalnızca değişen satırlar için dataChanged yayılır; tarama animasyonunun
+    her karesinde yalnızca test edilen satırların durum hücresi yeniden çizilir.
+    """
+    FIELDS = ("disk", "size", "brand_model", "state", "detail", "real_capacity", "speed")
+    HEADER_KEYS = ("column_disk", "column_size", "column_brand_model", "column_status", "column_detail",
+                   "column_real_capacity", "column_speed")
+    STATUS_COLUMN = 3
+
+    def __init__(self, tr, icon_cache, flush_interval_ms=DASHBOARD_FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.tr = tr
+        self.icon_cache = icon_cache
+        self.icon_size = QSize(ICON_TARGET_WIDTH * DASHBOARD_ICON_HEIGHT // ICON_TARGET_HEIGHT, DASHBOARD_ICON_HEIGHT)
+        self._rows = []  # Her satır FIELDS anahtarlı bir sözlük
+        self._row_index = {}  # Disk yolu -> satır numarası
+        self._dirty = set()  # Son çizimden beri değişen disk yolları
+        self._running = set()  # Tarama animasyonu gösteren disk yolları
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+        icon_cache.scanning_movie().frameChanged.connect(self._on_scanning_frame)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.FIELDS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.STATUS_COLUMN:
+                return self.tr(DRIVE_STATES[row["state"]][0])
+            return row[self.FIELDS[column]] or ""
+        if role == Qt.ItemDataRole.DecorationRole and column == self.STATUS_COLUMN:
+            return self.icon_cache.state_pixmap(row["state"], self.icon_size)
+        if role == Qt.ItemDataRole.ToolTipRole and column == self.FIELDS.index("detail"):
+            return row["detail"] or None
+        return None
 
-                if float(real_val) != float(promised_val) or real_unit != promised_unit:
-                    status_message = self.tr("capacity_mismatch_warning")
-                else:
-                     status_message = self.tr("probably_genuine")
-            except (ValueError, IndexError):
-                if real_capacity != promised_capacity:
-                    status_message = self.tr("capacity_mismatch_warning")
-                else:
-                    status_message = self.tr("probably_genuine")
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.tr(self.HEADER_KEYS[section])
+        return None
 
-        self.f3probe_result.emit(real_capacity, promised_capacity, brand_model, status_message)
+    def row_for(self, disk_path):
+        """Diskin satır numarası; disk tabloda yoksa None."""
+        return self._row_index.get(disk_path)
+
+    def disk_at(self, row):
+        return self._rows[row]["disk"] if 0 <= row < len(self._rows) else None
+
+    def state(self, disk_path):
+        row = self._row_index.get(disk_path)
+        return self._rows[row]["state"] if row is not None else None
+
+    def add_drive(self, disk_path, size, brand_model=None):
+        if disk_path in self._row_index:
+            self.update(disk_path, size=size, brand_model=brand_model)
+            return
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append({"disk": disk_path, "size": size, "brand_model": brand_model, "state": DRIVE_STATE_IDLE,
+                           "detail": None, "real_capacity": None, "speed": None})
+        self._row_index[disk_path] = row
+        self.endInsertRows()
+
+    def remove_drive(self, disk_path):
+        row = self._row_index.get(disk_path)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._row_index = {values["disk"]: index for index, values in enumerate(self._rows)}
+        self._dirty.discard(disk_path)
+        self._running.discard(disk_path)
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows.clear()
+        self._row_index.clear()
+        self._dirty.clear()
+        self._running.clear()
+        self.endResetModel()
+
+    def update(self, disk_path, **fields):
+        """Satırın alanlarını değiştirir; çizim bir sonraki flush'ta (yalnızca bu satır için) yapılır."""
+        row = self._row_index.get(disk_path)
+        if row is None:
+            return
+        values = self._rows[row]
+        changed = {key: value for key, value in fields.items() if values.get(key) != value}
+        if not changed:
+            return
+        values.update(changed)
+        if "state" in changed:
+            if changed["state"] == DRIVE_STATE_RUNNING:
+                self._running.add(disk_path)
+            else:
+                self._running.discard(disk_path)
+        self._dirty.add(disk_path)
+
+    def flush(self):
+        """Biriken değişiklikler için satır başına bir dataChanged yayar."""
+        if not self._dirty:
+            return
+        last_column = len(self.FIELDS) - 1
+        for disk_path in self._dirty:
+            row = self._row_index.get(disk_path)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last_column))
+        self._dirty.clear()
+
+    def retranslate(self):
+        """Dil değiştiğinde başlıkları ve durum metinlerini yeniden çizdirir."""
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self.FIELDS) - 1)
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(self.FIELDS) - 1))
+
+    def _on_scanning_frame(self, frame_number):
+        if not self._running:
+            return
+        rows = [self._row_index[disk_path] for disk_path in self._running]
+        self.dataChanged.emit(self.index(min(rows), self.STATUS_COLUMN), self.index(max(rows), self.STATUS_COLUMN),
+                              [Qt.ItemDataRole.DecorationRole])
+
+
+class HotplugBridge(QObject):
+    """HotplugMonitor geri çağırmalarını GUI thread'ine sinyal olarak taşır."""
+    disk_added = Signal(str, str)  # Disk yolu, okunabilir boyut
+    disk_removed = Signal(str)  # Disk yolu
+
+    def __init__(self, device_index):
+        super().__init__()
+        self.device_index = device_index
+
+    def on_add(self, disk):
+        # Dizin sinyalden önce güncellenir; GUI diski seçtiğinde meta veri hazırdır
+        metadata = self.device_index.update(disk["path"])
+        if metadata is not None:
+            self.disk_added.emit(metadata["path"], metadata["size"])
+
+    def on_remove(self, disk_path):
+        self.device_index.remove(disk_path)
+        self.disk_removed.emit(disk_path)
+
+
+class DiskEnumerator(QThread):
+    """
+    Disk dizinini arka planda /sys/block'tan tek geçişte kurar; pencere önce çizilir,
+    combobox sonuçlar geldikçe dolar. Marka/model ve kimlik bilgileri dizinde hazır bulunur.
+    """
+    disk_found = Signal(str, str)  # Disk yolu, okunabilir boyut
+    listing_done = Signal(int)  # Bulunan disk sayısı
+    failed = Signal(object)  # Listeleme sırasında oluşan istisna
+
+    def __init__(self, device_index):
+        super().__init__()
+        self.device_index = device_index
+
+    def run(self):
+        try:
+            disks = self.device_index.refresh()
+        except Exception as e:
+            self.failed.emit(e)
+            return
+
+        for disk in disks:
+            self.disk_found.emit(disk["path"], disk["size"])
+        self.listing_done.emit(len(disks))
 
 
 class FakeUSBTesterApp(QWidget):
@@ -167,39 +678,97 @@ class FakeUSBTesterApp(QWidget):
         self.setWindowTitle("Fake USB Tester")
         self.current_language_index = 0  # 0: Türkçe, 1: English
         self.translations = self._load_translations()
-        self.icon_paths = {}  # İkon yollarını saklamak için sözlük
-        self.status_text_edit = QTextEdit()  # _load_icon_paths'tan önce tanımlanmalı
-        self._load_icon_paths()
+        self.icon_paths = {}  # İkon yollarını saklamak için sözlük (ilk kullanımda doldurulur)
+        self.device_index = DeviceIndex()  # Disk yolu -> sysfs meta verisi (marka/model, kimlik, USB bilgisi)
+        self.status_text_edit = QPlainTextEdit()  # _icon_path'ten ve önbellekler açılmadan önce tanımlanmalı
+        self.log_sink = LogSink(self.status_text_edit)
+        self.result_cache = self._open_result_cache()
+        self.fingerprints = self._open_fingerprint_db()  # Test öncesi risk puanı; açılamazsa None
+        # Root değilsek testler tek seferde yetkilendirilen yardımcıda çalışır (disk başına polkit sorusu yok)
+        self.privileged_helper = PrivilegedHelper() if helper_needed() else None
+        self.disk_enumerator = None
+        self.first_frame_ms = None
+        self.icon_cache = IconCache(self._icon_path, self)  # İkonlar bir kez çözülüp ölçeklenir
+        self._current_movie = None  # İkon etiketi tarama animasyonunu gösteriyorsa paylaşılan QMovie
         self._load_and_set_window_icon()  # Pencere ikonunu ayarla
         self.init_ui()
 
         # DÜZELTME: Sinyal bağlantısını diskler yüklenmeden önce yap.
         self.flash_drive_combo.currentIndexChanged.connect(self._on_disk_selected)
-        print("DEBUG (TERMINAL): currentIndexChanged sinyali bağlandı.")
+        self.log_sink.debug("currentIndexChanged sinyali bağlandı.")
 
-        self._load_disks() # Diskler yüklendiğinde _on_disk_selected tetiklenecektir.
         self.update_ui_language()
         self._set_initial_icon()  # Başlangıç ikonu
 
         self.is_processing = False
+        self.workers = {}  # Disk yolu -> çalışan F3Worker
+        self.close_when_done = False  # Pencere testler sürerken kapatıldıysa son test bitince kapanır
+        self.multi_test_mode = False  # Birden fazla disk aynı anda test ediliyorsa True
+        self.scheduler = ProbeScheduler(SCHEDULER_MAX_WORKERS, SCHEDULER_PER_BUS_LIMIT)
+        # Panolar için NDJSON ilerleme akışı; abone yokken maliyeti bir liste kontrolüdür
+        self.event_bus = EventBus()
+        self.progress_stream = self._start_progress_stream()
+        self.metrics_collector = MetricsCollector(self.event_bus)
+        self.metrics_server = self._start_metrics_server()
+        if TRACE_PATH:
+            trace.enable(TRACE_PATH)
+
+        # Takılan/çıkarılan diskleri izle
+        self.hotplug_bridge = HotplugBridge(self.device_index)
+        self.hotplug_bridge.disk_added.connect(self._on_disk_hotplugged)
+        self.hotplug_bridge.disk_removed.connect(self._on_disk_unplugged)
+        self.hotplug_monitor = HotplugMonitor(self.hotplug_bridge.on_add, self.hotplug_bridge.on_remove)
+        self.hotplug_monitor.start()
 
 
         self.setMinimumWidth(350)
 
-    def _load_icon_paths(self):
-        """İkon dosyalarının yollarını bulur ve saklar."""
-        icons = ["flashicon.png", "flashicon_scanning.gif", "flashicon_testOK.png", "flashicon_testFAIL.png"]
-        for icon in icons:
-            path = self._find_icon_path(icon)
-            if path:
-                self.icon_paths.update({icon: path})
-            else:
-                self.status_text_edit.append(self.tr("icon_load_error").format(path=icon))
-                print(f"DEBUG (TERMINAL): İkon yüklenemedi: {icon}") # YENİ DEBUG
+        # Diskler pencere gösterildikten sonra arka planda listelenir.
+        # Diskler yüklendiğinde _on_disk_selected tetiklenecektir.
+        QTimer.singleShot(0, self._load_disks)
+
+    def closeEvent(self, event):
+        if self.workers:
+            # Testler durdurulup aygıtlar geri yüklenmeden çıkılmaz; son test bitince pencere kapanır
+            self.close_when_done = True
+            self._cancel_tests()
+            self.log_sink.info(self.tr("close_after_cancel_message"))
+            event.ignore()
+            return
+        self.hotplug_monitor.stop()
+        if self.progress_stream is not None:
+            self.progress_stream.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.privileged_helper is not None:
+            self.privileged_helper.shutdown()
+        tracer = trace.disable()
+        if tracer is not None:
+            try:
+                # Pencere kapanırken durum alanı artık görünmez; sonuç terminale yazılır
+                sys.stderr.write(f"Zaman çizelgesi yazıldı: {tracer.write()}\n")
+            except OSError as e:
+                sys.stderr.write(f"Zaman çizelgesi yazılamadı: {e}\n")
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_frame_ms is None:
+            self.first_frame_ms = (time.monotonic() - STARTUP_TIME) * 1000
+            self.log_sink.debug(lambda: f"İlk kare {self.first_frame_ms:.1f} ms'de çizildi.")
+
+    def _icon_path(self, icon_name):
+        """İkon dosyasının yolunu ilk kullanımda bulur ve saklar."""
+        if icon_name not in self.icon_paths:
+            path = self._find_icon_path(icon_name)
+            self.icon_paths[icon_name] = path
+            if not path:
+                self.log_sink.warning(self.tr("icon_load_error").format(path=icon_name))
+        return self.icon_paths[icon_name]
 
     def _load_and_set_window_icon(self):
         """Pencere ikonunu ayarlar."""
-        icon_path = self.icon_paths.get("flashicon.png")
+        icon_path = self._icon_path("flashicon.png")
         if icon_path:
             self.setWindowIcon(QIcon(icon_path))
 
@@ -241,13 +810,91 @@ class FakeUSBTesterApp(QWidget):
                 "current_disk_info": "Mevcut Disk Bilgisi:",
                 "capacity_mismatch_warning": "UYARI: Vaadedilen ve gerçek kapasite farklı!",
                 "pkexec_not_found": "Hata: 'pkexec' komutu bulunamadı. Lütfen yüklü olduğundan emin olun (genellikle policykit-1 paketiyle gelir).",
+                "helper_not_installed": "Hata: Yetkili yardımcı kurulu değil. Bir kez 'sudo python3 -m fakeusb.helper install' komutunu çalıştırın.\nDetay: {detail}",
                 "authentication_error": "Yetkilendirme Hatası: 'f3' komutunu çalıştırmak için yetkiniz yok veya parola girilmedi.\nLütfen pkexec ve Polkit ayarlarını kontrol edin. Detay: {detail}",
                 "test_start_message": "Test başlatılıyor:",
                 "test_completed": "Test tamamlandı.",
                 "f3probe_capacity_parse_error": "f3probe kapasite uyarısı ayrıştırılırken hata.",
                 "no_output_found": "Çıktı yok.",
                 "icon_load_error": "İkon yüklenemedi: {path}",
-                "fake_device_detected_code_102": "Sahte cihaz tespit edildi (Hata Kodu 102)."
+                "fake_device_detected_code_102": "Sahte cihaz tespit edildi (Hata Kodu 102).",
+                "start_all_tests_button": "Tümünü Test Et",
+                "tests_queued_message": "{count} disk test kuyruğuna eklendi.",
+                "test_mode_label": "Test Türü:",
+                "mode_f3probe": "f3probe (veriler korunur)",
+                "mode_quick": "Hızlı ön eleme, şüpheliler tam proba (veriler korunur)",
+                "mode_probe": "Yerleşik prob (veriler korunur)",
+                "mode_verify": "Tam yazma/doğrulama (veriler silinir)",
+                "mode_speed": "Hız testi (diskin başı silinir)",
+                "mode_sustained": "Sürekli yazma profili (veriler silinir)",
+                "destructive_warning_title": "Veri Kaybı Uyarısı",
+                "destructive_warning_text": "Seçilen test türü aşağıdaki disklerdeki TÜM verileri silecek:\n{disks}\n\nDevam edilsin mi?",
+                "phase_write": "Yazılıyor",
+                "phase_verify": "Doğrulanıyor",
+                "phase_probe": "Kapasite sınırı aranıyor",
+                "phase_quick": "Rastgele bloklar örnekleniyor",
+                "column_disk": "Disk",
+                "column_size": "Boyut",
+                "column_brand_model": "Marka/Model",
+                "column_status": "Durum",
+                "column_detail": "Ayrıntı",
+                "column_real_capacity": "Gerçek Kapasite",
+                "column_speed": "Hız",
+                "state_idle": "Test edilmedi",
+                "region_bar_tooltip": "Sağlam: {good}, sarmalı: {wraparound}, kayıp: {discarded}, test edilmedi: {untested}; sağlam bölgeler arasında {holes} delik",
+                "risk_known_bad": "bilinen sahte",
+                "risk_suspect": "şüpheli",
+                "risk_unknown": "bilinmiyor",
+                "risk_known_clean": "bilinen temiz",
+                "risk_known_bad_message": "UYARI: Bu model ve boyut daha önce sahte çıktı ({fakes} sahte / {genuines} gerçek).",
+                "risk_suspect_message": "Dikkat: Bu model şüpheli ({fakes} sahte / {genuines} gerçek; aynı denetleyicinin diğer boyutlarında {controller_fakes} sahte).",
+                "risk_known_clean_message": "Bu model ve boyut daha önce {genuines} kez gerçek çıktı.",
+                "risk_unknown_message": "Bu model ve boyut için yeterli geçmiş yok.",
+                "risk_typical_capacity": "Tipik gerçek kapasite: {real_cap}.",
+                "risk_planned_message": "Parmak izi: {risk}; test türü: {mode}, öncelik ona göre ayarlandı.",
+                "state_queued": "Kuyrukta",
+                "state_running": "Test ediliyor",
+                "state_genuine": "Gerçek",
+                "state_fake": "Sahte",
+                "state_done": "Tamamlandı",
+                "state_slow": "Yavaş",
+                "state_error": "Hata",
+                "state_cancelled": "İptal edildi",
+                "phase_seq_write": "Sıralı yazma ölçülüyor",
+                "phase_seq_read": "Sıralı okuma ölçülüyor",
+                "phase_rand_read": "4K rastgele okuma ölçülüyor",
+                "phase_rand_write": "4K rastgele yazma ölçülüyor",
+                "probe_progress": "{phase}: %{percent:.0f}",
+                "engine_progress": "{phase}: %{percent:.1f} ({done} / {total}, {rate}/s)",
+                "verify_summary": "Yazma hızı: {write}/s, Okuma hızı: {read}/s, Hatalı alan: {bad}",
+                "device_permission_error": "Hata: Aygıta doğrudan erişim izni yok. Programı yetkili kullanıcıyla çalıştırın. Detay: {detail}",
+                "device_busy_error": "Hata: Diskin bağlı bölümleri var, önce ayırın: {detail}",
+                "cancel_test_button": "İptal Et",
+                "cancelling_message": "Testler durduruluyor; prob yazdığı sektörleri geri yüklüyor...",
+                "test_cancelled_message": "Test iptal edildi.",
+                "close_after_cancel_message": "Testler durduruluyor; tamamlanınca pencere kapanacak.",
+                "test_resumed_message": "Test önceki çalıştırmanın kaldığı yerden sürdürüldü ({phase}, {offset}).",
+                "quick_genuine_message": "Hızlı ön eleme: {samples} örneğin hiçbiri bozulmadı. Kapasitesinin en az %{fraction:g}'i sahte olan bir disk bu örneklemle %{confidence:.1f} olasılıkla yakalanırdı.",
+                "quick_escalated_message": "Hızlı ön eleme: {samples} örnekten {bad} tanesi bozuldu; disk tam teste ({mode}) aktarıldı. Aşağıdaki sonuç tam testindir.",
+                "auto_start_checkbox": "Takılan diski otomatik test et",
+                "unmounting_message": "Diskin bağlı bölümleri ayrılıyor...",
+                "skip_cached_checkbox": "Yakın zamanda test edilmiş diskleri atla",
+                "cached_label": "önbellek",
+                "cached_result_message": "Önceki test sonucu ({date}): {status} Gerçek: {real_cap}, Vaadedilen: {promised_cap}",
+                "speed_label": "Hız:",
+                "speed_ok_message": "Hız testi tamamlandı: {summary}",
+                "speed_slow_warning": "Disk istenen hızın altında: {summary}",
+                "cache_cliff_warning": "Yazma hızı önbellek dolunca çöküyor: {summary}",
+                "profile_saved_message": "Yazma profili kaydedildi: {path}",
+                "profile_save_error": "Yazma profili kaydedilemedi: {detail}",
+                "progress_stream_error": "İlerleme soketi açılamadı: {detail}",
+                "metrics_server_error": "Metrik ucu açılamadı: {detail}",
+                "metrics_server_message": "Metrikler: {url}",
+                "result_cache_open_error": "Sonuç önbelleği açılamadı: {detail}",
+                "result_cache_read_error": "Önbellek okunamadı: {detail}",
+                "fingerprint_db_open_error": "Parmak izi veritabanı açılamadı: {detail}",
+                "fingerprint_assess_error": "Parmak izi değerlendirilemedi: {detail}",
+                "fingerprint_record_error": "Parmak izi kaydedilemedi: {detail}"
             },
             "en": {
                 "flash_drive_label": "Flash Drive:",
@@ -284,12 +931,90 @@ class FakeUSBTesterApp(QWidget):
                 "current_disk_info": "Current Disk Information:",
                 "capacity_mismatch_warning": "WARNING: Announced and real capacity differ!",
                 "pkexec_not_found": "Error: 'pkexec' command not found. Please ensure it is installed (usually with policykit-1 package).",
+                "helper_not_installed": "Error: The privileged helper is not installed. Run 'sudo python3 -m fakeusb.helper install' once.\nDetail: {detail}",
                 "authentication_error": "Authentication Error: You don't have permission or password was not entered to run 'f3' commands.\nPlease check pkexec and Polkit settings. Details: {detail}",
                 "test_start_message": "Starting test:",
                 "test_completed": "Test completed.",
                 "f3probe_capacity_parse_error": "Error parsing f3probe capacity warning.",
                 "no_output_found": "No output found.",
-                "icon_load_error": "Could not load icon: {path}"
+                "icon_load_error": "Could not load icon: {path}",
+                "start_all_tests_button": "Test All",
+                "tests_queued_message": "{count} drive(s) added to the test queue.",
+                "test_mode_label": "Test Type:",
+                "mode_f3probe": "f3probe (keeps data)",
+                "mode_quick": "Quick check, suspicious drives get the full probe (keeps data)",
+                "mode_probe": "Built-in probe (keeps data)",
+                "mode_verify": "Full write/verify (erases data)",
+                "mode_speed": "Speed test (erases start of drive)",
+                "mode_sustained": "Sustained write profile (erases data)",
+                "destructive_warning_title": "Data Loss Warning",
+                "destructive_warning_text": "The selected test type will erase ALL data on these drives:\n{disks}\n\nContinue?",
+                "phase_write": "Writing",
+                "phase_verify": "Verifying",
+                "phase_probe": "Searching capacity boundary",
+                "phase_quick": "Sampling random blocks",
+                "column_disk": "Drive",
+                "column_size": "Size",
+                "column_brand_model": "Brand/Model",
+                "column_status": "Status",
+                "column_detail": "Details",
+                "column_real_capacity": "Real Capacity",
+                "column_speed": "Speed",
+                "state_idle": "Not tested",
+                "region_bar_tooltip": "Good: {good}, wraparound: {wraparound}, discarded: {discarded}, untested: {untested}; {holes} hole(s) between good regions",
+                "risk_known_bad": "known fake",
+                "risk_suspect": "suspect",
+                "risk_unknown": "unknown",
+                "risk_known_clean": "known clean",
+                "risk_known_bad_message": "WARNING: This model and size has tested fake before ({fakes} fake / {genuines} genuine).",
+                "risk_suspect_message": "Caution: This model is suspect ({fakes} fake / {genuines} genuine; {controller_fakes} fake in other sizes with the same controller).",
+                "risk_known_clean_message": "This model and size has tested genuine {genuines} times before.",
+                "risk_unknown_message": "Not enough history for this model and size.",
+                "risk_typical_capacity": "Typical real capacity: {real_cap}.",
+                "risk_planned_message": "Fingerprint: {risk}; test type: {mode}, priority adjusted accordingly.",
+                "state_queued": "Queued",
+                "state_running": "Testing",
+                "state_genuine": "Genuine",
+                "state_fake": "Fake",
+                "state_done": "Done",
+                "state_slow": "Slow",
+                "state_error": "Error",
+                "state_cancelled": "Cancelled",
+                "phase_seq_write": "Measuring sequential write",
+                "phase_seq_read": "Measuring sequential read",
+                "phase_rand_read": "Measuring 4K random read",
+                "phase_rand_write": "Measuring 4K random write",
+                "probe_progress": "{phase}: {percent:.0f}%",
+                "engine_progress": "{phase}: {percent:.1f}% ({done} / {total}, {rate}/s)",
+                "verify_summary": "Write speed: {write}/s, Read speed: {read}/s, Bad area: {bad}",
+                "device_permission_error": "Error: No direct access to the device. Run the program as a privileged user. Details: {detail}",
+                "device_busy_error": "Error: The drive has mounted partitions, unmount them first: {detail}",
+                "cancel_test_button": "Cancel",
+                "cancelling_message": "Stopping tests; the probe is restoring the sectors it wrote...",
+                "test_cancelled_message": "Test cancelled.",
+                "close_after_cancel_message": "Stopping tests; the window will close when they finish.",
+                "test_resumed_message": "The test resumed where the previous run stopped ({phase}, {offset}).",
+                "quick_genuine_message": "Quick check: none of the {samples} samples were corrupted. A drive with at least {fraction:g}% fake capacity would have been caught with {confidence:.1f}% probability.",
+                "quick_escalated_message": "Quick check: {bad} of {samples} samples were corrupted; the drive was passed on to the full test ({mode}). The result below is from the full test.",
+                "auto_start_checkbox": "Automatically test inserted drives",
+                "unmounting_message": "Unmounting the drive's partitions...",
+                "skip_cached_checkbox": "Skip recently tested drives",
+                "cached_label": "cached",
+                "cached_result_message": "Previous test result ({date}): {status} Real: {real_cap}, Promised: {promised_cap}",
+                "speed_label": "Speed:",
+                "speed_ok_message": "Speed test completed: {summary}",
+                "speed_slow_warning": "Drive is slower than required: {summary}",
+                "cache_cliff_warning": "Write speed collapses once the cache is full: {summary}",
+                "profile_saved_message": "Write profile saved: {path}",
+                "profile_save_error": "Could not save the write profile: {detail}",
+                "progress_stream_error": "Could not open the progress socket: {detail}",
+                "metrics_server_error": "Could not open the metrics endpoint: {detail}",
+                "metrics_server_message": "Metrics: {url}",
+                "result_cache_open_error": "Could not open the result cache: {detail}",
+                "result_cache_read_error": "Could not read the result cache: {detail}",
+                "fingerprint_db_open_error": "Could not open the fingerprint database: {detail}",
+                "fingerprint_assess_error": "Could not assess the fingerprint: {detail}",
+                "fingerprint_record_error": "Could not record the fingerprint: {detail}"
             }
         }
 
@@ -316,22 +1041,50 @@ class FakeUSBTesterApp(QWidget):
         flash_drive_layout.addWidget(self.flash_drive_combo)
         flash_drive_selection_layout.addLayout(flash_drive_layout)
 
+        # Test türü seçimi
+        test_mode_layout = QHBoxLayout()
+        self.test_mode_label = QLabel()
+        self.test_mode_label.setFont(QFont("Arial", 10))
+        self.test_mode_combo = QComboBox()
+        self.test_mode_combo.setFont(QFont("Arial", 10))
+        for mode in MODES:
+            self.test_mode_combo.addItem(mode, mode)
+        test_mode_layout.addWidget(self.test_mode_label)
+        test_mode_layout.addWidget(self.test_mode_combo)
+        flash_drive_selection_layout.addLayout(test_mode_layout)
+
+        self.auto_start_checkbox = QCheckBox()
+        self.auto_start_checkbox.setFont(QFont("Arial", 10))
+        flash_drive_selection_layout.addWidget(self.auto_start_checkbox)
+
+        self.skip_cached_checkbox = QCheckBox()
+        self.skip_cached_checkbox.setFont(QFont("Arial", 10))
+        self.skip_cached_checkbox.setChecked(True)
+        flash_drive_selection_layout.addWidget(self.skip_cached_checkbox)
+
         # Bilgi Alanları (sol tarafta kalacak)
         info_layout = QVBoxLayout()
         self.current_disk_info_label = QLabel()
         self.brand_model_label = QLabel()
         self.promised_capacity_label = QLabel()
         self.real_capacity_label = QLabel()
+        self.speed_label = QLabel()
+        self.speed_text = None  # Seçili diskin son hız özeti; dil değişiminde yeniden yazılır
+        self.region_bar = RegionBar()
+        self.region_maps = {}  # Disk yolu -> bu oturumdaki son testin bölge haritası
 
         self.current_disk_info_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
         self.brand_model_label.setFont(QFont("Arial", 10))
         self.promised_capacity_label.setFont(QFont("Arial", 10))
         self.real_capacity_label.setFont(QFont("Arial", 10))
+        self.speed_label.setFont(QFont("Arial", 10))
 
         info_layout.addWidget(self.current_disk_info_label)
         info_layout.addWidget(self.brand_model_label)
         info_layout.addWidget(self.promised_capacity_label)
         info_layout.addWidget(self.real_capacity_label)
+        info_layout.addWidget(self.region_bar)
+        info_layout.addWidget(self.speed_label)
         flash_drive_selection_layout.addLayout(info_layout)
 
         top_section_layout.addLayout(flash_drive_selection_layout)  # Sol tarafı ana yatay düzene ekle
@@ -345,6 +1098,25 @@ class FakeUSBTesterApp(QWidget):
 
         main_layout.addLayout(top_section_layout)  # En üstteki ana yatay düzeni ekle
 
+        # Pano: her disk bir satır; yalnızca durumu değişen satırlar yeniden çizilir
+        self.drive_model = DriveTableModel(self.tr, self.icon_cache, parent=self)
+        self.drive_table = QTableView()
+        self.drive_table.setModel(self.drive_model)
+        self.drive_table.setFont(QFont("Arial", 9))
+        self.drive_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.drive_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.drive_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.drive_table.setIconSize(self.drive_model.icon_size)
+        self.drive_table.setWordWrap(False)
+        self.drive_table.verticalHeader().setVisible(False)
+        # Sabit satır yüksekliği ve sütun genişlikleri: her değişiklikte içerik ölçülmez
+        self.drive_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.drive_table.verticalHeader().setDefaultSectionSize(DASHBOARD_ROW_HEIGHT)
+        self.drive_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.drive_table.horizontalHeader().setStretchLastSection(True)
+        self.drive_table.selectionModel().currentRowChanged.connect(self._on_table_row_selected)
+        main_layout.addWidget(self.drive_table)
+
         # Durum Alanı
         status_group_box = QFrame()
         status_group_box.setFrameShape(QFrame.Shape.StyledPanel)
@@ -354,7 +1126,7 @@ class FakeUSBTesterApp(QWidget):
         self.status_title_label = QLabel()
         self.status_text_edit.setFont(QFont("Arial", 9))
         self.status_text_edit.setReadOnly(True)
-        self.status_text_edit.setText(self.tr("initial_status"))
+        self.log_sink.set_text(self.tr("initial_status"))
 
         status_layout.addWidget(self.status_title_label)
         status_layout.addWidget(self.status_text_edit)
@@ -366,8 +1138,17 @@ class FakeUSBTesterApp(QWidget):
         self.start_test_button = QPushButton()
         self.start_test_button.setFont(QFont("Arial", 10))
         self.start_test_button.clicked.connect(self._start_test)
+        self.start_all_tests_button = QPushButton()
+        self.start_all_tests_button.setFont(QFont("Arial", 10))
+        self.start_all_tests_button.clicked.connect(self._start_all_tests)
+        self.cancel_test_button = QPushButton()
+        self.cancel_test_button.setFont(QFont("Arial", 10))
+        self.cancel_test_button.setEnabled(False)
+        self.cancel_test_button.clicked.connect(self._cancel_tests)
 
         button_layout.addWidget(self.start_test_button)
+        button_layout.addWidget(self.start_all_tests_button)
+        button_layout.addWidget(self.cancel_test_button)
         main_layout.addLayout(button_layout)
 
         # Yardımcı Butonlar
@@ -405,57 +1186,42 @@ class FakeUSBTesterApp(QWidget):
 
         return None
 
-    def _set_icon_to_label(self, icon_path):
-        """Verilen yoldaki ikonu icon_label'a yükler ve ayarlar."""
-        if icon_path:
-            scaled_size = QSize(ICON_TARGET_WIDTH, ICON_TARGET_HEIGHT)
-
-            if icon_path.lower().endswith(".gif"):
-                if hasattr(self, '_current_movie') and self._current_movie is not None:
-                    self._current_movie.stop()
-                    self._current_movie = None
-
-                movie = QMovie(icon_path)
-                if movie.isValid():
-                    self.icon_label.setScaledContents(True)
-                    self.icon_label.setFixedSize(scaled_size)
-
-                    # Bu satır şimdi aktiftir ve GIF'in pürüzsüzlüğünü sağlamalıdır.
-                    movie.setScaledSize(scaled_size)
-
+    @trace.traced()
+    def _set_icon_to_label(self, icon_name):
+        """Verilen ikonu icon_label'a ayarlar; ikonlar IconCache'ten gelir, diskten yeniden okunmaz."""
+        scaled_size = QSize(ICON_TARGET_WIDTH, ICON_TARGET_HEIGHT)
+        self.icon_label.setScaledContents(True)
+        self.icon_label.setFixedSize(scaled_size)
+        if icon_name == SCANNING_ICON:
+            movie = self.icon_cache.scanning_movie()
+            if movie.isValid():
+                if self._current_movie is not movie:
                     self.icon_label.setMovie(movie)
-                    movie.start()
                     self._current_movie = movie
-                    QApplication.processEvents()
-                else:
-                    self.status_text_edit.append(self.tr("icon_load_error").format(path=icon_path))
-                    self.icon_label.clear()
-            else:
-                if hasattr(self, '_current_movie') and self._current_movie is not None:
-                    self._current_movie.stop()
-                    self._current_movie = None
-
-                pixmap = QPixmap(icon_path)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(scaled_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                    self.icon_label.setPixmap(scaled_pixmap)
-                    self.icon_label.setFixedSize(scaled_size)
-                    self.icon_label.setScaledContents(True)
-                else:
-                    self.status_text_edit.append(self.tr("icon_load_error").format(path=icon_path))
-                    self.icon_label.clear()
-        else: # Bu 'else' bloğu 'if icon_path:' bloğuna aittir ve şimdi doğru yerdedir.
-            self.icon_label.clear()
-
+                movie.start()
+                return
+        else:
+            pixmap = self.icon_cache.pixmap(icon_name, scaled_size)
+            if not pixmap.isNull():
+                self.icon_label.setPixmap(pixmap)
+                self._current_movie = None
+                return
+        self.log_sink.info(self.tr("icon_load_error").format(path=icon_name))
+        self.icon_label.clear()
+        self._current_movie = None
 
     def _set_initial_icon(self):
         """Başlangıç ikonunu yükler ve ayarlar."""
-        icon_path = self.icon_paths.get("flashicon.png")
-        self._set_icon_to_label(icon_path)
+        self._set_icon_to_label("flashicon.png")
 
     def update_ui_language(self):
         """Mevcut dile göre tüm UI elemanlarının metinlerini günceller."""
         self.flash_drive_label.setText(self.tr("flash_drive_label"))
+        self.test_mode_label.setText(self.tr("test_mode_label"))
+        self.auto_start_checkbox.setText(self.tr("auto_start_checkbox"))
+        self.skip_cached_checkbox.setText(self.tr("skip_cached_checkbox"))
+        for index in range(self.test_mode_combo.count()):
+            self.test_mode_combo.setItemText(index, self.tr(f"mode_{self.test_mode_combo.itemData(index)}"))
         self.current_disk_info_label.setText(self.tr("current_disk_info"))
 
         current_brand_text = self.brand_model_label.text()
@@ -516,6 +1282,8 @@ class FakeUSBTesterApp(QWidget):
                 self.real_capacity_label.setText(f"{self.tr('real_capacity_label')} {self.tr('not_tested')}")
 
 
+        self._set_speed_text(self.speed_text)
+
         self.status_title_label.setText(self.tr("status_label"))
         current_status_text = self.status_text_edit.toPlainText()
 
@@ -529,21 +1297,24 @@ class FakeUSBTesterApp(QWidget):
            current_status_text == en_initial_status or \
            current_status_text == tr_info_reset_message or \
            current_status_text == en_info_reset_message:
-            self.status_text_edit.setText(self.tr("initial_status"))
+            self.log_sink.set_text(self.tr("initial_status"))
         elif self.tr("current_disk_info") in current_status_text or \
              self.translations.get("en", {}).get("current_disk_info") in current_status_text:
             selected_text = self.flash_drive_combo.currentText()
             if self.tr("select_drive_placeholder") not in selected_text and selected_text:
-                self.status_text_edit.setText(f"{self.tr('current_disk_info')}\n{selected_text}")
+                self.log_sink.set_text(f"{self.tr('current_disk_info')}\n{selected_text}")
             else:
-                self.status_text_edit.setText(self.tr("initial_status"))
+                self.log_sink.set_text(self.tr("initial_status"))
 
 
         if self.flash_drive_combo.count() == 0:
              self.flash_drive_combo.setPlaceholderText(self.tr("select_drive_placeholder"))
 
         self.start_test_button.setText(self.tr("start_test_button"))
+        self.start_all_tests_button.setText(self.tr("start_all_tests_button"))
+        self.cancel_test_button.setText(self.tr("cancel_test_button"))
         self.about_button.setText(self.tr("about_button"))
+        self.drive_model.retranslate()
 
 
     def _toggle_language(self):
@@ -552,80 +1323,195 @@ class FakeUSBTesterApp(QWidget):
         self.update_ui_language()
         self._on_disk_selected()
         if not self.is_processing:
-             self.status_text_edit.setText(self.tr("initial_status"))
+             self.log_sink.set_text(self.tr("initial_status"))
 
     def _show_about_dialog(self):
         """Hakkında penceresini gösterir."""
         QMessageBox.about(self, self.tr("about_title"), self.tr("about_text"))
 
     def _load_disks(self):
-        """Sistemdeki çıkarılabilir diskleri listeler (Linux için)."""
+        """Sistemdeki çıkarılabilir diskleri arka planda listeler (Linux için)."""
+        if self.disk_enumerator is not None and self.disk_enumerator.isRunning():
+            return
         self.flash_drive_combo.clear()
+        self.drive_model.clear()
+
+        self.disk_enumerator = DiskEnumerator(self.device_index)
+        self.disk_enumerator.disk_found.connect(self._on_disk_found)
+        self.disk_enumerator.listing_done.connect(self._on_disk_listing_done)
+        self.disk_enumerator.failed.connect(self._on_disk_loading_failed)
+        self.disk_enumerator.start()
+
+    def _on_disk_found(self, disk_path, disk_size_hr):
+        """Arka plandan gelen her diski combobox'a ve panoya ekler."""
+        if self._find_disk_index(disk_path) >= 0:
+            return
+        self.drive_model.add_drive(disk_path, disk_size_hr, self._disk_metadata(disk_path, "brand_model"))
+        risk = self._assess_disk(disk_path)
+        if risk is not None and risk.level in (RISK_KNOWN_BAD, RISK_SUSPECT):
+            # Bilinen sahte parmak izi test beklenmeden işaretlenir
+            warning = self._risk_text(risk)
+            self.drive_model.update(disk_path, detail=warning)
+            self.log_sink.error(f"[{disk_path}] {warning}")
+        placeholder_index = self.flash_drive_combo.findText(self.tr("select_drive_placeholder"))
+        if placeholder_index >= 0:
+            self.flash_drive_combo.removeItem(placeholder_index)
+        self.flash_drive_combo.addItem(f"{disk_path} ({disk_size_hr})")
+        if self.flash_drive_combo.count() == 1:
+            self.flash_drive_combo.setCurrentIndex(0)
+
+    def _find_disk_index(self, disk_path):
+        """Diskin combobox'taki sırasını döndürür; yoksa -1."""
+        for index in range(self.flash_drive_combo.count()):
+            if self.flash_drive_combo.itemText(index).split(" ")[0] == disk_path:
+                return index
+        return -1
+
+    def _on_disk_hotplugged(self, disk_path, disk_size_hr):
+        """Yeni takılan diski listeye ekler; istenirse testini kuyruğa alır."""
+        self.log_sink.debug(lambda: f"Disk takıldı: {disk_path}")
+        self._on_disk_found(disk_path, disk_size_hr)
+        if self.auto_start_checkbox.isChecked():
+            self._queue_tests([disk_path], unmount_first=True)
+
+    def _on_disk_unplugged(self, disk_path):
+        """Çıkarılan diski listeden kaldırır."""
+        self.log_sink.debug(lambda: f"Disk çıkarıldı: {disk_path}")
+        self.event_bus.forget(disk_path)
+        self.drive_model.remove_drive(disk_path)
+        index = self._find_disk_index(disk_path)
+        if index >= 0:
+            self.flash_drive_combo.removeItem(index)
+        if self.flash_drive_combo.count() == 0:
+            self.flash_drive_combo.addItem(self.tr("select_drive_placeholder"))
+
+    def _on_disk_listing_done(self, disk_count):
+        """Disk listesi tamamlandığında çalışır."""
+        if disk_count == 0:
+            self.flash_drive_combo.addItem(self.tr("select_drive_placeholder"))
+        self.log_sink.debug(lambda: f"Diskler yüklendi ({(time.monotonic() - STARTUP_TIME) * 1000:.1f} ms).")
+
+    def _disk_metadata(self, disk_path, key):
+        """Disk dizininden tek bir alanı döndürür; disk dizinde yoksa None."""
+        metadata = self.device_index.get(disk_path)
+        return metadata.get(key) if metadata else None
+
+    def _start_progress_stream(self):
+        """İlerleme akışı soketini açar; açılamazsa testler akışsız devam eder."""
+        stream = ProgressStreamServer(self.event_bus)
         try:
-            result = subprocess.run(["lsblk", "--json", "-b"],
-                                    capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
-
-            disks = []
-            for block_device in data.get("blockdevices", []):
-                if block_device.get("type") == "disk" and block_device.get("rm") is True:
-                    name = "/dev/" + block_device.get("name")
-                    size_bytes = int(block_device.get("size", 0))
-                    size_human_readable = self._bytes_to_human_readable(size_bytes)
-
-                    mountpoint = block_device.get("mountpoint", None)
-
-                    if mountpoint is None or (mountpoint != "/" and not mountpoint.startswith("/boot")):
-                        if not name.startswith("/dev/loop") and \
-                           not name.startswith("/dev/ram") and \
-                           not name.startswith("/dev/md"):
-                            disks.append((name, size_human_readable))
-
-            if not disks:
-                self.flash_drive_combo.addItem(self.tr("select_drive_placeholder"))
-            else:
-                for disk_path, disk_size_hr in disks:
-                    self.flash_drive_combo.addItem(f"{disk_path} ({disk_size_hr})")
-
-                if self.flash_drive_combo.count() > 0:
-                    self.flash_drive_combo.setCurrentIndex(0)
-            print("DEBUG (TERMINAL): Diskler yüklendi.") # YENİ DEBUG
-
-        except FileNotFoundError:
-            self.status_text_edit.append(self.tr("Hata: lsblk komutu bulunamadı. Lütfen yüklü olduğundan emin olun."))
-            print("DEBUG (TERMINAL): lsblk FileNotFoundError.") # YENİ DEBUG
-        except subprocess.CalledProcessError as e:
-            self.status_text_edit.append(f"{self.tr('disk_loading_error')} {e.stderr}")
-            print(f"DEBUG (TERMINAL): lsblk CalledProcessError: {e.stderr}") # YENİ DEBUG
-        except json.JSONDecodeError:
-            self.status_text_edit.append(self.tr("Hata: lsblk çıktısı JSON olarak ayrıştırılamadı."))
-            print("DEBUG (TERMINAL): lsblk JSONDecodeError.") # YENİ DEBUG
+            stream.start()
+        except OSError as e:
+            self.log_sink.warning(self.tr("progress_stream_error").format(detail=e))
+            return None
+        self.log_sink.debug(lambda: f"İlerleme akışı: {stream.socket_path}")
+        return stream
+
+    def _start_metrics_server(self):
+        """FAKE_USB_TESTER_METRICS_PORT verildiyse metrik ucunu açar."""
+        if not METRICS_PORT:
+            return None
+        try:
+            server = MetricsServer(int(METRICS_PORT))
+        except (OSError, ValueError) as e:
+            self.log_sink.warning(self.tr("metrics_server_error").format(detail=e))
+            return None
+        server.start()
+        self.log_sink.info(self.tr("metrics_server_message").format(url=f"http://127.0.0.1:{server.port}/metrics"))
+        return server
+
+    def _open_result_cache(self):
+        """Sonuç önbelleğini açar; açılamazsa önbelleksiz devam edilir."""
+        try:
+            return ResultCache(ttl_seconds=RESULT_CACHE_TTL_DAYS * 24 * 3600)
         except Exception as e:
-            self.status_text_edit.append(f"{self.tr('disk_loading_error')} {e}")
-            print(f"DEBUG (TERMINAL): Unexpected error in _load_disks: {e}") # YENİ DEBUG
+            self.log_sink.warning(self.tr("result_cache_open_error").format(detail=e))
+            return None
+
+    def _open_fingerprint_db(self):
+        """Parmak izi veritabanını açar; açılamazsa diskler değerlendirilmeden test edilir."""
+        try:
+            return FingerprintDB()
+        except Exception as e:
+            self.log_sink.warning(self.tr("fingerprint_db_open_error").format(detail=e))
+            return None
+
+    def _assess_disk(self, disk_path):
+        """Diskin parmak izi risk değerlendirmesini döndürür; veritabanı ya da meta veri yoksa None."""
+        metadata = self.device_index.get(disk_path)
+        if self.fingerprints is None or metadata is None:
+            return None
+        try:
+            return self.fingerprints.assess(metadata)
+        except Exception as e:
+            self.log_sink.warning(self.tr("fingerprint_assess_error").format(detail=e))
+            return None
+
+    def _risk_text(self, risk):
+        text = self.tr(f"risk_{risk.level}_message").format(fakes=risk.fake_count, genuines=risk.genuine_count,
+                                                             controller_fakes=risk.controller_fake_count)
+        if risk.typical_real_bytes:
+            text += " " + self.tr("risk_typical_capacity").format(
+                real_cap=devices.bytes_to_human_readable(risk.typical_real_bytes))
+        return text
+
+    def _cached_result(self, disk_path):
+        """Disk için geçerli önbellek sonucunu (ProbeResult, tested_at) döndürür; yoksa None."""
+        identity = self._disk_metadata(disk_path, "identity")
+        if self.result_cache is None or not identity:
+            return None
+        try:
+            return self.result_cache.get(identity)
+        except Exception as e:
+            self.log_sink.warning(self.tr("result_cache_read_error").format(detail=e))
+            return None
+
+    def _cached_result_text(self, cached):
+        result, tested_at = cached
+        return self.tr("cached_result_message").format(
+            date=time.strftime("%Y-%m-%d %H:%M", time.localtime(tested_at)),
+            status=self.tr(VERDICT_MESSAGE_KEYS.get(result.verdict, "test_completed")),
+            real_cap=result.real_capacity or self.tr("not_detected"),
+            promised_cap=result.promised_capacity or self.tr("not_detected"))
+
+    def _show_cached_result(self, disk_path):
+        """Seçili disk daha önce test edildiyse sonucu önbellekten hemen gösterir."""
+        cached = self._cached_result(disk_path)
+        if cached is None:
+            return
+        result, _ = cached
+        if result.real_capacity:
+            self.real_capacity_label.setText(
+                f"{self.tr('real_capacity_label')} {result.real_capacity} ({self.tr('cached_label')})")
+        if disk_path not in self.region_maps and "regions" in result.details:
+            self._show_region_map(result.details["regions"])
+        if result.is_fake:
+            self.log_sink.error(self._cached_result_text(cached))
+        else:
+            self.log_sink.success(self._cached_result_text(cached))
+
+    def _on_disk_loading_failed(self, error):
+        """Disk listeleme hatasını durum alanına yazar."""
+        self.log_sink.warning(f"{self.tr('disk_loading_error')} {error}")
 
         if self.flash_drive_combo.count() == 0:
             self.flash_drive_combo.setPlaceholderText(self.tr("select_drive_placeholder"))
 
     def _bytes_to_human_readable(self, num_bytes):
         """Bayt cinsinden boyutu okunabilir KB, MB, GB, TB formatına çevirir."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if num_bytes < 1024.0:
-                return f"{num_bytes:.2f} {unit}"
-            num_bytes /= 1024.0
-        return f"{num_bytes:.2f} PB"
+        return devices.bytes_to_human_readable(num_bytes)
 
 
     def _on_disk_selected(self):
         """Disk combobox'tan bir disk seçildiğinde çalışır."""
         self._reset_info_labels() # Bu metod tüm alanları sıfırlar, sonra yeniden dolduracağız.
         selected_text = self.flash_drive_combo.currentText()
-        print(f"DEBUG (TERMINAL): _on_disk_selected çalıştı. Seçilen metin: '{selected_text}'") # YENİ DEBUG
+        self.log_sink.debug(lambda: f"_on_disk_selected çalıştı. Seçilen metin: '{selected_text}'")
 
         if not selected_text or self.tr("select_drive_placeholder") in selected_text:
-            self.status_text_edit.setText(self.tr("initial_status"))
+            self.log_sink.set_text(self.tr("initial_status"))
             self._set_initial_icon()
-            print("DEBUG (TERMINAL): Disk seçimi yok veya yer tutucu.") # YENİ DEBUG
+            self.log_sink.debug("Disk seçimi yok veya yer tutucu.")
             return
 
         try:
@@ -633,87 +1519,53 @@ class FakeUSBTesterApp(QWidget):
             self.promised_capacity_label.setText(f"{self.tr('promised_capacity_label')} {disk_size_str}")
         except IndexError:
             self.promised_capacity_label.setText(f"{self.tr('promised_capacity_label')} {self.tr('not_detected')}")
-            print("DEBUG (TERMINAL): Vaadedilen kapasite ayrıştırılamadı.") # YENİ DEBUG
+            self.log_sink.debug("Vaadedilen kapasite ayrıştırılamadı.")
 
         disk_path = selected_text.split(" ")[0]
-        self.status_text_edit.append(f"DEBUG: Seçilen disk yolu: {disk_path}")
-        print(f"DEBUG (TERMINAL): Seçilen disk yolu: {disk_path}") # YENİ DEBUG
+        self.log_sink.debug(lambda: f"Seçilen disk yolu: {disk_path}")
+        row = self.drive_model.row_for(disk_path)
+        if row is not None:
+            self.drive_table.selectRow(row)
+
+        # Marka/model dizinden okunur; udevadm süreci başlatılmaz
+        self._show_brand_model(self._disk_metadata(disk_path, "brand_model"))
 
-        brand_model_info = self._get_disk_vendor_product(disk_path)
-        self.status_text_edit.append(f"DEBUG: _get_disk_vendor_product'tan alınan: '{brand_model_info}'")
-        print(f"DEBUG (TERMINAL): _get_disk_vendor_product'tan alınan: '{brand_model_info}'") # YENİ DEBUG
+        self.log_sink.info(f"{self.tr('current_disk_info')}\n{selected_text}")
+        self._show_region_map(self.region_maps.get(disk_path))
+        self._show_cached_result(disk_path)
+        self._set_initial_icon()
+
+    def _show_region_map(self, data):
+        """Seçili diskin bölge haritasını çubukta gösterir; ayrıntılar ipucundadır."""
+        if data is None:
+            self.region_bar.set_regions(None)
+            return
+        regions = RegionMap.from_dict(data)
+        totals = {kind: devices.bytes_to_human_readable(size) for kind, size in regions.totals().items()}
+        self.region_bar.set_regions(regions, self.tr("region_bar_tooltip").format(holes=regions.holes(), **totals))
+
+    def _update_region_map(self, data):
+        disk_path = self._sender_disk_path()
+        self.region_maps[disk_path] = data
+        if self._is_selected_disk(disk_path):
+            self._show_region_map(data)
+
+    def _on_table_row_selected(self, current, previous):
+        """Panoda seçilen diski combobox'ta da seçer (testler sürerken seçim değiştirilmez)."""
+        if self.is_processing:
+            return
+        index = self._find_disk_index(self.drive_model.disk_at(current.row()))
+        if index >= 0 and index != self.flash_drive_combo.currentIndex():
+            self.flash_drive_combo.setCurrentIndex(index)
 
+    def _show_brand_model(self, brand_model_info):
+        """Marka/Model etiketini günceller."""
         if brand_model_info:
             self.brand_model_label.setText(f"{self.tr('brand_model_label')} {brand_model_info}")
-            print(f"DEBUG (TERMINAL): Marka/Model etiketi güncellendi: {brand_model_info}") # YENİ DEBUG
+            self.log_sink.debug(lambda: f"Marka/Model etiketi güncellendi: {brand_model_info}")
         else:
             self.brand_model_label.setText(f"{self.tr('brand_model_label')} {self.tr('not_detected')}")
-            print("DEBUG (TERMINAL): Marka/Model tespit edilemedi.") # YENİ DEBUG
-
-        self.status_text_edit.append(f"{self.tr('current_disk_info')}\n{selected_text}")
-        self._set_initial_icon()
-
-    def _get_disk_vendor_product(self, disk_path):
-        """Diskin marka/model bilgilerini udevadm kullanarak almaya çalışır."""
-        self.status_text_edit.append(f"DEBUG: _get_disk_vendor_product çalıştırılıyor: {disk_path}")
-        print(f"DEBUG (TERMINAL): _get_disk_vendor_product çalıştırılıyor: {disk_path}") # YENİ DEBUG
-        try:
-            result = subprocess.run(["udevadm", "info", "-q", "property", "-n", disk_path],
-                                    capture_output=True, text=True, check=True)
-
-            self.status_text_edit.append(f"DEBUG: udevadm ham çıktı:\n{result.stdout}")
-            print(f"DEBUG (TERMINAL): udevadm ham çıktı:\n{result.stdout}") # YENİ DEBUG
-
-            vendor = None
-            model = None
-
-            for line in result.stdout.splitlines():
-                if line.startswith("ID_VENDOR_FROM_DATABASE="):
-                    vendor = line.split("=")[1].strip()
-                elif line.startswith("ID_MODEL_FROM_DATABASE="):
-                    model = line.split("=")[1].strip()
-                elif line.startswith("ID_VENDOR=") and vendor is None:
-                    vendor = line.split("=")[1].strip()
-                elif line.startswith("ID_MODEL=") and model is None:
-                    model = line.split("=")[1].strip()
-                # Ek kontrol: Eğer önceki satırlardan alınmadıysa ve ID_VENDOR_ENC varsa
-                elif line.startswith("ID_VENDOR_ENC=") and vendor is None:
-                    vendor = line.split("=")[1].strip()
-                # Ek kontrol: Eğer önceki satırlardan alınmadıysa ve ID_MODEL_ENC varsa
-                elif line.startswith("ID_MODEL_ENC=") and model is None:
-                    model = line.split("=")[1].strip()
-
-            info_parts = []
-            if vendor:
-                info_parts.append(vendor)
-            if model:
-                info_parts.append(model)
-
-            self.status_text_edit.append(f"DEBUG: Ayrıştırılan Vendor: {vendor}, Model: {model}")
-            print(f"DEBUG (TERMINAL): Ayrıştırılan Vendor: {vendor}, Model: {model}") # YENİ DEBUG
-
-            if info_parts:
-                final_info = " ".join(info_parts)
-                self.status_text_edit.append(f"DEBUG: Döndürülen marka/model: {final_info}")
-                print(f"DEBUG (TERMINAL): Döndürülen marka/model: {final_info}") # YENİ DEBUG
-                return final_info
-
-            self.status_text_edit.append("DEBUG: Marka/Model bulunamadı, None döndürüldü.")
-            print("DEBUG (TERMINAL): Marka/Model bulunamadı, None döndürüldü.") # YENİ DEBUG
-            return None
-
-        except FileNotFoundError:
-            self.status_text_edit.append(f"<font color='red'>Hata: udevadm bulunamadı veya PATH'te değil.</font>")
-            print(f"DEBUG (TERMINAL): Hata: udevadm bulunamadı veya PATH'te değil.") # YENİ DEBUG
-            return None
-        except subprocess.CalledProcessError as e:
-            self.status_text_edit.append(f"<font color='red'>Hata: udevadm komutu başarısız oldu: {e.stderr}</font>")
-            print(f"DEBUG (TERMINAL): Hata: udevadm komutu başarısız oldu: {e.stderr}") # YENİ DEBUG
-            return None
-        except Exception as e:
-            self.status_text_edit.append(f"<font color='red'>Hata: udevadm işlenirken beklenmeyen hata: {e}</font>")
-            print(f"DEBUG (TERMINAL): Hata: udevadm işlenirken beklenmeyen hata: {e}") # YENİ DEBUG
-            return None
+            self.log_sink.debug("Marka/Model tespit edilemedi.")
 
     def _get_selected_disk_path(self):
         """Seçili diskin /dev/sdX yolunu döndürür."""
@@ -734,15 +1586,20 @@ class FakeUSBTesterApp(QWidget):
         """GUI butonlarını işlem durumuna göre etkinleştirir/devre dışı bırakır."""
         self.is_processing = processing
         self.start_test_button.setEnabled(not processing)
+        self.start_all_tests_button.setEnabled(not processing)
+        self.cancel_test_button.setEnabled(processing)
         self.language_button.setEnabled(not processing)
         self.about_button.setEnabled(not processing)
         self.flash_drive_combo.setEnabled(not processing)
+        self.test_mode_combo.setEnabled(not processing)
 
         if processing:
-            scanning_icon_path = self.icon_paths.get("flashicon_scanning.gif")
-            self._set_icon_to_label(scanning_icon_path)
+            self._set_icon_to_label(SCANNING_ICON)
         else:
-            pass
+            if self._current_movie is not None:
+                # Seçili disk için sonuç gelmediyse tarama animasyonunu durdur
+                self._set_initial_icon()
+            self.icon_cache.scanning_movie().stop()
 
 
     def _reset_info_labels(self):
@@ -753,6 +1610,13 @@ class FakeUSBTesterApp(QWidget):
         self.brand_model_label.setText(f"{self.tr('brand_model_label')} {self.tr('not_detected')}")
         self.promised_capacity_label.setText(f"{self.tr('promised_capacity_label')} {self.tr('not_detected')}")
         self.real_capacity_label.setText(f"{self.tr('real_capacity_label')} {self.tr('not_tested')}")
+        self._set_speed_text(None)
+        self.region_bar.set_regions(None)
+
+    def _set_speed_text(self, summary):
+        """Hız etiketini günceller; summary None ise disk henüz ölçülmemiştir."""
+        self.speed_text = summary
+        self.speed_label.setText(f"{self.tr('speed_label')} {summary or self.tr('not_tested')}")
 
 
     def _start_test(self):
@@ -764,91 +1628,266 @@ class FakeUSBTesterApp(QWidget):
         if not disk_path:
             return
 
+        self.log_sink.debug("Test başlatma butonu tıklandı.")
+        self._queue_tests([disk_path])
+
+    def _start_all_tests(self):
+        """Listedeki tüm diskleri test kuyruğuna ekler."""
+        if self.is_processing:
+            return
+
+        disk_paths = self._listed_disk_paths()
+        if not disk_paths:
+            QMessageBox.warning(self, self.tr("select_drive_warning_title"), self.tr("select_drive_warning_text"))
+            return
+
+        self.log_sink.debug(lambda: f"Tümünü test et: {disk_paths}")
+        self._queue_tests(disk_paths)
+
+    def _cancel_tests(self):
+        """Kuyruktaki ve süren tüm testleri durdurur; sonuçları worker'lardan hata olarak gelir."""
+        if not self.workers:
+            return
+        self.log_sink.debug(lambda: f"Testler iptal ediliyor: {list(self.workers)}")
+        self.cancel_test_button.setEnabled(False)
+        self.log_sink.info(self.tr("cancelling_message"))
+        for worker in list(self.workers.values()):
+            worker.cancel()
+
+    def _listed_disk_paths(self):
+        """Combobox'taki tüm disklerin /dev/sdX yollarını döndürür."""
+        disk_paths = []
+        for index in range(self.flash_drive_combo.count()):
+            item_text = self.flash_drive_combo.itemText(index)
+            disk_path = item_text.split(" ")[0]
+            if disk_path.startswith("/dev/"):
+                disk_paths.append(disk_path)
+        return disk_paths
+
+    def _confirm_destructive_test(self, mode, disk_paths):
+        """Yıkıcı test türlerinde kullanıcıdan onay alır."""
+        if mode not in DESTRUCTIVE_MODES:
+            return True
+        message_box = QMessageBox(QMessageBox.Icon.Warning, self.tr("destructive_warning_title"),
+                                  self.tr("destructive_warning_text").format(disks="\n".join(disk_paths)), parent=self)
+        yes_button = message_box.addButton(self.tr("yes_button"), QMessageBox.ButtonRole.YesRole)
+        no_button = message_box.addButton(self.tr("no_button"), QMessageBox.ButtonRole.NoRole)
+        message_box.setDefaultButton(no_button)
+        message_box.exec_()
+        return message_box.clickedButton() == yes_button
+
+    def _queue_tests(self, disk_paths, unmount_first=False):
+        """Verilen diskler için F3Worker oluşturur ve zamanlayıcıya gönderir."""
+        mode = self.test_mode_combo.currentData()
+        if self.skip_cached_checkbox.isChecked() and (len(disk_paths) > 1 or unmount_first):
+            # Toplu ve otomatik testlerde yakın zamanda test edilmiş diskler atlanır
+            disk_paths = self._skip_cached_disks(disk_paths)
+            if not disk_paths:
+                return
+        if not self._confirm_destructive_test(mode, disk_paths):
+            return
+
+        if self.is_processing:
+            # Testler sürerken (ör. yeni takılan disk) durum alanı temizlenmeden kuyruğa eklenir
+            self.multi_test_mode = True
+            self._start_workers(disk_paths, mode, unmount_first)
+            return
+
         self._set_processing_state(True)
-        
+        self.multi_test_mode = len(disk_paths) > 1
+
         # Sadece gerçek kapasite bilgisini test başlangıcında sıfırla
         self.real_capacity_label.setText(f"{self.tr('real_capacity_label')} {self.tr('not_tested')}")
 
         # Durum penceresini temizle ve mevcut disk bilgisini tekrar ekle
-        self.status_text_edit.clear()
+        self.log_sink.clear()
         selected_disk_text = self.flash_drive_combo.currentText()
-        if selected_disk_text and self.tr("select_drive_placeholder") not in selected_disk_text:
-            self.status_text_edit.append(f"{self.tr('current_disk_info')}\n{selected_disk_text}\n")
-        self.status_text_edit.append(self.tr("processing_message"))
-        print("DEBUG (TERMINAL): Test başlatma butonu tıklandı.") # YENİ DEBUG
-
-
-        if hasattr(self, 'worker') and self.worker.isRunning():
-            self.worker.quit()
-            self.worker.wait()
-
-        self.worker = F3Worker(disk_path, self.translations, self.current_language_index)
-        self.worker.finished.connect(self._test_finished)
-        self.worker.progress.connect(self._update_status_text)
-        self.worker.error.connect(self._test_error)
-        self.worker.f3probe_result.connect(self._update_f3probe_results)
-        self.worker.start()
+        if len(disk_paths) == 1 and selected_disk_text and self.tr("select_drive_placeholder") not in selected_disk_text:
+            self.log_sink.info(f"{self.tr('current_disk_info')}\n{selected_disk_text}\n")
+        elif len(disk_paths) > 1:
+            self.log_sink.info(self.tr("tests_queued_message").format(count=len(disk_paths)))
+        self.log_sink.info(self.tr("processing_message"))
+        self._start_workers(disk_paths, mode, unmount_first)
+
+    def _skip_cached_disks(self, disk_paths):
+        """Geçerli önbellek sonucu olan diskleri sonucu yazarak listeden çıkarır."""
+        remaining = []
+        for disk_path in disk_paths:
+            cached = self._cached_result(disk_path)
+            if cached is None:
+                remaining.append(disk_path)
+                continue
+            message = f"[{disk_path}] {self._cached_result_text(cached)}"
+            self.drive_model.update(disk_path, state=DRIVE_STATE_FAKE if cached[0].is_fake else DRIVE_STATE_GENUINE,
+                                    detail=self._cached_result_text(cached), real_capacity=cached[0].real_capacity)
+            if cached[0].is_fake:
+                self.log_sink.error(message)
+            else:
+                self.log_sink.success(message)
+        return remaining
+
+    def _start_workers(self, disk_paths, mode, unmount_first):
+        """Her disk için bir F3Worker oluşturup zamanlayıcıya gönderir."""
+        for disk_path in disk_paths:
+            if disk_path in self.workers:
+                continue
+            disk_mode, priority = mode, PRIORITY_NORMAL
+            risk = self._assess_disk(disk_path)
+            if risk is not None:
+                # Bilinen sahteler kuyruğun önüne, bilinen temizler hızlı ön elemeye
+                disk_mode, priority = plan_test(risk, mode)
+                if disk_mode != mode or priority != PRIORITY_NORMAL:
+                    self.log_sink.info(f"[{disk_path}] " + self.tr("risk_planned_message").format(
+                        risk=self.tr(f"risk_{risk.level}"), mode=self.tr(f"mode_{disk_mode}")))
+            worker = F3Worker(disk_path, self.translations, self.current_language_index, disk_mode, unmount_first,
+                              self._disk_metadata(disk_path, "identity"), self.result_cache,
+                              self.privileged_helper, self.event_bus, self.device_index.get(disk_path),
+                              self.fingerprints, self.log_sink)
+            worker.finished.connect(self._test_finished)
+            worker.progress.connect(self._update_status_text)
+            worker.error.connect(self._test_error)
+            worker.f3probe_result.connect(self._update_f3probe_results)
+            worker.speed_result.connect(self._update_speed_results)
+            worker.regions_result.connect(self._update_region_map)
+            worker.done.connect(self._on_worker_done)
+            worker.test_started.connect(self._on_test_started)
+            worker.phase_progress.connect(self._on_phase_progress)
+            self.workers[disk_path] = worker
+            self.drive_model.update(disk_path, state=DRIVE_STATE_QUEUED, detail=None, real_capacity=None, speed=None)
+            self.scheduler.submit(disk_path, worker.run, priority)
+
+    def _sender_disk_path(self):
+        """Sinyali gönderen worker'ın disk yolunu döndürür."""
+        return getattr(self.sender(), "disk_path", None)
+
+    def _message_prefix(self, disk_path):
+        """Birden fazla test çalışıyorsa mesajların önüne disk yolunu ekler."""
+        if disk_path and self.multi_test_mode:
+            return f"[{disk_path}] "
+        return ""
+
+    def _is_selected_disk(self, disk_path):
+        """disk_path combobox'ta seçili disk ise True döndürür."""
+        if disk_path is None:
+            return True
+        return self.flash_drive_combo.currentText().split(" ")[0] == disk_path
+
+    @trace.traced()
+    def _on_worker_done(self, disk_path):
+        """Bir disk testi bittiğinde worker'ı bırakır; hepsi bittiyse arayüzü açar."""
+        trace.async_end("done", id(self.sender()))
+        self.workers.pop(disk_path, None)
+        if self.drive_model.state(disk_path) in (DRIVE_STATE_QUEUED, DRIVE_STATE_RUNNING):
+            # Sonuç gelmeden biten test (yetki, f3 bulunamadı...) hata sayılır; ayrıntı son hata satırıdır
+            self.drive_model.update(disk_path, state=DRIVE_STATE_ERROR)
+        self.log_sink.debug(lambda: f"Test bitti: {disk_path}, kalan: {len(self.workers)}")
+        if not self.workers:
+            self._set_processing_state(False)
+            if self.close_when_done:
+                self.close()
+
+    def _on_test_started(self, disk_path):
+        self.drive_model.update(disk_path, state=DRIVE_STATE_RUNNING, detail=None)
+
+    def _on_phase_progress(self, text):
+        """Yerleşik motorun ilerlemesini panoda diskin satırına yazar (satır bir sonraki flush'ta çizilir)."""
+        self.drive_model.update(self._sender_disk_path(), detail=text.strip())
 
     def _update_status_text(self, text):
         """Worker'dan gelen ilerleme mesajlarını durum kutusuna ekler."""
-        self.status_text_edit.append(text.strip())
-        QApplication.processEvents()
+        self.log_sink.info(self._message_prefix(self._sender_disk_path()) + text.strip())
 
     def _test_finished(self, message):
         """Test başarıyla tamamlandığında."""
-        self.status_text_edit.append(message)
-        print(f"DEBUG (TERMINAL): Test finished: {message}") # YENİ DEBUG
+        self.log_sink.info(self._message_prefix(self._sender_disk_path()) + message)
+        self.log_sink.debug(lambda: f"Test finished: {message}")
 
     def _test_error(self, message):
         """Test sırasında bir hata oluştuğunda."""
+        disk_path = self._sender_disk_path()
+        prefix = self._message_prefix(disk_path)
+        if message.startswith(self.tr("test_cancelled_message")):
+            # İptal bir test hatası değildir; seçili diskin ikonu başlangıç durumuna döner
+            self.drive_model.update(disk_path, state=DRIVE_STATE_CANCELLED, detail=message.strip())
+            self.log_sink.info(f"{prefix}{message}")
+            if self._is_selected_disk(disk_path):
+                self._set_initial_icon()
+            return
         if self.tr("pkexec_not_found") in message:
-            self.status_text_edit.append(f"<font color='red'>{self.tr('pkexec_not_found')}</font>")
+            self.log_sink.error(f"{prefix}{self.tr('pkexec_not_found')}")
         elif self.tr("authentication_error").split('\n')[0] in message:
             original_detail = message.split("Detay: ", 1)[-1] if "Detay: " in message else ""
-            self.status_text_edit.append(f"<font color='red'>{self.tr('authentication_error').format(detail=original_detail)}</font>")
+            self.log_sink.error(f"{prefix}{self.tr('authentication_error').format(detail=original_detail)}")
         elif self.tr("f3_not_found_error") in message:
-             self.status_text_edit.append(f"<font color='red'>{self.tr('f3_not_found_error')}</font>")
+             self.log_sink.error(f"{prefix}{self.tr('f3_not_found_error')}")
         elif self.tr("unexpected_error") in message:
-             self.status_text_edit.append(f"<font color='red'>{self.tr('unexpected_error')}</font>")
+             self.log_sink.error(f"{prefix}{self.tr('unexpected_error')}")
         elif self.tr("f3probe_capacity_parse_error") in message:
-             self.status_text_edit.append(f"<font color='red'>{self.tr('f3probe_capacity_parse_error')}</font>")
+             self.log_sink.error(f"{prefix}{self.tr('f3probe_capacity_parse_error')}")
         else:
-            self.status_text_edit.append(f"<font color='red'>{message}</font>")
-        self._set_processing_state(False)
-        fail_icon_path = self.icon_paths.get("flashicon_testFAIL.png")
-        self._set_icon_to_label(fail_icon_path)
-        print(f"DEBUG (TERMINAL): Test error: {message}") # YENİ DEBUG
-
+            self.log_sink.error(f"{prefix}{message}")
+        # f3probe'un stderr satırları da buradan geçer; satır ancak test sonuçsuz biterse hata olur
+        self.drive_model.update(disk_path, detail=message.strip())
+        if self._is_selected_disk(disk_path):
+            self._set_icon_to_label("flashicon_testFAIL.png")
+        self.log_sink.debug(lambda: f"Test error: {message}")
+
+    @trace.traced()
     def _update_f3probe_results(self, real_capacity, promised_capacity, brand_model, status_message):
         """f3probe test sonuçlarını GUI'ye yansıtır."""
+        trace.async_end("f3probe_result", id(self.sender()))
+        disk_path = self._sender_disk_path()
+        prefix = self._message_prefix(disk_path)
+        is_fake = self.tr("fake_warning") in status_message or self.tr("capacity_mismatch_warning") in status_message
+        self.drive_model.update(disk_path, state=DRIVE_STATE_FAKE if is_fake else DRIVE_STATE_GENUINE,
+                                detail=status_message, real_capacity=real_capacity)
+        if not self._is_selected_disk(disk_path):
+            # Seçili olmayan diskin sonucu yalnızca durum alanına yazılır
+            level = LOG_ERROR if self.tr("fake_warning") in status_message or self.tr("capacity_mismatch_warning") in status_message else LOG_SUCCESS
+            self.log_sink.log(f"{prefix}{status_message} "
+                              f"({self.tr('real_capacity_info').format(real_cap=real_capacity, promised_cap=promised_capacity)})", level)
+            return
+
         self.real_capacity_label.setText(f"{self.tr('real_capacity_label')} {real_capacity}")
-        print(f"DEBUG (TERMINAL): Real capacity updated: {real_capacity}") # YENİ DEBUG
+        self.log_sink.debug(lambda: f"Real capacity updated: {real_capacity}")
 
         if promised_capacity != self.tr("not_detected"):
             self.promised_capacity_label.setText(f"{self.tr('promised_capacity_label')} {promised_capacity}")
-            print(f"DEBUG (TERMINAL): Promised capacity updated: {promised_capacity}") # YENİ DEBUG
-
-        # DÜZELTME: Marka/Model bilgisi udevadm'den gelir, f3probe'dan değil.
-        # Bu kısım _update_f3probe_results metodundan kaldırıldı.
-        # if brand_model != self.tr("not_detected") and brand_model != "":
-        #     self.brand_model_label.setText(f"{self.tr('brand_model_label')} {brand_model}")
-        #     print(f"DEBUG (TERMINAL): Brand/Model label updated: {brand_model}")
-        # else:
-        #     self.brand_model_label.setText(f"{self.tr('brand_model_label')} {self.tr('not_detected')}")
-        #     print("DEBUG (TERMINAL): Brand/Model label set to not detected.")
+            self.log_sink.debug(lambda: f"Promised capacity updated: {promised_capacity}")
 
 
         if self.tr("fake_warning") in status_message or self.tr("capacity_mismatch_warning") in status_message:
-            self.status_text_edit.append(f"<font color='red'>{status_message}</font>")
-            fail_icon_path = self.icon_paths.get("flashicon_testFAIL.png")
-            self._set_icon_to_label(fail_icon_path)
+            self.log_sink.error(f"{prefix}{status_message}")
+            self._set_icon_to_label("flashicon_testFAIL.png")
         else:  # Test başarılı veya gerçek çıktı
-            self.status_text_edit.append(f"<font color='green'>{status_message}</font>")
-            ok_icon_path = self.icon_paths.get("flashicon_testOK.png")
-            self._set_icon_to_label(ok_icon_path)
+            self.log_sink.success(f"{prefix}{status_message}")
+            self._set_icon_to_label("flashicon_testOK.png")
+
+    @trace.traced()
+    def _update_speed_results(self, summary, performance_verdict):
+        """Hız testi sonucunu hız etiketine ve durum alanına yazar; kapasite etiketleri değişmez."""
+        trace.async_end("speed_result", id(self.sender()))
+        disk_path = self._sender_disk_path()
+        prefix = self._message_prefix(disk_path)
+        slow = performance_verdict in PERFORMANCE_MESSAGE_KEYS
+        message = self.tr(PERFORMANCE_MESSAGE_KEYS.get(performance_verdict, "speed_ok_message")).format(summary=summary)
+        state = self.drive_model.state(disk_path)
+        if slow and state != DRIVE_STATE_FAKE:
+            state = DRIVE_STATE_SLOW
+        elif state == DRIVE_STATE_RUNNING:
+            state = DRIVE_STATE_DONE
+        self.drive_model.update(disk_path, state=state, speed=summary)
+        self.log_sink.log(f"{prefix}{message}", LOG_ERROR if slow else LOG_SUCCESS)
+        if not self._is_selected_disk(disk_path):
+            return
 
-        self._set_processing_state(False)
-        print("DEBUG (TERMINAL): Processing state set to False.") # YENİ DEBUG
+        self._set_speed_text(summary)
+        self.log_sink.debug(lambda: f"Speed updated: {summary}")
+        if slow:
+            self._set_icon_to_label("flashicon_testFAIL.png")
+        elif self._current_movie is not None:
+            # Kapasite sonucu (sürekli yazma testinde) ikonu zaten belirlediyse değiştirilmez
+            self._set_icon_to_label("flashicon_testOK.png")
 
 
 if __name__ == '__main__':
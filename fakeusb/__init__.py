@@ -0,0 +1,4 @@
+"""
+Fake USB Tester için GUI'den bağımsız yardımcı modüller.
+Bu paket PyQt5 içe aktarmaz; arayüz ve komut satırı aynı çekirdeği paylaşır.
+"""
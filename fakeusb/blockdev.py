@@ -0,0 +1,117 @@
+"""
+Ham blok aygıtlarına (veya test için normal dosyalara) hizalı, doğrudan G/Ç.
+
+Yazılabilir açılan blok aygıtları O_EXCL ile özel olarak açılır: bölümü bağlı disk açılamaz
+(DeviceBusyError) ve test sürerken masaüstünün otomatik bağlayıcısı diski yeniden bağlayamaz.
+"""
+
+import errno
+import fcntl
+import mmap
+import os
+import stat
+import struct
+
+from . import simulator
+
+BLKSSZGET = 0x1268  # Mantıksal blok boyutu
+BLKPBSZGET = 0x127B  # Fiziksel blok boyutu
+BLKFLSBUF = 0x1261  # Aygıtın tampon önbelleğini boşalt
+
+
+class DeviceBusyError(Exception):
+    """Aygıtın bağlı (mount edilmiş) bölümleri varken yıkıcı test başlatılamaz."""
+
+
+def aligned_buffer(size):
+    """Sayfa hizalı, O_DIRECT ile kullanılabilir yazılabilir bir tampon döndürür."""
+    return mmap.mmap(-1, size)
+
+
+def open_device(path, writable=True, direct=True):
+    """Yolu açar: simüle sürücüler için SimulatedDevice, diğerleri için BlockDevice döndürür."""
+    if simulator.is_simulated(path):
+        return simulator.SimulatedDevice(path, writable)
+    return BlockDevice(path, writable, direct)
+
+
+class BlockDevice:
+    """
+    Aygıtı açar ve konum belirterek okuma/yazma yapar.
+    direct=True iken O_DIRECT denenir; dosya sistemi desteklemiyorsa normal G/Ç'ye düşülür.
+    """
+
+    def __init__(self, path, writable=True, direct=True):
+        self.path = path
+        flags = os.O_RDWR if writable else os.O_RDONLY
+        flags |= getattr(os, "O_CLOEXEC", 0)
+        if writable and stat.S_ISBLK(os.stat(path).st_mode):
+            flags |= os.O_EXCL  # Blok aygıtlarında O_EXCL bağlamaya karşı özel erişim demektir
+        self.direct = False
+        self.fd = None
+        try:
+            if direct and hasattr(os, "O_DIRECT"):
+                try:
+                    self.fd = os.open(path, flags | os.O_DIRECT)
+                    self.direct = True
+                except OSError as e:
+                    if e.errno != errno.EINVAL:  # O_DIRECT desteklenmiyor
+                        raise
+            if self.fd is None:
+                self.fd = os.open(path, flags)
+        except OSError as e:
+            if e.errno == errno.EBUSY:
+                raise DeviceBusyError(f"{path} kullanımda (bölümü bağlı)") from e
+            raise
+
+        self.is_block_device = stat.S_ISBLK(os.fstat(self.fd).st_mode)
+        self.logical_block_size = self._ioctl_int(BLKSSZGET, 512)
+        self.physical_block_size = self._ioctl_int(BLKPBSZGET, self.logical_block_size)
+        size = os.lseek(self.fd, 0, os.SEEK_END)
+        # Dosyalarda son eksik sektör kullanılmaz
+        self.size = size - size % self.logical_block_size
+
+    def _ioctl_int(self, request, default):
+        if not self.is_block_device:
+            return default
+        try:
+            return struct.unpack("i", fcntl.ioctl(self.fd, request, struct.pack("i", 0)))[0]
+        except OSError:
+            return default
+
+    @property
+    def sector_count(self):
+        return self.size // self.logical_block_size
+
+    def read_into(self, buffer, offset):
+        """buffer'ı offset'ten okunan verilerle doldurur, okunan bayt sayısını döndürür."""
+        return os.preadv(self.fd, [buffer], offset)
+
+    def write(self, buffer, offset):
+        """buffer'ı offset'e yazar, yazılan bayt sayısını döndürür."""
+        return os.pwritev(self.fd, [buffer], offset)
+
+    def flush(self):
+        """Yazılan verileri aygıta gönderir."""
+        os.fsync(self.fd)
+
+    def drop_caches(self):
+        """Okumaların aygıttan yapılması için çekirdek önbelleğini boşaltmaya çalışır."""
+        self.flush()
+        if self.is_block_device:
+            try:
+                fcntl.ioctl(self.fd, BLKFLSBUF, 0)
+            except OSError:
+                pass  # Yetki yoksa fadvise ile yetinilir
+        os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,71 @@
+"""
+Uzun tam yüzey testleri için kaldığı yerden devam kaydı.
+
+Yazma/doğrulama motoru belirli aralıklarla (ve iptal edildiğinde) hangi aşamada hangi konuma
+kadar geldiğini aygıt kimliğine göre adlandırılmış küçük bir JSON dosyasına yazar. Aynı aygıt
+yeniden test edildiğinde (başka bir /dev yolunda olsa bile) test sıfırıncı sektörden değil bu
+konumdan devam eder. Test tamamlanınca kayıt silinir.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from .cache import default_cache_dir
+from .index import disk_identity
+
+CHECKPOINT_DIR_NAME = "checkpoints"
+CHECKPOINT_INTERVAL = 30.0  # Saniye; her kayıttan önce aygıt önbelleği boşaltılır
+CHECKPOINT_VERSION = 1
+
+
+def default_checkpoint_dir():
+    return os.path.join(default_cache_dir(), CHECKPOINT_DIR_NAME)
+
+
+class Checkpoint:
+    """Tek bir aygıtın devam kaydı."""
+
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    @classmethod
+    def for_disk(cls, disk_path, directory=None):
+        """Aygıt kimliğine göre kaydı döndürür; kimlik bulunamazsa None (devam desteklenmez)."""
+        identity = disk_identity(disk_path)
+        if not identity:
+            return None
+        name = hashlib.sha256(identity.encode()).hexdigest()[:32]
+        return cls(os.path.join(directory or default_checkpoint_dir(), name + ".json"))
+
+    def load(self):
+        """Kaydedilmiş durumu döndürür; yoksa veya okunamıyorsa None."""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            return None
+        return state
+
+    def due(self):
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state):
+        """Durumu atomik olarak yazar (yarım kalmış dosya okunmaz)."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(dict(state, version=CHECKPOINT_VERSION, saved_at=time.time()), f)
+        os.replace(temporary, self.path)
+        self._last_save = time.monotonic()
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
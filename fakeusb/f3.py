@@ -0,0 +1,345 @@
+"""
+f3probe çalıştırma ve çıktısını ayrıştırma (GUI'den bağımsız).
+
+stdout ve stderr aynı anda (selectors ile) boşaltılır; böylece f3 stderr borusunu
+doldurduğunda kilitlenme olmaz. Çıktı satırları saklanmadan, durum makinesi olarak
+çalışan F3ProbeParser'a verilir ve tipli olaylar geldikleri anda yayılır.
+"""
+
+import collections
+import os
+import re
+import selectors
+import subprocess
+import time
+
+from . import trace
+from .cancel import TestCancelled
+from .regions import cutoff_map
+from .result import (
+    ProbeResult, VERDICT_GENUINE, VERDICT_FAKE, VERDICT_MISMATCH, VERDICT_UNKNOWN, VERDICT_ERROR,
+    ERROR_AUTH, ERROR_PKEXEC_MISSING, ERROR_F3_MISSING, ERROR_EXIT_CODE, ERROR_UNEXPECTED, ERROR_CANCELLED,
+)
+
+F3PROBE_OK_CODES = (0, 102)  # 102: f3probe sahte aygıt buldu
+PKEXEC_AUTH_FAILED_CODES = (126, 127)  # Pencere kapatıldı / yetki verilmedi
+DEFAULT_SECTOR_SIZE_BYTES = 512  # f3 blok boyutunu bildirmezse
+MAX_LINE_BYTES = 64 * 1024  # Satır sonu gelmese de bu uzunlukta satır kesilir
+STDERR_TAIL_LINES = 50  # Hata sınıflandırması için saklanan son stderr satırları
+CANCEL_REFUSED_MESSAGE = ("f3probe yarıda durdurulamaz: yedeklediği blokları ancak test sonunda geri yazar. "
+                          "Test bitince sonuç gösterilecek.\n")
+
+# Tipli olaylar
+ProgressEvent = collections.namedtuple("ProgressEvent", "line")
+CapacityEvent = collections.namedtuple("CapacityEvent", "field size blocks")  # field: usable, announced, module
+BlockSizeEvent = collections.namedtuple("BlockSizeEvent", "size")
+VerdictEvent = collections.namedtuple("VerdictEvent", "verdict fake_type")
+TimingEvent = collections.namedtuple("TimingEvent", "operation total_seconds count average_seconds")
+
+_TIME_UNITS = {"ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0}
+_TIMING_LINE = re.compile(r"^\s*(Read|Write|Reset): (.+?) / (\d+) = (.+?)\s*$")
+_POWER_OF_TWO = re.compile(r"\(2\^(\d+) Bytes?\)")
+
+
+def needs_pkexec():
+    """f3probe root değilsek pkexec ile çalıştırılır."""
+    return os.geteuid() != 0
+
+
+def f3probe_command(disk_path):
+    """f3probe komut listesini döndürür; root değilsek pkexec ile yetki istenir."""
+    command = ["f3probe", "--time-ops", disk_path]
+    if needs_pkexec():
+        command.insert(0, "pkexec")
+    return command
+
+
+def parse_f3_duration(text):
+    """f3'ün süre biçimlerini ("112us", "55.48s", "1'13\\"", "1h02'03\\"") saniyeye çevirir."""
+    text = text.strip()
+    for unit in ("ns", "us", "ms", "s"):
+        if text.endswith(unit) and text[:-len(unit)].replace(".", "", 1).isdigit():
+            return float(text[:-len(unit)]) * _TIME_UNITS[unit]
+    match = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)')?(?:(\d+(?:\.\d+)?)\")?", text)
+    if match and any(match.groups()):
+        hours, minutes, seconds = match.groups()
+        return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+    raise ValueError(f"Süre ayrıştırılamadı: {text}")
+
+
+def _size_and_blocks(line):
+    """'*Usable* size: 7.86 GB (16477879 blocks)' satırından ("7.86 GB", 16477879) çıkarır."""
+    value = line.split(":", 1)[-1].strip()
+    size_part = value.split("(")[0].strip()
+    blocks = None
+    if "(" in value and "blocks" in value:
+        try:
+            blocks = int(value.split("(")[1].split("blocks")[0].replace(",", "").strip())
+        except ValueError:
+            pass
+    return size_part, blocks
+
+
+class F3ProbeParser:
+    """
+    f3probe çıktısını satır satır ayrıştıran durum makinesi.
+    Satırlar saklanmaz; yalnızca sonuç alanları tutulur, bellek kullanımı sabittir.
+    """
+
+    def __init__(self, disk_path):
+        self.result = ProbeResult(disk=disk_path)
+        self.block_size = None
+        self._usable_blocks = None
+        self._announced_blocks = None
+        self._is_fake = False
+        self._is_genuine = False
+        self._time_ops = {}
+
+    def feed(self, line):
+        """Bir satırı işler ve ürettiği olayların listesini döndürür."""
+        line = line.rstrip("\r\n")
+        events = [ProgressEvent(line)]
+        result = self.result
+
+        if "Good news: The device" in line and "is the real thing" in line:
+            self._is_genuine = True
+            events.append(VerdictEvent(VERDICT_GENUINE, None))
+        elif "Bad news: The device" in line and "is a counterfeit" in line:
+            self._is_fake = True
+            if "of type" in line:
+                result.fake_type = line.split("of type", 1)[1].strip()
+            events.append(VerdictEvent(VERDICT_FAKE, result.fake_type))
+        elif "WARNING: Only" in line and "sectors were found" in line:
+            self._is_fake = True
+            try:
+                parts = line.split("Only ")[1].split(" of ")
+                self._usable_blocks = int(parts[0].replace(",", "").strip())
+                self._announced_blocks = int(parts[1].split(" sectors")[0].replace(",", "").strip())
+            except (ValueError, IndexError):
+                result.parse_errors.append(line)
+            events.append(VerdictEvent(VERDICT_FAKE, result.fake_type))
+        elif "*Usable* size:" in line:
+            result.real_capacity, self._usable_blocks = _size_and_blocks(line)
+            events.append(CapacityEvent("usable", result.real_capacity, self._usable_blocks))
+        elif "Announced size:" in line:
+            result.promised_capacity, self._announced_blocks = _size_and_blocks(line)
+            events.append(CapacityEvent("announced", result.promised_capacity, self._announced_blocks))
+        elif "Module:" in line:
+            size, _ = _size_and_blocks(line)
+            result.details["module"] = size
+            events.append(CapacityEvent("module", size, None))
+        elif "block size:" in line:
+            match = _POWER_OF_TWO.search(line)
+            if match:
+                self.block_size = 1 << int(match.group(1))
+                events.append(BlockSizeEvent(self.block_size))
+        elif "Probe time:" in line:
+            try:
+                result.details["probe_time"] = parse_f3_duration(line.split(":", 1)[1])
+            except ValueError:
+                pass
+        else:
+            match = _TIMING_LINE.match(line)
+            if match:
+                operation, total, count, average = match.groups()
+                try:
+                    event = TimingEvent(operation.lower(), parse_f3_duration(total), int(count),
+                                        parse_f3_duration(average))
+                except ValueError:
+                    pass
+                else:
+                    self._time_ops[event.operation] = {"total_seconds": event.total_seconds, "count": event.count,
+                                                       "average_seconds": event.average_seconds}
+                    events.append(event)
+        return events
+
+    def finish(self):
+        """Ayrıştırmayı bitirir ve ProbeResult döndürür."""
+        result = self.result
+        block_size = self.block_size or DEFAULT_SECTOR_SIZE_BYTES
+        result.details["block_size"] = block_size
+        if self._time_ops:
+            result.details["time_ops"] = self._time_ops
+        if self._usable_blocks is not None:
+            result.real_bytes = self._usable_blocks * block_size
+        if self._announced_blocks is not None:
+            result.announced_bytes = self._announced_blocks * block_size
+        # Eski f3 sürümleri yalnızca "WARNING: Only X of Y sectors" yazar
+        if result.real_capacity is None and result.real_bytes is not None:
+            result.real_capacity = f"{round(result.real_bytes / (1024**3), 2)} GB"
+        if result.promised_capacity is None and result.announced_bytes is not None:
+            result.promised_capacity = f"{round(result.announced_bytes / (1024**3), 2)} GB"
+        result.verdict = _decide_verdict(result, self._is_fake, self._is_genuine)
+        # f3probe tek bir sınır bildirir: sınırın ötesi sahtelik türüne göre işaretlenir
+        real_bytes = result.announced_bytes if result.verdict == VERDICT_GENUINE else result.real_bytes
+        regions = cutoff_map(result.announced_bytes, real_bytes, result.fake_type, block_size)
+        if regions is not None:
+            result.details["regions"] = regions.to_dict()
+        return result
+
+
+def _decide_verdict(result, is_fake, is_genuine):
+    """Ayrıştırılan bilgilere göre nihai kararı verir."""
+    if is_fake:
+        return VERDICT_FAKE
+    if result.real_capacity and result.promised_capacity:
+        try:
+            real_val, real_unit = result.real_capacity.split(" ")
+            promised_val, promised_unit = result.promised_capacity.split(" ")
+            if float(real_val) != float(promised_val) or real_unit != promised_unit:
+                return VERDICT_MISMATCH
+        except ValueError:
+            if result.real_capacity != result.promised_capacity:
+                return VERDICT_MISMATCH
+        return VERDICT_GENUINE
+    if is_genuine:
+        return VERDICT_GENUINE
+    return VERDICT_UNKNOWN
+
+
+def drain_lines(process, on_stdout_line, on_stderr_line):
+    """
+    Sürecin stdout ve stderr borularını aynı anda okur, tamamlanan her satırı
+    ilgili geri çağırmaya verir. Satır başına en fazla MAX_LINE_BYTES bellek tutulur.
+    """
+    selector = selectors.DefaultSelector()
+    pending = {}
+    for pipe, callback in ((process.stdout, on_stdout_line), (process.stderr, on_stderr_line)):
+        selector.register(pipe, selectors.EVENT_READ, callback)
+        pending[pipe] = bytearray()
+
+    with selector:
+        while selector.get_map():
+            for key, _ in selector.select():
+                pipe, callback = key.fileobj, key.data
+                buffer = pending[pipe]
+                chunk = os.read(pipe.fileno(), 65536)
+                if not chunk:
+                    selector.unregister(pipe)
+                    if buffer:
+                        callback(buffer.decode(errors="replace"))
+                    continue
+                buffer += chunk
+                while True:
+                    newline = buffer.find(b"\n")
+                    if newline < 0:
+                        if len(buffer) >= MAX_LINE_BYTES:
+                            callback(buffer[:MAX_LINE_BYTES].decode(errors="replace"))
+                            del buffer[:MAX_LINE_BYTES]
+                            continue
+                        break
+                    callback(buffer[:newline + 1].decode(errors="replace"))
+                    del buffer[:newline + 1]
+
+
+def run_f3probe(disk_path, on_stdout=None, on_stderr=None, on_event=None, cancel=None):
+    """
+    f3probe'u çalıştırır; stdout satırlarını ayrıştırıcıdan geçirip olayları on_event'e,
+    ham satırları on_stdout/on_stderr'e iletir.
+    (returncode, ProbeResult, stderr_tail) döndürür; stderr_tail son STDERR_TAIL_LINES satırdır.
+    pkexec veya f3probe bulunamazsa FileNotFoundError, cancel f3probe başlamadan iptal edildiyse
+    TestCancelled yükseltir. Başlamış f3probe sonlandırılmaz: yedeklediği bloklar yalnızca bellekte
+    durur ve sinyalle ölürse kullanıcı verisi kaybolur (pkexec altında sinyal zaten reddedilir).
+    İptal isteği on_stderr'e CANCEL_REFUSED_MESSAGE olarak bildirilir ve test sonuna kadar çalışır.
+    """
+    parser = F3ProbeParser(disk_path)
+    stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+    parse_seconds = 0.0
+    spawn_time = trace.now_us() if trace.enabled() else None
+
+    def mark_output():
+        # İzleme açıksa sürecin başlatılmasından ilk çıktıya kadar geçen süre ayrı aralık olur
+        nonlocal spawn_time
+        trace.current().complete("spawn_to_first_output", spawn_time, trace.now_us(), disk_path)
+        spawn_time = None
+
+    def handle_stdout(line):
+        nonlocal parse_seconds
+        if spawn_time is not None:
+            mark_output()
+        start = time.perf_counter()
+        events = parser.feed(line)
+        parse_seconds += time.perf_counter() - start
+        if on_stdout:
+            on_stdout(line)
+        if on_event:
+            for event in events:
+                on_event(event)
+
+    def handle_stderr(line):
+        if spawn_time is not None:
+            mark_output()
+        stderr_tail.append(line.strip())
+        if on_stderr:
+            on_stderr(line)
+
+    def refuse_cancel():
+        if on_stderr:
+            on_stderr(CANCEL_REFUSED_MESSAGE)
+
+    if cancel is not None:
+        cancel.check()
+    process = subprocess.Popen(
+        f3probe_command(disk_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0
+    )
+    remove_cancel = cancel.on_cancel(refuse_cancel) if cancel is not None else None
+    with trace.span("f3probe", disk_path) as span, process:
+        try:
+            drain_lines(process, handle_stdout, handle_stderr)
+            process.wait()
+        finally:
+            if remove_cancel is not None:
+                remove_cancel()
+        span.set(returncode=process.returncode, parse_seconds=parse_seconds)
+    result = parser.finish()
+    result.details["parse_seconds"] = parse_seconds
+    return process.returncode, result, list(stderr_tail)
+
+
+def classify_f3_error(stderr_lines, returncode=None, under_pkexec=False):
+    """
+    Başarısız f3probe çalışmasının hata kodunu belirler. pkexec altında 126/127 yetkilendirme
+    hatasıdır (pkexec'in mesajları yerelleştirildiği için metne güvenilmez); pkexec f3probe'u
+    bulamazsa da 127 döner ve "Cannot run program" yazar. Kod bilinmiyorsa stderr metnine bakılır.
+    """
+    error_output = "\n".join(stderr_lines).lower()
+    if under_pkexec and returncode in PKEXEC_AUTH_FAILED_CODES:
+        return ERROR_F3_MISSING if "cannot run program" in error_output else ERROR_AUTH
+    if "authentication" in error_output:
+        return ERROR_AUTH
+    if "not found" in error_output and "pkexec" in error_output:
+        return ERROR_PKEXEC_MISSING
+    return ERROR_EXIT_CODE
+
+
+def probe_disk(disk_path, on_stdout=None, on_stderr=None, on_event=None, cancel=None):
+    """
+    Diski f3probe ile test eder ve her durumda bir ProbeResult döndürür;
+    çalıştırma hataları result.error alanına yazılır.
+    f3probe yedeklediği blokları bellekte tutar; bu yüzden yalnızca başlamadan iptal edilebilir.
+    """
+    start_time = time.monotonic()
+    try:
+        returncode, result, stderr_lines = run_f3probe(disk_path, on_stdout, on_stderr, on_event, cancel)
+    except TestCancelled:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_CANCELLED,
+                           error_detail="f3probe başlatılmadan iptal edildi",
+                           elapsed=time.monotonic() - start_time)
+    except FileNotFoundError as e:
+        error = ERROR_PKEXEC_MISSING if e.filename == "pkexec" else ERROR_F3_MISSING
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=error, error_detail=str(e),
+                           elapsed=time.monotonic() - start_time)
+    except Exception as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED, error_detail=str(e),
+                           elapsed=time.monotonic() - start_time)
+
+    if returncode not in F3PROBE_OK_CODES:
+        result = ProbeResult(disk=disk_path, verdict=VERDICT_ERROR,
+                             error=classify_f3_error(stderr_lines, returncode, needs_pkexec()),
+                             error_detail="\n".join(stderr_lines))
+    result.returncode = returncode
+    result.elapsed = time.monotonic() - start_time
+    return result
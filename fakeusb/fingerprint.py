@@ -0,0 +1,293 @@
+"""
+Sahte bellek parmak izi veritabanı: testten önce anlık risk puanı.
+
+Parmak izi, seri numarası dışındaki tanımlayıcılardır: USB VID:PID (denetleyici) ve duyurulan
+boyut. Aynı denetleyici ve boyut birleşimi genellikle aynı üretim partisinden gelir; sahte
+partiler de tekrar tekrar aynı birleşimle karşımıza çıkar. Her fiziksel aygıt (önbellek kimliği)
+yalnızca son kararıyla bir oy verir; aynı diskin yeniden test edilmesi sayıları şişirmez.
+
+Veritabanı bu istasyonun kendi sonuçlarıyla büyür (her test sonrası ve `learn` ile sonuç
+önbelleğinden), başka istasyonlarla JSON olarak paylaşılabilir:
+
+    python3 -m fakeusb.fingerprint learn
+    python3 -m fakeusb.fingerprint list
+    python3 -m fakeusb.fingerprint export fingerprints.json
+    python3 -m fakeusb.fingerprint import fingerprints.json
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from .cache import ResultCache, default_cache_dir
+from .devices import bytes_to_human_readable
+from .modes import MODE_F3PROBE, MODE_PROBE, MODE_QUICK
+from .result import VERDICT_GENUINE
+from .scheduler import PRIORITY_HIGH, PRIORITY_NORMAL
+
+FINGERPRINT_FILE_NAME = "fingerprints.sqlite"
+
+OBSERVED_FAKE = "fake"  # Gözlem kararları; kapasite uyumsuzluğu (mismatch) da sahte sayılır
+OBSERVED_GENUINE = "genuine"
+
+RISK_KNOWN_BAD = "known_bad"  # Bu parmak izinin gözlemlerinin çoğu sahte
+RISK_SUSPECT = "suspect"  # Denetleyicinin başka boyutları sahte çıkmış ya da gözlemler karışık
+RISK_UNKNOWN = "unknown"
+RISK_KNOWN_CLEAN = "known_clean"  # Yeterince gerçek gözlem var, hiç sahte yok
+
+MIN_CLEAN_OBSERVATIONS = 3
+MIN_SUSPECT_CONTROLLER_FAKES = 2
+
+
+def fingerprint_parts(vendor_id, product_id, size_bytes):
+    """(parmak izi, denetleyici) döndürür; VID:PID veya boyut yoksa (None, None)."""
+    if not vendor_id or not product_id or not size_bytes:
+        return None, None
+    controller = f"{vendor_id.lower()}:{product_id.lower()}"
+    return f"{controller}|{size_bytes}", controller
+
+
+def fingerprint_of(metadata):
+    """index/simulator meta verisinden (parmak izi, denetleyici) döndürür."""
+    usb = metadata.get("usb") or {}
+    return fingerprint_parts(usb.get("vendor_id"), usb.get("product_id"), metadata.get("size_bytes"))
+
+
+def _fingerprint_of_identity(identity):
+    """Önbellek kimliğinden (seri|vid:pid|boyut) parmak izi çıkarır."""
+    try:
+        _, ids, size = identity.rsplit("|", 2)
+        vendor_id, product_id = ids.split(":", 1)
+        return fingerprint_parts(vendor_id, product_id, int(size))
+    except (AttributeError, ValueError):
+        return None, None
+
+
+def _observed_verdict(result):
+    """Sonucun veritabanına yazılacak kararı; kesin olmayan sonuçlar için None."""
+    if result.is_fake:
+        return OBSERVED_FAKE
+    if result.verdict != VERDICT_GENUINE:
+        return None
+    quick = result.details.get("quick")
+    if quick and not quick.get("escalated_to"):
+        # Yalnızca örneklemle verilmiş gerçek kararı olasılıksaldır; temiz sayılmaz
+        return None
+    return OBSERVED_GENUINE
+
+
+@dataclasses.dataclass
+class RiskAssessment:
+    """Bir diskin test öncesi risk değerlendirmesi."""
+    level: str = RISK_UNKNOWN
+    fingerprint: str = None
+    fake_count: int = 0
+    genuine_count: int = 0
+    controller_fake_count: int = 0
+    controller_genuine_count: int = 0
+    typical_real_bytes: int = None  # Sahte gözlemlerde en sık görülen gerçek kapasite
+
+    @property
+    def score(self):
+        """Sahte olma olasılığı tahmini (Laplace düzeltmeli oran, 0..1)."""
+        return (self.fake_count + 1) / (self.fake_count + self.genuine_count + 2)
+
+    def to_dict(self):
+        return dict(dataclasses.asdict(self), score=self.score)
+
+
+def plan_test(risk, mode):
+    """
+    Risk düzeyine göre diskin test türünü ve kuyruk önceliğini döndürür: (mode, priority).
+    Bilinen sahte ve şüpheli diskler kuyruğun önüne alınır ve hızlı ön eleme yerine doğrudan
+    tam proba gider; bilinen temiz diskler tam prob yerine hızlı ön elemeye gider.
+    Yıkıcı test türleri kullanıcı seçtiği için değiştirilmez, yalnızca öne alınır.
+    """
+    if risk.level in (RISK_KNOWN_BAD, RISK_SUSPECT):
+        return (MODE_F3PROBE if mode == MODE_QUICK else mode), PRIORITY_HIGH
+    if risk.level == RISK_KNOWN_CLEAN and mode in (MODE_F3PROBE, MODE_PROBE):
+        return MODE_QUICK, PRIORITY_NORMAL
+    return mode, PRIORITY_NORMAL
+
+
+def risk_summary(risk):
+    """Risk değerlendirmesini tek satırlık metne çevirir."""
+    text = f"{risk.level}: {risk.fake_count} sahte / {risk.genuine_count} gerçek"
+    if risk.controller_fake_count or risk.controller_genuine_count:
+        text += f" (denetleyici: {risk.controller_fake_count} sahte / {risk.controller_genuine_count} gerçek)"
+    if risk.typical_real_bytes:
+        text += f", tipik gerçek kapasite {bytes_to_human_readable(risk.typical_real_bytes)}"
+    return text
+
+
+class FingerprintDB:
+    """Aygıt başına son kararları saklar; parmak izi ve denetleyici sütunları indekslidir."""
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(default_cache_dir(), FINGERPRINT_FILE_NAME)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    device TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    controller TEXT NOT NULL,
+                    vendor TEXT,
+                    model TEXT,
+                    verdict TEXT NOT NULL,
+                    real_bytes INTEGER,
+                    observed_at REAL NOT NULL
+                )""")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS observations_fingerprint ON observations (fingerprint, verdict)")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS observations_controller ON observations (controller, verdict)")
+
+    def _observe(self, device, fingerprint, controller, vendor, model, verdict, real_bytes, observed_at):
+        """Aygıtın gözlemini yazar; aygıtın daha yeni bir gözlemi varsa değiştirmez."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO observations (device, fingerprint, controller, vendor, model, verdict, real_bytes, "
+                "observed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(device) DO UPDATE SET fingerprint = excluded.fingerprint, "
+                "controller = excluded.controller, vendor = COALESCE(excluded.vendor, vendor), "
+                "model = COALESCE(excluded.model, model), verdict = excluded.verdict, "
+                "real_bytes = excluded.real_bytes, observed_at = excluded.observed_at "
+                "WHERE excluded.observed_at >= observations.observed_at",
+                (device, fingerprint, controller, vendor, model, verdict, real_bytes, observed_at))
+
+    def record(self, metadata, result, observed_at=None):
+        """Test sonucunu diskin parmak izine ekler; kesin olmayan sonuçlar ve tanınmayan diskler atlanır."""
+        verdict = _observed_verdict(result)
+        fingerprint, controller = fingerprint_of(metadata)
+        if verdict is None or fingerprint is None:
+            return False
+        # Seri numarası olmayan aygıtlar ayırt edilemez; her sonuçları ayrı bir gözlemdir
+        device = metadata.get("identity") or f"anonymous-{uuid.uuid4().hex}"
+        self._observe(device, fingerprint, controller, metadata.get("vendor"), metadata.get("model"), verdict,
+                      result.real_bytes if verdict == OBSERVED_FAKE else None, observed_at or time.time())
+        return True
+
+    def learn_from_cache(self, cache):
+        """Sonuç önbelleğindeki geçmiş sonuçları ekler ve eklenen gözlem sayısını döndürür."""
+        learned = 0
+        for identity, _, result, tested_at in cache.entries():
+            fingerprint, controller = _fingerprint_of_identity(identity)
+            verdict = _observed_verdict(result)
+            if fingerprint is None or verdict is None:
+                continue
+            self._observe(identity, fingerprint, controller, None, None, verdict,
+                          result.real_bytes if verdict == OBSERVED_FAKE else None, tested_at)
+            learned += 1
+        return learned
+
+    def _counts(self, column, value):
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT verdict, COUNT(*) FROM observations WHERE {column} = ? GROUP BY verdict",
+                (value,)).fetchall()
+        counts = dict(rows)
+        return counts.get(OBSERVED_FAKE, 0), counts.get(OBSERVED_GENUINE, 0)
+
+    def assess(self, metadata):
+        """Diskin test öncesi risk değerlendirmesini döndürür (tek bir indeksli sorgu çifti)."""
+        fingerprint, controller = fingerprint_of(metadata)
+        if fingerprint is None:
+            return RiskAssessment()
+        risk = RiskAssessment(fingerprint=fingerprint)
+        risk.fake_count, risk.genuine_count = self._counts("fingerprint", fingerprint)
+        controller_fakes, controller_genuines = self._counts("controller", controller)
+        # Denetleyici sayıları bu parmak izi dışındaki boyutlardır
+        risk.controller_fake_count = controller_fakes - risk.fake_count
+        risk.controller_genuine_count = controller_genuines - risk.genuine_count
+
+        if risk.fake_count and risk.fake_count >= risk.genuine_count:
+            risk.level = RISK_KNOWN_BAD
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT real_bytes FROM observations WHERE fingerprint = ? AND verdict = ? "
+                    "AND real_bytes IS NOT NULL GROUP BY real_bytes ORDER BY COUNT(*) DESC LIMIT 1",
+                    (fingerprint, OBSERVED_FAKE)).fetchone()
+            risk.typical_real_bytes = row[0] if row else None
+        elif risk.fake_count or (risk.controller_fake_count >= MIN_SUSPECT_CONTROLLER_FAKES
+                                 and risk.controller_fake_count >= risk.controller_genuine_count):
+            risk.level = RISK_SUSPECT
+        elif risk.genuine_count >= MIN_CLEAN_OBSERVATIONS:
+            risk.level = RISK_KNOWN_CLEAN
+        return risk
+
+    def fingerprints(self):
+        """Parmak izi başına özet: (parmak izi, üretici, model, sahte, gerçek) listesi, en riskli önce."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT fingerprint, MAX(vendor), MAX(model), SUM(verdict = ?), SUM(verdict = ?) "
+                "FROM observations GROUP BY fingerprint ORDER BY SUM(verdict = ?) DESC, fingerprint",
+                (OBSERVED_FAKE, OBSERVED_GENUINE, OBSERVED_FAKE)).fetchall()
+
+    def export(self):
+        """Tüm gözlemleri JSON'a yazılabilir sözlükler olarak döndürür."""
+        with self._lock:
+            cursor = self._connection.execute("SELECT * FROM observations ORDER BY observed_at")
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def import_observations(self, observations):
+        """export çıktısını (başka istasyonlardan) ekler; her aygıtın daha yeni gözlemi kalır."""
+        imported = 0
+        for observation in observations:
+            if observation.get("verdict") not in (OBSERVED_FAKE, OBSERVED_GENUINE):
+                continue
+            self._observe(observation["device"], observation["fingerprint"], observation["controller"],
+                          observation.get("vendor"), observation.get("model"), observation["verdict"],
+                          observation.get("real_bytes"), observation["observed_at"])
+            imported += 1
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m fakeusb.fingerprint",
+                                     description="Sahte bellek parmak izi veritabanını yönetir.")
+    parser.add_argument("--db", default=None, help="Veritabanı dosyası (varsayılan ~/.cache/fake-usb-tester).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("learn", help="Sonuç önbelleğindeki geçmiş sonuçları veritabanına ekler.")
+    commands.add_parser("list", help="Parmak izlerini en riskliden başlayarak listeler.")
+    export = commands.add_parser("export", help="Gözlemleri JSON olarak yazar (başka istasyonlarla paylaşmak için).")
+    export.add_argument("file")
+    import_ = commands.add_parser("import", help="export ile yazılmış gözlemleri ekler.")
+    import_.add_argument("file")
+    args = parser.parse_args(argv)
+
+    database = FingerprintDB(args.db)
+    if args.command == "learn":
+        print(f"{database.learn_from_cache(ResultCache())} sonuç eklendi.")
+    elif args.command == "list":
+        for fingerprint, vendor, model, fakes, genuines in database.fingerprints():
+            controller, size = fingerprint.split("|")
+            name = " ".join(part for part in (vendor, model) if part) or "?"
+            print(f"{controller}\t{bytes_to_human_readable(int(size))}\t{fakes} sahte / {genuines} gerçek\t{name}")
+    elif args.command == "export":
+        with open(args.file, "w") as f:
+            json.dump({"observations": database.export()}, f, indent=2)
+    else:
+        with open(args.file) as f:
+            print(f"{database.import_observations(json.load(f)['observations'])} gözlem eklendi.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
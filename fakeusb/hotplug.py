@@ -0,0 +1,149 @@
+"""
+Disk takma/çıkarma izleyicisi.
+
+Çekirdeğin uevent netlink soketini dinler; soket açılamazsa /sys/block
+dizinini belirli aralıklarla tarayarak aynı olayları üretir. Kart okuyucular
+takılı kaldığından kart değişimi "change" olayı (boyut 0'a düşer veya
+DISK_MEDIA_CHANGE=1) olarak gelir; bu olaylar çıkarma ve takma olarak bildirilir.
+"""
+
+import os
+import select
+import socket
+import threading
+
+from .devices import disk_from_sysfs, is_removable_disk
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_UEVENT_GROUP = 1
+POLL_INTERVAL = 2.0  # Saniye, netlink yoksa /sys/block tarama aralığı
+SYS_BLOCK_DIR = "/sys/block"
+
+
+def parse_uevent(data):
+    """
+    Çekirdek uevent iletisini ({"ACTION": ..., "DEVNAME": ...}) sözlüğüne çevirir.
+    udevd'nin 'libudev' iletileri için None döndürür.
+    """
+    if data.startswith(b"libudev"):
+        return None
+    fields = data.split(b"\0")
+    event = {}
+    for field in fields[1:]:
+        if b"=" in field:
+            key, value = field.split(b"=", 1)
+            event[key.decode(errors="replace")] = value.decode(errors="replace")
+    return event
+
+
+class HotplugMonitor:
+    """
+    Çıkarılabilir disk eklendiğinde on_add(disk), çıkarıldığında on_remove(disk_path) çağırır.
+    disk, devices.disk_from_sysfs'in döndürdüğü sözlüktür. Ortamı olmayan (boyutu 0) aygıtlar
+    eklenmiş sayılmaz; kart okuyucuya kart takılması ekleme, çıkarılması çıkarma olarak bildirilir.
+    Geri çağırmalar izleyici iş parçacığında çalışır.
+    """
+
+    def __init__(self, on_add, on_remove, poll_interval=POLL_INTERVAL, sys_block_dir=SYS_BLOCK_DIR):
+        self.on_add = on_add
+        self.on_remove = on_remove
+        self.poll_interval = poll_interval
+        self.sys_block_dir = sys_block_dir
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._present = {}  # Ortamı takılı disk adı -> bayt cinsinden boyut
+        self.using_netlink = False
+
+    def start(self):
+        for name in self._list_block_names():
+            self._remember_present(name)
+        sock = self._open_netlink()
+        self.using_netlink = sock is not None
+        target = self._netlink_loop if sock is not None else self._poll_loop
+        self._thread = threading.Thread(target=target, args=(sock,), name="hotplug-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+    def _open_netlink(self):
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, KERNEL_UEVENT_GROUP))
+            return sock
+        except (OSError, AttributeError):
+            return None
+
+    def _handle_add(self, name):
+        if is_removable_disk(name, self.sys_block_dir):
+            disk = disk_from_sysfs(name, self.sys_block_dir)
+            if disk is not None and disk["size_bytes"] > 0:
+                self._present[name] = disk["size_bytes"]
+                self.on_add(disk)
+
+    def _handle_remove(self, name):
+        if self._present.pop(name, None) is not None:
+            self.on_remove("/dev/" + name)
+
+    def _handle_change(self, name, media_changed=False):
+        """Ortam değişimi: kart çıkarıldıysa çıkarma, takıldıysa veya değiştirildiyse (çıkarma ve) ekleme bildirir."""
+        disk = disk_from_sysfs(name, self.sys_block_dir)
+        size_bytes = disk["size_bytes"] if disk is not None else 0
+        if size_bytes == 0:
+            self._handle_remove(name)
+        elif media_changed or self._present.get(name) != size_bytes:
+            self._handle_remove(name)
+            self._handle_add(name)
+
+    def _netlink_loop(self, sock):
+        with sock:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([sock], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    event = parse_uevent(sock.recv(65536))
+                except OSError:
+                    continue
+                if not event or event.get("SUBSYSTEM") != "block" or event.get("DEVTYPE") != "disk":
+                    continue
+                name = event.get("DEVNAME", "")
+                if not name:
+                    continue
+                name = os.path.basename(name)
+                action = event.get("ACTION")
+                if action == "add":
+                    self._handle_add(name)
+                elif action == "remove":
+                    self._handle_remove(name)
+                elif action == "change":
+                    self._handle_change(name, event.get("DISK_MEDIA_CHANGE") == "1")
+
+    def _list_block_names(self):
+        try:
+            return set(os.listdir(self.sys_block_dir))
+        except OSError:
+            return set()
+
+    def _poll_loop(self, _sock):
+        known = self._list_block_names()
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._list_block_names()
+            for name in sorted(current - known):
+                self._handle_add(name)
+            for name in sorted(known - current):
+                self._handle_remove(name)
+            # Takılı kalan kart okuyucularda kart değişimi yalnızca boyut değişimi olarak görülür
+            for name in sorted(current & known):
+                if is_removable_disk(name, self.sys_block_dir):
+                    self._handle_change(name)
+            known = current
+
+    def _remember_present(self, name):
+        """İzleme başlamadan önce takılı olan diskleri olay üretmeden kaydeder."""
+        if is_removable_disk(name, self.sys_block_dir):
+            disk = disk_from_sysfs(name, self.sys_block_dir)
+            if disk is not None and disk["size_bytes"] > 0:
+                self._present[name] = disk["size_bytes"]
@@ -0,0 +1,215 @@
+"""
+Çıkarılabilir disklerin bellek içi meta veri dizini.
+
+Tüm bilgiler (boyut, marka/model, seri no, blok boyutları, USB bağlantısı) tek geçişte
+doğrudan /sys/block/* ve üst USB aygıtından okunur; lsblk veya udevadm süreci başlatılmaz.
+Dizin takma/çıkarma olaylarıyla güncellenir, disk seçimi bir sözlük aramasıdır.
+"""
+
+import os
+import threading
+
+from . import simulator
+from .cache import make_identity
+from .metrics import ENUMERATION_SECONDS, METADATA_LOOKUP_SECONDS
+from .devices import (SYS_BLOCK_DIR, PROC_MOUNTS, EXCLUDED_DEVICE_PREFIXES, bytes_to_human_readable,
+                      _read_sysfs)
+from .topology import device_sysfs_path
+
+SYSTEM_MOUNT_POINTS = ("/", "/boot", "/boot/efi")
+
+
+def _read_int(path):
+    value = _read_sysfs(path)
+    return int(value) if value is not None and value.isdigit() else None
+
+
+def _usb_parent(real_path):
+    """Blok aygıtın üstündeki USB aygıt dizinini (idVendor dosyası olan) bulur."""
+    while real_path and real_path != os.sep:
+        if os.path.exists(os.path.join(real_path, "idVendor")):
+            return real_path
+        real_path = os.path.dirname(real_path)
+    return None
+
+
+def _usb_metadata(usb_path):
+    """USB aygıt tanımlayıcısındaki alanları okur."""
+    def attribute(name):
+        return _read_sysfs(os.path.join(usb_path, name))
+
+    root_hub = next((part for part in usb_path.split(os.sep)
+                     if part.startswith("usb") and part[3:].isdigit()), None)
+    return {
+        "bus": root_hub,
+        "busnum": _read_int(os.path.join(usb_path, "busnum")),
+        "devnum": _read_int(os.path.join(usb_path, "devnum")),
+        "vendor_id": attribute("idVendor"),
+        "product_id": attribute("idProduct"),
+        "manufacturer": attribute("manufacturer"),
+        "product": attribute("product"),
+        "serial": attribute("serial"),
+        "speed_mbps": _read_int(os.path.join(usb_path, "speed")),
+        "version": attribute("version"),
+    }
+
+
+def system_mounted_disks(mounts_file=PROC_MOUNTS):
+    """Kendisi veya bölümü /, /boot gibi sistem noktalarına bağlı disk adlarını döndürür."""
+    names = set()
+    try:
+        with open(mounts_file) as f:
+            for line in f:
+                fields = line.split(" ")
+                if len(fields) < 2 or not fields[0].startswith("/dev/") or fields[1] not in SYSTEM_MOUNT_POINTS:
+                    continue
+                name = os.path.basename(os.path.realpath(fields[0]))
+                names.add(name)
+                # Bölümün ait olduğu disk: /sys/class/block/sdb1 -> ../sdb/sdb1
+                parent = os.path.basename(os.path.dirname(os.path.realpath(os.path.join("/sys/class/block", name))))
+                names.add(parent)
+    except OSError:
+        pass
+    return names
+
+
+def read_disk_metadata(name, sys_block_dir=SYS_BLOCK_DIR):
+    """
+    /sys/block/<name> için meta veri sözlüğü döndürür; disk yoksa None.
+    Sözlük devices.disk_from_sysfs ile aynı "path", "size_bytes", "size" anahtarlarını da içerir.
+    """
+    with METADATA_LOOKUP_SECONDS.time("sysfs"):
+        return _read_disk_metadata(name, sys_block_dir)
+
+
+def _read_disk_metadata(name, sys_block_dir):
+    block_dir = os.path.join(sys_block_dir, name)
+    sectors = _read_int(os.path.join(block_dir, "size"))
+    if sectors is None:
+        return None
+    size_bytes = sectors * 512  # sysfs boyutu her zaman 512 baytlık birimlerle verir
+    disk_path = "/dev/" + name
+
+    real_path = device_sysfs_path(disk_path, sys_block_dir)
+    usb_path = _usb_parent(real_path)
+    usb = _usb_metadata(usb_path) if usb_path else None
+
+    # SCSI sorgu metinleri (boşlukları _read_sysfs kırpar) önceliklidir; yoksa USB tanımlayıcısına düşülür.
+    # virtio gibi SCSI olmayan aygıtların device/vendor dosyası PCI kimliğidir, kullanılmaz.
+    vendor = model = None
+    if os.path.exists(os.path.join(block_dir, "device", "model")):
+        vendor = _read_sysfs(os.path.join(block_dir, "device", "vendor"))
+        model = _read_sysfs(os.path.join(block_dir, "device", "model"))
+    vendor = vendor or (usb and usb["manufacturer"])
+    model = model or (usb and usb["product"])
+    serial = (usb and usb["serial"]) or _read_sysfs(os.path.join(block_dir, "device", "serial"))
+    brand_parts = [part for part in (vendor, model) if part]
+
+    return {
+        "path": disk_path,
+        "name": name,
+        "size_bytes": size_bytes,
+        "size": bytes_to_human_readable(size_bytes),
+        "removable": _read_sysfs(os.path.join(block_dir, "removable")) == "1",
+        "vendor": vendor,
+        "model": model,
+        "serial": serial,
+        "brand_model": " ".join(brand_parts) if brand_parts else None,
+        "logical_block_size": _read_int(os.path.join(block_dir, "queue", "logical_block_size")),
+        "physical_block_size": _read_int(os.path.join(block_dir, "queue", "physical_block_size")),
+        "usb": usb,
+        "identity": make_identity(serial, usb and usb["vendor_id"], usb and usb["product_id"], size_bytes),
+    }
+
+
+def is_testable(metadata, system_disks=()):
+    """Çıkarılabilir, boş olmayan ve sistem diski olmayan diskler test edilebilir."""
+    return (metadata["removable"] and metadata["size_bytes"] > 0
+            and not metadata["path"].startswith(EXCLUDED_DEVICE_PREFIXES)
+            and metadata["name"] not in system_disks)
+
+
+def scan_removable_disks(sys_block_dir=SYS_BLOCK_DIR, mounts_file=PROC_MOUNTS, simulator_directory=None):
+    """
+    /sys/block üzerinde tek geçişte test edilebilir disklerin meta verilerini ada göre sıralı döndürür.
+    Simülatör etkinse (simulator_directory veya FAKE_USB_TESTER_SIMULATOR) simüle sürücüler sona eklenir.
+    """
+    with ENUMERATION_SECONDS.time():
+        return _scan_removable_disks(sys_block_dir, mounts_file, simulator_directory)
+
+
+def _scan_removable_disks(sys_block_dir, mounts_file, simulator_directory):
+    system_disks = system_mounted_disks(mounts_file)
+    disks = []
+    for name in sorted(os.listdir(sys_block_dir)):
+        if ("/dev/" + name).startswith(EXCLUDED_DEVICE_PREFIXES):
+            continue
+        metadata = read_disk_metadata(name, sys_block_dir)
+        if metadata is not None and is_testable(metadata, system_disks):
+            disks.append(metadata)
+    simulator_directory = simulator_directory or simulator.simulator_dir()
+    if simulator_directory:
+        disks.extend(simulator.drive_metadata(path) for path in simulator.list_drives(simulator_directory))
+    return disks
+
+
+def disk_metadata(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """/dev/sdX (veya simüle sürücü) için meta veriyi okur; bulunamazsa None."""
+    if simulator.is_simulated(disk_path):
+        return simulator.drive_metadata(disk_path)
+    return read_disk_metadata(os.path.basename(disk_path), sys_block_dir)
+
+
+def disk_identity(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """/dev/sdX için önbellek kimliğini sysfs'ten bulur; bulunamazsa None."""
+    metadata = disk_metadata(disk_path, sys_block_dir)
+    return metadata["identity"] if metadata else None
+
+
+class DeviceIndex:
+    """Disk yolu -> meta veri sözlüğü; farklı thread'lerden güvenle okunup güncellenebilir."""
+
+    def __init__(self, sys_block_dir=SYS_BLOCK_DIR, mounts_file=PROC_MOUNTS, simulator_directory=None):
+        self.sys_block_dir = sys_block_dir
+        self.mounts_file = mounts_file
+        self.simulator_directory = simulator_directory
+        self._lock = threading.Lock()
+        self._disks = {}
+
+    def refresh(self):
+        """Dizini sıfırdan kurar ve diskleri sıralı liste olarak döndürür."""
+        disks = scan_removable_disks(self.sys_block_dir, self.mounts_file, self.simulator_directory)
+        with self._lock:
+            self._disks = {disk["path"]: disk for disk in disks}
+        return disks
+
+    def update(self, disk_path):
+        """Tek bir diski yeniden okur (takma olayı); test edilebilir değilse dizinden çıkarır."""
+        if simulator.is_simulated(disk_path):
+            metadata = simulator.drive_metadata(disk_path)
+            with self._lock:
+                self._disks[disk_path] = metadata
+            return metadata
+        metadata = read_disk_metadata(os.path.basename(disk_path), self.sys_block_dir)
+        if metadata is None or not is_testable(metadata, system_mounted_disks(self.mounts_file)):
+            self.remove(disk_path)
+            return None
+        with self._lock:
+            self._disks[metadata["path"]] = metadata
+        return metadata
+
+    def remove(self, disk_path):
+        with self._lock:
+            self._disks.pop(disk_path, None)
+
+    def get(self, disk_path):
+        with self._lock:
+            return self._disks.get(disk_path)
+
+    def disks(self):
+        with self._lock:
+            return [self._disks[path] for path in sorted(self._disks)]
+
+    def __contains__(self, disk_path):
+        with self._lock:
+            return disk_path in self._disks
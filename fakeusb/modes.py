@@ -0,0 +1,158 @@
+"""Test türleri ve tek giriş noktası: arayüz ve komut satırı testleri buradan başlatır."""
+
+import os
+import shutil
+
+from . import topology, trace
+from .cancel import TestCancelled
+from .checkpoint import Checkpoint
+from .engine import verify_disk, DeviceBusyError
+from .f3 import probe_disk
+from .probe import probe_capacity
+from .quick import quick_check, DEFAULT_SAMPLES
+from .simulator import is_simulated
+from .speed import speed_test
+from .sustained import sustained_test
+from .result import (
+    ProbeResult, VERDICT_GENUINE, VERDICT_ERROR, ERROR_UNEXPECTED, ERROR_PERMISSION, ERROR_DEVICE_BUSY, ERROR_CANCELLED,
+)
+
+MODE_F3PROBE = "f3probe"  # pkexec f3probe (veriler korunur)
+MODE_PROBE = "probe"  # Yerleşik kapasite probu (veriler geri yazılır)
+MODE_VERIFY = "verify"  # Yerleşik tam yüzey yazma/doğrulama (yıkıcı)
+MODE_SPEED = "speed"  # Sıralı hız ve 4K rastgele IOPS ölçümü (diskin başını siler)
+MODE_SUSTAINED = "sustained"  # Tam yazma/doğrulama + yazma hızı profili ve önbellek uçurumu (yıkıcı)
+MODE_QUICK = "quick"  # Rastgele örneklemle hızlı ön eleme; şüpheli diskler tam proba aktarılır (veriler korunur)
+
+MODES = (MODE_F3PROBE, MODE_QUICK, MODE_PROBE, MODE_VERIFY, MODE_SPEED, MODE_SUSTAINED)
+DESTRUCTIVE_MODES = (MODE_VERIFY, MODE_SPEED, MODE_SUSTAINED)
+# Sonucu aygıtın değişmez bir özelliği olan testler; hız ölçümleri zamanla ve yıpranmayla değişir
+CACHEABLE_MODES = (MODE_F3PROBE, MODE_QUICK, MODE_PROBE, MODE_VERIFY)
+# Hızlı ön elemenin gerçek bulmadığı disklerin aktarılabileceği (veri koruyan) tam testler
+ESCALATION_MODES = (MODE_F3PROBE, MODE_PROBE)
+
+# Testlere options sözlüğüyle geçirilebilen ayarlar (yardımcıdan gelenler de bu listeyle süzülür)
+MODE_OPTIONS = {
+    MODE_QUICK: ("samples", "escalate"),  # escalate: ESCALATION_MODES'tan biri ya da None (aktarma yok)
+    MODE_VERIFY: ("resume",),  # False: kayıtlı ilerleme yok sayılır, test baştan başlar
+    MODE_SPEED: ("sequential_bytes", "queue_depths", "random_seconds", "min_write_mbps", "min_read_mbps"),
+    MODE_SUSTAINED: ("bucket_count", "cliff_ratio", "min_write_mbps"),
+}
+
+
+def run_test(disk_path, mode=MODE_F3PROBE, on_stdout=None, on_stderr=None, on_progress=None, on_event=None,
+             helper=None, options=None, cancel=None):
+    """
+    Diski seçilen türde test eder ve her durumda ProbeResult döndürür.
+    on_progress(phase, done_bytes, total_bytes, bytes_per_sec) yerleşik motorlarda,
+    on_event(event) f3probe ayrıştırıcısının tipli olaylarıyla çağrılır.
+    helper (helper.PrivilegedHelper) verilirse /dev altındaki diskler root yardımcısında test edilir.
+    options teste özgü ayarlardır (MODE_OPTIONS); bilinmeyen anahtarlar yok sayılır.
+    cancel (cancel.CancelToken) iptal edilirse test durdurulur ve error=ERROR_CANCELLED döner;
+    prob özgün verileri geri yazar, tam yüzey testi (verify) kaldığı yeri kaydedip sonraki
+    çalıştırmada oradan devam eder.
+    """
+    with trace.span("test", disk_path, mode=mode) as span:
+        result = _run_test(disk_path, mode, on_stdout, on_stderr, on_progress, on_event, helper, options or {},
+                           cancel)
+        span.set(verdict=result.verdict, error=result.error)
+    return result
+
+
+def _run_test(disk_path, mode, on_stdout, on_stderr, on_progress, on_event, helper, options, cancel):
+    if cancel is not None and cancel.cancelled:
+        # Kuyrukta beklerken iptal edilen test hiç başlamaz
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_CANCELLED)
+    if helper is not None and disk_path.startswith("/dev/"):
+        return helper.run_test(disk_path, mode, on_stdout, on_stderr, on_progress, on_event, options, cancel)
+    if mode == MODE_F3PROBE and is_simulated(disk_path):
+        # f3probe simüle sürücüyü göremez; yerine aynı soruyu yanıtlayan yerleşik prob çalışır
+        mode = MODE_PROBE
+    if mode == MODE_F3PROBE:
+        return probe_disk(disk_path, on_stdout, on_stderr, on_event, cancel)
+    if mode not in MODES:
+        raise ValueError(f"Bilinmeyen test türü: {mode}")
+
+    settings = {key: value for key, value in options.items() if key in MODE_OPTIONS.get(mode, ())}
+    if mode == MODE_QUICK:
+        return _run_quick(disk_path, on_stdout, on_stderr, on_progress, on_event, options, cancel,
+                          settings.get("samples"), settings.get("escalate", MODE_F3PROBE))
+
+    on_progress, finish_phase = trace.progress_spans(disk_path, on_progress)
+    try:
+        if mode == MODE_PROBE:
+            return probe_capacity(disk_path, reset=_usb_reset(disk_path), on_progress=on_progress, cancel=cancel)
+        if mode == MODE_SPEED:
+            return speed_test(disk_path, on_progress=on_progress, cancel=cancel, **settings)
+        if mode == MODE_SUSTAINED:
+            return sustained_test(disk_path, on_progress=on_progress, cancel=cancel, **settings)
+        checkpoint = Checkpoint.for_disk(disk_path)
+        return verify_disk(disk_path, on_progress=on_progress, cancel=cancel, checkpoint=checkpoint, **settings)
+    except TestCancelled:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_CANCELLED)
+    except PermissionError as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_PERMISSION, error_detail=str(e))
+    except DeviceBusyError as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_DEVICE_BUSY, error_detail=str(e))
+    except Exception as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED, error_detail=str(e))
+    finally:
+        finish_phase()
+
+
+def _usb_reset(disk_path):
+    """
+    Probun denetleyici önbelleğini boşaltmak için kullanacağı USB sıfırlaması. Yardımcıyla çalışan
+    testler zaten root olan yardımcının içinde buraya gelir. Root değilsek ya da disk USB'ye bağlı
+    değilse None döner; prob önbelleği doldurma yazmalarıyla boşaltır.
+    """
+    if is_simulated(disk_path) or os.geteuid() != 0 or topology.usb_device_node(disk_path) is None:
+        return None
+    return lambda: topology.reset_usb_device(disk_path)
+
+
+def _escalation_mode(disk_path, mode):
+    """
+    Aktarmada gerçekten çalışacak test türü: f3probe simüle sürücüyü göremez, kurulu değilse
+    de çalışamaz; bu durumlarda aynı soruyu yanıtlayan yerleşik prob çalışır.
+    """
+    if mode == MODE_F3PROBE and (is_simulated(disk_path) or shutil.which("f3probe") is None):
+        return MODE_PROBE
+    return mode
+
+
+def _run_quick(disk_path, on_stdout, on_stderr, on_progress, on_event, options, cancel, samples, escalate):
+    """
+    Hızlı ön elemeyi çalıştırır; gerçek bulunmayan (sahte ya da belirsiz) diskler escalate türündeki
+    tam teste aktarılır. Aktarılan testin sonucu döner, ön eleme özeti details["quick"] içindedir.
+    """
+    if escalate is not None and escalate not in ESCALATION_MODES:
+        raise ValueError(f"Hızlı ön eleme bu teste aktarılamaz: {escalate}")
+    on_progress_traced, finish_phase = trace.progress_spans(disk_path, on_progress)
+    try:
+        quick = quick_check(disk_path, samples or DEFAULT_SAMPLES, on_progress=on_progress_traced, cancel=cancel)
+    except TestCancelled:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_CANCELLED)
+    except PermissionError as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_PERMISSION, error_detail=str(e))
+    except DeviceBusyError as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_DEVICE_BUSY, error_detail=str(e))
+    except Exception as e:
+        return ProbeResult(disk=disk_path, verdict=VERDICT_ERROR, error=ERROR_UNEXPECTED, error_detail=str(e))
+    finally:
+        finish_phase()
+
+    summary = {key: quick.details.get(key) for key in ("samples", "bad_samples", "confidence", "min_fake_fraction")}
+    summary.update(verdict=quick.verdict, elapsed=quick.elapsed, escalated_to=None)
+    if quick.verdict == VERDICT_GENUINE or escalate is None:
+        quick.details["quick"] = summary
+        return quick
+
+    escalate = _escalation_mode(disk_path, escalate)
+    summary["escalated_to"] = escalate  # Özet, istenen değil gerçekten çalışan testi gösterir
+    with trace.span("escalate", disk_path, mode=escalate, quick_verdict=quick.verdict):
+        result = _run_test(disk_path, escalate, on_stdout, on_stderr, on_progress, on_event, None, options, cancel)
+    result.details["quick"] = summary
+    if result.elapsed is not None:
+        result.elapsed += quick.elapsed
+    return result
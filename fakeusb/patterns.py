@@ -0,0 +1,127 @@
+"""
+Sektör bazlı, adres etiketli test deseni.
+
+Her sektörün içeriği, tohumdan üretilmiş rastgele bir tablo satırının sektör adresiyle
+XOR'lanmasıdır. Satırların ilk 8 baytı sıfır olduğundan her sektör kendi adresiyle başlar;
+böylece yanlış yerden okunan (adres sarması yapan) sektörün hangi adrese ait olduğu da görülebilir.
+
+NumPy kuruluysa üretim ve karşılaştırma tüm blok üzerinde vektörel yapılır (bellek bant genişliğinde);
+kurulu değilse aynı baytları üreten saf Python yoluna düşülür. NumPy'nin yüklenmesi ~100 ms sürdüğünden
+modül içe aktarılırken değil, ilk PatternTable oluşturulurken yüklenir (liste, önbellek ve f3probe
+yolları hiç yüklemez).
+"""
+
+import random
+
+_numpy = None  # None: henüz denenmedi, False: kurulu değil
+
+TABLE_ROWS = 64  # 2'nin kuvveti olmalı
+_ROW_SHIFT = 64 - (TABLE_ROWS.bit_length() - 1)
+_MIX_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+DEFAULT_SEED = 0x46334655  # "F3FU"
+
+
+def load_numpy():
+    """NumPy modülünü ilk çağrıda içe aktarıp döndürür; kurulu değilse None."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # İsteğe bağlı bağımlılık
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def row_index(sector):
+    """Sektör adresine göre tablo satırını seçer."""
+    return ((sector * _MIX_MULTIPLIER) & _MASK64) >> _ROW_SHIFT
+
+
+class PatternTable:
+    """Bir tohum ve sektör boyutu için desen satırlarını tutar."""
+
+    def __init__(self, seed=DEFAULT_SEED, sector_size=512, use_numpy=True):
+        if sector_size % 8:
+            raise ValueError("Sektör boyutu 8'in katı olmalı.")
+        self.seed = seed
+        self.sector_size = sector_size
+        self.words = sector_size // 8
+        rng = random.Random(seed)
+        self.rows = [bytes(8) + rng.randbytes(sector_size - 8) for _ in range(TABLE_ROWS)]
+        self._numpy = load_numpy() if use_numpy else None
+        self.use_numpy = self._numpy is not None
+        if self.use_numpy:
+            self._row_array = self._numpy.frombuffer(b"".join(self.rows), dtype="<u8").reshape(TABLE_ROWS, self.words)
+
+    def sector(self, address):
+        """Tek bir sektörün beklenen içeriğini döndürür."""
+        tag = (address & _MASK64).to_bytes(8, "little") * (self.sector_size // 8)
+        row = self.rows[row_index(address)]
+        return (int.from_bytes(row, "little") ^ int.from_bytes(tag, "little")).to_bytes(self.sector_size, "little")
+
+    def generate(self, first_sector, count):
+        """first_sector'dan başlayan count sektörlük deseni bayt dizisi olarak döndürür."""
+        if self.use_numpy:
+            block = self._numpy.empty((count, self.words), dtype="<u8")
+            self._fill_array(block, first_sector)
+            return block.tobytes()
+        words = self.sector_size // 8
+        rows = self.rows
+        sectors = range(first_sector, first_sector + count)
+        table_part = b"".join([rows[row_index(address)] for address in sectors])
+        tag_part = b"".join([(address & _MASK64).to_bytes(8, "little") * words for address in sectors])
+        length = self.sector_size * count
+        # Tüm blok tek bir büyük tamsayı XOR'u ile birleştirilir; sektör başına Python döngüsü yapılmaz
+        return (int.from_bytes(table_part, "little") ^ int.from_bytes(tag_part, "little")).to_bytes(length, "little")
+
+    def _fill_array(self, block, first_sector):
+        """(count, words) biçimli uint64 dizisini ara kopya olmadan desenle doldurur."""
+        numpy = self._numpy
+        count = block.shape[0]
+        addresses = numpy.arange(first_sector, first_sector + count, dtype=numpy.uint64)
+        indices = (addresses * numpy.uint64(_MIX_MULTIPLIER)) >> numpy.uint64(_ROW_SHIFT)
+        numpy.take(self._row_array, indices.astype(numpy.intp), axis=0, out=block)
+        block ^= addresses[:, None]
+
+    def _as_array(self, buffer, count):
+        return self._numpy.frombuffer(buffer, dtype="<u8", count=count * self.words).reshape(count, self.words)
+
+    def source_address(self, data):
+        """
+        Sektör verisi bu desenin bir sektörüyse onun adresini, değilse None döndürür.
+        Yalnızca ilk iki sözcük denetlenir: ilki adresin kendisi, ikincisi satırın rastgele sözcüğüdür.
+        """
+        if len(data) < 16:
+            return None
+        address = int.from_bytes(data[:8], "little")
+        row = self.rows[row_index(address)]
+        if int.from_bytes(data[8:16], "little") != int.from_bytes(row[8:16], "little") ^ address:
+            return None
+        return address
+
+    def fill(self, buffer, first_sector):
+        """Yazılabilir buffer'ı (bytearray, mmap, memoryview) desenle doldurur."""
+        count = len(buffer) // self.sector_size
+        if self.use_numpy:
+            self._fill_array(self._as_array(buffer, count), first_sector)
+            return
+        buffer[:count * self.sector_size] = self.generate(first_sector, count)
+
+    def find_bad_sectors(self, buffer, first_sector):
+        """Desenle uyuşmayan sektörlerin buffer içindeki sıra numaralarını döndürür."""
+        sector_size = self.sector_size
+        count = len(buffer) // sector_size
+        if self.use_numpy:
+            expected = self._numpy.empty((count, self.words), dtype="<u8")
+            self._fill_array(expected, first_sector)
+            mismatched = (self._as_array(buffer, count) != expected).any(axis=1)
+            return self._numpy.flatnonzero(mismatched).tolist()
+        expected = self.generate(first_sector, count)
+        data = bytes(buffer[:count * sector_size])
+        if data == expected:
+            return []
+        return [index for index in range(count)
+                if data[index * sector_size:(index + 1) * sector_size]
+                != expected[index * sector_size:(index + 1) * sector_size]]
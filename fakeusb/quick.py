@@ -0,0 +1,159 @@
+"""
+Hızlı ön eleme: istatistiksel rastgele blok örneklemesi (veriler geri yazılır).
+
+Duyurulan kapasite eşit dilimlere bölünür ve her dilimden rastgele bir sektör (son dilimde
+her zaman son sektör) ile onun olası eşleri (prob ile aynı 2'nin kuvveti modüller) adres
+etiketli desenle yazılır. Tüm örnekler yazıldıktan sonra önbellek bir kez boşaltılır ve
+hepsi geri okunur; prob her denemede önbelleği boşalttığı için bu tek boşaltma testi
+saniyeler mertebesine indirir.
+
+Hiçbir örnek bozulmadıysa disk gerçek sayılır ve güven, kapasitenin en az
+MIN_FAKE_FRACTION kadarı sahte olan bir diskin bu örneklemle yakalanma olasılığı olarak
+bildirilir: 1 - (1 - f)^n. Bozulan örnekler kapasitenin sonunda toplanıyorsa disk sahtedir
+(gerçek kapasite iki örnek arasında kalır); aralarında sağlam örnekler varsa sonuç
+belirsizdir (dağınık bozuk bloklar). Sahte ve belirsiz diskler tam proba aktarılır.
+"""
+
+import random
+import time
+
+from .blockdev import open_device
+from .devices import bytes_to_human_readable, mounted_partitions
+from .engine import DeviceBusyError
+from .probe import CapacityProbe, FAKE_TYPE_LIMBO, FAKE_TYPE_WRAPAROUND
+from .regions import sample_map
+from .result import ProbeResult, VERDICT_GENUINE, VERDICT_FAKE, VERDICT_UNKNOWN
+
+DEFAULT_SAMPLES = 64
+MIN_FAKE_FRACTION = 0.05  # Güven bu orandan fazlası sahte olan diskler için bildirilir
+MIN_ALIAS_BYTES = 64 * 1024 * 1024  # Bundan küçük gerçek kapasiteli sarma pratikte görülmez; eş sayısını azaltır
+
+
+def detection_confidence(samples, fake_fraction=MIN_FAKE_FRACTION):
+    """Kapasitenin fake_fraction kadarı sahte olan bir diskin en az bir örnekle yakalanma olasılığı."""
+    return 1.0 - (1.0 - fake_fraction) ** samples
+
+
+def quick_summary(summary):
+    """modes'un details["quick"] özetini tek satırlık metne çevirir."""
+    text = f"hızlı: {summary['bad_samples']}/{summary['samples']} örnek bozuk"
+    if summary.get("escalated_to"):
+        return f"{text}, {summary['verdict']} → {summary['escalated_to']}"
+    if summary["verdict"] != VERDICT_GENUINE:
+        return text
+    return f"{text}, güven %{summary['confidence'] * 100:.1f}"
+
+
+class SampleCheck(CapacityProbe):
+    """Açık bir BlockDevice üzerinde örneklenen sektörlerin etiketlerini tek geçişte doğrular."""
+
+    def __init__(self, device, samples=DEFAULT_SAMPLES, seed=None, on_progress=None, cancel=None):
+        super().__init__(device, seed, on_progress=on_progress, cancel=cancel)
+        self.samples = max(1, min(samples, self.sector_count))
+        self.rng = random.Random(seed)
+        self.min_alias_bits = max(1, (MIN_ALIAS_BYTES // self.sector_size).bit_length() - 1)
+
+    def sample_sectors(self):
+        """Her dilimden bir rastgele sektör; son dilimden her zaman son sektör (sahte alan oradadır)."""
+        count = self.samples
+        sectors = set()
+        for index in range(count - 1):
+            first = index * self.sector_count // count
+            last = (index + 1) * self.sector_count // count
+            sectors.add(self.rng.randrange(first, max(last, first + 1)))
+        sectors.add(self.sector_count - 1)
+        return sorted(sectors)
+
+    def _anchors(self, sector):
+        """Prob ile aynı eş adresler; yalnızca gerçekçi (MIN_ALIAS_BYTES ve üstü) modüller."""
+        anchors = set()
+        for bits in range(self.min_alias_bits, self.sector_count.bit_length() + 1):
+            alias = sector & ((1 << bits) - 1)
+            if alias != sector:
+                anchors.add(alias)
+        return sorted(anchors)
+
+    def run(self):
+        """(örnek sektörler, {bozuk sektör: sahtelik türü}) döndürür; özgün veriler her durumda geri yazılır."""
+        try:
+            return self._check()
+        finally:
+            self.restore()
+
+    def _check(self):
+        sectors = self.sample_sectors()
+        total = 2 * len(sectors)
+        plan = []
+        for index, sector in enumerate(sectors):
+            if self.cancel is not None:
+                self.cancel.check()
+            anchors = self._anchors(sector)
+            for anchor in anchors:
+                # Eş her örnekte yeniden yazılmaz: önceki bir örneğin sarmasını örtmesin
+                if anchor not in self._saved:
+                    self._write_tag(anchor)
+            self._write_tag(sector)
+            plan.append((sector, anchors))
+            self.stats["probes"] += 1
+            if self.on_progress:
+                self.on_progress("quick", index + 1, total, 0.0)
+        self.device.drop_caches()
+
+        bad = {}
+        for index, (sector, anchors) in enumerate(plan):
+            if self.cancel is not None:
+                self.cancel.check()
+            if self._read(sector) != self.table.sector(sector):
+                bad[sector] = FAKE_TYPE_LIMBO
+            elif any(self._read(anchor) != self.table.sector(anchor) for anchor in anchors):
+                bad[sector] = FAKE_TYPE_WRAPAROUND
+            if self.on_progress:
+                self.on_progress("quick", len(sectors) + index + 1, total, 0.0)
+        return sectors, bad
+
+
+def quick_check(disk_path, samples=DEFAULT_SAMPLES, seed=None, on_progress=None, cancel=None):
+    """
+    Diski rastgele örneklemle hızlıca sınar ve ProbeResult döndürür (details["confidence"] ile).
+    Karar gerçek, sahte (bozulmalar kapasitenin sonunda) veya belirsiz (dağınık bozulmalar) olur.
+    Bağlı bölümü olan disklerde DeviceBusyError, yetki yoksa PermissionError, iptalde
+    (özgün veriler geri yazıldıktan sonra) TestCancelled yükseltir.
+    """
+    mounts = mounted_partitions(disk_path)
+    if mounts:
+        raise DeviceBusyError(", ".join(mounts))
+
+    start_time = time.monotonic()
+    with open_device(disk_path, writable=True) as device:
+        check = SampleCheck(device, samples, seed, on_progress, cancel)
+        sectors, bad = check.run()
+        sector_size = check.sector_size
+        announced_sectors = check.sector_count
+
+    result = ProbeResult(disk=disk_path, announced_bytes=announced_sectors * sector_size)
+    result.promised_capacity = bytes_to_human_readable(result.announced_bytes)
+    details = dict(check.stats, sector_size=sector_size, announced_sectors=announced_sectors,
+                   samples=len(sectors), bad_samples=len(bad), min_fake_fraction=MIN_FAKE_FRACTION,
+                   confidence=detection_confidence(len(sectors)), direct_io=device.direct)
+    if not bad:
+        result.verdict = VERDICT_GENUINE
+        result.real_bytes = result.announced_bytes
+        result.real_capacity = result.promised_capacity
+    else:
+        first_bad = min(bad)
+        good_below = [sector for sector in sectors if sector < first_bad]
+        if any(sector > first_bad and sector not in bad for sector in sectors):
+            # Sahte kapasite sondan başlar; arada sağlam örnek varsa bu bozuk blok ya da önbellek etkisidir
+            result.verdict = VERDICT_UNKNOWN
+        else:
+            result.verdict = VERDICT_FAKE
+            result.fake_type = bad[first_bad]
+            # Gerçek sınır son sağlam örnek ile ilk bozuk örnek arasındadır; alt sınır bildirilir
+            result.real_bytes = (good_below[-1] + 1) * sector_size if good_below else 0
+            result.real_capacity = bytes_to_human_readable(result.real_bytes)
+            details["real_bytes_upper"] = first_bad * sector_size
+        details["first_bad_offset"] = first_bad * sector_size
+    details["regions"] = sample_map(announced_sectors, sector_size, sectors, bad).to_dict()
+    result.details = details
+    result.elapsed = time.monotonic() - start_time
+    return result
@@ -0,0 +1,241 @@
+"""
+Sektör aralığı haritası: diskin hangi bölgelerinin sağlam, sarmalı veya kayıp olduğu.
+
+Harita duyurulan kapasitenin tamamını kapsayan, ardışık ve çakışmayan bölgelerden oluşur ve
+bölge başlangıçları ile türleri iki dizi (array('Q') + bytearray) halinde saklanır. Basit bir
+kesilmede 2 TB (yaklaşık 4 milyar sektör) duyuran sahte disk de iki bölge tutar. Dağınık
+bozuk bloklar bölge sayısını max_runs'ı aşacak kadar artırırsa harita kabalaştırılır: bölgeler
+2'nin kuvveti sektörlük taneciklere yuvarlanır ve her tanecik içindeki en kötü türü alır; bozuk
+bir sektör hiçbir zaman sağlam gösterilmez.
+
+Türler:
+    good        Yazılan geri okundu
+    wraparound  Hayalet adres: verisi gerçek kapasitedeki bir sektöre düşüyor (adres sarması)
+    discarded   Yazılan kayboldu (limbo) ya da okunamadı
+    untested    Bu testte bakılmadı (ör. hızlı ön elemede türü farklı iki örnek arası)
+
+Prob ve f3probe tek bir sınır bulur; sınırın ötesi bütünüyle sahtelik türüyle işaretlenir.
+Tam yüzey testinde sarmalı bir diskin baştaki sektörleri sondaki adreslerin verisini taşır;
+bu durumda okunan baştaki gerçek bölge değil, verisi oraya düşen hayalet adresler sarmalı
+sayılır (engine._Aliases).
+
+Sonuçta details["regions"] olarak (to_dict) saklanır ve sonuçla birlikte dışa aktarılır.
+"""
+
+import array
+import bisect
+
+REGION_GOOD = "good"
+REGION_UNTESTED = "untested"
+REGION_WRAPAROUND = "wraparound"
+REGION_DISCARDED = "discarded"
+# Sıra önem derecesidir: kabalaştırmada tanecik içindeki en büyük kod kazanır
+REGION_KINDS = (REGION_GOOD, REGION_UNTESTED, REGION_WRAPAROUND, REGION_DISCARDED)
+_KIND_CODES = {kind: code for code, kind in enumerate(REGION_KINDS)}
+
+DEFAULT_MAX_RUNS = 4096
+TEXT_BAR_SYMBOLS = {REGION_GOOD: "=", REGION_UNTESTED: " ", REGION_WRAPAROUND: "~", REGION_DISCARDED: "x"}
+
+
+def region_for_fake_type(fake_type):
+    """Prob ve f3probe sahtelik türünü bölge türüne çevirir (sarma ve zincir: wraparound)."""
+    fake_type = (fake_type or "").lower()
+    if "wrap" in fake_type or "chain" in fake_type:
+        return REGION_WRAPAROUND
+    return REGION_DISCARDED
+
+
+class RegionMap:
+    """Duyurulan sektörlerin tamamını kapsayan sıralı bölge listesi."""
+
+    def __init__(self, sectors, sector_size=512, max_runs=DEFAULT_MAX_RUNS):
+        self.sectors = max(0, int(sectors))
+        self.sector_size = sector_size
+        self.max_runs = max(4, max_runs)
+        self.granularity = 1  # Kabalaştırmadan sonra bölge sınırları bu sektör sayısının katlarıdır
+        self._starts = array.array("Q", [0])
+        self._kinds = bytearray([_KIND_CODES[REGION_UNTESTED]])
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def runs(self):
+        """(başlangıç sektörü, bitiş sektörü (hariç), tür) üretir."""
+        starts, kinds = self._starts, self._kinds
+        for index in range(len(kinds)):
+            end = starts[index + 1] if index + 1 < len(kinds) else self.sectors
+            yield starts[index], end, REGION_KINDS[kinds[index]]
+
+    def kind_at(self, sector):
+        return REGION_KINDS[self._kinds[bisect.bisect_right(self._starts, sector) - 1]]
+
+    def mark(self, start, end, kind):
+        """[start, end) sektörlerini kind olarak işaretler."""
+        start, end = max(0, start), min(self.sectors, end)
+        if start >= end:
+            return
+        code = _KIND_CODES[kind]
+        granularity = self.granularity
+        if granularity == 1:
+            self._assign(start, end, code)
+        else:
+            # Kısmen kapsanan uç taneciklerde mevcut en kötü tür korunur
+            inner_start = -(-start // granularity) * granularity
+            inner_end = end if end == self.sectors else end - end % granularity
+            edges = set()
+            if start % granularity:
+                edges.add(start - start % granularity)
+            if end % granularity and end != self.sectors:
+                edges.add(end - end % granularity)
+            for edge in edges:
+                edge_end = min(edge + granularity, self.sectors)
+                self._assign(edge, edge_end, max(code, self._worst(edge, edge_end)))
+            if inner_start < inner_end:
+                self._assign(inner_start, inner_end, code)
+        if len(self._kinds) > self.max_runs:
+            self._coarsen()
+
+    def _split(self, position):
+        """position'da bir bölge sınırı olmasını sağlar ve o bölgenin sırasını döndürür."""
+        index = bisect.bisect_right(self._starts, position) - 1
+        if self._starts[index] == position:
+            return index
+        self._starts.insert(index + 1, position)
+        self._kinds.insert(index + 1, self._kinds[index])
+        return index + 1
+
+    def _assign(self, start, end, code):
+        first = self._split(start)
+        last = self._split(end) if end < self.sectors else len(self._kinds)
+        del self._starts[first + 1:last]
+        del self._kinds[first + 1:last]
+        self._kinds[first] = code
+        # Komşu bölgeler aynı türdeyse birleştirilir
+        if first + 1 < len(self._kinds) and self._kinds[first + 1] == code:
+            del self._starts[first + 1]
+            del self._kinds[first + 1]
+        if first > 0 and self._kinds[first - 1] == code:
+            del self._starts[first]
+            del self._kinds[first]
+
+    def escalate(self, start, end, kind):
+        """[start, end) içinde yalnızca kind'dan daha az önemli türdeki bölgeleri kind yapar."""
+        start, end = max(0, start), min(self.sectors, end)
+        code = _KIND_CODES[kind]
+        index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        pieces = []
+        while index < len(self._kinds) and self._starts[index] < end:
+            run_end = self._starts[index + 1] if index + 1 < len(self._kinds) else self.sectors
+            if self._kinds[index] < code:
+                pieces.append((max(self._starts[index], start), min(run_end, end)))
+            index += 1
+        for piece_start, piece_end in pieces:
+            self.mark(piece_start, piece_end, kind)
+
+    def _worst(self, start, end):
+        index = bisect.bisect_right(self._starts, start) - 1
+        worst = 0
+        while index < len(self._kinds) and self._starts[index] < end:
+            worst = max(worst, self._kinds[index])
+            index += 1
+        return worst
+
+    def _coarsen(self):
+        """Bölge sayısı max_runs'ın yarısına inene kadar tanecik boyunu ikiye katlar."""
+        while len(self._kinds) > self.max_runs // 2:
+            self.granularity *= 2
+            granularity = self.granularity
+            pieces = []
+            for start, end, kind in list(self.runs()):
+                edge = start - start % granularity
+                if edge != start and (not pieces or pieces[-1][0] < edge):
+                    pieces.append((edge, self._worst(edge, min(edge + granularity, self.sectors))))
+                inner_start = -(-start // granularity) * granularity
+                inner_end = end if end == self.sectors else end - end % granularity
+                if inner_start < inner_end:
+                    pieces.append((inner_start, _KIND_CODES[kind]))
+            starts, kinds = array.array("Q"), bytearray()
+            for start, code in pieces:
+                if kinds and kinds[-1] == code:
+                    continue
+                starts.append(start)
+                kinds.append(code)
+            self._starts, self._kinds = starts, kinds
+
+    def totals(self):
+        """Tür -> bayt sayısı."""
+        totals = dict.fromkeys(REGION_KINDS, 0)
+        for start, end, kind in self.runs():
+            totals[kind] += (end - start) * self.sector_size
+        return totals
+
+    def holes(self):
+        """
+        Sağlam bölgelerin arasında kalan bozuk bölge sayısı. Sondaki bozuk bölgeler (basit bir
+        kesilmenin ötesi) ve test edilmemiş bölgeler sayılmaz.
+        """
+        kinds = [kind for _, _, kind in self.runs() if kind != REGION_UNTESTED]
+        last_good = max((index for index, kind in enumerate(kinds) if kind == REGION_GOOD), default=-1)
+        return sum(1 for kind in kinds[:last_good] if kind != REGION_GOOD)
+
+    def cells(self, width):
+        """Haritayı width hücreye böler; her hücre kapsadığı en kötü türü alır (çubuk gösterimi için)."""
+        if width <= 0 or not self.sectors:
+            return []
+        cells = []
+        for cell in range(width):
+            start = cell * self.sectors // width
+            end = max((cell + 1) * self.sectors // width, start + 1)
+            cells.append(REGION_KINDS[self._worst(start, end)])
+        return cells
+
+    def text_bar(self, width=40):
+        return "[" + "".join(TEXT_BAR_SYMBOLS[kind] for kind in self.cells(width)) + "]"
+
+    def to_dict(self):
+        """JSON'a yazılabilir RLE gösterimi: runs [başlangıç sektörü, tür] listesidir."""
+        return {"sectors": self.sectors, "sector_size": self.sector_size, "granularity": self.granularity,
+                "runs": [[start, REGION_KINDS[code]] for start, code in zip(self._starts, self._kinds)]}
+
+    @classmethod
+    def from_dict(cls, data, max_runs=DEFAULT_MAX_RUNS):
+        regions = cls(data["sectors"], data.get("sector_size", 512), max(max_runs, len(data["runs"])))
+        regions.granularity = data.get("granularity", 1)
+        regions._starts = array.array("Q", (start for start, _ in data["runs"]))
+        regions._kinds = bytearray(_KIND_CODES[kind] for _, kind in data["runs"])
+        return regions
+
+
+def cutoff_map(announced_bytes, real_bytes, fake_type=None, sector_size=512):
+    """Tek bir kesilme: [0, real) sağlam, ötesi sahtelik türüne göre; boyutlar bilinmiyorsa None."""
+    if not announced_bytes or real_bytes is None or not sector_size:
+        return None
+    regions = RegionMap(announced_bytes // sector_size, sector_size)
+    real_sectors = min(real_bytes // sector_size, regions.sectors)
+    regions.mark(0, real_sectors, REGION_GOOD)
+    regions.mark(real_sectors, regions.sectors, region_for_fake_type(fake_type))
+    return regions
+
+
+def sample_map(sectors, sector_size, samples, bad):
+    """
+    Örnek sektörlerden harita: ardışık iki örnek aynı türdeyse aradaki bölge de o türdendir,
+    türleri farklıysa aradaki bölge test edilmemiş sayılır. bad {sektör: sahtelik türü} sözlüğüdür.
+    """
+    regions = RegionMap(sectors, sector_size)
+    previous = None
+    for sector in samples:
+        kind = region_for_fake_type(bad[sector]) if sector in bad else REGION_GOOD
+        if previous is not None and previous[1] == kind:
+            regions.mark(previous[0], sector + 1, kind)
+        else:
+            regions.mark(sector, sector + 1, kind)
+        previous = (sector, kind)
+    return regions
+
+
+def regions_summary(data):
+    """details["regions"] sözlüğünü tek satırlık metne (çubuk ve delik sayısı) çevirir."""
+    regions = RegionMap.from_dict(data)
+    holes = regions.holes()
+    return regions.text_bar() + (f" {holes} delik" if holes else "")
@@ -0,0 +1,63 @@
+"""Test sonuçlarının arayüzden bağımsız gösterimi."""
+
+import dataclasses
+
+VERDICT_GENUINE = "genuine"  # Muhtemelen gerçek
+VERDICT_FAKE = "fake"  # Sahte (f3 sahte olduğunu bildirdi)
+VERDICT_MISMATCH = "mismatch"  # Vaadedilen ve gerçek kapasite farklı
+VERDICT_UNKNOWN = "unknown"  # Test bitti ama karar verilemedi
+VERDICT_ERROR = "error"  # Test çalıştırılamadı
+
+# Hata kodları (arayüz bunları çeviri anahtarlarına eşler)
+ERROR_AUTH = "auth"
+ERROR_PKEXEC_MISSING = "pkexec_missing"
+ERROR_HELPER_MISSING = "helper_missing"  # Root'a ait yardımcı kurulu değil
+ERROR_F3_MISSING = "f3_missing"
+ERROR_EXIT_CODE = "exit_code"
+ERROR_UNEXPECTED = "unexpected"
+ERROR_PERMISSION = "permission"  # Aygıta doğrudan erişim izni yok
+ERROR_DEVICE_BUSY = "device_busy"  # Aygıtın bağlı bölümleri var
+ERROR_CANCELLED = "cancelled"  # Test kullanıcı isteğiyle durduruldu
+ERROR_DEVICE_CHANGED = "device_changed"  # İş kaydedildikten sonra disk çıkarıldı veya yerine başkası takıldı
+
+# Kapasite kararından ayrı tutulan hız kararı (yalnızca hız ölçen testlerde dolu)
+PERFORMANCE_OK = "ok"
+PERFORMANCE_SLOW = "slow"  # İstenen en düşük hızın altında
+PERFORMANCE_CACHE_CLIFF = "cache_cliff"  # Yazma hızı önbellek dolunca kalıcı olarak çöküyor
+
+
+@dataclasses.dataclass
+class ProbeResult:
+    """Tek bir diskin test sonucu."""
+    disk: str
+    verdict: str = VERDICT_UNKNOWN
+    real_capacity: str = None  # "7.86 GB" gibi, f3'ün yazdığı biçimde
+    promised_capacity: str = None
+    real_bytes: int = None
+    announced_bytes: int = None
+    fake_type: str = None  # f3'ün bildirdiği sahte türü (limbo, wraparound, chain...)
+    returncode: int = None
+    error: str = None  # ERROR_* kodlarından biri
+    error_detail: str = None
+    parse_errors: list = dataclasses.field(default_factory=list)
+    details: dict = dataclasses.field(default_factory=dict)  # Motora özgü ayrıntılar (hızlar, hatalı baytlar...)
+    elapsed: float = None  # Saniye
+    performance_verdict: str = None  # PERFORMANCE_* kodlarından biri; hız ölçülmediyse None
+
+    @property
+    def is_fake(self):
+        return self.verdict in (VERDICT_FAKE, VERDICT_MISMATCH)
+
+    @property
+    def is_slow(self):
+        return self.performance_verdict not in (None, PERFORMANCE_OK)
+
+    def to_dict(self):
+        """JSON'a yazılabilir sözlük döndürür."""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict çıktısından ProbeResult oluşturur; bilinmeyen alanlar yok sayılır."""
+        field_names = {field.name for field in dataclasses.fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in field_names})
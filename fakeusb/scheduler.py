@@ -0,0 +1,139 @@
+"""
+Çoklu disk testleri için zamanlayıcı.
+Testler sabit sayıda, yeniden kullanılan iş parçacığında çalışır;
+aynı kök hub'a bağlı disklerde aynı anda çalışan test sayısı sınırlanır.
+Kuyruk önceliğe göre sıralıdır (küçük sayı önce); aynı öncelikteki işler geliş sırasıyla çalışır.
+"""
+
+import bisect
+import collections
+import itertools
+import threading
+
+from .topology import usb_bus_for_device
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PER_BUS_LIMIT = 2
+
+PRIORITY_HIGH = -10  # Ör. bilinen sahte parmak izine sahip diskler
+PRIORITY_NORMAL = 0
+
+
+class ProbeJob:
+    """Zamanlayıcıya gönderilen tek bir disk testi."""
+
+    def __init__(self, disk_path, func, bus, priority=PRIORITY_NORMAL):
+        self.disk_path = disk_path
+        self.func = func
+        self.bus = bus
+        self.priority = priority
+        self.state = "queued"  # queued, running, done
+        self.error = None
+        self._done_event = threading.Event()
+
+    def wait(self, timeout=None):
+        """Test bitene kadar bekler."""
+        return self._done_event.wait(timeout)
+
+    def done(self):
+        return self._done_event.is_set()
+
+
+class ProbeScheduler:
+    """
+    Testleri öncelik sıralı bir iş kuyruğundan alıp iş parçacığı havuzunda çalıştırır.
+    Her kök hub için aynı anda en fazla per_bus_limit test yürütülür;
+    sıradaki iş meşgul bir hub'daysa, boş hub'daki sonraki işe geçilir.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, per_bus_limit=DEFAULT_PER_BUS_LIMIT,
+                 bus_resolver=usb_bus_for_device):
+        self.max_workers = max(1, int(max_workers))
+        self.per_bus_limit = max(1, int(per_bus_limit))
+        self._bus_resolver = bus_resolver
+        self._condition = threading.Condition()
+        self._pending = []  # (öncelik, sıra no, ProbeJob), sıralı tutulur
+        self._sequence = itertools.count()
+        self._running_per_bus = collections.Counter()
+        self._running_disks = set()
+        self._threads = []
+        self._idle_workers = 0
+        self._shutdown = False
+
+    def submit(self, disk_path, func, priority=PRIORITY_NORMAL):
+        """func'ı disk_path için kuyruğa ekler ve ProbeJob döndürür; küçük priority önce çalışır."""
+        job = ProbeJob(disk_path, func, self._bus_resolver(disk_path), priority)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Zamanlayıcı kapatıldı.")
+            bisect.insort(self._pending, (priority, next(self._sequence), job))
+            # Boşta iş parçacığı yoksa havuzu sınırına kadar büyüt
+            if self._idle_workers == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker_loop, name=f"probe-worker-{len(self._threads)}",
+                                          daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify_all()
+        return job
+
+    def is_busy(self, disk_path):
+        """Disk için kuyrukta veya çalışan bir test varsa True döndürür."""
+        with self._condition:
+            if disk_path in self._running_disks:
+                return True
+            return any(job.disk_path == disk_path for _, _, job in self._pending)
+
+    def active_count(self):
+        """Kuyruktaki ve çalışan testlerin toplamını döndürür."""
+        with self._condition:
+            return len(self._pending) + len(self._running_disks)
+
+    def shutdown(self, wait=True):
+        """Yeni iş kabulünü durdurur; wait=True ise çalışan iş parçacıklarını bekler."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _next_runnable_job(self):
+        """Kök hub sınırını aşmayan en öncelikli işi kuyruktan çıkarır (kilit tutulurken çağrılır)."""
+        for index, (_, _, job) in enumerate(self._pending):
+            # Aynı disk için iki test aynı anda çalışmamalı
+            if job.disk_path in self._running_disks:
+                continue
+            if self._running_per_bus[job.bus] < self.per_bus_limit:
+                del self._pending[index]
+                return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                self._idle_workers += 1
+                job = self._next_runnable_job()
+                while job is None:
+                    if self._shutdown and not self._pending:
+                        self._idle_workers -= 1
+                        return
+                    self._condition.wait()
+                    job = self._next_runnable_job()
+                self._idle_workers -= 1
+                self._running_per_bus[job.bus] += 1
+                self._running_disks.add(job.disk_path)
+                job.state = "running"
+
+            try:
+                job.func()
+            except Exception as e:  # İş parçacığı havuzu tek bir hatayla ölmemeli
+                job.error = e
+            finally:
+                with self._condition:
+                    self._running_per_bus[job.bus] -= 1
+                    if self._running_per_bus[job.bus] <= 0:
+                        del self._running_per_bus[job.bus]
+                    self._running_disks.discard(job.disk_path)
+                    job.state = "done"
+                    self._condition.notify_all()
+                job._done_event.set()
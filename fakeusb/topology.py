@@ -0,0 +1,66 @@
+"""USB topolojisi yardımcıları: bir blok aygıtın hangi kök hub/veri yolunda olduğunu sysfs'ten okur."""
+
+import fcntl
+import os
+
+from . import simulator
+
+SYS_BLOCK_DIR = "/sys/block"
+USB_DEVICE_DIR = "/dev/bus/usb"
+USBDEVFS_RESET = 0x5514  # _IO('U', 20)
+
+
+def device_sysfs_path(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """/dev/sdX yolunu /sys/devices altındaki gerçek aygıt yoluna çevirir."""
+    name = os.path.basename(disk_path)
+    link = os.path.join(sys_block_dir, name)
+    if not os.path.exists(link):
+        return None
+    return os.path.realpath(link)
+
+
+def usb_bus_for_device(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """
+    Diskin bağlı olduğu kök hub'ı ("usb2" gibi) döndürür.
+    USB dışı veya çözümlenemeyen aygıtlar kendi adıyla ayrı bir anahtar alır;
+    böylece topolojisini bilmediğimiz aygıtlar birbirini kısıtlamaz.
+    """
+    if simulator.is_simulated(disk_path):
+        return simulator.load_manifest(disk_path)["bus"]
+    real_path = device_sysfs_path(disk_path, sys_block_dir)
+    if real_path:
+        for part in real_path.split(os.sep):
+            if part.startswith("usb") and part[3:].isdigit():
+                return part
+    return "dev:" + os.path.basename(disk_path)
+
+
+def usb_device_node(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """Diskin bağlı olduğu USB aygıtının /dev/bus/usb/BBB/DDD düğümünü döndürür; USB değilse None."""
+    real_path = device_sysfs_path(disk_path, sys_block_dir)
+    while real_path and real_path != os.sep:
+        try:
+            with open(os.path.join(real_path, "busnum")) as f:
+                busnum = int(f.read())
+            with open(os.path.join(real_path, "devnum")) as f:
+                devnum = int(f.read())
+        except (OSError, ValueError):
+            real_path = os.path.dirname(real_path)
+            continue
+        return os.path.join(USB_DEVICE_DIR, f"{busnum:03d}", f"{devnum:03d}")
+    return None
+
+
+def reset_usb_device(disk_path, sys_block_dir=SYS_BLOCK_DIR):
+    """
+    Diskin USB aygıtını sıfırlar (USBDEVFS_RESET); denetleyici önbelleği boşalır.
+    Root yetkisi gerekir; aygıt USB değilse FileNotFoundError yükseltir.
+    """
+    node = usb_device_node(disk_path, sys_block_dir)
+    if node is None:
+        raise FileNotFoundError(f"{disk_path} için USB aygıtı bulunamadı")
+    fd = os.open(node, os.O_WRONLY)
+    try:
+        fcntl.ioctl(fd, USBDEVFS_RESET, 0)
+    finally:
+        os.close(fd)
@@ -0,0 +1,231 @@
+"""
+İsteğe bağlı test zaman çizelgesi (Chrome trace biçimi).
+
+Etkinleştirildiğinde iç içe geçen aralıklar (span) monotonik saatle kaydedilir ve
+Perfetto veya chrome://tracing ile açılabilen trace.json dosyasına yazılır. Disk yolu verilen
+aralıklar her disk için ayrı bir şeritte, diğerleri çalıştıkları thread'in şeridinde görünür.
+Kapalıyken span() paylaşılan boş bir bağlam yöneticisi döndürür; hiçbir şey kaydedilmez.
+
+Zaman damgaları CLOCK_MONOTONIC'ten alındığı için yardımcı sürecin kaydettiği aralıklar
+(istekle birlikte geri gönderilir) aynı zaman çizelgesinde doğru yerde görünür.
+
+Örnek:
+    fake-usb-tester --batch --trace trace.json
+    FAKE_USB_TESTER_TRACE=trace.json fake-usb-tester
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+DISK_LANE_BASE = 10 ** 9  # Disk şeritleri gerçek thread kimlikleriyle (pid_max altında) çakışmaz
+
+_tracer = None  # Kapalıyken None; span() yalnızca buna bakar
+
+
+def now_us():
+    return time.monotonic_ns() // 1000
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, disk, args):
+        self.tracer = tracer
+        self.name = name
+        self.disk = disk
+        self.args = args
+
+    def __enter__(self):
+        self.start = now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, now_us(), self.disk, **self.args)
+        return False
+
+    def set(self, **args):
+        """Aralık kapanmadan önce öğrenilen bilgileri (karar, bayt sayısı...) ekler."""
+        self.args.update(args)
+
+
+class Tracer:
+    """Olayları bellekte toplar; write() ile Chrome trace JSON olarak yazar."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events = []
+        self._lanes = {}  # Disk yolu -> şerit numarası
+        self._thread_names = {}  # Şerit (tid) -> görünen ad
+
+    def _lane(self, disk):
+        if disk is None:
+            thread = threading.current_thread()
+            tid = threading.get_native_id()
+            self._thread_names.setdefault(tid, thread.name)
+            return tid
+        tid = self._lanes.get(disk)
+        if tid is None:
+            tid = self._lanes[disk] = DISK_LANE_BASE + len(self._lanes)
+            self._thread_names[tid] = disk
+        return tid
+
+    def add(self, event, disk=None):
+        with self._lock:
+            event["pid"] = self.pid
+            event["tid"] = self._lane(disk)
+            self._events.append(event)
+
+    def complete(self, name, start_us, end_us, disk=None, **args):
+        self.add({"name": name, "ph": "X", "ts": start_us, "dur": max(end_us - start_us, 0), "args": args}, disk)
+
+    def instant(self, name, disk=None, **args):
+        self.add({"name": name, "ph": "i", "s": "t", "ts": now_us(), "args": args}, disk)
+
+    def async_event(self, name, async_id, phase, **args):
+        self.add({"name": name, "cat": "signal", "ph": phase, "id": hex(async_id), "ts": now_us(), "args": args})
+
+    def merge(self, events):
+        """Başka bir süreçte (yardımcıda) kaydedilmiş olayları ekler."""
+        with self._lock:
+            self._events.extend(events)
+
+    def drain(self, disk):
+        """Diskin şeridindeki olayları (şerit adıyla birlikte) çıkarıp döndürür."""
+        with self._lock:
+            tid = self._lanes.get(disk)
+            if tid is None:
+                return []
+            drained = [event for event in self._events if event["tid"] == tid and event["pid"] == self.pid]
+            self._events = [event for event in self._events if not (event["tid"] == tid and event["pid"] == self.pid)]
+        return self._metadata(only_tid=tid) + drained
+
+    def _metadata(self, only_tid=None):
+        with self._lock:
+            names = dict(self._thread_names)
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                     "args": {"name": f"{os.path.basename(sys.argv[0]) or 'python'} ({self.pid})"}}]
+        metadata.extend({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                        for tid, name in names.items() if only_tid is None or tid == only_tid)
+        return metadata
+
+    def to_dict(self):
+        with self._lock:
+            events = list(self._events)
+        return {"traceEvents": self._metadata() + events, "displayTimeUnit": "ms"}
+
+    def write(self, path=None):
+        """trace.json dosyasını yazar ve yolunu döndürür."""
+        path = path or self.path
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+
+def enable(path=None):
+    """İzlemeyi açar (zaten açıksa mevcut kaydediciyi döndürür)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+    return _tracer
+
+
+def disable():
+    """İzlemeyi kapatır ve kaydediciyi (varsa) döndürür."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def current():
+    return _tracer
+
+
+def span(name, disk=None, **args):
+    """with trace.span("write", disk): ... — kapalıyken maliyetsiz boş bağlam yöneticisi."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, disk, args)
+
+
+def instant(name, disk=None, **args):
+    tracer = _tracer
+    if tracer is not None:
+        tracer.instant(name, disk, **args)
+
+
+def async_begin(name, async_id, **args):
+    """Thread'ler arasında süren bir aralığı başlatır (ör. sinyalin yayılması ile teslimi arası)."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.async_event(name, async_id, "b", **args)
+
+
+def async_end(name, async_id):
+    tracer = _tracer
+    if tracer is not None:
+        tracer.async_event(name, async_id, "e")
+
+
+def progress_spans(disk, on_progress):
+    """
+    on_progress'i sarar; ilerleme bildirilen her aşama (yazma, doğrulama...) ayrı bir aralık olur.
+    Döndürülen (callback, finish) çiftinde finish() son aşamayı kapatır. Kapalıyken sarmaz.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return on_progress, lambda: None
+    state = {"phase": None, "start": 0}
+
+    def finish():
+        if state["phase"] is not None:
+            tracer.complete(state["phase"], state["start"], now_us(), disk)
+            state["phase"] = None
+
+    def callback(phase, done, total, rate):
+        if phase != state["phase"]:
+            finish()
+            state["phase"], state["start"] = phase, now_us()
+        if on_progress:
+            on_progress(phase, done, total, rate)
+    return callback, finish
+
+
+def traced(name=None):
+    """Fonksiyonun her çağrısını bir aralık olarak kaydeden dekoratör (kapalıyken yalnızca bir kontrol)."""
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            with _Span(tracer, label, None, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,36 @@
+"""Testler için ortak ayarlar: depo kökü içe aktarma yoluna eklenir, önbellekler geçici dizine yönlendirilir."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakeusb import simulator  # noqa: E402
+
+MiB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Önbellek, kontrol noktası ve belirteç dosyaları kullanıcının ~/.cache dizinine yazılmaz."""
+    cache_home = tmp_path / "cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.delenv(simulator.SIMULATOR_DIR_ENV, raising=False)
+    return cache_home
+
+
+@pytest.fixture
+def sim_dir(tmp_path):
+    return str(tmp_path / "sim")
+
+
+@pytest.fixture
+def make_drive(sim_dir):
+    """simulator.create_drive'ı küçük varsayılan boyutlarla çağıran yardımcı."""
+
+    def make(kind, announced_bytes=64 * MiB, real_bytes=16 * MiB, name=None, **options):
+        return simulator.create_drive(sim_dir, name or kind, kind, announced_bytes, real_bytes, **options)
+
+    return make
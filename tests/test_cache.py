@@ -0,0 +1,83 @@
+import types
+
+import pytest
+
+from fakeusb import cache as cache_module
+from fakeusb.cache import ResultCache, make_identity
+from fakeusb.result import ProbeResult, VERDICT_ERROR, VERDICT_FAKE, VERDICT_GENUINE
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Önbelleğin gördüğü saati elle ilerletilebilir yapar."""
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _result(verdict=VERDICT_FAKE, real_bytes=1024):
+    return ProbeResult(disk="/dev/sdb", verdict=verdict, real_bytes=real_bytes, details={"block_size": 512})
+
+
+def test_identity_needs_serial():
+    assert make_identity("ABC123", "0781", "5567", 16 * 1024**3) == f"ABC123|0781:5567|{16 * 1024**3}"
+    assert make_identity(None, "0781", "5567", 1024) is None
+
+
+def test_round_trip_by_mode(clock):
+    cache = ResultCache(":memory:")
+    cache.put("id", _result(), "probe")
+    clock[0] += 10
+    cache.put("id", _result(VERDICT_GENUINE), "quick")
+    result, tested_at = cache.get("id", "probe")
+    assert result.verdict == VERDICT_FAKE and result.real_bytes == 1024 and result.details == {"block_size": 512}
+    assert tested_at == clock[0] - 10
+    # Test türü verilmezse en yeni sonuç döner
+    assert cache.get("id")[0].verdict == VERDICT_GENUINE
+    assert cache.get("id", "verify") is None
+    assert cache.get(None) is None
+
+
+def test_errors_and_unknown_identities_are_not_stored():
+    cache = ResultCache(":memory:")
+    cache.put("id", _result(VERDICT_ERROR), "probe")
+    cache.put(None, _result(), "probe")
+    assert cache.entries() == []
+
+
+def test_expired_results_are_ignored_and_evicted(clock):
+    cache = ResultCache(":memory:", ttl_seconds=30 * DAY)
+    cache.put("old", _result(), "probe")
+    clock[0] += 29 * DAY
+    assert cache.get("old", "probe") is not None
+    assert cache.get("old", "probe", max_age=DAY) is None
+    clock[0] += 2 * DAY
+    assert cache.get("old", "probe") is None
+    cache.put("new", _result(), "probe")
+    assert [identity for identity, _, _, _ in cache.entries()] == ["new"]
+
+
+def test_least_recently_seen_entries_are_evicted_first(clock):
+    cache = ResultCache(":memory:", max_entries=2)
+    cache.put("a", _result(), "probe")
+    clock[0] += 1
+    cache.put("b", _result(), "probe")
+    clock[0] += 1
+    cache.get("a", "probe")  # a yeniden görüldü; en eski görülen artık b
+    clock[0] += 1
+    cache.put("c", _result(), "probe")
+    assert sorted(identity for identity, _, _, _ in cache.entries()) == ["a", "c"]
+
+
+def test_results_persist_on_disk(tmp_path):
+    path = str(tmp_path / "nested" / "results.sqlite")
+    cache = ResultCache(path)
+    cache.put("id", _result(), "probe")
+    cache.close()
+    assert ResultCache(path).get("id", "probe")[0].verdict == VERDICT_FAKE
+
+
+def test_default_location_follows_xdg_cache_home(isolated_cache):
+    assert ResultCache().path == str(isolated_cache / "fake-usb-tester" / cache_module.CACHE_FILE_NAME)
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+from fakeusb import engine, simulator
+from fakeusb.cancel import CancelToken
+from fakeusb.checkpoint import CHECKPOINT_VERSION, Checkpoint
+from fakeusb.engine import PHASE_VERIFY, PHASE_WRITE
+from fakeusb.modes import run_test, MODE_VERIFY
+from fakeusb.result import ERROR_CANCELLED, VERDICT_ERROR, VERDICT_FAKE, VERDICT_GENUINE
+
+MiB = 1024 * 1024
+ANNOUNCED = 64 * MiB
+
+
+@pytest.fixture(autouse=True)
+def progress_every_chunk(monkeypatch):
+    """Simüle sürücü yarım saniyeden kısa sürede biter; ilerleme her parçada bildirilsin."""
+    monkeypatch.setattr(engine, "PROGRESS_INTERVAL", 0)
+
+
+def _cancel_halfway(phase):
+    """Verilen aşamanın yarısında testi iptal eden (CancelToken, on_progress) çifti."""
+    cancel = CancelToken()
+
+    def on_progress(current_phase, done_bytes, total_bytes, bytes_per_sec):
+        if current_phase == phase and done_bytes >= total_bytes // 2:
+            cancel.cancel()
+
+    return cancel, on_progress
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "checkpoints" / "disk.json"))
+    assert checkpoint.load() is None
+    checkpoint.save({"phase": PHASE_WRITE, "offset": 4096})
+    state = checkpoint.load()
+    assert state["offset"] == 4096 and state["version"] == CHECKPOINT_VERSION
+    assert os.listdir(tmp_path / "checkpoints") == ["disk.json"]  # Geçici dosya kalmaz
+    checkpoint.clear()
+    checkpoint.clear()
+    assert checkpoint.load() is None
+
+
+def test_checkpoint_ignores_other_versions_and_corrupt_files(tmp_path):
+    path = tmp_path / "disk.json"
+    path.write_text(json.dumps({"version": CHECKPOINT_VERSION + 1, "offset": 1}))
+    assert Checkpoint(str(path)).load() is None
+    path.write_text("{yarım")
+    assert Checkpoint(str(path)).load() is None
+
+
+def test_checkpoint_is_keyed_by_device_identity(make_drive, tmp_path):
+    path = make_drive(simulator.KIND_GENUINE, MiB)
+    checkpoint = Checkpoint.for_disk(path, str(tmp_path))
+    assert checkpoint.path == Checkpoint.for_disk(path, str(tmp_path)).path
+    assert os.path.dirname(checkpoint.path) == str(tmp_path)
+    assert Checkpoint.for_disk(make_drive(simulator.KIND_GENUINE, MiB, name="other"), str(tmp_path)).path \
+        != checkpoint.path
+    assert Checkpoint.for_disk("/dev/yok-boyle-disk") is None
+
+
+@pytest.mark.parametrize("phase", [PHASE_WRITE, PHASE_VERIFY])
+@pytest.mark.parametrize("kind, real_bytes", [
+    (simulator.KIND_GENUINE, ANNOUNCED), (simulator.KIND_LIMBO, 16 * MiB), (simulator.KIND_WRAPAROUND, 16 * MiB),
+])
+def test_cancelled_verify_resumes_with_same_result(make_drive, kind, real_bytes, phase):
+    uninterrupted = run_test(make_drive(kind, ANNOUNCED, real_bytes, name="reference"), MODE_VERIFY)
+    path = make_drive(kind, ANNOUNCED, real_bytes)
+    cancel, on_progress = _cancel_halfway(phase)
+    cancelled = run_test(path, MODE_VERIFY, on_progress=on_progress, cancel=cancel)
+    assert (cancelled.verdict, cancelled.error) == (VERDICT_ERROR, ERROR_CANCELLED)
+
+    result = run_test(path, MODE_VERIFY)
+    assert result.error is None
+    assert result.details["resumed_from"]["phase"] == phase
+    assert result.details["resumed_from"]["offset"] > 0
+    assert result.verdict == (VERDICT_GENUINE if kind == simulator.KIND_GENUINE else VERDICT_FAKE)
+    assert result.real_bytes == real_bytes
+    assert result.details["regions"] == uninterrupted.details["regions"]
+    assert Checkpoint.for_disk(path).load() is None  # Biten testin kaydı silinir
+
+
+def test_overwritten_drive_restarts_from_zero(make_drive):
+    path = make_drive(simulator.KIND_GENUINE, ANNOUNCED)
+    cancel, on_progress = _cancel_halfway(PHASE_WRITE)
+    run_test(path, MODE_VERIFY, on_progress=on_progress, cancel=cancel)
+    assert Checkpoint.for_disk(path).load() is not None
+    with simulator.SimulatedDevice(path) as device:
+        device.write(bytes(ANNOUNCED), 0)  # Arada disk başka bir araçla silindi
+
+    result = run_test(path, MODE_VERIFY)
+    assert result.details["resumed_from"] is None
+    assert result.verdict == VERDICT_GENUINE
+
+
+def test_resume_can_be_disabled(make_drive):
+    path = make_drive(simulator.KIND_GENUINE, ANNOUNCED)
+    cancel, on_progress = _cancel_halfway(PHASE_VERIFY)
+    run_test(path, MODE_VERIFY, on_progress=on_progress, cancel=cancel)
+    result = run_test(path, MODE_VERIFY, options={"resume": False})
+    assert result.details["resumed_from"] is None
+    assert result.verdict == VERDICT_GENUINE
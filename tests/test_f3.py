@@ -0,0 +1,187 @@
+import subprocess
+import sys
+
+import pytest
+
+from fakeusb import f3
+from fakeusb.cancel import CancelToken
+from fakeusb.f3 import (F3ProbeParser, BlockSizeEvent, CapacityEvent, TimingEvent, VerdictEvent, classify_f3_error,
+                        drain_lines, parse_f3_duration)
+from fakeusb.result import (VERDICT_FAKE, VERDICT_GENUINE, VERDICT_MISMATCH, ERROR_AUTH, ERROR_CANCELLED,
+                            ERROR_EXIT_CODE, ERROR_F3_MISSING, ERROR_PKEXEC_MISSING)
+
+LIMBO_OUTPUT = """\
+F3 probe 8.0
+Copyright (C) 2010 Digirati Internet LTDA.
+
+Bad news: The device `/dev/sdb' is a counterfeit of type limbo
+
+You can "fix" this device using the following command:
+f3fix --last-sec=16477878 /dev/sdb
+
+Device geometry:
+\t         *Usable* size: 7.86 GB (16477879 blocks)
+\t        Announced size: 15.33 GB (32147456 blocks)
+\t                Module: 16.00 GB (2^34 Bytes)
+\tApproximate cache size: 0.00 Byte (0 blocks), need-reset=yes
+\t   Physical block size: 512.00 Byte (2^9 Bytes)
+
+Probe time: 1'13"
+ Operation: total time / count = avg time
+      Read: 472.1ms / 4198 = 112us
+     Write: 55.48s / 2158 = 25.7ms
+     Reset: 17.88s / 14 = 1.27s
+"""
+
+GENUINE_OUTPUT = """\
+Good news: The device `/dev/sdc' is the real thing
+
+Device geometry:
+\t         *Usable* size: 14.91 GB (31266816 blocks)
+\t        Announced size: 14.91 GB (31266816 blocks)
+\t   Physical block size: 4.00 KB (2^12 Bytes)
+"""
+
+
+def _parse(text, disk="/dev/sdb"):
+    parser = F3ProbeParser(disk)
+    events = []
+    for line in text.splitlines(keepends=True):
+        events.extend(parser.feed(line))
+    return parser.finish(), events
+
+
+def test_limbo_output():
+    result, events = _parse(LIMBO_OUTPUT)
+    assert result.verdict == VERDICT_FAKE
+    assert result.fake_type == "limbo"
+    assert result.real_bytes == 16477879 * 512
+    assert result.announced_bytes == 32147456 * 512
+    assert result.real_capacity == "7.86 GB" and result.promised_capacity == "15.33 GB"
+    assert result.details["module"] == "16.00 GB"
+    assert result.details["probe_time"] == 73
+    assert result.details["time_ops"]["write"] == {"total_seconds": 55.48, "count": 2158,
+                                                   "average_seconds": pytest.approx(0.0257)}
+    assert VerdictEvent(VERDICT_FAKE, "limbo") in events
+    assert CapacityEvent("usable", "7.86 GB", 16477879) in events
+    assert BlockSizeEvent(512) in events
+    assert [event.operation for event in events if isinstance(event, TimingEvent)] == ["read", "write", "reset"]
+    assert result.details["regions"]["runs"] == [[0, "good"], [16477879, "discarded"]]
+
+
+def test_genuine_output_uses_reported_block_size():
+    result, _ = _parse(GENUINE_OUTPUT, "/dev/sdc")
+    assert result.verdict == VERDICT_GENUINE
+    assert result.details["block_size"] == 4096
+    assert result.real_bytes == result.announced_bytes == 31266816 * 4096
+
+
+def test_capacity_mismatch_without_verdict_line():
+    result, _ = _parse("*Usable* size: 7.86 GB (16477879 blocks)\nAnnounced size: 15.33 GB (32147456 blocks)\n")
+    assert result.verdict == VERDICT_MISMATCH
+
+
+def test_old_warning_format():
+    result, _ = _parse("WARNING: Only 16,477,879 of 32,147,456 sectors were found\n")
+    assert result.verdict == VERDICT_FAKE
+    assert result.real_bytes == 16477879 * 512
+    assert result.real_capacity == "7.86 GB"
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("112us", 112e-6), ("25.7ms", 0.0257), ("55.48s", 55.48), ("1'13\"", 73), ("1h02'03\"", 3723), ("3ns", 3e-9),
+])
+def test_parse_f3_duration(text, seconds):
+    assert parse_f3_duration(text) == pytest.approx(seconds)
+
+
+def test_parse_f3_duration_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_f3_duration("yakında")
+
+
+def test_classify_f3_error():
+    assert classify_f3_error(["Error executing command as another user: Not authorized",
+                              "This incident has been reported.", "Authentication failed"]) == ERROR_AUTH
+    assert classify_f3_error(["pkexec: command not found"]) == ERROR_PKEXEC_MISSING
+    assert classify_f3_error(["f3probe: Can't open device"]) == ERROR_EXIT_CODE
+
+
+@pytest.mark.parametrize("stderr_lines, returncode, under_pkexec, error", [
+    # Yerelleştirilmiş pkexec mesajı: metin eşleşmese de çıkış kodu yetkilendirme hatasıdır
+    (["Başka bir kullanıcı olarak komut çalıştırılırken hata: Yetkili değil"], 127, True, ERROR_AUTH),
+    ([], 126, True, ERROR_AUTH),  # Yetkilendirme penceresi kapatıldı
+    (["Cannot run program f3probe: No such file or directory"], 127, True, ERROR_F3_MISSING),
+    (["f3probe: Can't open device"], 1, True, ERROR_EXIT_CODE),
+    ([], 127, False, ERROR_EXIT_CODE),  # Root olarak çalışan f3probe'un kendi kodu
+    (["Authentication failed"], 1, False, ERROR_AUTH),
+])
+def test_classify_f3_error_uses_pkexec_exit_codes(stderr_lines, returncode, under_pkexec, error):
+    assert classify_f3_error(stderr_lines, returncode, under_pkexec) == error
+
+
+def test_missing_pkexec_is_reported(monkeypatch):
+    monkeypatch.setattr(f3, "f3probe_command", lambda disk_path: ["pkexec", "f3probe", disk_path])
+    monkeypatch.setattr(f3.subprocess, "Popen", _missing_program)
+    assert f3.probe_disk("/dev/sdb").error == ERROR_PKEXEC_MISSING
+
+
+def _missing_program(command, **kwargs):
+    raise FileNotFoundError(2, "No such file or directory", command[0])
+
+
+def test_drain_lines_reads_both_pipes_without_blocking():
+    # stderr borusunu dolduran süreç, yalnızca stdout okunsaydı kilitlenirdi
+    script = ("import sys\n"
+              "for number in range(20000):\n"
+              "    sys.stderr.write(f'err {number}\\n')\n"
+              "sys.stdout.write('partial line without newline')\n")
+    process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = [], []
+    drain_lines(process, stdout.append, stderr.append)
+    assert process.wait(10) == 0
+    assert len(stderr) == 20000 and stderr[-1] == "err 19999\n"
+    assert stdout == ["partial line without newline"]
+
+
+@pytest.fixture
+def fake_f3probe(monkeypatch):
+    """f3probe yerine LIMBO_OUTPUT'u iki parçada yazan, root süreci gibi sinyal kabul etmeyen bir betik çalıştırır."""
+    signals = []
+    script = ("import sys, time\n"
+              f"lines = {LIMBO_OUTPUT.splitlines(keepends=True)!r}\n"
+              "sys.stdout.write(lines[0]); sys.stdout.flush()\n"
+              "time.sleep(0.3)\n"
+              "sys.stdout.write(''.join(lines[1:]))\n"
+              "sys.exit(102)\n")
+    monkeypatch.setattr(f3, "f3probe_command", lambda disk_path: [sys.executable, "-c", script])
+
+    def refuse(process, *args):
+        signals.append(process.pid)
+        raise PermissionError("Operation not permitted")
+
+    monkeypatch.setattr(subprocess.Popen, "terminate", refuse)
+    monkeypatch.setattr(subprocess.Popen, "kill", refuse)
+    monkeypatch.setattr(subprocess.Popen, "send_signal", refuse)
+    return signals
+
+
+def test_cancel_does_not_signal_a_running_f3probe(fake_f3probe):
+    cancel = CancelToken()
+    stderr = []
+
+    def on_stdout(line):
+        cancel.cancel()  # İlk satırdan sonra, f3probe çalışırken
+
+    result = f3.probe_disk("/dev/sdb", on_stdout=on_stdout, on_stderr=stderr.append, cancel=cancel)
+    assert fake_f3probe == []
+    assert stderr == [f3.CANCEL_REFUSED_MESSAGE]
+    assert result.error is None and result.returncode == 102
+    assert (result.verdict, result.fake_type) == (VERDICT_FAKE, "limbo")
+
+
+def test_cancel_before_start_does_not_run_f3probe(fake_f3probe):
+    cancel = CancelToken()
+    cancel.cancel()
+    result = f3.probe_disk("/dev/sdb", cancel=cancel)
+    assert result.error == ERROR_CANCELLED
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from fakeusb import simulator
+from fakeusb.cache import ResultCache, make_identity
+from fakeusb.cli import _assess_disk, run_batch
+from fakeusb.fingerprint import (FingerprintDB, RISK_KNOWN_BAD, RISK_KNOWN_CLEAN, RISK_SUSPECT, RISK_UNKNOWN,
+                                 plan_test)
+from fakeusb.modes import MODE_F3PROBE, MODE_PROBE, MODE_QUICK, MODE_VERIFY
+from fakeusb.result import ProbeResult, VERDICT_ERROR, VERDICT_FAKE, VERDICT_GENUINE, VERDICT_MISMATCH
+from fakeusb.scheduler import PRIORITY_HIGH, PRIORITY_NORMAL
+
+GiB = 1024**3
+MiB = 1024 * 1024
+
+
+def _metadata(serial, size_bytes=16 * GiB, vendor_id="1234", product_id="abcd"):
+    return {"size_bytes": size_bytes, "vendor": "Generic", "model": "Flash Disk",
+            "usb": {"vendor_id": vendor_id, "product_id": product_id},
+            "identity": make_identity(serial, vendor_id, product_id, size_bytes)}
+
+
+def _result(verdict, real_bytes=None, **details):
+    return ProbeResult(disk="/dev/sdb", verdict=verdict, real_bytes=real_bytes, details=details)
+
+
+@pytest.fixture
+def db():
+    return FingerprintDB(":memory:")
+
+
+def test_unrecognised_drives_are_unknown(db):
+    assert db.assess({"size_bytes": GiB, "usb": {}}).level == RISK_UNKNOWN
+    assert not db.record({"size_bytes": GiB}, _result(VERDICT_FAKE))
+    assert db.assess(_metadata("A")).level == RISK_UNKNOWN
+
+
+def test_known_bad_reports_typical_real_capacity(db):
+    db.record(_metadata("A"), _result(VERDICT_FAKE, 8 * GiB))
+    db.record(_metadata("B"), _result(VERDICT_MISMATCH, 8 * GiB))
+    db.record(_metadata("C"), _result(VERDICT_FAKE, 4 * GiB))
+    db.record(_metadata("D"), _result(VERDICT_GENUINE))
+    risk = db.assess(_metadata("E"))
+    assert risk.level == RISK_KNOWN_BAD
+    assert (risk.fake_count, risk.genuine_count) == (3, 1)
+    assert risk.typical_real_bytes == 8 * GiB
+    assert risk.score == pytest.approx(4 / 6)
+
+
+def test_single_fake_among_genuines_is_suspect(db):
+    for serial in "ABC":
+        db.record(_metadata(serial), _result(VERDICT_GENUINE))
+    db.record(_metadata("D"), _result(VERDICT_FAKE, GiB))
+    assert db.assess(_metadata("E")).level == RISK_SUSPECT
+
+
+def test_controller_with_fake_sizes_is_suspect(db):
+    db.record(_metadata("A", 32 * GiB), _result(VERDICT_FAKE, GiB))
+    db.record(_metadata("B", 64 * GiB), _result(VERDICT_FAKE, GiB))
+    risk = db.assess(_metadata("C"))
+    assert risk.level == RISK_SUSPECT
+    assert (risk.fake_count, risk.controller_fake_count) == (0, 2)
+
+
+def test_clean_needs_enough_distinct_devices(db):
+    for _ in range(5):
+        db.record(_metadata("A"), _result(VERDICT_GENUINE))  # Aynı disk tek oy verir
+    assert db.assess(_metadata("X")).level == RISK_UNKNOWN
+    db.record(_metadata("B"), _result(VERDICT_GENUINE))
+    db.record(_metadata("C"), _result(VERDICT_GENUINE))
+    assert db.assess(_metadata("X")).level == RISK_KNOWN_CLEAN
+
+
+def test_inconclusive_results_are_not_recorded(db):
+    assert not db.record(_metadata("A"), _result(VERDICT_ERROR))
+    assert not db.record(_metadata("B"), _result(VERDICT_GENUINE, quick={"verdict": VERDICT_GENUINE}))
+    assert db.record(_metadata("C"), _result(VERDICT_GENUINE, quick={"escalated_to": MODE_PROBE}))
+    assert db.assess(_metadata("X")).genuine_count == 1
+
+
+def test_newer_observation_of_a_device_wins(db):
+    db.record(_metadata("A"), _result(VERDICT_FAKE, GiB), observed_at=200)
+    db.record(_metadata("A"), _result(VERDICT_GENUINE), observed_at=100)
+    assert (db.assess(_metadata("A")).fake_count, db.assess(_metadata("A")).genuine_count) == (1, 0)
+
+
+def test_export_import_and_learn_from_cache(db):
+    db.record(_metadata("A"), _result(VERDICT_FAKE, GiB))
+    other = FingerprintDB(":memory:")
+    assert other.import_observations(db.export() + [{"verdict": "unknown"}]) == 1
+    assert other.assess(_metadata("X")).level == RISK_KNOWN_BAD
+
+    cache = ResultCache(":memory:")
+    cache.put(_metadata("B")["identity"], _result(VERDICT_FAKE, GiB), MODE_PROBE)
+    cache.put(make_identity("C", None, None, GiB), _result(VERDICT_FAKE, GiB), MODE_PROBE)  # VID:PID yok
+    assert db.learn_from_cache(cache) == 1
+    assert db.fingerprints() == [("1234:abcd|17179869184", "Generic", "Flash Disk", 2, 0)]
+
+
+@pytest.mark.parametrize("level, mode, expected", [
+    (RISK_KNOWN_BAD, MODE_QUICK, (MODE_F3PROBE, PRIORITY_HIGH)),
+    (RISK_SUSPECT, MODE_VERIFY, (MODE_VERIFY, PRIORITY_HIGH)),
+    (RISK_KNOWN_CLEAN, MODE_PROBE, (MODE_QUICK, PRIORITY_NORMAL)),
+    (RISK_KNOWN_CLEAN, MODE_VERIFY, (MODE_VERIFY, PRIORITY_NORMAL)),
+    (RISK_UNKNOWN, MODE_F3PROBE, (MODE_F3PROBE, PRIORITY_NORMAL)),
+])
+def test_plan_test(db, level, mode, expected):
+    risk = db.assess(_metadata("A"))
+    risk.level = level
+    assert plan_test(risk, mode) == expected
+
+
+def test_batch_records_and_flags_known_fakes(db, make_drive):
+    first = make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB, name="first")
+    assert run_batch([first], mode=MODE_PROBE, fingerprints=db)[0].verdict == VERDICT_FAKE
+    # Aynı türden ikinci sahte disk: takılır takılmaz işaretlenir ve öne alınır
+    second = make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB, name="second")
+    metadata, risk, mode, priority = _assess_disk(second, MODE_QUICK, db, threading.Lock())
+    assert metadata["identity"] and metadata["usb"]["vendor_id"]
+    assert (risk.level, risk.typical_real_bytes) == (RISK_KNOWN_BAD, 2 * MiB)
+    assert (mode, priority) == (MODE_F3PROBE, PRIORITY_HIGH)
+    result = run_batch([second], mode=MODE_PROBE, fingerprints=db)[0]
+    assert result.details["risk"]["level"] == RISK_KNOWN_BAD
@@ -0,0 +1,136 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from fakeusb import helper
+from fakeusb.helper import (HELPER_PROGRAM_NAME, HelperError, HelperServer, PrivilegedHelper, helper_command,
+                            helper_program)
+from fakeusb.result import ERROR_HELPER_MISSING
+
+
+@pytest.fixture
+def install_tree(tmp_path, monkeypatch):
+    """
+    Kurulu yardımcı dizini taklidi. Testler root olmadan da çalışsın diye lstat, bu kullanıcıya
+    ait dosyaları root'a ait, tmp_path'in üst dizinlerini de root'a ait ve yazılamaz gösterir;
+    foreign kümesindeki yollar başka bir kullanıcıya aittir.
+    """
+    real_lstat = os.lstat
+    foreign = set()
+
+    def fake_lstat(path):
+        path = os.path.abspath(path)
+        info = real_lstat(path)
+        if not path.startswith(str(tmp_path)):
+            return os.stat_result((0o40755, info.st_ino, info.st_dev, info.st_nlink, 0, 0) + tuple(info)[6:])
+        uid = 1000 if path in foreign else (0 if info.st_uid == os.getuid() else info.st_uid)
+        return os.stat_result(tuple(info)[:4] + (uid,) + tuple(info)[5:])
+
+    monkeypatch.setattr(helper.os, "lstat", fake_lstat)
+    root = tmp_path / "lib" / "fake-usb-tester"
+    (root / "fakeusb").mkdir(parents=True)
+    (root / "fakeusb" / "__init__.py").write_text("")
+    (root / HELPER_PROGRAM_NAME).write_text("#!/usr/bin/python3 -I\n")
+    for path in (tmp_path / "lib", root, root / "fakeusb"):
+        path.chmod(0o755)
+    for path in (root / HELPER_PROGRAM_NAME, root / "fakeusb" / "__init__.py"):
+        path.chmod(0o755)
+    return root, foreign
+
+
+def test_trusted_install_is_used(install_tree):
+    root, _ = install_tree
+    assert helper_program(str(root)) == str(root / HELPER_PROGRAM_NAME)
+    assert helper_command("/run/user/1000/helper.sock", str(root))[:2] == ["pkexec", str(root / HELPER_PROGRAM_NAME)]
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda root, foreign: (root / "fakeusb" / "__init__.py").chmod(0o664),  # Grup yazabiliyor
+    lambda root, foreign: (root / "fakeusb").chmod(0o777),
+    lambda root, foreign: root.parent.chmod(0o775),  # Üst dizin: yardımcı dizini değiştirilebilir
+    lambda root, foreign: (root / "fakeusb" / "probe.py").symlink_to("/tmp/probe.py"),
+    lambda root, foreign: foreign.add(str(root / "fakeusb" / "__init__.py")),
+    lambda root, foreign: foreign.add(str(root.parent)),
+], ids=["group-writable-file", "world-writable-dir", "writable-parent", "symlink", "foreign-file", "foreign-parent"])
+def test_tampered_install_is_refused(install_tree, tamper):
+    root, foreign = install_tree
+    tamper(root, foreign)
+    assert helper_program(str(root)) is None
+    with pytest.raises(HelperError) as error:
+        helper_command("/run/user/1000/helper.sock", str(root))
+    assert error.value.error == ERROR_HELPER_MISSING
+
+
+def test_missing_install_is_refused(tmp_path):
+    assert helper_program(str(tmp_path / "yok")) is None
+
+
+@pytest.mark.parametrize("environment, euid, expected", [
+    ({"PKEXEC_UID": "1000"}, 0, 1000), ({"PKEXEC_UID": "abc"}, 0, None), ({}, 0, 0), ({}, 1000, None),
+])
+def test_allowed_uid(monkeypatch, environment, euid, expected):
+    monkeypatch.delenv("PKEXEC_UID", raising=False)
+    for key, value in environment.items():
+        monkeypatch.setenv(key, value)
+    monkeypatch.setattr(helper.os, "geteuid", lambda: euid)
+    assert helper.allowed_uid() == expected
+
+
+@pytest.mark.parametrize("disk", ["/tmp/disk.img", "/dev/../etc/passwd", "/dev/disk/by-id/usb-x", "/dev/yok", None])
+def test_helper_refuses_non_removable_paths(disk):
+    with pytest.raises(ValueError):
+        helper._validate_disk(disk)
+
+
+def test_peer_uid_reads_socket_credentials():
+    first, second = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    with first, second:
+        assert helper._peer_uid(first) == os.getuid()
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Yardımcı sunucuyu bir thread'de çalıştırır ve bitince durdurur."""
+    servers = []
+
+    def start(allowed_uid):
+        server = HelperServer(str(tmp_path / "run" / "helper.sock"), allowed_uid)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        client = PrivilegedHelper(server.socket_path)
+        for _ in range(100):
+            if os.path.exists(server.socket_path):
+                break
+            threading.Event().wait(0.02)
+        return server, client
+
+    yield start
+    for server, thread in servers:
+        server._stopping.set()
+        thread.join(5)
+
+
+def test_helper_socket_is_private_to_the_user(serve):
+    server, client = serve(os.getuid())
+    assert client.is_running()
+    assert os.stat(server.socket_path).st_mode & 0o777 == 0o600
+    assert os.stat(os.path.dirname(server.socket_path)).st_mode & 0o777 == 0o700
+
+
+def test_helper_drops_connections_from_other_users(serve, monkeypatch):
+    other_uid = os.getuid() + 1000
+    monkeypatch.setattr(helper, "_peer_uid", lambda connection: other_uid)
+    server, client = serve(os.getuid())
+    assert not client.is_running()
+    # Reddedilen bağlantı isteği okunmadan kapanır
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(server.socket_path)
+        try:
+            helper._send(connection, {"op": "shutdown"})
+        except BrokenPipeError:
+            pass
+        assert connection.recv(1) == b""
+    assert not server._stopping.is_set()
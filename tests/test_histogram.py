@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from fakeusb import simulator
+from fakeusb.histogram import (BUCKET_COUNT, SUB_BUCKETS, LatencyHistogram, bucket_index, bucket_lower_bound)
+from fakeusb.modes import run_test, MODE_SPEED
+from fakeusb.result import PERFORMANCE_OK, PERFORMANCE_SLOW
+
+MiB = 1024 * 1024
+
+
+def test_buckets_cover_values_with_bounded_error():
+    for value in list(range(4096)) + [random.Random(7).randrange(1 << 39) for _ in range(2000)]:
+        index = bucket_index(value)
+        lower, upper = bucket_lower_bound(index), bucket_lower_bound(index + 1)
+        assert lower <= value < upper
+        assert upper - lower <= max(1, lower // SUB_BUCKETS)
+
+
+def test_huge_values_go_to_last_bucket():
+    histogram = LatencyHistogram()
+    histogram.record(1 << 50)
+    histogram.record(-5)  # Saat geri giderse negatif süre sıfır sayılır
+    assert histogram.counts[BUCKET_COUNT - 1] == 1 and histogram.counts[0] == 1
+    assert histogram.max == 1 << 50
+
+
+def test_percentiles_and_summary():
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+    summary = histogram.summary()
+    assert summary["count"] == 1000 and summary["mean"] == pytest.approx(500.5) and summary["max"] == 1000
+    for fraction, key in ((0.5, "p50"), (0.9, "p90"), (0.99, "p99")):
+        assert summary[key] == pytest.approx(fraction * 1000, rel=1 / SUB_BUCKETS)
+    assert LatencyHistogram().percentile(0.5) == 0
+
+
+def test_merge_and_round_trip():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in (3, 40, 500):
+        first.record(value)
+    second.record(70000)
+    first.merge(second)
+    assert first.count == 4 and first.max == 70000
+    data = first.to_dict()
+    assert data["counts"][-1] == 1 and len(data["counts"]) == bucket_index(70000) + 1
+    restored = LatencyHistogram.from_dict(data)
+    assert list(restored.counts) == list(first.counts)
+    assert restored.summary() == first.summary()
+
+
+@pytest.mark.parametrize("min_write_mbps, expected", [(None, PERFORMANCE_OK), (1e9, PERFORMANCE_SLOW)])
+def test_speed_mode_reports_latency_histograms(make_drive, min_write_mbps, expected):
+    path = make_drive(simulator.KIND_GENUINE, 32 * MiB)
+    result = run_test(path, MODE_SPEED, options={"sequential_bytes": 4 * MiB, "queue_depths": [1, 4],
+                                                 "random_seconds": 0.1, "min_write_mbps": min_write_mbps})
+    assert result.error is None
+    assert result.performance_verdict == expected
+    speed = result.details["speed"]
+    assert speed["seq_write_bytes_per_sec"] > 0 and speed["seq_read_bytes_per_sec"] > 0
+    assert {(run["operation"], run["queue_depth"]) for run in speed["random"]} == {
+        ("rand_read", 1), ("rand_read", 4), ("rand_write", 1), ("rand_write", 4)}
+    for run in speed["random"]:
+        latency = LatencyHistogram.from_dict(run["latency"])
+        assert latency.count == sum(latency.counts) > 0
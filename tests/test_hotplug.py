@@ -0,0 +1,52 @@
+import pytest
+
+from fakeusb.hotplug import HotplugMonitor, parse_uevent
+
+
+def test_parse_kernel_uevent():
+    data = b"add@/devices/pci0000:00/usb1/1-1/block/sdb\0ACTION=add\0DEVPATH=/devices/usb1/1-1/block/sdb\0" \
+           b"SUBSYSTEM=block\0DEVNAME=sdb\0DEVTYPE=disk\0SEQNUM=4711\0"
+    assert parse_uevent(data) == {"ACTION": "add", "DEVPATH": "/devices/usb1/1-1/block/sdb", "SUBSYSTEM": "block",
+                                  "DEVNAME": "sdb", "DEVTYPE": "disk", "SEQNUM": "4711"}
+
+
+def test_parse_uevent_keeps_equals_in_values_and_skips_bare_fields():
+    event = parse_uevent(b"change@/block/sdb\0ACTION=change\0ID_FS_LABEL=a=b\0garip\0DISK_MEDIA_CHANGE=1")
+    assert event == {"ACTION": "change", "ID_FS_LABEL": "a=b", "DISK_MEDIA_CHANGE": "1"}
+
+
+def test_parse_uevent_tolerates_invalid_utf8():
+    assert parse_uevent(b"add@/block/sdb\0DEVNAME=sd\xffb")["DEVNAME"] == "sd�b"
+
+
+def test_parse_uevent_ignores_udev_messages():
+    assert parse_uevent(b"libudev\0\xfe\xed\xca\xfeACTION=add") is None
+
+
+@pytest.fixture
+def sys_block(tmp_path):
+    def set_disk(name, sectors, removable="1"):
+        disk = tmp_path / name
+        disk.mkdir(exist_ok=True)
+        (disk / "removable").write_text(removable + "\n")
+        (disk / "size").write_text(f"{sectors}\n")
+    set_disk.path = str(tmp_path)
+    return set_disk
+
+
+def test_card_changes_are_reported_as_remove_and_add(sys_block):
+    events = []
+    monitor = HotplugMonitor(lambda disk: events.append(("add", disk["path"], disk["size_bytes"])),
+                             lambda disk_path: events.append(("remove", disk_path)), sys_block_dir=sys_block.path)
+    sys_block("sdb", 0)  # Boş kart okuyucu eklenmiş sayılmaz
+    sys_block("sda", 2048, removable="0")
+    monitor._handle_add("sdb")
+    monitor._handle_add("sda")
+    sys_block("sdb", 2048)
+    monitor._handle_change("sdb")
+    monitor._handle_change("sdb")  # Boyut aynı, ortam değişmedi
+    monitor._handle_change("sdb", media_changed=True)
+    sys_block("sdb", 0)
+    monitor._handle_change("sdb")
+    assert events == [("add", "/dev/sdb", 2048 * 512), ("remove", "/dev/sdb"), ("add", "/dev/sdb", 2048 * 512),
+                      ("remove", "/dev/sdb")]
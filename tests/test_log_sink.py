@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt5.QtWidgets")
+
+from fake_usb_tester import LOG_DEBUG, LOG_INFO, LOG_WARNING, LogSink  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def sink(app):
+    def make(**options):
+        sink = LogSink(QtWidgets.QPlainTextEdit(), **options)
+        sink._timer.stop()  # Testler flush'ı elle çağırır
+        return sink
+    return make
+
+
+def _lines(sink):
+    sink.flush()
+    return sink.view.toPlainText().splitlines()
+
+
+def test_lines_below_level_are_dropped_without_formatting(sink):
+    log = sink(level=LOG_INFO)
+    calls = []
+    log.debug(lambda: calls.append(True) or "gizli")
+    log.info(lambda: "görünür")
+    log.warning("uyarı")
+    assert calls == []
+    assert _lines(log) == ["görünür", "uyarı"]
+    assert not log.is_enabled(LOG_DEBUG) and log.is_enabled(LOG_WARNING)
+
+
+def test_debug_level_keeps_debug_lines(sink):
+    log = sink(level=LOG_DEBUG)
+    log.debug(lambda: "ayrıntı")
+    assert _lines(log) == ["ayrıntı"]
+
+
+def test_pending_buffer_and_view_are_capped(sink):
+    log = sink(level=LOG_DEBUG, max_lines=5)
+    for number in range(12):
+        log.info(str(number))
+    assert len(log._pending) == 5  # Halka tampon en eski satırları atar
+    assert _lines(log) == [str(number) for number in range(7, 12)]
+    for number in range(12, 20):
+        log.info(str(number))
+        log.flush()
+    assert log.view.document().blockCount() == 5
+
+
+def test_set_text_keeps_pending_warnings(sink):
+    log = sink(level=LOG_DEBUG)
+    log.info("eski bilgi")
+    log.warning("önbellek açılamadı")
+    log.set_text("başlangıç")
+    assert _lines(log) == ["başlangıç", "önbellek açılamadı"]
+
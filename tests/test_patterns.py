@@ -0,0 +1,68 @@
+import pytest
+
+from fakeusb import patterns
+from fakeusb.patterns import PatternTable
+
+KERNELS = ["numpy", "python"]
+
+
+@pytest.fixture(params=KERNELS)
+def table(request):
+    if request.param == "numpy" and patterns.load_numpy() is None:
+        pytest.skip("NumPy kurulu değil")
+    table = PatternTable(seed=7, use_numpy=request.param == "numpy")
+    assert table.use_numpy == (request.param == "numpy")
+    return table
+
+
+@pytest.mark.parametrize("first_sector", [0, 12345, 2**40 + 3, 2**64 - 5])
+def test_kernels_generate_the_same_bytes(first_sector):
+    pure = PatternTable(seed=7, use_numpy=False)
+    expected = b"".join(pure.sector(first_sector + index) for index in range(5))
+    assert pure.generate(first_sector, 5) == expected
+    if patterns.load_numpy() is not None:
+        assert PatternTable(seed=7).generate(first_sector, 5) == expected
+
+
+def test_each_sector_starts_with_its_address(table):
+    data = table.generate(1000, 3)
+    for index in range(3):
+        sector = data[index * 512:(index + 1) * 512]
+        assert int.from_bytes(sector[:8], "little") == 1000 + index
+        assert table.source_address(sector) == 1000 + index
+    assert table.source_address(bytes(512)) is None
+    assert table.source_address(b"short") is None
+    assert PatternTable(seed=8).source_address(data[:512]) is None  # Başka tohumun deseni
+
+
+def test_fill_matches_generate(table):
+    buffer = bytearray(8 * 512 + 100)  # Sektör boyutunu aşan kuyruk dokunulmadan kalır
+    table.fill(buffer, 77)
+    assert bytes(buffer[:8 * 512]) == table.generate(77, 8)
+    assert bytes(buffer[8 * 512:]) == bytes(100)
+    view = memoryview(bytearray(4 * 512))
+    table.fill(view[512:], 78)
+    assert bytes(view[512:]) == table.generate(78, 3)
+
+
+def test_find_bad_sectors(table):
+    buffer = bytearray(table.generate(500, 16))
+    assert table.find_bad_sectors(buffer, 500) == []
+    buffer[3 * 512 + 511] ^= 1  # Tek bit
+    buffer[9 * 512:10 * 512] = table.generate(0, 1)  # Başka adresin sektörü (sarma)
+    buffer[15 * 512:] = bytes(512)  # Kaybolan yazma
+    assert table.find_bad_sectors(buffer, 500) == [3, 9, 15]
+    assert table.find_bad_sectors(buffer, 501) == list(range(16))
+
+
+def test_missing_numpy_falls_back_to_python(monkeypatch):
+    monkeypatch.setattr(patterns, "_numpy", False)
+    assert patterns.load_numpy() is None
+    assert not PatternTable().use_numpy
+
+
+def test_sector_size_must_be_a_multiple_of_eight():
+    with pytest.raises(ValueError):
+        PatternTable(sector_size=500)
+    table = PatternTable(sector_size=4096, use_numpy=False)
+    assert len(table.generate(1, 2)) == 8192
@@ -0,0 +1,121 @@
+import hashlib
+import os
+
+import pytest
+
+from fakeusb import cancel as cancel_module, modes, simulator
+from fakeusb.cancel import CancelToken
+from fakeusb.modes import run_test, MODE_PROBE
+from fakeusb.probe import FAKE_TYPE_LIMBO, FAKE_TYPE_WRAPAROUND, CapacityProbe
+from fakeusb.result import ERROR_CANCELLED, VERDICT_FAKE
+
+MiB = 1024 * 1024
+ANNOUNCED = 64 * MiB
+REAL = 16 * MiB
+CACHED_SECTORS = 256  # Bir denemenin tüm etiketlerini tutacak kadar büyük
+
+
+def _backing(path):
+    return os.path.join(os.path.dirname(path), simulator.load_manifest(path)["backing"])
+
+
+def _digest(path):
+    with open(_backing(path), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _fill_with_data(path):
+    with open(_backing(path), "r+b") as f:
+        f.write(os.urandom(REAL))
+
+
+def _probe(path, **options):
+    with simulator.SimulatedDevice(path) as device:
+        probe = CapacityProbe(device, seed=1, **options)
+        real_sectors = probe.run()
+        return real_sectors * probe.sector_size, probe
+
+
+def test_simulated_cache_hides_lost_writes_until_reset(make_drive):
+    with simulator.SimulatedDevice(make_drive(simulator.KIND_LIMBO, cached_sectors=2)) as device:
+        buffer = bytearray(512)
+        for sector in (40000, 40001):
+            device.write(bytes([sector % 256]) * 512, sector * 512)
+        device.read_into(buffer, 40000 * 512)
+        assert bytes(buffer) == bytes([40000 % 256]) * 512  # Kaybolan yazma önbellekten okunur
+        device.write(b"y" * 512, 0)  # En eski önbellek girdisi çıkar
+        device.read_into(buffer, 40000 * 512)
+        assert bytes(buffer) == bytes(512)
+        device.reset()
+        device.read_into(buffer, 40001 * 512)
+        assert bytes(buffer) == bytes(512)
+
+
+def test_cached_drive_fools_probe_without_eviction(make_drive):
+    real_bytes, _ = _probe(make_drive(simulator.KIND_LIMBO, cached_sectors=CACHED_SECTORS), flush_bytes=0)
+    assert real_bytes == ANNOUNCED
+
+
+@pytest.mark.parametrize("kind, fake_type", [
+    (simulator.KIND_LIMBO, FAKE_TYPE_LIMBO), (simulator.KIND_WRAPAROUND, FAKE_TYPE_WRAPAROUND),
+])
+def test_probe_flushes_cache_when_no_reset_is_possible(make_drive, kind, fake_type):
+    path = make_drive(kind, cached_sectors=CACHED_SECTORS)
+    _fill_with_data(path)
+    before = _digest(path)
+    result = run_test(path, MODE_PROBE)
+    assert (result.verdict, result.fake_type, result.real_bytes) == (VERDICT_FAKE, fake_type, REAL)
+    assert result.details["flush_bytes"] > 0 and result.details["resets"] == 0
+    assert _digest(path) == before
+
+
+def test_probe_uses_reset_to_evict_cache(make_drive):
+    path = make_drive(simulator.KIND_LIMBO, cached_sectors=CACHED_SECTORS)
+    with simulator.SimulatedDevice(path) as device:
+        probe = CapacityProbe(device, seed=1, reset=device.reset, flush_bytes=0)
+        assert probe.run() * probe.sector_size == REAL
+        assert probe.stats["resets"] == probe.stats["probes"] and probe.stats["flush_bytes"] == 0
+
+
+def test_failing_reset_falls_back_to_flushing(make_drive):
+    calls = []
+
+    def reset():
+        calls.append(True)
+        raise OSError("USBDEVFS_RESET desteklenmiyor")
+
+    real_bytes, probe = _probe(make_drive(simulator.KIND_LIMBO, cached_sectors=CACHED_SECTORS), reset=reset)
+    assert real_bytes == REAL
+    assert len(calls) == 1 and probe.stats["flush_bytes"] > 0
+
+
+@pytest.mark.parametrize("kind", [simulator.KIND_LIMBO, simulator.KIND_WRAPAROUND])
+def test_probe_restores_data_when_cancelled(make_drive, kind):
+    path = make_drive(kind, cached_sectors=CACHED_SECTORS)
+    _fill_with_data(path)
+    before = _digest(path)
+    cancel = CancelToken()
+
+    def on_progress(phase, done, total, rate):
+        if done >= total // 2:
+            cancel.cancel()
+
+    with simulator.SimulatedDevice(path) as device:
+        probe = CapacityProbe(device, on_progress=on_progress, cancel=cancel)
+        with pytest.raises(cancel_module.TestCancelled):
+            probe.run()
+        assert probe.stats["writes"] > 0
+    assert _digest(path) == before
+    assert run_test(path, MODE_PROBE, cancel=cancel).error == ERROR_CANCELLED
+
+
+def test_usb_reset_is_only_offered_to_root_on_usb_drives(make_drive, monkeypatch):
+    assert modes._usb_reset(make_drive(simulator.KIND_LIMBO)) is None
+    monkeypatch.setattr(modes.topology, "usb_device_node", lambda disk_path: "/dev/bus/usb/001/004")
+    monkeypatch.setattr(modes.os, "geteuid", lambda: 1000)
+    assert modes._usb_reset("/dev/sdb") is None
+    monkeypatch.setattr(modes.os, "geteuid", lambda: 0)
+    resets = []
+    monkeypatch.setattr(modes.topology, "reset_usb_device", resets.append)
+    modes._usb_reset("/dev/sdb")()
+    assert resets == ["/dev/sdb"]
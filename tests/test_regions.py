@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from fakeusb.regions import (REGION_DISCARDED, REGION_GOOD, REGION_KINDS, REGION_UNTESTED, REGION_WRAPAROUND,
+                             RegionMap, cutoff_map, region_for_fake_type, regions_summary, sample_map)
+
+GiB = 1024**3
+
+
+def test_new_map_is_one_untested_run():
+    regions = RegionMap(1000)
+    assert list(regions.runs()) == [(0, 1000, REGION_UNTESTED)]
+    assert regions.holes() == 0
+
+
+def test_mark_splits_and_merges_runs():
+    regions = RegionMap(100)
+    regions.mark(0, 100, REGION_GOOD)
+    regions.mark(40, 50, REGION_DISCARDED)
+    assert list(regions.runs()) == [(0, 40, REGION_GOOD), (40, 50, REGION_DISCARDED), (50, 100, REGION_GOOD)]
+    assert regions.kind_at(39) == REGION_GOOD and regions.kind_at(40) == REGION_DISCARDED
+    regions.mark(40, 50, REGION_GOOD)  # Komşularla aynı türe dönen bölge birleşir
+    assert list(regions.runs()) == [(0, 100, REGION_GOOD)]
+    regions.mark(-5, 0, REGION_DISCARDED)
+    regions.mark(90, 500, REGION_WRAPAROUND)  # Harita dışı kırpılır
+    assert list(regions.runs())[-1] == (90, 100, REGION_WRAPAROUND)
+
+
+def test_escalate_only_raises_severity():
+    regions = RegionMap(100)
+    regions.mark(0, 50, REGION_GOOD)
+    regions.mark(50, 60, REGION_DISCARDED)
+    regions.escalate(0, 100, REGION_WRAPAROUND)
+    assert list(regions.runs()) == [(0, 50, REGION_WRAPAROUND), (50, 60, REGION_DISCARDED),
+                                    (60, 100, REGION_WRAPAROUND)]
+
+
+def test_dict_round_trip_is_run_length_encoded():
+    regions = cutoff_map(2048 * GiB, 8 * GiB, "limbo")
+    data = regions.to_dict()
+    assert data["runs"] == [[0, REGION_GOOD], [8 * GiB // 512, REGION_DISCARDED]]
+    restored = RegionMap.from_dict(data)
+    assert list(restored.runs()) == list(regions.runs())
+    assert restored.totals() == {REGION_GOOD: 8 * GiB, REGION_UNTESTED: 0, REGION_WRAPAROUND: 0,
+                                 REGION_DISCARDED: 2040 * GiB}
+
+
+def test_coarsening_never_shows_bad_sectors_as_good():
+    sectors = 1 << 16
+    expected = bytearray(sectors)  # Her sektörün gerçek türü (REGION_KINDS sırası)
+    regions = RegionMap(sectors, max_runs=16)
+    rng = random.Random(3)
+    regions.mark(0, sectors, REGION_GOOD)
+    for _ in range(400):
+        start = rng.randrange(sectors)
+        end = min(sectors, start + rng.randrange(1, 64))
+        kind = rng.choice(REGION_KINDS)
+        regions.mark(start, end, kind)
+        expected[start:end] = bytes([REGION_KINDS.index(kind)]) * (end - start)
+    assert len(regions) <= 16 and regions.granularity > 1
+    for start, end, kind in regions.runs():
+        assert start % regions.granularity == 0
+        assert REGION_KINDS.index(kind) >= max(expected[start:end])
+    assert sum(regions.totals().values()) == sectors * 512
+
+
+def test_holes_ignore_trailing_bad_runs_and_untested_gaps():
+    regions = RegionMap(100)
+    regions.mark(0, 80, REGION_GOOD)
+    regions.mark(80, 100, REGION_DISCARDED)
+    assert regions.holes() == 0
+    regions.mark(10, 20, REGION_WRAPAROUND)
+    regions.mark(30, 40, REGION_DISCARDED)
+    regions.mark(50, 60, REGION_UNTESTED)
+    assert regions.holes() == 2
+
+
+def test_cells_take_the_worst_kind():
+    regions = RegionMap(1000)
+    regions.mark(0, 1000, REGION_GOOD)
+    regions.mark(999, 1000, REGION_DISCARDED)
+    regions.mark(0, 250, REGION_WRAPAROUND)
+    assert regions.cells(4) == [REGION_WRAPAROUND, REGION_GOOD, REGION_GOOD, REGION_DISCARDED]
+    assert regions.text_bar(4) == "[~==x]"
+    assert RegionMap(0).cells(4) == []
+
+
+@pytest.mark.parametrize("fake_type, kind", [
+    ("wraparound", REGION_WRAPAROUND), ("chain", REGION_WRAPAROUND), ("limbo", REGION_DISCARDED),
+    (None, REGION_DISCARDED),
+])
+def test_region_for_fake_type(fake_type, kind):
+    assert region_for_fake_type(fake_type) == kind
+
+
+def test_cutoff_map_needs_sizes():
+    assert cutoff_map(None, GiB) is None
+    assert cutoff_map(GiB, None) is None
+    assert list(cutoff_map(GiB, GiB).runs()) == [(0, GiB // 512, REGION_GOOD)]
+
+
+def test_sample_map_fills_between_equal_samples():
+    regions = sample_map(100, 512, [0, 20, 40, 60, 99], {60: "wraparound", 99: "wraparound"})
+    assert list(regions.runs()) == [(0, 41, REGION_GOOD), (41, 60, REGION_UNTESTED), (60, 100, REGION_WRAPAROUND)]
+
+
+def test_regions_summary():
+    regions = RegionMap(40)
+    regions.mark(0, 40, REGION_GOOD)
+    regions.mark(10, 20, REGION_DISCARDED)
+    assert regions_summary(regions.to_dict()) == "[" + "=" * 10 + "x" * 10 + "=" * 20 + "] 1 delik"
+    assert regions_summary(cutoff_map(40 * 512, 20 * 512).to_dict()) == "[" + "=" * 20 + "x" * 20 + "]"
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+
+from fakeusb import simulator
+from fakeusb.cache import ResultCache
+from fakeusb.cli import run_batch
+from fakeusb.fingerprint import FingerprintDB
+from fakeusb.modes import MODE_PROBE
+from fakeusb.result import VERDICT_GENUINE, VERDICT_FAKE
+from fakeusb.scheduler import ProbeScheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from fakeusb.topology import usb_bus_for_device
+
+MiB = 1024 * 1024
+BUSES = {"/dev/sdb": "usb1", "/dev/sdc": "usb1", "/dev/sdd": "usb1", "/dev/sde": "usb2"}
+
+
+def _wait_all(jobs):
+    for job in jobs:
+        assert job.wait(5)
+
+
+def test_jobs_run_in_priority_order():
+    scheduler = ProbeScheduler(max_workers=1, bus_resolver=BUSES.get)
+    gate = threading.Event()
+    order = []
+    first = scheduler.submit("/dev/sdb", gate.wait)
+    jobs = [scheduler.submit("/dev/sdc", lambda: order.append("sdc"), PRIORITY_NORMAL),
+            scheduler.submit("/dev/sdd", lambda: order.append("sdd"), PRIORITY_NORMAL),
+            scheduler.submit("/dev/sde", lambda: order.append("sde"), PRIORITY_HIGH)]
+    gate.set()
+    _wait_all([first] + jobs)
+    scheduler.shutdown()
+    assert order == ["sde", "sdc", "sdd"]
+
+
+def test_per_bus_limit_skips_to_free_bus():
+    scheduler = ProbeScheduler(max_workers=4, per_bus_limit=1, bus_resolver=BUSES.get)
+    gate = threading.Event()
+    started = []
+    lock = threading.Lock()
+
+    def job(name):
+        def run():
+            with lock:
+                started.append(name)
+            gate.wait(5)
+        return run
+
+    jobs = [scheduler.submit(path, job(path)) for path in ("/dev/sdb", "/dev/sdc", "/dev/sde")]
+    # sdc, sdb ile aynı hub'da olduğundan bekler; sıradaki boş hub'daki sde başlar
+    for _ in range(100):
+        if len(started) == 2:
+            break
+        time.sleep(0.01)
+    assert sorted(started) == ["/dev/sdb", "/dev/sde"]
+    assert scheduler.is_busy("/dev/sdc")
+    gate.set()
+    _wait_all(jobs)
+    scheduler.shutdown()
+    assert started[-1] == "/dev/sdc"
+    assert scheduler.active_count() == 0
+
+
+def test_same_disk_never_runs_twice_at_once():
+    scheduler = ProbeScheduler(max_workers=4, per_bus_limit=4, bus_resolver=BUSES.get)
+    running = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def run():
+        with lock:
+            overlaps.append(len(running))
+            running.append(1)
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    _wait_all([scheduler.submit("/dev/sdb", run) for _ in range(3)])
+    scheduler.shutdown()
+    assert overlaps == [0, 0, 0]
+
+
+def test_failed_job_keeps_error_and_worker_survives():
+    scheduler = ProbeScheduler(max_workers=1, bus_resolver=BUSES.get)
+
+    def fail():
+        raise OSError("okunamadı")
+
+    failed = scheduler.submit("/dev/sdb", fail)
+    after = scheduler.submit("/dev/sdc", lambda: None)
+    _wait_all([failed, after])
+    scheduler.shutdown()
+    assert isinstance(failed.error, OSError)
+    assert after.error is None and after.state == "done"
+
+
+def test_usb_bus_from_sysfs_path(tmp_path):
+    devices = tmp_path / "devices" / "pci0000:00" / "0000:00:14.0" / "usb2" / "2-1" / "host6" / "block" / "sdb"
+    devices.mkdir(parents=True)
+    block_dir = tmp_path / "block"
+    block_dir.mkdir()
+    os.symlink(devices, block_dir / "sdb")
+    assert usb_bus_for_device("/dev/sdb", str(block_dir)) == "usb2"
+    # Topolojisi bilinmeyen aygıtlar birbirini kısıtlamaz
+    assert usb_bus_for_device("/dev/nvme0n1", str(block_dir)) == "dev:nvme0n1"
+
+
+def test_usb_bus_of_simulated_drive(sim_dir):
+    path = simulator.create_drive(sim_dir, "a", simulator.KIND_GENUINE, 1024 * 1024, bus="sim3")
+    assert usb_bus_for_device(path) == "sim3"
+
+
+class _LockedCache(ResultCache):
+    def put(self, identity, result, mode):
+        raise sqlite3.OperationalError("database is locked")
+
+
+class _LockedFingerprints(FingerprintDB):
+    def record(self, metadata, result, observed_at=None):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_run_batch_keeps_results_when_stores_fail(make_drive):
+    genuine = make_drive(simulator.KIND_GENUINE, 8 * MiB)
+    limbo = make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB)
+    results = run_batch([genuine, limbo], mode=MODE_PROBE, cache=_LockedCache(":memory:"),
+                        fingerprints=_LockedFingerprints(":memory:"))
+    assert [result.disk for result in results] == [genuine, limbo]
+    assert [result.verdict for result in results] == [VERDICT_GENUINE, VERDICT_FAKE]
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import stat
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from fakeusb import simulator
+from fakeusb.index import disk_metadata
+from fakeusb.modes import MODE_PROBE, MODE_QUICK, MODE_VERIFY
+from fakeusb.result import ERROR_CANCELLED, ERROR_DEVICE_CHANGED, ProbeResult, VERDICT_FAKE, VERDICT_GENUINE
+from fakeusb.station import (JOB_CANCELLED, JOB_DONE, JOB_INTERRUPTED, JOB_QUEUED, JOB_RUNNING, JobError, JobQueue,
+                             Station, StationClient, StationError, StationServer, collect, drive_identity,
+                             load_or_create_token)
+
+MiB = 1024 * 1024
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def simulated(sim_dir, monkeypatch):
+    """İstasyonun disk taramasına simüle sürücüleri ekler."""
+    monkeypatch.setenv(simulator.SIMULATOR_DIR_ENV, sim_dir)
+    return sim_dir
+
+
+@pytest.fixture
+def station(tmp_path, simulated):
+    station = Station(JobQueue(str(tmp_path / "jobs.sqlite")), max_workers=2)
+    yield station
+    station.stop()
+
+
+@pytest.fixture
+def server(station):
+    server = StationServer(station, port=0, token=TOKEN)
+    server.start()
+    yield server
+    server.stop()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.port}"
+
+
+def _wait(station, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while station.jobs.get(job_id)["state"] in (JOB_QUEUED, JOB_RUNNING) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return station.jobs.get(job_id)
+
+
+def _raw_request(server, path, data=None, headers=None):
+    request = urllib.request.Request(_url(server) + path, data=data, headers=headers or {},
+                                     method="POST" if data is not None else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_job_queue_round_trip():
+    jobs = JobQueue(":memory:")
+    first = jobs.add("/dev/sdb", MODE_QUICK, {"samples": 8}, {"serial": "A"})
+    second = jobs.add("/dev/sdc", MODE_PROBE, None, {"serial": "B"})
+    assert first["state"] == JOB_QUEUED and first["options"] == {"samples": 8} and first["drive"] == {"serial": "A"}
+    assert [job["id"] for job in jobs.pending()] == [first["id"], second["id"]]
+    assert jobs.active() == {"/dev/sdb": first["id"], "/dev/sdc": second["id"]}
+    assert jobs.mark_running(first["id"], MODE_PROBE)
+    assert not jobs.cancel_queued(first["id"])  # Çalışan iş kuyruktan iptal edilemez
+    assert jobs.finish(first["id"], ProbeResult(disk="/dev/sdb", verdict=VERDICT_FAKE))
+    assert not jobs.finish(first["id"], ProbeResult(disk="/dev/sdb"))  # Biten iş yeniden bitirilmez
+    assert jobs.cancel_queued(second["id"])
+    assert [job["state"] for job in jobs.list()] == [JOB_CANCELLED, JOB_DONE]
+    assert jobs.get(first["id"])["result"]["verdict"] == VERDICT_FAKE
+    assert jobs.get("yok") is None
+
+
+def test_restart_interrupts_destructive_jobs_and_requeues_others(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    jobs = JobQueue(path)
+    destructive = jobs.add("/dev/sdb", MODE_VERIFY, {}, {})
+    probe = jobs.add("/dev/sdc", MODE_PROBE, {}, {})
+    jobs.mark_running(destructive["id"], MODE_VERIFY)
+    jobs.mark_running(probe["id"], MODE_PROBE)
+    jobs.close()
+
+    reopened = JobQueue(path)
+    interrupted = reopened.get(destructive["id"])
+    assert interrupted["state"] == JOB_INTERRUPTED
+    assert interrupted["result"]["error"] == ERROR_CANCELLED
+    assert reopened.get(probe["id"])["state"] == JOB_QUEUED
+
+
+def test_old_job_database_gains_drive_column(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, disk TEXT NOT NULL, mode TEXT NOT NULL, "
+                       "options_json TEXT NOT NULL, state TEXT NOT NULL, planned_mode TEXT, created_at REAL NOT NULL, "
+                       "started_at REAL, finished_at REAL, result_json TEXT)")
+    connection.execute("INSERT INTO jobs VALUES ('old', '/dev/sdb', 'quick', '{}', 'queued', NULL, 1, NULL, NULL, "
+                       "NULL)")
+    connection.commit()
+    connection.close()
+    assert JobQueue(path).get("old")["drive"] is None
+
+
+def test_submit_validates_requests(station, make_drive):
+    path = make_drive(simulator.KIND_GENUINE, MiB)
+    with pytest.raises(JobError, match="confirm_destructive"):
+        station.submit(path, MODE_VERIFY)
+    with pytest.raises(JobError):
+        station.submit(path, "format")
+    with pytest.raises(JobError) as missing:
+        station.submit("/dev/yok-boyle-disk", MODE_QUICK)
+    assert missing.value.status == 404
+
+
+def test_station_runs_jobs_and_records_drive_identity(station, make_drive):
+    path = make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB)
+    job = station.submit(path, MODE_PROBE)
+    assert job["drive"] == drive_identity(disk_metadata(path))
+    job = _wait(station, job["id"])
+    assert job["state"] == JOB_DONE and job["planned_mode"] == MODE_PROBE
+    assert job["result"]["verdict"] == VERDICT_FAKE and job["result"]["real_bytes"] == 2 * MiB
+
+
+def test_restarted_job_fails_if_drive_was_swapped_or_removed(tmp_path, simulated, make_drive):
+    path = str(tmp_path / "jobs.sqlite")
+    swapped = make_drive(simulator.KIND_GENUINE, 8 * MiB, name="swapped")
+    removed = make_drive(simulator.KIND_GENUINE, 8 * MiB, name="removed")
+    jobs = JobQueue(path)
+    swapped_job = jobs.add(swapped, MODE_PROBE, {}, drive_identity(disk_metadata(swapped)))
+    removed_job = jobs.add(removed, MODE_PROBE, {}, drive_identity(disk_metadata(removed)))
+    jobs.close()
+    # İstasyon kapalıyken aynı yola başka bir disk takıldı, diğeri çıkarıldı
+    simulator.remove_drive(swapped)
+    make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB, name="swapped")
+    simulator.remove_drive(removed)
+
+    station = Station(JobQueue(path))
+    station.start()
+    station.stop()
+    for job_id in (swapped_job["id"], removed_job["id"]):
+        job = station.jobs.get(job_id)
+        assert job["state"] == JOB_DONE
+        assert job["result"]["error"] == ERROR_DEVICE_CHANGED
+    assert station.jobs.get(swapped_job["id"])["started_at"] is None
+
+
+def test_token_is_created_once_and_private(isolated_cache):
+    token = load_or_create_token()
+    assert len(token) >= 32 and load_or_create_token() == token
+    token_path = isolated_cache / "fake-usb-tester" / "station.token"
+    assert stat.S_IMODE(os.stat(token_path).st_mode) == 0o600
+
+
+def test_server_requires_token_json_and_loopback_host(server):
+    authorized = {"Authorization": f"Bearer {TOKEN}"}
+    assert _raw_request(server, "/jobs") == 401
+    assert _raw_request(server, "/jobs", headers={"Authorization": "Bearer wrong-token"}) == 401
+    assert _raw_request(server, "/jobs", headers=authorized) == 200
+    assert _raw_request(server, "/jobs", headers=dict(authorized, Host="evil.example:9465")) == 403
+    body = json.dumps({"disk": "/dev/sdb"}).encode()
+    assert _raw_request(server, "/jobs", body, dict(authorized, **{"Content-Type": "text/plain"})) == 415
+    assert _raw_request(server, "/jobs", body, dict(authorized, **{"Content-Type": "application/json"})) == 404
+    assert _raw_request(server, "/bilinmeyen", headers=authorized) == 404
+
+
+def test_client_submits_streams_and_collects(server, station, make_drive):
+    genuine = make_drive(simulator.KIND_GENUINE, 8 * MiB)
+    client = StationClient(_url(server), TOKEN)
+    assert genuine in [drive["path"] for drive in client.drives()]
+    job = client.submit(genuine, MODE_PROBE)
+    with pytest.raises(StationError) as duplicate:
+        client.submit(genuine, MODE_PROBE)
+    assert duplicate.value.status == 409
+    events = list(client.stream(job["id"]))
+    assert events[0]["type"] == "job" and events[-1]["job"]["state"] == JOB_DONE
+    assert client.result(job["id"]).verdict == VERDICT_GENUINE
+    assert client.job(job["id"])["state"] == JOB_DONE
+
+    limbo = make_drive(simulator.KIND_LIMBO, 8 * MiB, 2 * MiB)
+    collected = collect([client], mode=MODE_PROBE, poll_seconds=0.05)
+    assert {job["disk"]: job["result"]["verdict"] for _, job in collected} == {genuine: VERDICT_GENUINE,
+                                                                                limbo: VERDICT_FAKE}
+    with pytest.raises(StationError) as unauthorized:
+        StationClient(_url(server)).jobs()
+    assert unauthorized.value.status == 401
+    assert station.jobs.list(JOB_RUNNING) == []